@@ -16,7 +16,10 @@ import configparser
 import os
 import shlex
 import socket
-from typing import Optional, Union
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
 
 from tortuga.objects.provisioningInfo import ProvisioningInfo
 from tortuga.utility.helper import str2bool
@@ -53,6 +56,9 @@ DEFAULT_TORTUGA_DB_PORT = '3306'
 DEFAULT_TORTUGA_DB_SCHEMA = 'tortugadb'
 DEFAULT_TORTUGA_DB_USER = 'tortuga'
 DEFAULT_TORTUGA_DB_PASSWORD = ''
+DEFAULT_TORTUGA_WSAPI_POOL_SIZE = 10
+DEFAULT_TORTUGA_WSAPI_MAX_RETRIES = 3
+DEFAULT_TORTUGA_WSAPI_BACKOFF_FACTOR = 0.5
 DEFAULT_TORTUGA_DB_PASSWORD_FILE = os.path.join(DEFAULT_TORTUGA_ETC,
                                                 'db.passwd')
 DEFAULT_TORTUGA_REDIS_PASSWORD = ''
@@ -87,6 +93,9 @@ DEFAULT_PROVISIONING_INFO = None
 # The most amount of data we will read when parsing provisioning info object
 MAX_PROVINFO_LENGTH = 50000
 
+# The number of seconds lookups in Vault are cached for
+VAULT_CACHE_TTL = 300
+
 
 def get_default_dns_suffix() -> Union[str, None]:
     if not os.path.exists('/etc/resolv.conf'):
@@ -136,6 +145,39 @@ def lookup_ipaddress(fqdn: str) -> str:
     return aiInfo[0][4][0]
 
 
+def _get_file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    return st.st_mtime_ns, st.st_size
+
+
+def _get_snapshot_key() -> tuple:
+    """
+    Gets a key that changes whenever the environment, or any of the files
+    the configuration is loaded from, change.
+
+    """
+    root = os.environ.get('TORTUGA_ROOT', DEFAULT_TORTUGA_ROOT)
+
+    paths = [
+        DEFAULT_TORTUGA_PROFILE_NII_FILE,
+        DEFAULT_TORTUGA_DB_PASSWORD_FILE,
+        DEFAULT_TORTUGA_REDIS_PASSWORD_FILE,
+        DEFAULT_TORTUGA_RELEASE_FILE,
+        DEFAULT_TORTUGA_CFM_SECRET_FILE,
+        os.path.join(root, 'config', 'tortuga.ini'),
+    ]
+
+    return (
+        os.environ.get('TORTUGA_ROOT'),
+        os.environ.get('TORTUGA_REPO_CONFIG_FILE'),
+        tuple(_get_file_stamp(path) for path in paths),
+    )
+
+
 class ConfigManager(dict): \
         # pylint: disable=too-many-public-methods
     """
@@ -152,6 +194,10 @@ class ConfigManager(dict): \
         level = cm.getConsoleLogLevel()
         cm['myKey'] = 'myValue'
         value = cm.get('myKey')
+
+    The configuration is loaded only once per process, and shared by all
+    instances as a read-only snapshot (see get_snapshot() and reload()).
+    Changes made to an instance are local to that instance.
     """
     def __init_defaults(self):
         self['defaultRoot'] = DEFAULT_TORTUGA_ROOT
@@ -173,6 +219,10 @@ class ConfigManager(dict): \
         self['defaultDbSchema'] = DEFAULT_TORTUGA_DB_SCHEMA
         self['defaultDbUser'] = DEFAULT_TORTUGA_DB_USER
         self['defaultDbPassword'] = DEFAULT_TORTUGA_DB_PASSWORD
+        self['defaultWsApiPoolSize'] = DEFAULT_TORTUGA_WSAPI_POOL_SIZE
+        self['defaultWsApiMaxRetries'] = DEFAULT_TORTUGA_WSAPI_MAX_RETRIES
+        self['defaultWsApiBackoffFactor'] = \
+            DEFAULT_TORTUGA_WSAPI_BACKOFF_FACTOR
         self['defaultDbPasswordFile'] = DEFAULT_TORTUGA_DB_PASSWORD_FILE
         self['defaultRedisPassword'] = DEFAULT_TORTUGA_REDIS_PASSWORD
         self['defaultRedisPasswordFile'] = DEFAULT_TORTUGA_REDIS_PASSWORD_FILE
@@ -239,12 +289,73 @@ class ConfigManager(dict): \
                                    fallback=self['defaultDbSchema'])
         self['dbUser'] = cfg.get('database', 'user',
                                  fallback=self['defaultDbUser'])
+        self['wsApiPoolSize'] = cfg.get(
+            'wsapi', 'pool_size', fallback=self['defaultWsApiPoolSize'])
+        self['wsApiMaxRetries'] = cfg.get(
+            'wsapi', 'max_retries', fallback=self['defaultWsApiMaxRetries'])
+        self['wsApiBackoffFactor'] = cfg.get(
+            'wsapi', 'backoff_factor',
+            fallback=self['defaultWsApiBackoffFactor'])
+
+    #
+    # The configuration loaded from the environment, files and Vault is
+    # shared by all instances in the process, as a read-only snapshot
+    #
+    _snapshot: Optional[Mapping[str, Any]] = None
+    _snapshot_key: Optional[tuple] = None
+    _snapshot_expires: float = 0
+    _snapshot_lock = threading.Lock()
+
+    _vault_client = None
+    _vault_cache: Dict[Tuple[str, str], Tuple[float, Optional[dict]]] = {}
+    _encryption_keys: Dict[bytes, bytes] = {}
 
     def __init__(self):
         super(ConfigManager, self).__init__()
 
-        self.__vault_client = None
+        self.update(self.get_snapshot())
+
+    @classmethod
+    def get_snapshot(cls) -> Mapping[str, Any]:
+        """
+        Gets the process-wide configuration snapshot. It is (re)loaded
+        when the environment, or any of the files it is loaded from, have
+        changed, or when the values loaded from Vault have expired.
+
+        :return Mapping[str, Any]: the read-only configuration
+
+        """
+        key = _get_snapshot_key()
+
+        with ConfigManager._snapshot_lock:
+            if ConfigManager._snapshot is None or \
+                    ConfigManager._snapshot_key != key or \
+                    ConfigManager._snapshot_expires <= time.monotonic():
+                cm = dict.__new__(ConfigManager)
+                dict.__init__(cm)
+                cm.__load()
+
+                ConfigManager._snapshot = MappingProxyType(dict(cm))
+                ConfigManager._snapshot_key = key
+                ConfigManager._snapshot_expires = \
+                    time.monotonic() + VAULT_CACHE_TTL \
+                    if cm.isVaultEnabled() else float('inf')
+
+            return ConfigManager._snapshot
+
+    @classmethod
+    def reload(cls):
+        """
+        Discards the configuration snapshot and all cached Vault lookups,
+        so that they are loaded again by the next instance.
+
+        """
+        with ConfigManager._snapshot_lock:
+            ConfigManager._snapshot = None
+            ConfigManager._snapshot_key = None
+            ConfigManager._vault_cache.clear()
 
+    def __load(self):
         self.__init_defaults()
 
         self.__init_from_env()
@@ -277,32 +388,48 @@ class ConfigManager(dict): \
 
     def __get_vault_client(self):
         # Check to see if CFM should be loaded from vault
-        if self.__vault_client is None:
+        if ConfigManager._vault_client is None:
             try:
                 import hvac
-                self.__vault_client = hvac.Client()
-                return self.__vault_client
+                ConfigManager._vault_client = hvac.Client()
             except:
-                self.__vault_client = None
                 return None
-        return self.__vault_client
+        return ConfigManager._vault_client
 
     def isVaultEnabled(self):
         return self.__get_vault_client() is not None
 
     def loadFromVault(self, path, mount_point='puppet'):
+        """
+        Reads a secret from Vault. Results, including failed lookups, are
+        cached for VAULT_CACHE_TTL seconds.
+
+        """
+        key = (path, mount_point)
+        cached = ConfigManager._vault_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        record = self.__read_from_vault(path, mount_point)
+        ConfigManager._vault_cache[key] = \
+            (time.monotonic() + VAULT_CACHE_TTL, record)
+
+        return record
+
+    def __read_from_vault(self, path, mount_point):
         # Check to see if CFM should be loaded from vault
-        if not self.isVaultEnabled():
+        vault_client = self.__get_vault_client()
+        if vault_client is None:
             return None
         try:
-            self.__vault_client.secrets.kv.default_kv_version = 1
-            record = self.__vault_client.secrets.kv.read_secret(
+            vault_client.secrets.kv.default_kv_version = 1
+            record = vault_client.secrets.kv.read_secret(
                        path=path,
                        mount_point=mount_point
             )
             return record
         except:
-            self.__vault_client = None
+            ConfigManager._vault_client = None
             return None
 
     def __setRootSubdirectories(self):
@@ -741,6 +868,29 @@ class ConfigManager(dict): \
         """
         return self.__getKeyValue('dbUser', default)
 
+    def getWsApiPoolSize(self, default='__internal__') -> int:
+        """
+        Get the maximum number of pooled connections per host for web
+        service API clients.
+
+        """
+        return int(self.__getKeyValue('wsApiPoolSize', default))
+
+    def getWsApiMaxRetries(self, default='__internal__') -> int:
+        """
+        Get the number of times web service API clients retry failed
+        connections and idempotent requests.
+
+        """
+        return int(self.__getKeyValue('wsApiMaxRetries', default))
+
+    def getWsApiBackoffFactor(self, default='__internal__') -> float:
+        """
+        Get the backoff factor between web service API client retries.
+
+        """
+        return float(self.__getKeyValue('wsApiBackoffFactor', default))
+
     def getDbPassword(self, default='__internal__'):
         """
         Get the database password.
@@ -857,16 +1007,20 @@ class ConfigManager(dict): \
         # We do this on demand since it is an expensive operation and this method
         # is not used by most of the system
         if self.get('defaultEncryptionKey') is None:
-            # set encryption key
+            # set encryption key, which is derived only once per password
             password = self.getCfmPassword().encode()
-            salt = b'salt_fixed'
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=100000,
-                backend=default_backend()
-            )
-            self['defaultEncryptionKey'] = base64.urlsafe_b64encode(kdf.derive(password))
+            if password not in ConfigManager._encryption_keys:
+                salt = b'salt_fixed'
+                kdf = PBKDF2HMAC(
+                    algorithm=hashes.SHA256(),
+                    length=32,
+                    salt=salt,
+                    iterations=100000,
+                    backend=default_backend()
+                )
+                ConfigManager._encryption_keys[password] = \
+                    base64.urlsafe_b64encode(kdf.derive(password))
+            self['defaultEncryptionKey'] = \
+                ConfigManager._encryption_keys[password]
 
         return self.__getKeyValue('encryptionKey', default)  
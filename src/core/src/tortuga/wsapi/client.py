@@ -12,11 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import http.cookiejar
 import json
 import logging
-from typing import Optional, Union
+import os
+import threading
+from typing import Iterator, Optional, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from tortuga.config.configManager import ConfigManager
 from tortuga.logging import WEBSERVICE_CLIENT_NAMESPACE
@@ -50,12 +55,29 @@ class RestApiClient:
     """
     A generic REST API Client class.
 
+    Requests are made using a pooled, keep-alive session that is shared
+    by all clients in the process, unless a session is passed in. The
+    session only holds connections: credentials and SSL verification are
+    passed per request, and cookies are never stored, so that a server
+    session created by one client can't be used by other clients with
+    different (or invalid) credentials.
+
     """
+    #
+    # Gateway errors that idempotent requests are retried on
+    #
+    RETRY_STATUS_CODES = (502, 503, 504)
+
+    _session: Optional[requests.Session] = None
+    _session_pid: Optional[int] = None
+    _session_lock = threading.Lock()
+
     def __init__(self, token: Optional[str] = None,
                  username: Optional[str] = None,
                  password: Optional[str] = None,
                  baseurl: Optional[str] = None,
-                 verify: bool = True):
+                 verify: bool = True,
+                 session: Optional[requests.Session] = None):
 
         if baseurl.endswith('/'):
             baseurl = baseurl[:-1]
@@ -65,6 +87,7 @@ class RestApiClient:
         self.username = username
         self.password = password
         self.verify = verify
+        self.session = session
 
         self._requests_kwargs = None
         self._logger = logging.getLogger(WEBSERVICE_CLIENT_NAMESPACE)
@@ -74,6 +97,74 @@ class RestApiClient:
 
         self._cm = ConfigManager()
 
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """
+        Gets the session shared by all clients in the process. The pool
+        size and retries are read from the [wsapi] section of
+        tortuga.ini. A new session is created in forked child processes,
+        as pooled connections can't be shared with the parent.
+
+        :return requests.Session: the shared session
+
+        """
+        with cls._session_lock:
+            if cls._session is None or cls._session_pid != os.getpid():
+                cm = ConfigManager()
+
+                retry = Retry(
+                    total=cm.getWsApiMaxRetries(),
+                    backoff_factor=cm.getWsApiBackoffFactor(),
+                    status_forcelist=cls.RETRY_STATUS_CODES,
+                    raise_on_status=False,
+                )
+
+                adapter = HTTPAdapter(
+                    pool_connections=cm.getWsApiPoolSize(),
+                    pool_maxsize=cm.getWsApiPoolSize(),
+                    max_retries=retry,
+                )
+
+                session = requests.Session()
+                #
+                # Don't store cookies: the web service authenticates
+                # requests carrying its session cookie, and the session
+                # is shared by clients with different credentials
+                #
+                session.cookies.set_policy(
+                    http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+
+                cls._session = session
+                cls._session_pid = os.getpid()
+
+            return cls._session
+
+    @classmethod
+    def close_session(cls):
+        """
+        Closes the session shared by all clients in the process, and all
+        of its pooled connections.
+
+        """
+        with cls._session_lock:
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
+
+    def get_requests_session(self) -> requests.Session:
+        """
+        Gets the session used by this client.
+
+        :return requests.Session: the session
+
+        """
+        if self.session is not None:
+            return self.session
+
+        return self.get_session()
+
     def get_requests_kwargs(self) -> dict:
         #
         # Cache the base kwargs
@@ -195,13 +286,66 @@ class RestApiClient:
         url = self.build_url(path)
         self._logger.debug('GET: {}'.format(url))
 
-        result = requests.get(
+        result = self.get_requests_session().get(
             url,
             **self.get_requests_kwargs()
         )
 
         return self.process_response(result)
 
+    def get_stream(self, path: str) -> Iterator[dict]:
+        """
+        Performs a GET request on the specified path, for a streamed list
+        response in newline delimited JSON (ndjson) format. Objects are
+        decoded and yielded as they are received, rather than loading the
+        whole list in memory first.
+
+        :param str path: the API path to get from
+
+        :return Iterator[dict]: the objects in the response, JSON decoded
+
+        :raises RequestError: if a non 2xx status code is returned, or the
+                              server reports an error mid-stream
+
+        """
+        url = self.build_url(path)
+        self._logger.debug('GET (stream): {}'.format(url))
+
+        result = self.get_requests_session().get(
+            url,
+            stream=True,
+            **self.get_requests_kwargs()
+        )
+
+        try:
+            if round(result.status_code / 100) != 2:
+                self.process_error_response(result)
+
+            for line in result.iter_lines():
+                if not line:
+                    continue
+
+                data = json.loads(line.decode('utf-8'))
+
+                #
+                # Once streaming has started, the server can no longer
+                # change the status code, so errors are sent as the last
+                # object in the stream instead
+                #
+                if isinstance(data, dict) and list(data.keys()) == ['error']:
+                    self._logger.debug(
+                        'ERROR Payload: {}'.format(json.dumps(data)))
+                    raise RequestError(
+                        'ERROR: API Stream Error',
+                        status_code=result.status_code,
+                        data=data
+                    )
+
+                yield data
+
+        finally:
+            result.close()
+
     def post(self, path: str, data: Optional[dict] = None) -> Optional[dict]:
         """
         Post data to a specified path (API endpoint). Data will automatically
@@ -216,7 +360,7 @@ class RestApiClient:
         url = self.build_url(path)
         self._logger.debug('POST: {}'.format(url))
 
-        result = requests.post(
+        result = self.get_requests_session().post(
             url,
             json=data,
             **self.get_requests_kwargs()
@@ -238,7 +382,7 @@ class RestApiClient:
         url = self.build_url(path)
         self._logger.debug('PUT: {}'.format(url))
 
-        result = requests.put(
+        result = self.get_requests_session().put(
             url,
             json=data,
             **self.get_requests_kwargs()
@@ -258,7 +402,7 @@ class RestApiClient:
         url = self.build_url(path)
         self._logger.debug('DELETE: {}'.format(url))
 
-        result = requests.delete(
+        result = self.get_requests_session().delete(
             url,
             **self.get_requests_kwargs()
         )
@@ -279,7 +423,7 @@ class RestApiClient:
         url = self.build_url(path)
         self._logger.debug('PATCH: {}'.format(url))
 
-        result = requests.patch(
+        result = self.get_requests_session().patch(
             url,
             json=data,
             **self.get_requests_kwargs()
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import logging
-from typing import Optional
+from typing import Iterator, Optional
 
 from tortuga.config.configManager import ConfigManager
 from tortuga.logging import WEBSERVICE_CLIENT_NAMESPACE
@@ -75,6 +75,17 @@ class TortugaWsApiClient:
 
         return self._client.get(path)
 
+    def iter_list(self, **params) -> Iterator[dict]:
+        """
+        Same as list, but streams the result, yielding each object as it
+        is received from the server.
+
+        """
+        params['stream'] = 'ndjson'
+        path = '/?{}'.format(self._build_query_string(params))
+
+        return self._client.get_stream(path)
+
     def get(self, id_: str) -> dict:
         path = '/{}'.format(id_)
 
@@ -14,6 +14,8 @@
 
 import socket
 
+import pytest
+
 from tortuga.config.configManager import ConfigManager, getfqdn
 
 
@@ -44,3 +46,65 @@ def test_getIntWebRootUrl_with_host(config_manager):
     result = config_manager.getIntWebRootUrl('XXXXXXXX')
 
     assert result and 'XXXXXXXX' in result
+
+
+def test_snapshot_shared():
+    cm1 = ConfigManager()
+    cm2 = ConfigManager()
+
+    assert ConfigManager.get_snapshot() is ConfigManager.get_snapshot()
+
+    cm1.setDepotDir('/tmp/depot')
+
+    assert cm2.getDepotDir() != '/tmp/depot'
+
+    with pytest.raises(TypeError):
+        ConfigManager.get_snapshot()['depotDir'] = '/tmp/depot'
+
+
+def test_snapshot_invalidation(tmpdir, monkeypatch):
+    monkeypatch.setenv('TORTUGA_ROOT', str(tmpdir))
+    ini_file = tmpdir.mkdir('config').join('tortuga.ini')
+
+    assert ConfigManager().getDbHost() == '127.0.0.1'
+
+    ini_file.write('[database]\nhost = db1\n')
+
+    assert ConfigManager().getDbHost() == 'db1'
+
+    snapshot = ConfigManager.get_snapshot()
+    ConfigManager.reload()
+
+    assert ConfigManager.get_snapshot() is not snapshot
+
+    monkeypatch.delenv('TORTUGA_ROOT')
+
+    assert ConfigManager().getRoot() != str(tmpdir)
+
+
+class FakeVaultClient:
+    def __init__(self):
+        self.reads = 0
+        self.secrets = self
+        self.kv = self
+
+    def read_secret(self, path, mount_point):
+        self.reads += 1
+        return {'data': {'password': 'secret'}}
+
+
+def test_vault_cache(monkeypatch):
+    client = FakeVaultClient()
+    monkeypatch.setattr(ConfigManager, '_vault_client', client)
+    monkeypatch.setattr(ConfigManager, '_vault_cache', {})
+
+    cm = ConfigManager()
+
+    assert cm.loadFromVault('some/path') == {'data': {'password': 'secret'}}
+    assert cm.loadFromVault('some/path') == {'data': {'password': 'secret'}}
+    assert client.reads == 1
+
+    ConfigManager.reload()
+    cm.loadFromVault('some/path')
+
+    assert client.reads == 2
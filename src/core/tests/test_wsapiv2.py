@@ -12,8 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import base64
+import http.server
+import os
+import threading
+
 import pytest
 
+from tortuga.wsapi.client import RequestError, RestApiClient
 from tortuga.wsapi_v2.client import TortugaWsApiClient
 
 
@@ -35,3 +41,138 @@ def test_build_query_string(params, expected):
         endpoint='https://blah:1234')._build_query_string(params)
 
     assert result == expected
+
+
+class FakeStreamResponse:
+    def __init__(self, lines, status_code=200):
+        self.lines = lines
+        self.status_code = status_code
+        self.closed = False
+
+    def iter_lines(self):
+        yield from self.lines
+
+    def json(self):
+        raise ValueError()
+
+    def close(self):
+        self.closed = True
+
+
+def test_iter_list(monkeypatch):
+    response = FakeStreamResponse([b'{"id": "1"}', b'{"id": "2"}', b''])
+    calls = []
+
+    def get(url, **kwargs):
+        calls.append((url, kwargs))
+        return response
+
+    monkeypatch.setattr(RestApiClient.get_session(), 'get', get)
+
+    client = TortugaWsApiClient(endpoint='nodes', username='user',
+                                password='pass',
+                                base_url='https://blah:1234', verify=False)
+
+    assert list(client.iter_list(name='x')) == [{'id': '1'}, {'id': '2'}]
+    assert calls[0][0].endswith('?name=x&stream=ndjson')
+    assert calls[0][1]['stream'] is True
+    assert response.closed
+
+
+def test_iter_list_error(monkeypatch):
+    response = FakeStreamResponse(
+        [b'{"id": "1"}', b'{"error": {"message": "boom"}}'])
+    monkeypatch.setattr(RestApiClient.get_session(), 'get',
+                        lambda url, **kwargs: response)
+
+    client = TortugaWsApiClient(endpoint='nodes', username='user',
+                                password='pass',
+                                base_url='https://blah:1234', verify=False)
+
+    objs = client.iter_list()
+    assert next(objs) == {'id': '1'}
+    with pytest.raises(RequestError):
+        next(objs)
+    assert response.closed
+
+
+def test_shared_session(monkeypatch):
+    client1 = TortugaWsApiClient(endpoint='nodes', username='user1',
+                                 password='pass',
+                                 base_url='https://blah:1234')
+    client2 = TortugaWsApiClient(endpoint='softwareprofiles', token='x',
+                                 base_url='https://blah:1234')
+
+    session = client1._client.get_requests_session()
+    assert client2._client.get_requests_session() is session
+
+    adapter = session.get_adapter('https://blah:1234')
+    assert adapter._pool_maxsize == 10
+    assert adapter.max_retries.total == 3
+
+    #
+    # Forked processes get a new session
+    #
+    monkeypatch.setattr(RestApiClient, '_session_pid', os.getpid() + 1)
+    assert client1._client.get_requests_session() is not session
+
+
+class SessionAuthHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Authenticates requests like the web service does: using the session
+    cookie if there is one, otherwise using basic authentication, and
+    sets the session cookie once authenticated.
+
+    """
+    credentials = 'Basic {}'.format(
+        base64.b64encode(b'admin:secret').decode())
+
+    def do_GET(self):
+        cookie = self.headers.get('Cookie') or ''
+
+        if 'session_id=admin' in cookie:
+            self.send_response(200)
+        elif self.headers.get('Authorization') == self.credentials:
+            self.send_response(200)
+            self.send_header('Set-Cookie', 'session_id=admin; Path=/')
+        else:
+            self.send_response(401)
+
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def session_auth_server():
+    server = http.server.HTTPServer(('127.0.0.1', 0), SessionAuthHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield 'http://127.0.0.1:{}'.format(server.server_port)
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_shared_session_cookies(session_auth_server):
+    RestApiClient.close_session()
+
+    client = RestApiClient(username='admin', password='secret',
+                           baseurl=session_auth_server)
+    assert client.get('/v1/nodes') == {}
+
+    #
+    # A client with invalid credentials, sharing the session, is not
+    # authenticated by the session cookie of the other client
+    #
+    other_client = RestApiClient(username='admin', password='wrong',
+                                 baseurl=session_auth_server)
+    with pytest.raises(RequestError) as exc_info:
+        other_client.get('/v1/nodes')
+
+    assert exc_info.value.status_code == 401
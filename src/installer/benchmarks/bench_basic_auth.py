@@ -0,0 +1,104 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the latency of authenticating requests with HTTP Basic
+authentication, with and without the verified credential cache.
+
+Each request decodes the basic authorization header, authenticates the
+credentials as HttpBasicAuthenticationMethod does, and then looks up the
+authenticated principal, as CherryPyAuthenticator does. Admins are
+stored in an in-memory SQLite database.
+
+    python benchmarks/bench_basic_auth.py --requests 200
+
+"""
+
+import argparse
+import base64
+import statistics
+import time
+from unittest.mock import MagicMock, patch
+
+from passlib.hash import pbkdf2_sha256
+from sqlalchemy import create_engine
+
+from tortuga.auth import methods
+from tortuga.auth.credentialCache import credential_cache
+from tortuga.auth.manager import AuthManager
+from tortuga.db.dbManager import DbManager
+from tortuga.db.models.admin import Admin
+
+
+def authenticate(dbm: DbManager,
+                 method: methods.UsernamePasswordAuthenticationMethod,
+                 header: str):
+    username, password = base64.b64decode(
+        header.split(' ', 1)[1]).decode().split(':')
+
+    username = method.authenticate(username=username, password=password,
+                                   skip_callbacks=True)
+
+    with dbm.session() as session:
+        assert AuthManager(session=session).get_principal(username)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    dbm = DbManager(create_engine('sqlite:///:memory:'))
+    dbm.init_database()
+
+    with dbm.session() as session:
+        session.add(Admin(username='admin',
+                          password=pbkdf2_sha256.hash('password')))
+        session.commit()
+
+    header = 'Basic {}'.format(base64.b64encode(b'admin:password').decode())
+
+    print('{:>10} {:>10} {:>10} {:>10} {:>10}'.format(
+        'cache', 'requests', 'mean (ms)', 'p99 (ms)', 'hits'))
+
+    with patch.object(methods, 'dbm', dbm), \
+            patch('tortuga.auth.manager.ConfigManager',
+                  return_value=MagicMock(
+                      getCfmUser=MagicMock(return_value='cfm'),
+                      getCfmPassword=MagicMock(return_value='secret'),
+                      isInstaller=MagicMock(return_value=True))):
+        for ttl in (0, credential_cache.DEFAULT_TTL):
+            credential_cache.ttl = ttl
+            credential_cache.invalidate()
+            hits = credential_cache.get_stats()['hits']
+
+            method = methods.UsernamePasswordAuthenticationMethod()
+            latencies = []
+
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                authenticate(dbm, method, header)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            latencies.sort()
+
+            print('{:>10} {:>10d} {:>10.2f} {:>10.2f} {:>10d}'.format(
+                'on' if ttl else 'off', args.requests,
+                statistics.mean(latencies),
+                latencies[int(len(latencies) * 0.99) - 1],
+                credential_cache.get_stats()['hits'] - hits))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures DHCP lease add/remove throughput for different omshell batch
+sizes. A batch size of 1 starts one omshell session per lease, which is
+what BootHostManager did previously.
+
+By default, omshell is replaced by a shell script that reads and discards
+its input, so only the cost of starting omshell sessions and feeding them
+commands is measured. Use --omshell to run against the real omshell (and
+a DHCP server that accepts OMAPI connections without a key):
+
+    python benchmarks/bench_dhcp_leases.py --leases 1000
+    python benchmarks/bench_dhcp_leases.py --leases 1000 \\
+        --omshell /usr/bin/omshell
+
+"""
+
+import argparse
+import os
+import stat
+import tempfile
+import time
+
+from tortuga.os_objects.rhel.dhcpLeaseManager import (DhcpLease,
+                                                      OmshellLeaseManager)
+
+
+FAKE_OMSHELL = '#!/bin/sh\ncat > /dev/null\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--omshell', default=None,
+                        help='path to omshell, defaults to a stand-in')
+    parser.add_argument('--leases', type=int, default=1000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+',
+                        default=[1, 50, 250])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        omshell = args.omshell
+        if omshell is None:
+            omshell = os.path.join(tmpdir, 'omshell')
+            with open(omshell, 'w') as fp:
+                fp.write(FAKE_OMSHELL)
+            os.chmod(omshell, os.stat(omshell).st_mode | stat.S_IEXEC)
+
+        leases = [
+            DhcpLease(name='bench-{:05d}'.format(n),
+                      mac='02:00:00:{:02x}:{:02x}:{:02x}'.format(
+                          n >> 16, (n >> 8) & 0xff, n & 0xff),
+                      ip='10.{}.{}.{}'.format(
+                          n >> 16, (n >> 8) & 0xff, n & 0xff))
+            for n in range(args.leases)
+        ]
+
+        print('{:>10} {:>8} {:>8} {:>10} {:>12}'.format(
+            'batch size', 'action', 'sessions', 'time (s)', 'leases/s'))
+
+        for batch_size in args.batch_sizes:
+            for action in ('add', 'remove'):
+                mgr = OmshellLeaseManager(omshell=omshell,
+                                          batch_size=batch_size)
+
+                start = time.perf_counter()
+                if action == 'add':
+                    errors = mgr.add_leases(leases)
+                else:
+                    errors = mgr.remove_leases(leases)
+                elapsed = time.perf_counter() - start
+
+                if errors:
+                    print('{} lease(s) failed, e.g.: {}'.format(
+                        len(errors), next(iter(errors.values()))))
+
+                print('{:>10d} {:>8} {:>8d} {:>10.2f} {:>12.0f}'.format(
+                    batch_size, action, mgr.sessions, elapsed,
+                    args.leases / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares list-scan and bitmap allocation of provisioning IP addresses.
+
+The list scan is the algorithm previously used by
+AddHostServerLocal.generate_provisioning_ip_address, which checks every
+candidate against a list of all allocated addresses. Networks are filled
+to the given levels with randomly assigned addresses before allocating.
+
+    python benchmarks/bench_ip_allocator.py --allocations 1000
+
+"""
+
+import argparse
+import ipaddress
+import random
+import time
+from typing import List
+
+from tortuga.addhost.ipAllocator import IpAllocator
+
+
+def list_scan_allocate(network: ipaddress.IPv4Network,
+                       ips: List[ipaddress.IPv4Address]) -> str:
+    ip = network[1]
+    for _ in range(network.num_addresses):
+        if ip not in ips:
+            break
+        ip += 1
+    ips.append(ip)
+
+    return ip.exploded
+
+
+def fill(network: ipaddress.IPv4Network, level: float) \
+        -> List[ipaddress.IPv4Address]:
+    hosts = network.num_addresses - 2
+    offsets = random.sample(range(1, hosts + 1), int(hosts * level))
+
+    return [network.network_address + offset for offset in offsets]
+
+
+def time_list_scan(network, assigned, allocations: int) -> float:
+    start = time.perf_counter()
+    ips = list(assigned)
+    for _ in range(allocations):
+        list_scan_allocate(network, ips)
+
+    return (time.perf_counter() - start) / allocations
+
+
+def time_bitmap(network, assigned, allocations: int) -> float:
+    start = time.perf_counter()
+    allocator = IpAllocator(network)
+    for ip in assigned:
+        allocator.assign(ip)
+    for _ in range(allocations):
+        allocator.allocate()
+
+    return (time.perf_counter() - start) / allocations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--networks', nargs='+',
+                        default=['10.0.0.0/24', '10.0.0.0/20', '10.0.0.0/16'])
+    parser.add_argument('--levels', type=float, nargs='+',
+                        default=[0, 0.5, 0.9])
+    parser.add_argument('--allocations', type=int, default=1000)
+    parser.add_argument('--list-scan-allocations', type=int, default=20,
+                        help='number of allocations to time the (slow) '
+                             'list scan with')
+    args = parser.parse_args()
+
+    random.seed(0)
+
+    print('{:>14} {:>6} {:>16} {:>16} {:>10}'.format(
+        'network', 'fill', 'list scan (ms)', 'bitmap (ms)', 'speedup'))
+
+    for network in args.networks:
+        network = ipaddress.IPv4Network(network)
+        for level in args.levels:
+            assigned = fill(network, level)
+            free = network.num_addresses - 2 - len(assigned)
+
+            list_scan = time_list_scan(
+                network, assigned, min(args.list_scan_allocations, free))
+            bitmap = time_bitmap(
+                network, assigned, min(args.allocations, free))
+
+            print('{:>14} {:>5.0f}% {:>16.3f} {:>16.3f} {:>9.0f}x'.format(
+                str(network), level * 100, list_scan * 1000,
+                bitmap * 1000, list_scan / bitmap))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Counts SQL statements and wall time of node listing, with and without
+eager loading of node relations.
+
+Without eager loading, relations are lazy loaded node by node while the
+nodes are converted, which is what NodeDbApi.getNodeList did previously.
+Nodes are spread over a few hardware and software profiles, and each has
+a NIC, tags and an instance mapping with metadata. The relations loaded
+are those of "GET /v1/nodes?include=softwareprofile,hardwareprofile".
+
+    python benchmarks/bench_node_list.py --nodes 100 1000 10000
+
+"""
+
+import argparse
+import time
+
+from sqlalchemy import create_engine, event
+
+from tortuga.db.dbManager import DbManager
+from tortuga.db.models.hardwareProfile import HardwareProfile
+from tortuga.db.models.instanceMapping import InstanceMapping
+from tortuga.db.models.instanceMetadata import InstanceMetadata
+from tortuga.db.models.network import Network
+from tortuga.db.models.nic import Nic
+from tortuga.db.models.node import Node
+from tortuga.db.models.nodeTag import NodeTag
+from tortuga.db.models.operatingSystem import OperatingSystem
+from tortuga.db.models.operatingSystemFamily import OperatingSystemFamily
+from tortuga.db.models.resourceAdapter import ResourceAdapter
+from tortuga.db.models.resourceAdapterConfig import ResourceAdapterConfig
+from tortuga.db.models.softwareProfile import SoftwareProfile
+from tortuga.db.nodeDbApi import NodeDbApi
+from tortuga.node.nodeManager import get_default_relations
+
+
+def populate(dbm: DbManager, nodes: int, profiles: int):
+    with dbm.session() as session:
+        os_ = OperatingSystem(name='centos', version='7', arch='x86_64')
+        os_.family = OperatingSystemFamily(name='rhel', version='7',
+                                           arch='x86_64')
+
+        adapter = ResourceAdapter(name='aws')
+        adapter_config = ResourceAdapterConfig(name='default',
+                                               resourceadapter=adapter)
+
+        network = Network(address='10.0.0.0', netmask='255.0.0.0',
+                          name='provisioning', type='provision')
+
+        hardware_profiles = [
+            HardwareProfile(name='hwp{}'.format(n), location='remote',
+                            resourceadapter=adapter)
+            for n in range(profiles)
+        ]
+        software_profiles = [
+            SoftwareProfile(name='swp{}'.format(n), type='compute', os=os_)
+            for n in range(profiles)
+        ]
+
+        for n in range(nodes):
+            node = Node(name='compute-{:05d}'.format(n), state='Installed')
+            node.hardwareprofile = hardware_profiles[n % profiles]
+            node.softwareprofile = software_profiles[n % profiles]
+            node.nics = [Nic(ip='10.{}.{}.{}'.format(
+                n >> 16, (n >> 8) & 0xff, n & 0xff), boot=True,
+                network=network)]
+            node.tags = [NodeTag(name='rack', value=str(n % 10))]
+            node.instance = InstanceMapping(
+                instance='i-{:08x}'.format(n),
+                resource_adapter_configuration=adapter_config,
+                instance_metadata=[InstanceMetadata(key='az', value='a')]
+            )
+            session.add(node)
+
+        session.commit()
+
+
+def list_nodes(dbm: DbManager, eager: bool):
+    get_load_options = NodeDbApi._NodeDbApi__get_load_options
+    if not eager:
+        NodeDbApi._NodeDbApi__get_load_options = lambda self, options: []
+
+    try:
+        with dbm.session() as session:
+            return NodeDbApi().getNodeList(
+                session,
+                optionDict=get_default_relations(
+                    {'softwareprofile': True, 'hardwareprofile': True}))
+
+    finally:
+        NodeDbApi._NodeDbApi__get_load_options = get_load_options
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--nodes', type=int, nargs='+',
+                        default=[100, 1000, 10000])
+    parser.add_argument('--profiles', type=int, default=4,
+                        help='number of hardware/software profiles')
+    args = parser.parse_args()
+
+    print('{:>8} {:>10} {:>12} {:>10}'.format(
+        'nodes', 'loading', 'statements', 'time (s)'))
+
+    for nodes in args.nodes:
+        dbm = DbManager(create_engine('sqlite:///:memory:'))
+        dbm.init_database()
+        populate(dbm, nodes, args.profiles)
+
+        for eager in (False, True):
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            event.listen(dbm.engine, 'before_cursor_execute',
+                         before_cursor_execute)
+
+            start = time.perf_counter()
+            result = list_nodes(dbm, eager)
+            elapsed = time.perf_counter() - start
+
+            event.remove(dbm.engine, 'before_cursor_execute',
+                         before_cursor_execute)
+
+            assert len(result) == nodes
+
+            print('{:>8d} {:>10} {:>12d} {:>10.2f}'.format(
+                nodes, 'eager' if eager else 'lazy', len(statements),
+                elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares the cost of recording a node pinger sweep one reply at a time
+(the way node_pinger used to) and in bulk, with NodeLivenessTracker.
+
+Every node replies with its short (unqualified) name, as mco ping does
+for nodes whose certname is not fully qualified, so the per-reply path
+falls back to a wildcard lookup. The number of SQL statements executed
+and the elapsed time are reported for each sweep, against an in-memory
+SQLite database (or the database given with --db-url):
+
+    python benchmarks/bench_node_pinger.py --nodes 1000 10000
+
+"""
+
+import argparse
+import time
+
+from sqlalchemy import create_engine, event
+
+from tortuga.db.dbManager import DbManager
+from tortuga.db.models.node import Node
+from tortuga.db.nodesDbHandler import NodesDbHandler
+from tortuga.exceptions.nodeNotFound import NodeNotFound
+from tortuga.node.liveness import NodeLivenessTracker, NodePinger, \
+    NodePingReply
+
+
+class FakeNodePinger(NodePinger):
+    def __init__(self, names):
+        self.names = names
+
+    def ping_all_nodes(self):
+        return [NodePingReply(name, True, 1.0) for name in self.names]
+
+
+def populate(dbm: DbManager, nodes: int):
+    with dbm.session() as session:
+        session.bulk_insert_mappings(Node, [
+            {'name': 'compute-{:05d}.private'.format(n),
+             'state': 'Installed'}
+            for n in range(nodes)
+        ])
+        session.commit()
+
+
+def per_reply_sweep(dbm: DbManager, replies):
+    node_api = NodesDbHandler()
+
+    with dbm.session() as session:
+        for r in replies:
+            try:
+                nodes = [node_api.getNode(session, r.name)]
+            except NodeNotFound:
+                nodes = node_api.expand_nodespec(session, '{}*'.format(r.name))
+
+            for node in nodes:
+                node.lastUpdate = time.strftime(
+                    '%Y-%m-%d %H:%M:%S', time.gmtime(time.time()))
+
+            session.commit()
+
+
+def bulk_sweep(dbm: DbManager, pinger: NodePinger):
+    with dbm.session() as session:
+        NodeLivenessTracker(session).track(pinger)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--db-url', default='sqlite:///:memory:')
+    parser.add_argument('--nodes', type=int, nargs='+',
+                        default=[1000, 10000])
+    parser.add_argument('--per-reply-limit', type=int, default=2000,
+                        help='maximum number of replies to time on the'
+                             ' per-reply path, the time is extrapolated')
+    args = parser.parse_args()
+
+    print('{:>8} {:>10} {:>12} {:>10}'.format(
+        'nodes', 'sweep', 'statements', 'time (s)'))
+
+    for nodes in args.nodes:
+        dbm = DbManager(create_engine(args.db_url))
+        dbm.init_database()
+        populate(dbm, nodes)
+
+        statements = [0]
+
+        @event.listens_for(dbm.engine, 'before_cursor_execute')
+        def count(*args, **kwargs):  # pylint: disable=unused-argument
+            statements[0] += 1
+
+        names = ['compute-{:05d}'.format(n) for n in range(nodes)]
+        pinger = FakeNodePinger(names)
+
+        timed = min(nodes, args.per_reply_limit)
+        statements[0] = 0
+        start = time.perf_counter()
+        per_reply_sweep(dbm, pinger.ping_all_nodes()[:timed])
+        elapsed = (time.perf_counter() - start) * nodes / timed
+        print('{:>8d} {:>10} {:>12d} {:>10.2f}'.format(
+            nodes, 'per-reply', statements[0] * nodes // timed, elapsed))
+
+        statements[0] = 0
+        start = time.perf_counter()
+        bulk_sweep(dbm, pinger)
+        elapsed = time.perf_counter() - start
+        print('{:>8d} {:>10} {:>12d} {:>10.2f}'.format(
+            nodes, 'bulk', statements[0], elapsed))
+
+        event.remove(dbm.engine, 'before_cursor_execute', count)
+
+
+if __name__ == '__main__':
+    main()
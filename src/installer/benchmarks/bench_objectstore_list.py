@@ -0,0 +1,100 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares per-key and pipelined listing of objects in the RedisObjectStore.
+
+Requires a running Redis server. A batch size of 1 issues one round trip
+per object, which is equivalent to the old per-key HGETALL behavior.
+
+    python benchmarks/bench_objectstore_list.py --sizes 1000 10000 100000
+
+"""
+
+import argparse
+import time
+
+from redis import Redis
+
+from tortuga.objectstore.redis import RedisObjectStore
+
+
+NAMESPACE = 'benchmark-objectstore'
+
+
+def populate(redis: Redis, count: int):
+    store = RedisObjectStore(namespace=NAMESPACE, redis_client=redis)
+    pipe = redis.pipeline(transaction=False)
+    for idx in range(count):
+        key = store.get_key_name('obj-{:d}'.format(idx))
+        pipe.hmset(key, {
+            'id': idx,
+            'name': 'node-state-changed',
+            'timestamp': time.time(),
+            'node': 'JSON:{"name": "compute-%05d"}' % idx,
+        })
+        pipe.sadd(store.get_key_name('INDEX'), key)
+    pipe.execute()
+
+
+def cleanup(redis: Redis):
+    keys = redis.keys('{}:*'.format(NAMESPACE))
+    if keys:
+        redis.delete(*keys)
+
+
+def time_list(redis: Redis, batch_size: int, order_by: str = None) -> float:
+    store = RedisObjectStore(namespace=NAMESPACE, redis_client=redis,
+                             batch_size=batch_size)
+    start = time.perf_counter()
+    count = sum(1 for _ in store.list_sorted(order_by=order_by))
+    elapsed = time.perf_counter() - start
+    assert count > 0
+
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--password', default=None)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000])
+    parser.add_argument('--batch-size', type=int,
+                        default=RedisObjectStore.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    redis = Redis(host=args.host, port=args.port, password=args.password)
+
+    print('{:>8} {:>10} {:>12} {:>12} {:>8}'.format(
+        'objects', 'order_by', 'per-key (s)', 'pipelined (s)', 'speedup'))
+
+    for size in args.sizes:
+        cleanup(redis)
+        populate(redis, size)
+
+        try:
+            for order_by in (None, 'id'):
+                per_key = time_list(redis, 1, order_by)
+                pipelined = time_list(redis, args.batch_size, order_by)
+                print('{:>8d} {:>10} {:>12.3f} {:>12.3f} {:>7.1f}x'.format(
+                    size, order_by or '-', per_key, pipelined,
+                    per_key / pipelined))
+        finally:
+            cleanup(redis)
+
+
+if __name__ == '__main__':
+    main()
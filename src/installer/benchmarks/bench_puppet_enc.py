@@ -0,0 +1,173 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares the cost of a Puppet agent check-in on the get-tortuga-node slow
+path (rendering the ENC document) and fast path (serving the precomputed
+document from the cache).
+
+Requires a running Redis server. The slow path is measured the way every
+get-tortuga-node process used to run: load the kits, read the global
+parameters, look up the node and render its document. The time taken to
+import the modules each path needs is measured separately, in a fresh
+interpreter, as every check-in pays for it again. Nodes are spread over a
+few hardware and software profiles, in an in-memory database.
+
+    python benchmarks/bench_puppet_enc.py --nodes 1000 5000
+
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+from redis import Redis
+from sqlalchemy import create_engine
+
+from tortuga.db.dbManager import DbManager
+from tortuga.db.models.hardwareProfile import HardwareProfile
+from tortuga.db.models.node import Node
+from tortuga.db.models.operatingSystem import OperatingSystem
+from tortuga.db.models.operatingSystemFamily import OperatingSystemFamily
+from tortuga.db.models.softwareProfile import SoftwareProfile
+from tortuga.db.nodesDbHandler import NodesDbHandler
+from tortuga.kit.loader import load_kits
+from tortuga.objectstore.redis import RedisObjectStore
+from tortuga.puppet.enc import PuppetEncGenerator, precompute_puppet_enc
+from tortuga.puppet.encCache import PuppetEncCache
+
+
+NAMESPACE = 'benchmark-puppet-enc'
+
+SLOW_PATH_IMPORTS = \
+    'import tortuga.db.dbManager, tortuga.kit.loader, tortuga.puppet.enc'
+FAST_PATH_IMPORTS = 'import tortuga.puppet.encCache'
+
+
+def populate(dbm: DbManager, nodes: int, profiles: int):
+    with dbm.session() as session:
+        os_ = OperatingSystem(name='centos', version='7', arch='x86_64')
+        os_.family = OperatingSystemFamily(name='rhel', version='7',
+                                           arch='x86_64')
+
+        hardware_profiles = [
+            HardwareProfile(name='hwp{}'.format(n), location='remote')
+            for n in range(profiles)
+        ]
+        software_profiles = [
+            SoftwareProfile(name='swp{}'.format(n), type='compute', os=os_)
+            for n in range(profiles)
+        ]
+
+        for n in range(nodes):
+            node = Node(name='compute-{:05d}'.format(n), state='Installed')
+            node.hardwareprofile = hardware_profiles[n % profiles]
+            node.softwareprofile = software_profiles[n % profiles]
+            session.add(node)
+
+        session.commit()
+
+
+def cleanup(redis: Redis):
+    keys = redis.keys('{}*'.format(NAMESPACE))
+    if keys:
+        redis.delete(*keys)
+
+
+def time_import(statement: str, repeat: int = 3) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, '-c', statement])
+        elapsed.append(time.perf_counter() - start)
+
+    return min(elapsed)
+
+
+def slow_path(dbm: DbManager, node_name: str) -> str:
+    load_kits()
+
+    with dbm.session() as session:
+        generator = PuppetEncGenerator(session)
+
+        return generator.render(generator.get_node_data(
+            NodesDbHandler().getNode(session, node_name)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--nodes', type=int, nargs='+',
+                        default=[1000, 5000])
+    parser.add_argument('--profiles', type=int, default=4,
+                        help='number of hardware/software profiles')
+    parser.add_argument('--check-ins', type=int, default=200,
+                        help='number of check-ins to time per path')
+    args = parser.parse_args()
+
+    redis = Redis()
+
+    print('{:>20} {:>10}'.format('imports', 'time (ms)'))
+    print('{:>20} {:>10.1f}'.format(
+        'slow path', time_import(SLOW_PATH_IMPORTS) * 1000))
+    print('{:>20} {:>10.1f}'.format(
+        'fast path', time_import(FAST_PATH_IMPORTS) * 1000))
+    print()
+
+    print('{:>8} {:>12} {:>10} {:>16}'.format(
+        'nodes', 'path', 'time (s)', 'per node (ms)'))
+
+    for nodes in args.nodes:
+        dbm = DbManager(create_engine('sqlite:///:memory:'))
+        dbm.init_database()
+        populate(dbm, nodes, args.profiles)
+
+        cleanup(redis)
+
+        cache = PuppetEncCache(
+            store=RedisObjectStore(NAMESPACE, redis_client=redis,
+                                   expire=PuppetEncCache.DEFAULT_EXPIRE),
+            generation_store=RedisObjectStore(
+                '{}-generation'.format(NAMESPACE), redis_client=redis))
+
+        node_names = ['compute-{:05d}'.format(n)
+                      for n in range(0, nodes, max(1, nodes // args.check_ins))]
+
+        start = time.perf_counter()
+        for node_name in node_names:
+            slow_path(dbm, node_name)
+        elapsed = time.perf_counter() - start
+        print('{:>8d} {:>12} {:>10.2f} {:>16.2f}'.format(
+            nodes, 'slow path', elapsed, elapsed / len(node_names) * 1000))
+
+        start = time.perf_counter()
+        with dbm.session() as session:
+            count = precompute_puppet_enc(session, cache=cache)
+        elapsed = time.perf_counter() - start
+        assert count == nodes
+        print('{:>8d} {:>12} {:>10.2f} {:>16.2f}'.format(
+            nodes, 'precompute', elapsed, elapsed / nodes * 1000))
+
+        start = time.perf_counter()
+        for node_name in node_names:
+            assert cache.get(node_name) is not None
+        elapsed = time.perf_counter() - start
+        print('{:>8d} {:>12} {:>10.2f} {:>16.2f}'.format(
+            nodes, 'fast path', elapsed, elapsed / len(node_names) * 1000))
+
+        cleanup(redis)
+
+
+if __name__ == '__main__':
+    main()
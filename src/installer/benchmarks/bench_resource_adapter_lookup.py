@@ -0,0 +1,80 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures resource adapter discovery and lookup times.
+
+"startup" is the first search of the resource adapter modules in the
+process. "rescan lookup" searches the resource adapter modules again on
+every lookup, which is what get_resourceadapter_class did previously,
+and "cached lookup" uses the registry. "new instance" and "cached
+instance" compare creating a resource adapter instance for every
+get_api() call with reusing the cached one.
+
+    python benchmarks/bench_resource_adapter_lookup.py --lookups 1000
+
+"""
+
+import argparse
+import time
+
+from tortuga.resourceAdapter import resourceAdapterFactory
+from tortuga.resourceAdapter.registry import discover_resource_adapters
+from tortuga.resourceAdapter.resourceAdapter import ResourceAdapter
+
+
+class BenchAdapter(ResourceAdapter):
+    __adaptername__ = 'bench'
+
+
+def measure(name: str, func, count: int):
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    elapsed = time.perf_counter() - start
+
+    print('{:>16} {:>8d} {:>14.1f}'.format(
+        name, count, elapsed / count * 1000000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--lookups', type=int, default=1000)
+    args = parser.parse_args()
+
+    print('{:>16} {:>8} {:>14}'.format('', 'calls', 'per call (us)'))
+
+    measure('startup', resourceAdapterFactory.find_resourceadapters, 1)
+
+    def rescan_lookup():
+        discover_resource_adapters(refresh=True)
+        resourceAdapterFactory.get_resourceadapter_class('default')
+
+    measure('rescan lookup', rescan_lookup, args.lookups)
+    measure('cached lookup',
+            lambda: resourceAdapterFactory.get_resourceadapter_class(
+                'default'),
+            args.lookups)
+
+    measure('new instance',
+            lambda: resourceAdapterFactory.get_resourceadapter_class(
+                'bench')(),
+            args.lookups)
+    measure('cached instance',
+            lambda: resourceAdapterFactory.get_api('bench'),
+            args.lookups)
+
+
+if __name__ == '__main__':
+    main()
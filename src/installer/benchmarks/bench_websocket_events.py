@@ -0,0 +1,164 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures event-to-client latency and idle CPU of websocket event delivery.
+
+Requires a running Redis server. A websocket server using the regular
+StateManager is started in-process, with the given number of already
+authenticated and subscribed sessions connected to it. Each session may
+need two file descriptors, so raise the open file limit as required:
+
+    ulimit -n 4096
+    python benchmarks/bench_websocket_events.py --sessions 1000
+
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+import websockets
+from redis import Redis
+
+from tortuga.events.manager import PubSubManager
+from tortuga.events.types.base import BaseEvent
+from tortuga.web_service.websocket.state_manager import StateManager
+
+
+class BenchmarkEvent(BaseEvent):
+    name = 'benchmark'
+
+
+async def session_handler(websocket, path=None):
+    state_manager = StateManager(websocket=websocket)
+    state_manager.state.authenticated = True
+    state_manager.state.clear_authentication_timeout()
+    state_manager.state.subscribe()
+
+    try:
+        await state_manager.producer_handler()
+
+    except websockets.ConnectionClosed:
+        pass
+
+    finally:
+        state_manager.state.unsubscribe()
+
+
+class Client:
+    def __init__(self, sent: dict, latencies: list):
+        self.sent = sent
+        self.latencies = latencies
+        self.received = asyncio.Event()
+
+    async def run(self, url: str, connected: asyncio.Event):
+        async with websockets.connect(url) as websocket:
+            #
+            # The first message is always the authentication required
+            # message
+            #
+            await websocket.recv()
+            connected.set()
+
+            async for msg in websocket:
+                data = json.loads(msg)
+                if data.get('name') != BenchmarkEvent.name:
+                    continue
+                self.latencies.append(
+                    time.perf_counter() - self.sent[data['id']])
+                self.received.set()
+
+
+async def run(args):
+    server = await websockets.serve(session_handler, 'localhost', args.port)
+    url = 'ws://localhost:{}'.format(args.port)
+
+    sent = {}
+    latencies = []
+    clients = []
+    tasks = []
+
+    print('Connecting {} sessions...'.format(args.sessions))
+    for _ in range(args.sessions):
+        client = Client(sent, latencies)
+        connected = asyncio.Event()
+        clients.append(client)
+        tasks.append(asyncio.ensure_future(client.run(url, connected)))
+        await connected.wait()
+
+    #
+    # Idle CPU, with all sessions connected and subscribed
+    #
+    cpu_start = time.process_time()
+    await asyncio.sleep(args.idle)
+    idle_cpu = (time.process_time() - cpu_start) / args.idle
+
+    #
+    # Event-to-client latency
+    #
+    pubsub = PubSubManager.get()
+    for _ in range(args.events):
+        for client in clients:
+            client.received.clear()
+
+        event = BenchmarkEvent(id=str(uuid.uuid4()),
+                               timestamp=datetime.now(tz=timezone.utc))
+        sent[event.id] = time.perf_counter()
+        pubsub.publish(event)
+
+        await asyncio.wait_for(
+            asyncio.gather(*[client.received.wait() for client in clients]),
+            timeout=30)
+
+    for task in tasks:
+        task.cancel()
+    server.close()
+
+    latencies.sort()
+    print('{:>8} {:>10} {:>12} {:>12} {:>12}'.format(
+        'sessions', 'idle CPU', 'p50 (ms)', 'p99 (ms)', 'max (ms)'))
+    print('{:>8d} {:>9.1f}% {:>12.2f} {:>12.2f} {:>12.2f}'.format(
+        args.sessions, idle_cpu * 100,
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.99)] * 1000,
+        latencies[-1] * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--redis-port', type=int, default=6379)
+    parser.add_argument('--password', default=None)
+    parser.add_argument('--port', type=int, default=9555,
+                        help='the port to run the websocket server on')
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--events', type=int, default=100)
+    parser.add_argument('--idle', type=float, default=10,
+                        help='seconds to measure idle CPU for')
+    args = parser.parse_args()
+
+    PubSubManager._redis_client = Redis(
+        host=args.host, port=args.redis_port, password=args.password)
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(run(args))
+
+
+if __name__ == '__main__':
+    main()
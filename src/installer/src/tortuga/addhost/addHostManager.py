@@ -80,11 +80,8 @@ class AddHostManager(TagsDbApiMixin, TortugaObjectManager):
                 session, softwareProfileName) \
             if softwareProfileName else None
 
-        ResourceAdapterClass = \
-            resourceAdapterFactory.get_resourceadapter_class(
-                dbHardwareProfile.resourceadapter.name)
-
-        resourceAdapter = ResourceAdapterClass(
+        resourceAdapter = resourceAdapterFactory.get_api(
+            dbHardwareProfile.resourceadapter.name,
             addHostSession=addHostRequest['addHostSession'])
 
         resourceAdapter.session = session
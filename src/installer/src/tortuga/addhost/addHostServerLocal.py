@@ -17,13 +17,11 @@
 import ipaddress
 import itertools
 import logging
-import random
 import re
-import string
 import threading
-from typing import List, Optional
+from typing import List, Optional, Set
 
-from sqlalchemy.orm.session import Session
+from sqlalchemy.orm.session import Session, object_session
 
 from tortuga.db.models.hardwareProfile import HardwareProfile
 from tortuga.db.models.network import Network
@@ -39,16 +37,19 @@ from tortuga.exceptions.nicNotFound import NicNotFound
 from tortuga.logging import ADD_HOST_NAMESPACE
 from tortuga.resourceAdapter.utility import get_provisioning_nics
 from tortuga.utility.tortugaApi import TortugaApi
+from .ipAllocator import IpAllocator, get_ip_allocator, release_ip
+from .nameAllocator import get_name_allocator, release_name
 
 
 session_nodes_lock = threading.RLock()
 
-session_nodes: List[Node] = []
+# Maintain a set of host names generated in add nodes sessions
+session_nodes: Set[str] = set()
 
-# Maintain a list of used IP addresses. We do this to ensure we are
+# Maintain a set of used IP addresses. We do this to ensure we are
 # not reusing IP addresses that were already used in this add nodes
 # session.
-reservedIps: List[str] = []
+reservedIps: Set[str] = set()
 
 logger = logging.getLogger(ADD_HOST_NAMESPACE)
 
@@ -87,13 +88,16 @@ class AddHostServerLocal(TortugaApi):
                 logger.debug('DELETING session_nodes entry: {0}'.format(
                     hostname))
 
-                session_nodes.remove(hostname)
+                session_nodes.discard(hostname)
+                release_name(hostname)
 
             prov_nics = get_provisioning_nics(node)
 
-            if prov_nics:
-                if prov_nics[0].ip in reservedIps:
-                    reservedIps.remove(prov_nics[0].ip)
+            if prov_nics and prov_nics[0].ip in reservedIps:
+                reservedIps.discard(prov_nics[0].ip)
+
+                if prov_nics[0].network:
+                    release_ip(prov_nics[0].network.id, prov_nics[0].ip)
         finally:
             if lock:
                 session_nodes_lock.release()
@@ -159,57 +163,40 @@ class AddHostServerLocal(TortugaApi):
             InvalidArgument
         '''
 
+        return self.generate_node_names(
+            session, nameFormat, 1, rackNumber=rackNumber,
+            randomize=randomize, dns_zone=dns_zone)[0]
+
+    def generate_node_names(self, session: Session, nameFormat: str,
+                            count: int, rackNumber: Optional[str] = None,
+                            randomize: bool = False,
+                            dns_zone: Optional[str] = None) -> List[str]:
+        '''
+        Generate unique node names for the specified nameFormat. All names
+        are reserved at once, which allows bulk add host requests to name
+        all nodes with a single lookup.
+
+        Raises:
+            InvalidArgument
+        '''
+
         try:
             base_name = nameFormat if rackNumber is None else \
                 self._substituteHashSpecifier(
                     nameFormat, '#R', rackNumber)
 
-            # Find all pre-existing nodes + nodes in the session
-            if not randomize:
-                nodes = self._nodesDbHandler.getNodesByNameFilter(
-                    session,
-                    self._substituteHashSpecifier(
-                        base_name, '#N', '_'))
-
-                # Get list of all existing nodes names
-                node_names = [get_host_name(tmpNode.name)
-                              for tmpNode in nodes]
-            else:
-                # Get all nodes matching name format WITH a random suffix
-                nodes = self._nodesDbHandler.getNodesByNameFilter(
-                    session,
-                    self._substituteHashSpecifier(base_name, '#N', '_') +
-                    '-_____')
-
-                node_names = [
-                    strip_random_node_name_suffix(get_host_name(node.name))
-                    for node in nodes]
-
             with session_nodes_lock:
-                # Build a list of all nodes in database and session
-                if randomize:
-                    all_session_nodes = node_names + \
-                        strip_random_node_name_suffixes(session_nodes)
-                else:
-                    all_session_nodes = node_names + session_nodes
+                # Existing nodes and nodes in the session are tracked by
+                # the allocator
+                names = get_name_allocator(
+                    session, base_name, randomize=randomize,
+                    reserved_names=session_nodes).allocate(count)
 
-            for slot in itertools.count(1):
-                name = self._substituteHashSpecifier(
-                    base_name, '#N', slot)
-
-                if name not in all_session_nodes:
-                    break
-
-            if randomize:
-                # Add random 5 letter suffix to generated host name
-                name += '-%s' % (
-                    ''.join(random.sample(string.ascii_lowercase, 5)))
-
-            with session_nodes_lock:
                 # Add only host name to session_nodes cache
-                session_nodes.append(name)
+                session_nodes.update(names)
 
-            return '{}.{}'.format(name, dns_zone) if dns_zone else name
+            return ['{}.{}'.format(name, dns_zone) if dns_zone else name
+                    for name in names]
         except InvalidArgument as exc:
             raise InvalidArgument('%s (format=[%s])' % (exc, nameFormat))
 
@@ -354,7 +341,7 @@ class AddHostServerLocal(TortugaApi):
             dbNic.boot = dbNic.network and dbNic.network.type == 'provision'
 
             if dbNic.ip:
-                reservedIps.append(dbNic.ip)
+                self._reserve_ip(dbNic.ip, dbNic.network)
 
             nics.append(dbNic)
 
@@ -436,63 +423,76 @@ class AddHostServerLocal(TortugaApi):
             #
             raise NetworkNotFound('IP address [{}] is invalid'.format(ip))
 
-    def generate_provisioning_ip_address(self, network):
+    def _reserve_ip(self, ip: str, network: Optional[Network]) -> None:
+        with session_nodes_lock:
+            reservedIps.add(ip)
+
+            session = object_session(network) if network else None
+            if session is not None:
+                get_ip_allocator(session, network, reservedIps).reserve(ip)
+
+    def generate_provisioning_ip_address(self, network: Network) \
+            -> Optional[str]:
         """
         Raises:
             InvalidArgument
         """
 
+        ips = self.generate_provisioning_ip_addresses(network, 1)
+
+        return ips[0] if ips else None
+
+    def generate_provisioning_ip_addresses(self, network: Network,
+                                           count: int) -> List[str]:
+        """
+        Reserves the next available IP addresses on a provisioning
+        network, honouring the starting IP address and increment of the
+        network. This allows bulk add host requests to reserve the
+        addresses of all nodes at once.
+
+        Raises:
+            InvalidArgument
+        """
+
         if not network or network.usingDhcp:
             # This hardwareProfile uses an external DHCP server
             # (we do not assign the IP address for this hardwareProfile.)
-            return None
+            return []
 
         n = ipaddress.IPv4Network(
             '%s/%s' % (network.address, network.netmask))
 
-        # Get list of all currently allocated IPs on this network
-        ips = [
-            ipaddress.IPv4Address(str(dbNic.ip))
-            for dbNic in network.nics if dbNic and dbNic.ip]
+        if not network.startIp and n.num_addresses < 2:
+            raise InvalidArgument('IP address space exhausted')
 
-        with session_nodes_lock:
-            # Include reserved IPs
-            ips.extend([ipaddress.IPv4Address(str(ip))
-                        for ip in reservedIps])
-
-            if not network.startIp:
-                # Assume the starting IP address is the first IP address in
-                # the subnet
-                try:
-                    ip = n[1]
-                except IndexError:
-                    raise InvalidArgument('IP address space exhausted')
-            else:
-                ip = ipaddress.IPv4Address(str(network.startIp))
-
-            # Ensure there's a valid increment if none is defined in the
-            # network object.
-            inc = network.increment if network.increment else 1
+        # Ensure there's a valid increment if none is defined in the
+        # network object.
+        inc = int(network.increment) if network.increment else 1
 
-            for _ in range(n.num_addresses):
-                if ip not in ips:
-                    # Found available IP address within address space
-                    break
+        with session_nodes_lock:
+            session = object_session(network)
 
-                ip += int(inc)
+            if session is not None:
+                # Allocated and reserved IPs are tracked by the allocator
+                allocator = get_ip_allocator(session, network, reservedIps)
             else:
-                raise InvalidArgument('IP address space exhausted')
+                allocator = IpAllocator(n)
+                for dbNic in network.nics:
+                    if dbNic and dbNic.ip:
+                        allocator.assign(dbNic.ip)
+                for ip in reservedIps:
+                    allocator.reserve(ip)
 
-            if ip == n.broadcast_address:
-                raise InvalidArgument('IP address space exhausted')
+            ips = [ip.exploded for ip in allocator.allocate(
+                count, start=network.startIp or None, increment=inc)]
 
-            reservedIps.append(ip.exploded)
+            reservedIps.update(ips)
 
         self._logger.debug(
-            'Assigning IP address [%s] on network [%s]' % (
-                ip.exploded, str(n)))
+            'Assigning IP address(es) [%s] on network [%s]' % (
+                ' '.join(ips), str(n)))
 
-        return ip.exploded
+        return ips
 
 
 def strip_random_node_name_suffix(name):
@@ -0,0 +1,289 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ipaddress
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import func
+from sqlalchemy.orm.session import Session
+
+from tortuga.db.models.network import Network
+from tortuga.db.models.nic import Nic
+from tortuga.exceptions.invalidArgument import InvalidArgument
+
+
+#
+# Matches any byte in a bitmap that has at least one bit clear
+#
+NOT_FULL_BYTE = re.compile(b'[^\xff]')
+
+IpAddress = Union[str, ipaddress.IPv4Address]
+
+
+class IpAllocator:
+    """
+    Allocates IP addresses on a network.
+
+    Addresses are tracked in two bitmaps, with one bit per address in the
+    network: one for addresses that are assigned to NICs, and one for
+    addresses that are taken, i.e. assigned or reserved. Reservations
+    can be released again, assignments can only be reset by reloading.
+
+    This class is not thread-safe, callers are expected to serialize
+    access to it.
+
+    """
+    def __init__(self, network: ipaddress.IPv4Network):
+        """
+        Initializer.
+
+        :param ipaddress.IPv4Network network: the network to allocate
+                                              addresses on
+
+        """
+        self.network = network
+
+        self._assigned = bytearray((network.num_addresses + 7) // 8)
+        self._taken = bytearray(len(self._assigned))
+
+        #
+        # The lowest candidate number that may be free, for each
+        # (start offset, increment)
+        #
+        self._hints: Dict[Tuple[int, int], int] = {}
+
+        #
+        # The NIC rows the allocator was loaded from, for detecting
+        # changes in the database
+        #
+        self.nic_count: int = 0
+        self.max_nic_id: int = 0
+
+    def _offset(self, ip: IpAddress) -> Optional[int]:
+        offset = int(ipaddress.IPv4Address(str(ip))) - \
+            int(self.network.network_address)
+
+        if 0 <= offset < self.network.num_addresses:
+            return offset
+
+        return None
+
+    def _is_taken(self, offset: int) -> bool:
+        return bool(self._taken[offset >> 3] & (1 << (offset & 7)))
+
+    def _take(self, offset: int):
+        self._taken[offset >> 3] |= 1 << (offset & 7)
+
+    def assign(self, ip: IpAddress):
+        """
+        Marks an address as assigned to a NIC. Addresses that are not on
+        the network are ignored.
+
+        :param IpAddress ip: the address
+
+        """
+        offset = self._offset(ip)
+        if offset is None:
+            return
+
+        self._assigned[offset >> 3] |= 1 << (offset & 7)
+        self._take(offset)
+
+    def reserve(self, ip: IpAddress):
+        """
+        Marks an address as reserved. Addresses that are not on the
+        network are ignored.
+
+        :param IpAddress ip: the address
+
+        """
+        offset = self._offset(ip)
+        if offset is None:
+            return
+
+        self._take(offset)
+
+    def release(self, ip: IpAddress):
+        """
+        Releases a reserved address, unless it is assigned to a NIC.
+
+        :param IpAddress ip: the address
+
+        """
+        offset = self._offset(ip)
+        if offset is None:
+            return
+
+        if self._assigned[offset >> 3] & (1 << (offset & 7)):
+            return
+
+        self._taken[offset >> 3] &= ~(1 << (offset & 7)) & 0xff
+
+        for (start, increment), slot in self._hints.items():
+            if offset >= start and (offset - start) % increment == 0:
+                self._hints[(start, increment)] = \
+                    min(slot, (offset - start) // increment)
+
+    def is_taken(self, ip: IpAddress) -> bool:
+        """
+        Determines whether or not an address is assigned or reserved.
+
+        :param IpAddress ip: the address
+
+        :return bool: True if the address is taken, False otherwise
+
+        """
+        offset = self._offset(ip)
+
+        return offset is not None and self._is_taken(offset)
+
+    def allocate(self, count: int = 1,
+                 start: Optional[IpAddress] = None,
+                 increment: int = 1) -> List[ipaddress.IPv4Address]:
+        """
+        Reserves the first free addresses of the sequence start,
+        start + increment, start + 2 * increment, etc.
+
+        :param int count:        the number of addresses to reserve
+        :param IpAddress start:  the first address of the sequence,
+                                 defaults to the first host address
+        :param int increment:    the step between addresses
+
+        :return List[ipaddress.IPv4Address]: the reserved addresses
+
+        :raises InvalidArgument: if there are not enough free addresses
+
+        """
+        if start is None:
+            start_offset = 1
+        else:
+            start_offset = self._offset(start)
+            if start_offset is None:
+                raise InvalidArgument(
+                    'Starting IP address [{}] not on network [{}]'.format(
+                        start, self.network))
+
+        #
+        # The broadcast address is never allocated
+        #
+        end_offset = self.network.num_addresses
+        if self.network.prefixlen < 31:
+            end_offset -= 1
+
+        key = (start_offset, increment)
+        slot = self._hints.get(key, 0)
+        offsets = []
+
+        while len(offsets) < count:
+            offset = start_offset + slot * increment
+
+            #
+            # Skip over full bytes in the bitmap, when allocating
+            # consecutive addresses
+            #
+            if increment == 1 and offset < end_offset and \
+                    self._taken[offset >> 3] == 0xff:
+                match = NOT_FULL_BYTE.search(self._taken, (offset >> 3) + 1)
+                offset = match.start() * 8 if match else end_offset
+                slot = offset - start_offset
+                continue
+
+            if offset >= end_offset:
+                for offset in offsets:
+                    self.release(self.network.network_address + offset)
+                raise InvalidArgument('IP address space exhausted')
+
+            if not self._is_taken(offset):
+                self._take(offset)
+                offsets.append(offset)
+
+            slot += 1
+
+        self._hints[key] = slot
+
+        return [self.network.network_address + offset for offset in offsets]
+
+
+#
+# Allocators for provisioning networks, by network id
+#
+_allocators: Dict[int, IpAllocator] = {}
+
+
+def get_ip_allocator(session: Session, db_network: Network,
+                     reserved_ips: Iterable[str] = ()) -> IpAllocator:
+    """
+    Gets the allocator for a network, which is loaded from the NICs in
+    the database once, and kept in sync by only loading NICs that were
+    added since. If NICs were removed, the allocator is reloaded.
+
+    :param Session session:            the database session
+    :param Network db_network:         the network
+    :param Iterable[str] reserved_ips: the addresses reserved in add host
+                                       sessions, applied when the
+                                       allocator is (re)loaded
+
+    :return IpAllocator: the allocator
+
+    """
+    network = ipaddress.IPv4Network(
+        '{}/{}'.format(db_network.address, db_network.netmask))
+
+    allocator = _allocators.get(db_network.id)
+
+    with session.no_autoflush:
+        count, max_id = session.query(
+            func.count(Nic.id), func.max(Nic.id)
+        ).filter(Nic.networkId == db_network.id).one()
+
+        if allocator is None or allocator.network != network:
+            allocator = None
+        elif max_id is not None and max_id > allocator.max_nic_id:
+            for _, ip in session.query(Nic.id, Nic.ip).filter(
+                    Nic.networkId == db_network.id,
+                    Nic.id > allocator.max_nic_id):
+                if ip:
+                    allocator.assign(ip)
+                allocator.nic_count += 1
+            allocator.max_nic_id = max_id
+
+        if allocator is None or allocator.nic_count != count:
+            allocator = IpAllocator(network)
+            for nic_id, ip in session.query(Nic.id, Nic.ip).filter(
+                    Nic.networkId == db_network.id):
+                if ip:
+                    allocator.assign(ip)
+                allocator.nic_count += 1
+                allocator.max_nic_id = max(allocator.max_nic_id, nic_id)
+
+            for ip in reserved_ips:
+                allocator.reserve(ip)
+
+            _allocators[db_network.id] = allocator
+
+    return allocator
+
+
+def release_ip(network_id: int, ip: str):
+    """
+    Releases a reserved address, if there is an allocator for the network.
+
+    :param int network_id: the network id
+    :param str ip:         the address
+
+    """
+    allocator = _allocators.get(network_id)
+    if allocator is not None:
+        allocator.release(ip)
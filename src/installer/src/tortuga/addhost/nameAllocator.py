@@ -0,0 +1,281 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import re
+import string
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm.session import Session
+
+from tortuga.db.models.node import Node
+from tortuga.exceptions.invalidArgument import InvalidArgument
+
+
+#
+# Matches the node number specifier in a name format
+#
+NODE_NUMBER_SPECIFIER = re.compile(r'#N+')
+
+
+class NameAllocator:
+    """
+    Allocates node names for a name format, in which the node number is
+    given by a '#N' specifier (ie. "compute-#NN"). Rack specifiers must
+    already have been substituted.
+
+    Node numbers are tracked in two sets: one for numbers of nodes that
+    exist, and one for numbers that are taken, i.e. existing or reserved.
+    Reservations can be released again, existing nodes can only be reset
+    by reloading.
+
+    This class is not thread-safe, callers are expected to serialize
+    access to it.
+
+    """
+    def __init__(self, base_name: str, randomize: bool = False):
+        """
+        Initializer.
+
+        :param str base_name:  the name format
+        :param bool randomize: whether or not names get a random 5 letter
+                               suffix
+
+        """
+        self.base_name = base_name
+        self.randomize = randomize
+
+        match = NODE_NUMBER_SPECIFIER.search(base_name)
+        if match:
+            self._left = base_name[:match.start()]
+            self._width = match.end() - match.start() - 1
+            self._right = base_name[match.end():]
+            self.max_number = 10 ** self._width - 1
+        else:
+            #
+            # Without a specifier, there is only a single name
+            #
+            self._left, self._width, self._right = base_name, 0, ''
+            self.max_number = 1
+
+        self._regex = re.compile('^{}({}){}{}$'.format(
+            re.escape(self._left),
+            r'\d{{{}}}'.format(self._width) if self._width else '',
+            re.escape(self._right),
+            '-.{5}' if randomize else ''
+        ))
+
+        self._existing: Set[int] = set()
+        self._taken: Set[int] = set()
+
+        #
+        # The lowest node number that may be free
+        #
+        self._next = 1
+
+        #
+        # The node rows the allocator was loaded from, for detecting
+        # changes in the database
+        #
+        self.node_count: int = 0
+        self.max_node_id: int = 0
+
+    @property
+    def name_filter(self) -> str:
+        """
+        The SQL "LIKE" filter matching the host names of all nodes.
+
+        """
+        name_filter = self._left + '_' * self._width + self._right
+        if self.randomize:
+            name_filter += '-_____'
+
+        return name_filter
+
+    def parse(self, name: str) -> Optional[int]:
+        """
+        Gets the node number from a node name.
+
+        :param str name: the node name, or FQDN
+
+        :return Optional[int]: the node number, or None if the name does
+                               not match the name format
+
+        """
+        match = self._regex.match(name.split('.', 1)[0])
+        if not match:
+            return None
+
+        return int(match.group(1)) if self._width else 1
+
+    def format(self, number: int) -> str:
+        """
+        Gets the host name for a node number.
+
+        :param int number: the node number
+
+        :return str: the host name
+
+        """
+        if not self._width:
+            return self._left
+
+        return '{}{:0{}d}{}'.format(self._left, number, self._width,
+                                    self._right)
+
+    def assign(self, name: str):
+        """
+        Marks the node number of an existing node as taken.
+
+        :param str name: the node name
+
+        """
+        number = self.parse(name)
+        if number is not None:
+            self._existing.add(number)
+            self._taken.add(number)
+
+    def reserve(self, name: str):
+        """
+        Marks the node number of a name as reserved.
+
+        :param str name: the node name
+
+        """
+        number = self.parse(name)
+        if number is not None:
+            self._taken.add(number)
+
+    def release(self, name: str):
+        """
+        Releases the node number of a reserved name, unless the node
+        exists.
+
+        :param str name: the node name
+
+        """
+        number = self.parse(name)
+        if number is None or number in self._existing:
+            return
+
+        self._taken.discard(number)
+        self._next = min(self._next, number)
+
+    def allocate(self, count: int = 1) -> List[str]:
+        """
+        Reserves the lowest free node numbers.
+
+        :param int count: the number of names to reserve
+
+        :return List[str]: the reserved host names
+
+        :raises InvalidArgument: if there are not enough free node numbers
+
+        """
+        numbers = []
+        number = self._next
+
+        while len(numbers) < count:
+            if number > self.max_number:
+                self._taken.difference_update(numbers)
+                raise InvalidArgument('Unable to generate unique host name')
+
+            if number not in self._taken:
+                self._taken.add(number)
+                numbers.append(number)
+
+            number += 1
+
+        self._next = number
+
+        names = [self.format(number) for number in numbers]
+
+        if self.randomize:
+            # Add random 5 letter suffix to generated host names
+            names = ['{}-{}'.format(
+                name, ''.join(random.sample(string.ascii_lowercase, 5)))
+                for name in names]
+
+        return names
+
+
+#
+# Allocators by (base name, randomize)
+#
+_allocators: Dict[Tuple[str, bool], NameAllocator] = {}
+
+
+def get_name_allocator(session: Session, base_name: str,
+                       randomize: bool = False,
+                       reserved_names: Iterable[str] = ()) -> NameAllocator:
+    """
+    Gets the allocator for a name format, which is loaded from the nodes
+    in the database once, and kept in sync by only loading nodes that
+    were added since. If nodes were removed, the allocator is reloaded.
+
+    :param Session session:              the database session
+    :param str base_name:                the name format
+    :param bool randomize:               whether or not names get a random
+                                         suffix
+    :param Iterable[str] reserved_names: the host names reserved in add
+                                         host sessions, applied when the
+                                         allocator is (re)loaded
+
+    :return NameAllocator: the allocator
+
+    """
+    key = (base_name, randomize)
+    allocator = _allocators.get(key)
+
+    like = (allocator or NameAllocator(base_name, randomize)).name_filter
+    name_filter = or_(Node.name.like(like), Node.name.like(like + '.%'))
+
+    with session.no_autoflush:
+        count, max_id = session.query(
+            func.count(Node.id), func.max(Node.id)).filter(name_filter).one()
+
+        if allocator is not None and max_id is not None and \
+                max_id > allocator.max_node_id:
+            for _, name in session.query(Node.id, Node.name).filter(
+                    name_filter, Node.id > allocator.max_node_id):
+                allocator.assign(name)
+                allocator.node_count += 1
+            allocator.max_node_id = max_id
+
+        if allocator is None or allocator.node_count != count:
+            allocator = NameAllocator(base_name, randomize)
+            for node_id, name in session.query(Node.id, Node.name).filter(
+                    name_filter):
+                allocator.assign(name)
+                allocator.node_count += 1
+                allocator.max_node_id = max(allocator.max_node_id, node_id)
+
+            for name in reserved_names:
+                allocator.reserve(name)
+
+            _allocators[key] = allocator
+
+    return allocator
+
+
+def release_name(name: str):
+    """
+    Releases a reserved host name in all allocators it belongs to.
+
+    :param str name: the host name
+
+    """
+    for allocator in _allocators.values():
+        allocator.release(name)
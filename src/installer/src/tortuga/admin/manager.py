@@ -18,6 +18,7 @@ import string
 from random import choice
 
 from sqlalchemy.orm.session import Session
+from tortuga.auth.credentialCache import credential_cache
 from tortuga.auth.manager import AuthManager
 from tortuga.db.adminDbApi import AdminDbApi
 from tortuga.objects.tortugaObjectManager import TortugaObjectManager
@@ -84,11 +85,24 @@ class AdminManager(TortugaObjectManager):
         )
 
     def deleteAdmin(self, session: Session, admin):
+        # 'admin' is either the admin id or username
+        username = self.getAdminById(session, admin).getUsername() \
+            if admin.isdigit() else admin
+
         self._adminDbApi.deleteAdmin(session, admin)
 
+        credential_cache.invalidate(username)
+
         AuthManager(session=session).reloadPrincipals()
 
     def updateAdmin(self, session: Session, adminObject, isCrypted):
+        # Look up the current username, which may be changed by the update
+        if adminObject.getId() is not None:
+            username = self.getAdminById(
+                session, adminObject.getId()).getUsername()
+        else:
+            username = adminObject.getUsername()
+
         if adminObject.getPassword() is not None:
             # Only consider updating the password if the field is defined
             if not isCrypted:
@@ -98,4 +112,7 @@ class AdminManager(TortugaObjectManager):
 
         self._adminDbApi.updateAdmin(session, adminObject)
 
+        # Cached credentials must not outlive a password change
+        credential_cache.invalidate(username)
+
         AuthManager(session=session).reloadPrincipals()
@@ -0,0 +1,151 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class CredentialCache:
+    """
+    A bounded, in-memory cache of successfully verified credentials, so
+    that the (deliberately slow) password verification does not have to
+    run on every request.
+
+    Credentials are never stored in the clear: entries are keyed by an
+    HMAC of the credential, using a key that is randomly generated for
+    each process. Entries expire ttl seconds after they were added, and
+    the least recently used entries are evicted when the cache is full.
+
+    """
+    DEFAULT_TTL = 300
+    DEFAULT_MAX_SIZE = 1024
+
+    def __init__(self, ttl: float = DEFAULT_TTL,
+                 max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Initializer.
+
+        :param float ttl:    the number of seconds a verified credential is
+                             cached for, 0 disables the cache
+        :param int max_size: the maximum number of cached credentials
+
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._key = os.urandom(32)
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple[str, str, bytes], float]' = \
+            OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+
+    def _get_key(self, source: str, username: str,
+                 credential: str) -> Tuple[str, str, bytes]:
+        digest = hmac.new(self._key, credential.encode(),
+                          hashlib.sha256).digest()
+
+        return source, username, digest
+
+    def contains(self, source: str, username: str,
+                 credential: str) -> bool:
+        """
+        Checks whether a credential was successfully verified recently.
+
+        :param str source:     the source the credential was verified
+                               against, i.e. 'db' or 'vault'
+        :param str username:   the username
+        :param str credential: the password
+
+        :return bool: True if the credential is cached, otherwise False
+
+        """
+        key = self._get_key(source, username, credential)
+
+        with self._lock:
+            expires = self._entries.get(key)
+
+            if expires is not None and expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return True
+
+            if expires is not None:
+                del self._entries[key]
+
+            self._misses += 1
+
+            return False
+
+    def add(self, source: str, username: str, credential: str):
+        """
+        Adds a successfully verified credential to the cache.
+
+        :param str source:     the source the credential was verified
+                               against, i.e. 'db' or 'vault'
+        :param str username:   the username
+        :param str credential: the password
+
+        """
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+
+        key = self._get_key(source, username, credential)
+
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: Optional[str] = None):
+        """
+        Removes the cached credentials of a user, or of all users.
+
+        :param str username: the username, or None for all users
+
+        """
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+                return
+
+            for key in [key for key in self._entries
+                        if key[1] == username]:
+                del self._entries[key]
+
+    def get_stats(self) -> dict:
+        """
+        Gets the cache statistics.
+
+        :return dict: the hit and miss counts, and the cache size
+
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'size': len(self._entries),
+            }
+
+
+# process wide cache shared by all username/password authentication methods
+credential_cache = CredentialCache()
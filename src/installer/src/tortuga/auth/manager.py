@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from typing import Optional, Tuple
+
 from passlib.hash import pbkdf2_sha256
 
 from sqlalchemy.orm.session import Session
@@ -22,6 +24,10 @@ from .principal import AuthPrincipal
 
 
 class AuthManager(TortugaObjectManager):
+    # (cleartext, crypted) cfm password, so that it is not crypted again
+    # every time an AuthManager is created
+    __cfm_password: Optional[Tuple[str, str]] = None
+
     def __init__(self, *, session: Session):
         super(AuthManager, self).__init__()
 
@@ -59,7 +65,7 @@ class AuthManager(TortugaObjectManager):
         # Create built-in cfm principal
         cfmUser = AuthPrincipal(
             self._configManager.getCfmUser(),
-            self.cryptPassword(self._configManager.getCfmPassword()),
+            self.__getCryptedCfmPassword(),
             {'roles': 'cfm'})
 
         # Add cfm user
@@ -72,6 +78,19 @@ class AuthManager(TortugaObjectManager):
                     admin.getUsername(), admin.getPassword(),
                     attributes={'id': admin.getId()})
 
+    def __getCryptedCfmPassword(self) -> str:
+        """
+        Return crypted cfm password, crypting it only if it has changed
+        """
+        cfmPassword = self._configManager.getCfmPassword()
+
+        if AuthManager.__cfm_password is None or \
+                AuthManager.__cfm_password[0] != cfmPassword:
+            AuthManager.__cfm_password = (
+                cfmPassword, self.cryptPassword(cfmPassword))
+
+        return AuthManager.__cfm_password[1]
+
     def get_principal(self, username: str) -> AuthPrincipal:
         """
         Get a principal by username.
@@ -28,6 +28,7 @@ from tortuga.admin.api import AdminApi
 from tortuga.config.configManager import ConfigManager
 from tortuga.exceptions.authenticationFailed import AuthenticationFailed
 
+from .credentialCache import credential_cache
 from .manager import AuthManager
 from tortuga.web_service.database import dbm
 
@@ -173,7 +174,12 @@ class UsernamePasswordAuthenticationMethodBase(AuthenticationMethod):
     keyword arguments and delegates the password check to a derived
     class.
 
+    Successful verifications are cached in the process wide credential
+    cache, keyed by CREDENTIAL_SOURCE, so that repeated requests with the
+    same credentials do not pay for the password verification again.
+
     """
+    CREDENTIAL_SOURCE = 'db'
 
     def validate(principal,password) -> bool:
         """
@@ -196,6 +202,10 @@ class UsernamePasswordAuthenticationMethodBase(AuthenticationMethod):
         if not username or not password:
             raise AuthenticationFailed()
 
+        if credential_cache.contains(self.CREDENTIAL_SOURCE, username,
+                                     password):
+            return username
+
         with dbm.session() as session:
             auth_manager = AuthManager(session=session)
 
@@ -212,6 +222,8 @@ class UsernamePasswordAuthenticationMethodBase(AuthenticationMethod):
                 raise AuthenticationFailed()
 
             if self.validate(principal, password):
+                credential_cache.add(self.CREDENTIAL_SOURCE, username,
+                                     password)
                 return username
 
             raise AuthenticationFailed()
@@ -231,6 +243,8 @@ class UsernamePasswordAuthenticationVaultMethod(UsernamePasswordAuthenticationMe
     """
     An authentication method that validates a user against data stored in vault.
     """
+    CREDENTIAL_SOURCE = 'vault'
+
     def __init__(self):
         super().__init__()
         self.client = None
@@ -35,8 +35,10 @@ class CloudServerActionStoreManager:
             #
             # Cloud server actions only need to hang around for 24 hours
             #
-            object_store = ObjectStoreManager.get('cloudserveractions',
-                                                  expire=86400)
+            object_store = ObjectStoreManager.get(
+                'cloudserveractions', expire=86400,
+                indexes=['cloudserver_id', 'status'],
+                sorted_indexes=['timestamp'])
             cls._cloudserver_action_store = ObjectStoreCloudServerActionStore(
                 object_store)
         return cls._cloudserver_action_store
@@ -21,6 +21,7 @@ from tortuga.events.types import (CloudServerActionCreated,
                                   CloudServerActionUpdated,
                                   CloudServerActionDeleted)
 from tortuga.logging import NODE_NAMESPACE
+from tortuga.typestore.base import Cursor
 from tortuga.typestore.objectstore import ObjectStoreTypeStore
 from .types import CloudServerAction
 
@@ -61,6 +62,7 @@ class CloudServerActionStore:
             order_desc: bool = False,
             order_alpha: bool = False,
             limit: Optional[int] = None,
+            cursor: Optional[Cursor] = None,
             **filters) -> Iterator[CloudServerAction]:
         """
         Gets a iterator of clouds erver actions from the cloud server action 
@@ -71,6 +73,8 @@ class CloudServerActionStore:
         :param bool order_alpha: order alphabetically (instead of numerically)
         :param int limit:        the number of objects to limit in the
                                  iterator
+        :param Cursor cursor:    start after the object this cursor points
+                                 at
         :param filters:          one or more filters to apply to the list
 
         :return: an iterator of cloud server actions
@@ -12,13 +12,70 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime
+import re
+from typing import Optional, Union
+
 from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
 from sqlalchemy.ext.indexable import index_property
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 
 from .base import ModelBase
 
 
+#
+# The format of the Node.lastUpdate timestamps (always in UTC). Timestamps
+# in this format sort in chronological order, so they can be compared in
+# the database; Node.lastUpdate is therefore always normalized to it.
+#
+LAST_UPDATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+#
+# The (UTC) timestamp strings Node.lastUpdate accepts: LAST_UPDATE_FORMAT
+# or ISO 8601, with optional fractional seconds (which are discarded)
+#
+LAST_UPDATE_RE = re.compile(
+    r'^(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})(\.\d+)?Z?$')
+
+
+def normalize_last_update(
+        value: Optional[Union[str, datetime.datetime]]) -> Optional[str]:
+    """
+    Normalizes a timestamp for the Node.lastUpdate column.
+
+    :param value: the timestamp, either a datetime (naive datetimes are
+                  assumed to be in UTC) or a UTC string matching
+                  LAST_UPDATE_RE
+
+    :return Optional[str]: the timestamp in LAST_UPDATE_FORMAT
+
+    :raises ValueError: if the timestamp is not valid
+
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        match = LAST_UPDATE_RE.match(value.strip())
+        if match is None:
+            raise ValueError(
+                'Invalid node last update timestamp: {!r}'.format(value))
+
+        # raises ValueError for invalid dates/times, such as month 13
+        value = datetime.datetime.strptime(
+            '{} {}'.format(match.group(1), match.group(2)),
+            LAST_UPDATE_FORMAT)
+
+    if not isinstance(value, datetime.datetime):
+        raise ValueError(
+            'Invalid node last update timestamp: {!r}'.format(value))
+
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+    return value.strftime(LAST_UPDATE_FORMAT)
+
+
 class Node(ModelBase):
     __tablename__ = 'nodes'
 
@@ -27,7 +84,7 @@ class Node(ModelBase):
     public_hostname = Column(String(255), unique=True, nullable=True)
     state = Column(String(255), default='Discovered')
     bootFrom = Column(Integer, default=0)
-    lastUpdate = Column(String(20))
+    lastUpdate = Column(String(20), index=True)
     rack = Column(Integer, default=0)
     rank = Column(Integer, default=0)
     hardwareProfileId = Column(Integer, ForeignKey('hardwareprofiles.id'))
@@ -53,5 +110,11 @@ class Node(ModelBase):
         'InstanceMapping', uselist=False, back_populates='node',
         cascade='all,delete-orphan')
 
+    @validates('lastUpdate')
+    def validate_last_update(self, key, value): \
+            # pylint: disable=unused-argument,no-self-use
+        """Ensure 'lastUpdate' is always in LAST_UPDATE_FORMAT."""
+        return normalize_last_update(value)
+
     def __repr__(self):
         return 'Node(name={})'.format(self.name)
@@ -79,7 +79,9 @@ class NodeDbApi(TagsDbApiMixin, TortugaDbApi):
         try:
             return self.__convert_nodes_to_TortugaObjectList(
                 self._nodesDbHandler.getNodesByAddHostSession(
-                    session, ahSession), optionDict=optionDict)
+                    session, ahSession,
+                    options=self.__get_load_options(optionDict)),
+                optionDict=optionDict)
         except TortugaException:
             raise
         except Exception as ex:
@@ -100,7 +102,8 @@ class NodeDbApi(TagsDbApiMixin, TortugaDbApi):
                 self._nodesDbHandler.expand_nodespec(
                     session,
                     nodespec,
-                    include_installer=include_installer),
+                    include_installer=include_installer,
+                    options=self.__get_load_options(optionDict)),
                 optionDict=optionDict)
         except Exception as ex:
             self._logger.exception(str(ex))
@@ -166,11 +169,30 @@ class NodeDbApi(TagsDbApiMixin, TortugaDbApi):
             self._logger.exception(str(ex))
             raise
 
+    def __get_load_options(self, optionDict: Optional[OptionsDict]) -> list:
+        """
+        Get the query options that eagerly load the relations required to
+        convert a list of nodes, so that converting does not lazy load
+        relations node by node.
+
+        """
+        relations = ['hardwareprofile.resourceadapter']
+
+        if optionDict and optionDict.get('instance'):
+            relations.extend([
+                'instance.instance_metadata',
+                'instance.resource_adapter_configuration',
+            ])
+
+        return self.getLoadOptions(NodeModel, optionDict, relations)
+
     def __convert_nodes_to_TortugaObjectList(
             self, nodes: List[NodeModel],
             optionDict: Optional[OptionsDict] = None) -> TortugaObjectList:
         """
-        Return TortugaObjectList of nodes with relations populated
+        Return TortugaObjectList of nodes with relations populated. When
+        nodes are queried with the options from __get_load_options(), the
+        relations are already loaded and no further queries are made.
 
         :param nodes:      list of Node objects
         :param optionDict:
@@ -207,7 +229,9 @@ class NodeDbApi(TagsDbApiMixin, TortugaDbApi):
 
         try:
             return self.__convert_nodes_to_TortugaObjectList(
-                self._nodesDbHandler.getNodeList(session, tags=tags),
+                self._nodesDbHandler.getNodeList(
+                    session, tags=tags,
+                    options=self.__get_load_options(optionDict)),
                 optionDict=optionDict
             )
         except TortugaException:
@@ -290,7 +314,9 @@ class NodeDbApi(TagsDbApiMixin, TortugaDbApi):
         try:
             return self.__convert_nodes_to_TortugaObjectList(
                 self._nodesDbHandler.getNodesByNodeState(
-                    session, node_state), optionDict=optionDict)
+                    session, node_state,
+                    options=self.__get_load_options(optionDict)),
+                optionDict=optionDict)
         except TortugaException:
             raise
         except Exception as ex:
@@ -126,30 +126,36 @@ class NodesDbHandler(TortugaDbObjectHandler):
 
         return session.query(Node).filter(or_(*searchspec)).all()
 
-    def getNodesByAddHostSession(self, session: Session, ahSession: str) \
+    def getNodesByAddHostSession(self, session: Session, ahSession: str,
+                                 options: Optional[list] = None) \
             -> List[Node]:
         """
         Get nodes by add host session
         Returns a list of nodes
+
+        'options' are additional query options, ie. for eager loading
         """
 
         self._logger.debug(
             'getNodesByAddHostSession(): ahSession [%s]' % (ahSession))
 
-        return session.query(Node).filter(
+        return session.query(Node).options(*(options or [])).filter(
             Node.addHostSession == ahSession).order_by(Node.name).all()
 
     def getNodesByNameFilter(
             self,
             session: Session,
             filter_spec: Union[str, list],
-            include_installer: Optional[bool] = True) -> List[Node]:
+            include_installer: Optional[bool] = True,
+            options: Optional[list] = None) -> List[Node]:
         """
         Filter follows SQL "LIKE" semantics (ie. "something%")
 
         Exclude installer node from node list by setting
         'include_installer' to False.
 
+        'options' are additional query options, ie. for eager loading
+
         Returns a list of Node
         """
 
@@ -175,14 +181,15 @@ class NodesDbHandler(TortugaDbObjectHandler):
         if not include_installer:
             installer_fqdn = getfqdn()
 
-            return session.query(Node).filter(
+            return session.query(Node).options(*(options or [])).filter(
                 and_(
                     Node.name != installer_fqdn,
                     or_(*node_filter)
                 )
             ).all()
 
-        return session.query(Node).filter(or_(*node_filter)).all()
+        return session.query(Node).options(*(options or [])).filter(
+            or_(*node_filter)).all()
 
     def getNodeById(self, session: Session, _id: int) -> Node:
         """
@@ -217,10 +224,13 @@ class NodesDbHandler(TortugaDbObjectHandler):
 
     def getNodeList(self, session: Session,
                     softwareProfile: Optional[str] = None,
-                    tags: Optional[Tags] = None) -> List[Node]:
+                    tags: Optional[Tags] = None,
+                    options: Optional[list] = None) -> List[Node]:
         """
         Get sorted list of nodes from the db.
 
+        'options' are additional query options, ie. for eager loading
+
         Raises:
             SoftwareProfileNotFound
         """
@@ -252,7 +262,7 @@ class NodesDbHandler(TortugaDbObjectHandler):
                     #
                     searchspec.append(Node.tags.any(name=name))
 
-        return session.query(Node).filter(
+        return session.query(Node).options(*(options or [])).filter(
             or_(*searchspec)).order_by(Node.name).all()
 
     def getNodeListByNodeStateAndSoftwareProfileName(
@@ -270,8 +280,10 @@ class NodesDbHandler(TortugaDbObjectHandler):
             SoftwareProfile.name == softwareProfileName,
             Node.state == nodeState)).all()
 
-    def getNodesByNodeState(self, session: Session, state: str) -> List[Node]:
-        return session.query(Node).filter(Node.state == state).all()
+    def getNodesByNodeState(self, session: Session, state: str,
+                            options: Optional[list] = None) -> List[Node]:
+        return session.query(Node).options(*(options or [])).filter(
+            Node.state == state).all()
 
     def getNodesByMac(self, session: Session, usedMacList: List[str]) \
             -> List[Node]:
@@ -304,7 +316,8 @@ class NodesDbHandler(TortugaDbObjectHandler):
         return filter_spec
 
     def expand_nodespec(self, session: Session, nodespec: str,
-                        include_installer: Optional[bool] = True) \
+                        include_installer: Optional[bool] = True,
+                        options: Optional[list] = None) \
             -> List[Node]:
         """
         Expand command-line nodespec (ie. "compute*") to list of nodes
@@ -313,5 +326,6 @@ class NodesDbHandler(TortugaDbObjectHandler):
         return self.getNodesByNameFilter(
             session,
             self.build_node_filterspec(nodespec),
-            include_installer=include_installer
+            include_installer=include_installer,
+            options=options
         )
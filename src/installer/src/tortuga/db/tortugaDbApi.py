@@ -13,7 +13,10 @@
 # limitations under the License.
 
 import logging
-from typing import Dict
+from typing import Dict, Iterable, List
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
 
 from tortuga.exceptions.invalidDbRelation import InvalidDbRelation
 from tortuga.logging import DATABASE_NAMESPACE
@@ -59,6 +62,57 @@ class TortugaDbApi:
 
                     raise
 
+    def getLoadOptions(self, model, optionDict: Dict[str, bool] = None,
+                       relations: Iterable[str] = ()) -> List:
+        """
+        Get query options that eagerly load the relations enabled in
+        optionDict, and any additional relations, so the relations of a
+        list of objects are loaded by a fixed number of queries instead
+        of one or more queries per object. Relation names may be dotted
+        paths (ie. "hardwareprofile.resourceadapter").
+
+        Collections are loaded using "SELECT ... IN" queries, other
+        relations are joined.
+
+        :raises InvalidDbRelation:
+
+        """
+        paths = [k for k, v in (optionDict or {}).items() if v]
+        paths.extend(relations)
+
+        options = []
+
+        for path in paths:
+            cls = model
+            loader = None
+
+            for name in path.split('.'):
+                relationship = inspect(cls).relationships.get(name)
+                if relationship is None:
+                    if name in dir(cls):
+                        # not a relation, ie. a column
+                        break
+
+                    raise InvalidDbRelation(
+                        'Relation %s not valid for class %s' % (
+                            name, cls.__name__))
+
+                attr = getattr(cls, name)
+
+                if relationship.uselist:
+                    loader = loader.selectinload(attr) if loader \
+                        else selectinload(attr)
+                else:
+                    loader = loader.joinedload(attr) if loader \
+                        else joinedload(attr)
+
+                cls = relationship.mapper.class_
+
+            if loader is not None:
+                options.append(loader)
+
+        return options
+
     def getTortugaObjectList(self, cls, dbList): \
             # pylint: disable=no-self-use
         return TortugaObjectList([
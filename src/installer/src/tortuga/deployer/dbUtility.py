@@ -14,7 +14,6 @@
 
 # pylint: disable=no-member
 
-import time
 from typing import Any, Dict
 
 from sqlalchemy.orm.session import Session
@@ -25,6 +24,7 @@ from tortuga.db.models.operatingSystem import OperatingSystem
 from tortuga.db.models.operatingSystemFamily import OperatingSystemFamily
 from tortuga.db.models.softwareProfile import SoftwareProfile
 from tortuga.node import state
+from tortuga.node.liveness import format_last_update
 from tortuga.objects.parameter import Parameter
 
 
@@ -37,8 +37,7 @@ def primeDb(session: Session, settings: Dict[str, Any]):
     node = Node(name=settings['fqdn'])
     node.state = state.NODE_STATE_INSTALLED
     node.lockedState = 'HardLocked'
-    node.lastUpdate = time.strftime(
-        '%Y-%m-%d %H:%M:%S', time.gmtime(time.time()))
+    node.lastUpdate = format_last_update()
     node.bootFrom = 1
 
     # Create Installer Software Profile
@@ -0,0 +1,151 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+from typing import List, Optional
+
+from tortuga.logging import EVENTS_NAMESPACE
+from .types import BaseEvent
+
+
+logger = logging.getLogger(EVENTS_NAMESPACE)
+
+_local = threading.local()
+
+
+def get_current_batch() -> Optional['EventBatch']:
+    """
+    Gets the event batch that is active in the current thread, if any.
+
+    :return Optional[EventBatch]: the active event batch, or None
+
+    """
+    return getattr(_local, 'batch', None)
+
+
+def dispatch_events(events: List[BaseEvent]):
+    """
+    Stores, publishes and schedules the listeners for a number of events.
+    The events are stored and published in one round trip each, and each
+    listener is scheduled once for all the events it should run for.
+
+    :param List[BaseEvent] events: the events to dispatch
+
+    """
+    from .listeners import get_all_listener_classes
+    from .manager import EventStoreManager, PubSubManager
+    from .tasks import run_event_listener, run_event_listener_batch
+
+    EventStoreManager.get().save_many(events)
+    PubSubManager.get().publish_many(events)
+
+    event_dicts = [event.get_schema_class()().dump(event).data
+                   for event in events]
+
+    for listener_class in get_all_listener_classes():
+        listener_event_dicts = [
+            event_dict for event, event_dict in zip(events, event_dicts)
+            if listener_class.should_run(event)
+        ]
+        if not listener_event_dicts:
+            continue
+
+        kwargs = {}
+        if listener_class.countdown is not None:
+            kwargs['countdown'] = listener_class.countdown
+
+        if len(listener_event_dicts) == 1:
+            run_event_listener.apply_async(
+                args=[listener_class.name, listener_event_dicts[0]],
+                **kwargs
+            )
+        else:
+            run_event_listener_batch.apply_async(
+                args=[listener_class.name, listener_event_dicts],
+                **kwargs
+            )
+
+
+class EventBatch:
+    """
+    Collects the events fired in the current thread, and dispatches them
+    together when the batch is done (or grows to max_size events):
+
+        with EventBatch():
+            for node in nodes:
+                NodeStateChanged.fire(node=..., previous_state=...)
+
+    Batches may be nested, in which case the events are dispatched when
+    the outermost batch is done. Events are dispatched even if the batch
+    is left because of an exception, as they describe changes that have
+    already been made.
+
+    """
+    DEFAULT_MAX_SIZE = 500
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Initialization.
+
+        :param int max_size: the number of events after which the batch is
+                             dispatched, without waiting for it to be done
+
+        """
+        self.max_size = max(1, max_size)
+        self._events: List[BaseEvent] = []
+        self._nested = False
+
+    def __enter__(self) -> 'EventBatch':
+        current = get_current_batch()
+        if current is not None:
+            self._nested = True
+            return current
+
+        _local.batch = self
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._nested:
+            return
+
+        _local.batch = None
+
+        self.flush()
+
+    def add(self, event: BaseEvent):
+        """
+        Adds a fired event to the batch.
+
+        :param BaseEvent event: the event
+
+        """
+        self._events.append(event)
+
+        if len(self._events) >= self.max_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Dispatches the events in the batch.
+
+        """
+        events, self._events = self._events, []
+        if not events:
+            return
+
+        logger.debug('Dispatching batch of {} event(s)'.format(len(events)))
+
+        dispatch_events(events)
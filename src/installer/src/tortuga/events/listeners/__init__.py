@@ -16,3 +16,4 @@ from .base import get_all_listener_classes, get_listnener_class, BaseListener
 from .node import NodeProvisioningListener
 from .cloudserveraction import CloudServerActionListener
 from .tags import TagChangeListener
+from .puppet import PuppetEncListener
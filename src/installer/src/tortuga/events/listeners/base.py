@@ -127,6 +127,20 @@ class BaseListener(metaclass=ListenerMeta):
         if self.should_run(event):
             self.run(event)
 
+    def run_batch(self, events: List[BaseEvent]):
+        """
+        Run the listener for a batch of events, fired together in an
+        EventBatch. By default, the listener is run for each event in
+        turn. Override this in your implementations if the events can be
+        handled more efficiently together.
+
+        :param List[BaseEvent] events: the events to respond to, if
+                                       required
+
+        """
+        for event in events:
+            self.run_if_required(event)
+
     def run(self, event: BaseEvent):
         """
         Run the listener for the specified event. Override this in your
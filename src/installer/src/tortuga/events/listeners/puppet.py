@@ -0,0 +1,68 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from tortuga.node import state
+from .base import BaseListener
+from ..types import AddNodeRequestComplete, BaseEvent, \
+    HardwareProfileTagsChanged, NodeStateChanged, NodeTagsChanged, \
+    SoftwareProfileTagsChanged
+
+
+class PuppetEncListener(BaseListener):
+    """
+    The purpose of this event listener is to refresh the cached Puppet ENC
+    documents after changes that invalidated them, so get-tortuga-node
+    keeps serving precomputed documents. The documents themselves are
+    invalidated as soon as the changes are committed to the database.
+
+    """
+    name = 'refresh-puppet-enc-documents'
+    event_types = [
+        AddNodeRequestComplete,
+        HardwareProfileTagsChanged,
+        NodeStateChanged,
+        NodeTagsChanged,
+        SoftwareProfileTagsChanged,
+    ]
+
+    @classmethod
+    def should_run(cls, event: BaseEvent):
+        if not super().should_run(event):
+            return False
+
+        #
+        # A node is only about to run Puppet once it is provisioned
+        #
+        if isinstance(event, NodeStateChanged):
+            return event.node['state'] in [state.NODE_STATE_PROVISIONED,
+                                           state.NODE_STATE_INSTALLED]
+
+        return True
+
+    def run(self, event: BaseEvent):
+        from tortuga.puppet.enc import precompute_puppet_enc
+        from tortuga.tasks.celery import app
+
+        if isinstance(event, NodeStateChanged):
+            node_names = [event.node['name']]
+        elif isinstance(event, NodeTagsChanged):
+            node_names = [event.node_name]
+        else:
+            node_names = None
+
+        if node_names is not None and not all(node_names):
+            return
+
+        with app.dbm.session() as session:
+            precompute_puppet_enc(session, node_names=node_names)
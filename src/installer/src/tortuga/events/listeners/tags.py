@@ -13,89 +13,76 @@
 # limitations under the License.
 
 import logging
+from typing import List, Optional
 
-from sqlalchemy.orm import sessionmaker
-
-from tortuga.db.resourceAdaptersDbHandler import ResourceAdaptersDbHandler
-from tortuga.db.nodesDbHandler import NodesDbHandler
-from tortuga.web_service.database import dbm
 from tortuga.events.listeners.base import BaseListener
 from tortuga.events.types.tag import BaseTagEvent
 from tortuga.events.types import TagCreated, TagUpdated, TagDeleted
-from tortuga.hardwareprofile.manager import HardwareProfileStoreManager
-from tortuga.resourceAdapter.resourceAdapter import ResourceAdapter
-from tortuga.resourceAdapter.resourceAdapterFactory import get_api
-from tortuga.node.manager import NodeStoreManager
+from tortuga.resourceAdapter.tagSync import NodeTagChange, NodeTagSyncQueue
 from tortuga.tags.types import Tag
 
 
 logger = logging.getLogger(__name__)
 
 
-Session = sessionmaker(bind=dbm.engine)
-
-
 class TagChangeListener(BaseListener):
+    """
+    Pushes node tag changes to the resource adapters. Changes are queued,
+    and pushed together by the sync_node_tags task a short while after the
+    first one was queued, so that tagging many nodes at once results in a
+    few bulk resource adapter calls.
+
+    """
     name = 'push-tags-changes-to-resource-adapter'
     event_types = [TagCreated, TagUpdated, TagDeleted]
 
     def run(self, event: BaseTagEvent):
+        self.run_batch([event])
+
+    def run_batch(self, events: List[BaseTagEvent]):
+        changes = []
+        for event in events:
+            change = self._get_change(event)
+            if change is not None:
+                changes.append(change)
+
+        if not changes:
+            return
+
+        queue = NodeTagSyncQueue()
+        queue.add(changes)
+
+        if queue.schedule():
+            from tortuga.resourceAdapter.tasks import sync_node_tags
+            sync_node_tags.apply_async(countdown=queue.window)
+
+    def _get_change(self,
+                    event: BaseTagEvent) -> Optional[NodeTagChange]:
         #
         # Make sure this is the right event type, and that it is relevant
         # for this resource adapter.
         #
-        if not isinstance(event, BaseTagEvent):
-            return
+        if not self.should_run(event):
+            return None
         #
         # Parse the tag ID to get the metadata
         #
         object_type, object_id, tag_name = Tag.parse_id(event.tag_id)
-        try:
-            int(object_id)
-        except ValueError:
-            logger.error('Invalid object ID in tag ID: %s', event.tag_id)
         #
         # Currently only changes to node tags are supported
         #
         if object_type != 'node':
-            return
+            return None
+        try:
+            node_id = int(object_id)
+        except ValueError:
+            logger.error('Invalid object ID in tag ID: %s', event.tag_id)
+            return None
         #
         # Managed tags need to have their prefix removed
         #
         if tag_name.startswith('managed:'):
             tag_name = tag_name.replace('managed:', '')
-        #
-        # Do the actual tag update in the resource adapter
-        #
-        sess = Session()
-        ra = self._get_resource_adapter(sess, object_id)
-        ra.session = sess
-        node = NodesDbHandler().getNodeById(sess, int(object_id))
-        if isinstance(event, TagDeleted):
-            ra.unset_node_tag(node, tag_name)
-        else:
-            ra.set_node_tag(node, tag_name, event.value)
-        sess.close()
-
-    def _get_resource_adapter(self, sess: Session,
-                              node_id: str) -> ResourceAdapter:
-        node_store = NodeStoreManager.get()
-        node = node_store.get(node_id)
-        #
-        # Lookup the hardware profile for the node
-        #
-        hwp_store = HardwareProfileStoreManager.get()
-        hwp = hwp_store.get(node.hardwareprofile_id)
-        #
-        # Lookup the resource adapter for the hardware profile
-        #
-        ra_handler = ResourceAdaptersDbHandler()
-        for db_ra in ra_handler.getResourceAdapterList(sess):
-            if db_ra.id == int(hwp.resourceadapter_id):
-                #
-                # Get a instantiated ResourceAdapter instance
-                #
-                return get_api(db_ra.name)
 
-        raise Exception('Resource adapter not found with ID: %s',
-                        hwp.rsourceadapter_id)
+        return NodeTagChange(node_id, tag_name, event.value,
+                             isinstance(event, TagDeleted))
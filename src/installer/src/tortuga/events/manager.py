@@ -16,7 +16,7 @@ from redis import Redis
 
 from tortuga.config.configManager import ConfigManager
 from tortuga.objectstore.manager import ObjectStoreManager
-from .pubsub import EventPubSub, RedisEventPubSub
+from .pubsub import EventPubSub, RedisEventDispatcher, RedisEventPubSub
 from .store import EventStore, ObjectStoreEventStore
 
 
@@ -27,6 +27,11 @@ class EventStoreManager:
     """
     _event_store: EventStore = None
 
+    #
+    # Events only need to exist for 24 hours
+    #
+    EVENT_RETENTION = 86400
+
     @classmethod
     def get(cls) -> EventStore:
         """
@@ -37,9 +42,13 @@ class EventStoreManager:
         """
         if not cls._event_store:
             #
-            # Events only need to exist for 24 hours
+            # Events are indexed by time, per event name as well, so that
+            # the most recent events of a type can be listed directly
             #
-            object_store = ObjectStoreManager.get('events', expire=86400)
+            object_store = ObjectStoreManager.get(
+                'events', expire=cls.EVENT_RETENTION,
+                indexes=['name'], sorted_indexes=['timestamp'],
+                sorted_index_partitions={'timestamp': 'name'})
             cls._event_store = ObjectStoreEventStore(object_store)
         return cls._event_store
 
@@ -50,20 +59,47 @@ class PubSubManager:
 
     """
     _redis_client: Redis = None
+    _dispatcher: RedisEventDispatcher = None
     _config_manager: ConfigManager = ConfigManager()
 
     @classmethod
-    def get(cls) -> EventPubSub:
+    def get_redis_client(cls) -> Redis:
         """
-        Get an event pubsub service instance.
+        Get the Redis client used for pub/sub.
 
-        :return EventPubSub: the pub/sub service instance
+        :return Redis: the Redis client
 
         """
         if not cls._redis_client:
             cls._redis_client = Redis(
                 password=cls._config_manager.getRedisPassword())
+        return cls._redis_client
+
+    @classmethod
+    def get(cls) -> EventPubSub:
+        """
+        Get an event pubsub service instance.
+
+        :return EventPubSub: the pub/sub service instance
+
+        """
         return RedisEventPubSub(
-            redis_client=cls._redis_client,
+            redis_client=cls.get_redis_client(),
             event_store=EventStoreManager.get()
         )
+
+    @classmethod
+    def get_dispatcher(cls) -> RedisEventDispatcher:
+        """
+        Get the process-wide event dispatcher, for delivering events to
+        asyncio queues.
+
+        :return RedisEventDispatcher: the event dispatcher
+
+        """
+        if not cls._dispatcher:
+            cls._dispatcher = RedisEventDispatcher(
+                redis_client=cls.get_redis_client(),
+                event_store=EventStoreManager.get()
+            )
+        return cls._dispatcher
@@ -11,14 +11,66 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Optional
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 
 from redis import Redis
 
-from .types import BaseEvent
+from tortuga.logging import EVENTS_NAMESPACE
+from .types import BaseEvent, get_event_class
 from .store import EventStore
 
 
+logger = logging.getLogger(EVENTS_NAMESPACE)
+
+
+def encode_event(event: BaseEvent) -> str:
+    """
+    Encodes an event for publishing on a pub/sub channel.
+
+    :param BaseEvent event: the event to encode
+
+    :return str: the JSON encoded event
+
+    """
+    schema_class = event.get_schema_class()
+    return json.dumps(schema_class().dump(event).data)
+
+
+def decode_event(data: bytes,
+                 event_store: Optional[EventStore] = None
+                 ) -> Optional[BaseEvent]:
+    """
+    Decodes an event published on a pub/sub channel.
+
+    :param bytes data:              the message data
+    :param EventStore event_store:  the event store to look the event up
+                                    in, if the message only contains a
+                                    key, as published by older versions
+
+    :return Optional[BaseEvent]: the event, or None if it can't be found
+
+    """
+    data = data.decode()
+
+    if not data.startswith('{'):
+        if not event_store:
+            return None
+        event_id = data.replace('{}:'.format(
+            RedisEventPubSub._namespace), '')
+        return event_store.get(event_id)
+
+    event_dict = json.loads(data)
+    event_class = get_event_class(event_dict['name'])
+    schema_class = event_class.get_schema_class()
+    unmarshalled = schema_class().load(event_dict)
+    return event_class(**unmarshalled.data)
+
+
 class EventPubSub:
     """
     A publish/subscribe service for system events.
@@ -33,6 +85,16 @@ class EventPubSub:
         """
         raise NotImplementedError()
 
+    def publish_many(self, events: List[BaseEvent]):
+        """
+        Publishes a number of events to the pub/sub channel, in order.
+
+        :param List[BaseEvent] events: the events to publish
+
+        """
+        for event in events:
+            self.publish(event)
+
     def subscribe(self, event_name: str = None):
         """
         Subscribes to events. Once subscribed, callse to get_message will
@@ -83,8 +145,24 @@ class RedisEventPubSub(EventPubSub):
 
         """
         channel = '{}.{}'.format(self._namespace, event.name)
-        key = '{}:{}'.format(self._namespace, event.id)
-        self._redis.publish(channel, key)
+        #
+        # The event is published inline, so that subscribers don't have to
+        # look it up in the event store
+        #
+        self._redis.publish(channel, encode_event(event))
+
+    def publish_many(self, events: List[BaseEvent]):
+        """
+        See superclass. The events are published in a single round trip.
+
+        :param List[BaseEvent] events:
+
+        """
+        pipe = self._redis.pipeline(transaction=False)
+        for event in events:
+            pipe.publish('{}.{}'.format(self._namespace, event.name),
+                         encode_event(event))
+        pipe.execute()
 
     def subscribe(self, event_name: str = None):
         """
@@ -129,7 +207,119 @@ class RedisEventPubSub(EventPubSub):
         if not msg:
             return None
 
-        key = msg['data'].decode()
-        event_id = key.replace('{}:'.format(self._namespace), '')
-        event = self._store.get(event_id)
-        return event
+        return decode_event(msg['data'], self._store)
+
+
+class RedisEventDispatcher:
+    """
+    Dispatches events to asyncio queues, such as the outbound message
+    queues of websocket sessions.
+
+    A single Redis pub/sub subscription is shared by all queues in the
+    process. It is read in a background thread that blocks until a message
+    arrives, so idle subscribers cost nothing, and events are handed over
+    to each queue in its own event loop as soon as they are published.
+
+    """
+    _namespace = RedisEventPubSub._namespace
+
+    #
+    # The number of seconds to wait before re-subscribing, if the
+    # connection to Redis is lost
+    #
+    RECONNECT_DELAY = 5
+
+    def __init__(self, redis_client: Redis, event_store: EventStore):
+        """
+        Initialization.
+
+        :param Redis redis_client:     the (initialized) redis client to use
+        :param EventStore event_store: the (initialized) event store to use
+
+        """
+        self._redis = redis_client
+        self._store = event_store
+        self._lock = threading.Lock()
+        self._queues: Dict[asyncio.Queue,
+                           Tuple[asyncio.AbstractEventLoop,
+                                 Optional[str]]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, queue: asyncio.Queue, event_name: str = None,
+                  loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Subscribes a queue to events.
+
+        :param asyncio.Queue queue: the queue to put events on
+        :param str event_name:      the event name to subscribe to,
+                                    otherwise all
+        :param loop:                the event loop the queue belongs to,
+                                    defaults to the current event loop
+
+        """
+        if loop is None:
+            loop = asyncio.get_event_loop()
+
+        with self._lock:
+            self._queues[queue] = (loop, event_name)
+
+            if not self._thread:
+                self._thread = threading.Thread(target=self._run,
+                                                daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """
+        Unsubscribes a queue from events.
+
+        :param asyncio.Queue queue: the queue to unsubscribe
+
+        """
+        with self._lock:
+            self._queues.pop(queue, None)
+
+    def _run(self):
+        """
+        The thread worker that reads messages from the Redis pub/sub
+        subscription.
+
+        """
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                pubsub.psubscribe('{}.*'.format(self._namespace))
+                for msg in pubsub.listen():
+                    self.dispatch(msg)
+
+            except Exception:
+                logger.exception('Event subscription failed, re-subscribing')
+                time.sleep(self.RECONNECT_DELAY)
+
+    def dispatch(self, msg: dict):
+        """
+        Dispatches a pub/sub message to all subscribed queues.
+
+        :param dict msg: the pub/sub message
+
+        """
+        if msg.get('type') not in ('message', 'pmessage'):
+            return
+
+        event = decode_event(msg['data'], self._store)
+        if not event:
+            return
+
+        with self._lock:
+            queues = list(self._queues.items())
+
+        for queue, (loop, event_name) in queues:
+            if event_name and event_name != event.name:
+                continue
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+
+            except RuntimeError:
+                #
+                # The event loop has been closed
+                #
+                self.unsubscribe(queue)
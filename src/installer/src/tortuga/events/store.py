@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime
 import logging
-from typing import Iterator, Optional
+from typing import Iterator, List, Optional
 
 from tortuga.logging import EVENTS_NAMESPACE
+from tortuga.typestore.base import Cursor
 from tortuga.typestore.objectstore import ObjectStoreTypeStore
 from .types import BaseEvent
 from .types import get_event_class
@@ -38,6 +40,16 @@ class EventStore:
         """
         raise NotImplementedError()
 
+    def save_many(self, events: List[BaseEvent]):
+        """
+        Saves a number of events to the event store.
+
+        :param List[BaseEvent] events: the events to save
+
+        """
+        for event in events:
+            self.save(event)
+
     def get(self, event_id: str) -> Optional[BaseEvent]:
         """
         Gets an event from the event store.
@@ -49,12 +61,25 @@ class EventStore:
         """
         raise NotImplementedError()
 
+    def compact(self, before: datetime.datetime) -> int:
+        """
+        Removes the events that were fired before a point in time from
+        the event store.
+
+        :param datetime before: remove events fired before this time
+
+        :return int: the number of events removed
+
+        """
+        raise NotImplementedError()
+
     def list(
             self,
             order_by: Optional[str] = None,
             order_desc: bool = False,
             order_alpha: bool = False,
             limit: Optional[int] = None,
+            cursor: Optional[Cursor] = None,
             **filters) -> Iterator[BaseEvent]:
         """
         Gets a iterator of events from the event store.
@@ -64,6 +89,8 @@ class EventStore:
         :param bool order_alpha: order alphabetically (instead of numerically)
         :param int limit:        the number of objects to limit in the
                                  iterator
+        :param Cursor cursor:    start after the object this cursor points
+                                 at
         :param filters:          one or more filters to apply to the list
 
         :return: an iterator of events
@@ -75,6 +102,28 @@ class EventStore:
 class ObjectStoreEventStore(ObjectStoreTypeStore, EventStore):
     type_class = BaseEvent
 
+    def save_many(self, events: List[BaseEvent]):
+        """
+        See superclass. The events are written to the object store in a
+        single batch.
+
+        :param List[BaseEvent] events:
+
+        """
+        self._store.set_many(
+            {event.id: self.marshall(event) for event in events})
+
+    def compact(self, before: datetime.datetime) -> int:
+        """
+        See superclass.
+
+        :param datetime before:
+
+        :return int:
+
+        """
+        return self._store.trim('timestamp', before)
+
     def marshall(self, obj: BaseEvent) -> dict:
         schema_class = obj.get_schema_class()
         marshalled = schema_class().dump(obj)
@@ -11,12 +11,49 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Type
+import datetime
+import logging
+from typing import List, Type
+
+from celery.schedules import crontab
 
 from tortuga.events.types import BaseEvent, get_event_class
+from tortuga.logging import EVENTS_NAMESPACE
 from tortuga.tasks.celery import app
 
 from .listeners import get_listnener_class, BaseListener
+from .manager import EventStoreManager
+
+
+logger = logging.getLogger(EVENTS_NAMESPACE)
+
+
+@app.on_after_finalize.connect
+def setup_periodic_tasks(sender, **kwargs):
+    #
+    # Compact the event store every hour
+    #
+    logger.info(
+        'Setting-up periodic task to run every hour: compact_event_store')
+    sender.add_periodic_task(
+        crontab(minute=0),
+        compact_event_store.s(),
+    )
+
+
+def _load_event(event_dict: dict) -> BaseEvent:
+    """
+    Unmarshalls an event.
+
+    :param dict event_dict: the event, serialized as a dict
+
+    :return BaseEvent: the event
+
+    """
+    event_class = get_event_class(event_dict['name'])
+    schema_class = event_class.get_schema_class()
+    unmarshalled = schema_class().load(event_dict)
+    return event_class(**unmarshalled.data)
 
 
 @app.task()
@@ -34,15 +71,39 @@ def run_event_listener(listener_name: str, event_dict: dict):
     listener_class: Type[BaseListener] = get_listnener_class(listener_name)
     listener: BaseListener = listener_class(app.app)
 
-    #
-    # Unmarshall the event
-    #
-    event_class = get_event_class(event_dict['name'])
-    schema_class = event_class.get_schema_class()
-    unmarshalled = schema_class().load(event_dict)
-    event: BaseEvent = event_class(**unmarshalled.data)
-
     #
     # Run the event listener
     #
-    listener.run_if_required(event)
+    listener.run_if_required(_load_event(event_dict))
+
+
+@app.task()
+def run_event_listener_batch(listener_name: str, event_dicts: List[dict]):
+    """
+    A celery task that runs the event listener for a batch of events.
+
+    :param str listener_name:       the listener name
+    :param List[dict] event_dicts:  the events, serialized as dicts
+
+    """
+    listener_class: Type[BaseListener] = get_listnener_class(listener_name)
+    listener: BaseListener = listener_class(app.app)
+
+    listener.run_batch(
+        [_load_event(event_dict) for event_dict in event_dicts])
+
+
+@app.task()
+def compact_event_store():
+    """
+    Removes the events that are older than the event retention period
+    from the event store, along with their index entries.
+
+    """
+    before = datetime.datetime.now(tz=datetime.timezone.utc) - \
+        datetime.timedelta(seconds=EventStoreManager.EVENT_RETENTION)
+
+    count = EventStoreManager.get().compact(before)
+
+    logger.info('Removed {} expired event(s) from the event store'.format(
+        count))
@@ -110,6 +110,10 @@ class BaseEvent(BaseType, metaclass=EventMeta):
         - The event is published to a pubsub channel
         - Any matching event listeners are run
 
+        If an EventBatch is active in the current thread, the event is
+        added to it instead, and stored, published and dispatched to the
+        listeners together with the other events in the batch.
+
         :param kwargs: Arguments passed here will be passed to the
                        events class initialization (__init__) method
 
@@ -120,6 +124,13 @@ class BaseEvent(BaseType, metaclass=EventMeta):
         event.id = str(uuid.uuid4())
         event.timestamp = datetime.datetime.now(tz=datetime.timezone.utc)
 
+        from ..batch import get_current_batch
+
+        batch = get_current_batch()
+        if batch is not None:
+            batch.add(event)
+            return event
+
         cls._store_event(event)
         cls._publish_event(event)
         cls._schedule_event_listeners(event)
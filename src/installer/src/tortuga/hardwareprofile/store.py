@@ -14,7 +14,6 @@
 import logging
 from typing import Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import desc
 from sqlalchemy.orm import Session, sessionmaker
 
 from tortuga.db.dbManager import DbManager
@@ -24,7 +23,8 @@ from tortuga.db.models.hardwareProfileTag import HardwareProfileTag
 from tortuga.events.types import HardwareProfileTagsChanged, TagCreated, \
     TagUpdated, TagDeleted
 from tortuga.objectstore.base import matches_filters
-from tortuga.typestore.base import TypeStore
+from tortuga.typestore.base import Cursor, TypeStore
+from tortuga.typestore.keyset import keyset_iter
 from .types import HardwareProfile
 
 logger = logging.getLogger(__name__)
@@ -38,6 +38,14 @@ class SqlalchemySessionHardwareProfileStore(TypeStore):
     """
     type_class = HardwareProfile
 
+    #
+    # Maps HardwareProfile attribute names to database columns, where they differ
+    #
+    COLUMNS = {
+        'name_format': 'nameFormat',
+        'resourceadapter_id': 'resourceAdapterId',
+    }
+
     def __init__(self, db_manager: DbManager):
         self._Session = sessionmaker(bind=db_manager.engine)
 
@@ -111,21 +119,34 @@ class SqlalchemySessionHardwareProfileStore(TypeStore):
             order_desc: bool = False,
             order_alpha: bool = False,
             limit: Optional[int] = None,
+            cursor: Optional[Cursor] = None,
             **filters) -> Iterator[HardwareProfile]:
         logger.debug(
-            'list(order_by=%s, order_desc=%s, limit=%s, filters=%s) -> ...',
-            order_by, order_desc, limit, filters)
+            'list(order_by=%s, order_desc=%s, limit=%s, cursor=%s, '
+            'filters=%s) -> ...',
+            order_by, order_desc, limit, cursor, filters)
         session = self._Session()
         result = session.query(DbHardwareProfile)
-        if order_by:
-            #
-            # Note: currently, order_alpha is ignored for SqlAlchemy,
-            #       as it is the default behavior for strings
-            #
-            if desc:
-                result = result.order_by(desc(getattr(DbHardwareProfile, order_by)))
-            else:
-                result = result.order_by(getattr(DbHardwareProfile, order_by))
+        #
+        # Note: currently, order_alpha is ignored for SqlAlchemy,
+        #       as it is the default behavior for strings
+        #
+        # The primary key is always the last sort column, which gives a
+        # stable order for keyset pagination
+        #
+        columns = [DbHardwareProfile.id]
+        values = [int(cursor.obj_id)] if cursor else None
+        if order_by and order_by != 'id':
+            columns.insert(0, getattr(DbHardwareProfile,
+                                      self.COLUMNS.get(order_by, order_by)))
+            if cursor:
+                values.insert(0, cursor.value)
+        #
+        # Rows are read limit at a time, so that a page takes a single
+        # query unless the filters (applied below) reject rows
+        #
+        result = keyset_iter(result, columns, values, order_desc,
+                             batch_size=limit)
         count = 0
         for db_hwp in result:
             hwp = self._to_hwp(db_hwp)
@@ -137,6 +158,7 @@ class SqlalchemySessionHardwareProfileStore(TypeStore):
                     session.close()
                     return
                 yield hwp
+        session.close()
 
     def get(self, obj_id: str) -> Optional[HardwareProfile]:
         logger.debug('get(obj_id=%s) -> ...', obj_id)
@@ -20,7 +20,7 @@ import json
 import os
 import pkgutil
 import logging
-from typing import Optional, Type
+from typing import Dict, Optional, Type
 
 from tortuga.config import VERSION, version_is_compatible
 from tortuga.config.configManager import ConfigManager
@@ -43,6 +43,11 @@ logger = logging.getLogger(KIT_NAMESPACE)
 
 EULA_FILE = 'docs/EULA.txt'
 
+#
+# The component installer classes found for every kit installer class
+#
+COMPONENT_INSTALLER_CLASSES: Dict[type, list] = {}
+
 
 class ConfigurableMixin:
     """
@@ -63,6 +68,18 @@ class ConfigurableMixin:
     def get_config_base(self):
         raise NotImplementedError()
 
+    def reset(self):
+        """
+        Discards any state cached by this instance, such as the parsed
+        configuration file. Installer instances are reused (see
+        tortuga.kit.registry.get_kit_installer_instance), and this is
+        called every time an instance is reused. Override this in your
+        implementations if they cache any other state, making sure to
+        call the superclass method.
+
+        """
+        self._config_parser = None
+
     def get_config_defaults(self):
         return {}
 
@@ -271,15 +288,44 @@ class KitInstallerBase(ConfigurableMixin, metaclass=KitInstallerMeta):
         cls.spec = (cls.name, cls.version, cls.iteration)
         cls.meta = meta_dict
 
-    def _load_component_installers(self):
+    @property
+    def session(self):
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        #
+        # Kit installer instances are reused, make sure the component
+        # installers use the same session as their kit installer
+        #
+        self._session = session
+
+        for comp_inst in getattr(self, '_component_installers', {}).values():
+            comp_inst.session = session
+
+    def reset(self):
+        super().reset()
+
+        for comp_inst in self._component_installers.values():
+            comp_inst.reset()
+
+    @classmethod
+    def _get_component_installer_classes(cls) -> list:
         """
-        Load component installers for this kit.
+        Gets the component installer classes for this kit. The components
+        package is only searched the first time this is called for the
+        kit.
+
+        :return list: the ComponentInstaller classes
 
         """
-        if self._component_installers_loaded:
-            return
+        comp_inst_classes = COMPONENT_INSTALLER_CLASSES.get(cls)
+        if comp_inst_classes is not None:
+            return comp_inst_classes
 
-        kit_pkg_name = inspect.getmodule(self).__package__
+        comp_inst_classes = []
+
+        kit_pkg_name = inspect.getmodule(cls).__package__
 
         comp_pkg_name = '{}.components'.format(kit_pkg_name)
 
@@ -299,7 +345,8 @@ class KitInstallerBase(ConfigurableMixin, metaclass=KitInstallerMeta):
                 kit_pkg_name
             )
             logger.debug('The reason: {}'.format(e))
-            return
+            COMPONENT_INSTALLER_CLASSES[cls] = comp_inst_classes
+            return comp_inst_classes
 
         #
         # Walk the components sub-package, looking for component installers
@@ -325,25 +372,38 @@ class KitInstallerBase(ConfigurableMixin, metaclass=KitInstallerMeta):
                         full_pkg_path
                     )
 
-                #
-                # Initialize the ComponentInstaller class and register
-                # it with the KitInstaller
-                #
-                comp_inst_class = comp_inst_mod.ComponentInstaller
-                comp_inst = comp_inst_class(self)
-                comp_inst.session = self.session
-                self._component_installers[comp_inst_class.name] = \
-                    comp_inst
-
-                logger.debug(
-                    'Component installer registered: %s', comp_inst.spec
-                )
+                comp_inst_classes.append(comp_inst_mod.ComponentInstaller)
 
             except ModuleNotFoundError as e:
                 logger.debug('Package not a component: %s', full_pkg_path)
                 logger.debug('The reason: {}'.format(e))
 
-            self._component_installers_loaded = True
+        COMPONENT_INSTALLER_CLASSES[cls] = comp_inst_classes
+
+        return comp_inst_classes
+
+    def _load_component_installers(self):
+        """
+        Load component installers for this kit.
+
+        """
+        if self._component_installers_loaded:
+            return
+
+        #
+        # Initialize the ComponentInstaller classes and register them with
+        # the KitInstaller
+        #
+        for comp_inst_class in self._get_component_installer_classes():
+            comp_inst = comp_inst_class(self)
+            comp_inst.session = self.session
+            self._component_installers[comp_inst_class.name] = comp_inst
+
+            logger.debug(
+                'Component installer registered: %s', comp_inst.spec
+            )
+
+        self._component_installers_loaded = True
 
     def is_installable(self):
         """
@@ -49,6 +49,7 @@ from tortuga.objects.tortugaObjectManager import TortugaObjectManager
 from tortuga.os_utility import osUtility
 from tortuga.os_utility.osUtility import getOsObjectFactory, mapOsName
 from tortuga.repo import repoManager
+from tortuga.resourceAdapter import resourceAdapterFactory
 from tortuga.softwareprofile.softwareProfileApi import SoftwareProfileApi
 from tortuga.utility.actionManager import ActionManager
 from .eula import BaseEulaValidator
@@ -177,6 +178,12 @@ class KitManager(TortugaObjectManager):
             try:
                 self._run_installer(db_manager, installer)
 
+                #
+                # Make any resource adapters installed by the kit
+                # available
+                #
+                resourceAdapterFactory.refresh_resourceadapters()
+
             #
             # If kit already installed, raise the error and don't do anything
             # else
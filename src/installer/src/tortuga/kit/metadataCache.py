@@ -0,0 +1,212 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.orm.session import Session
+
+from tortuga.db.models.component import Component
+from tortuga.db.models.kit import Kit
+from tortuga.db.models.softwareProfile import SoftwareProfile
+
+
+class KitMetadataCache:
+    """
+    A bounded, in-memory cache of the metadata returned by the kit
+    installers for software profiles, keyed by software profile name and
+    kit spec.
+
+    The cache is invalidated whenever kits are installed or uninstalled,
+    or components are enabled or disabled on software profiles, from this
+    process. Changes made by other processes are picked up once the
+    entries expire, ttl seconds after they were added.
+
+    """
+    DEFAULT_TTL = 60
+    DEFAULT_MAX_SIZE = 1024
+
+    def __init__(self, ttl: float = DEFAULT_TTL,
+                 max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Initializer.
+
+        :param float ttl:    the number of seconds metadata is cached for,
+                             0 disables the cache
+        :param int max_size: the maximum number of cached entries
+
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._entries: \
+            'OrderedDict[Tuple[str, Tuple[str, str, str]], ' \
+            'Tuple[int, float, Optional[Dict[str, str]]]]' = OrderedDict()
+
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, software_profile_name: str,
+            kit_spec: Tuple[str, str, str]) -> Tuple[bool, Optional[dict]]:
+        """
+        Gets the metadata of a kit for a software profile.
+
+        :param str software_profile_name: the name of the software profile
+        :param Tuple[str, str, str] kit_spec: the kit spec tuple
+
+        :return Tuple[bool, Optional[dict]]: whether or not the metadata
+                                             was cached, and a copy of the
+                                             metadata
+
+        """
+        key = (software_profile_name, kit_spec)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                version, expires, metadata = entry
+
+                if version == self._version and \
+                        expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return True, \
+                        dict(metadata) if metadata is not None else None
+
+                del self._entries[key]
+
+            self._misses += 1
+
+            return False, None
+
+    def add(self, software_profile_name: str,
+            kit_spec: Tuple[str, str, str], metadata: Optional[dict],
+            version: Optional[int] = None):
+        """
+        Adds the metadata of a kit for a software profile to the cache.
+
+        :param str software_profile_name:    the name of the software
+                                             profile
+        :param Tuple[str, str, str] kit_spec: the kit spec tuple
+        :param Optional[dict] metadata:      the metadata returned by the
+                                             kit installer
+        :param Optional[int] version:        the cache version the metadata
+                                             was retrieved in. If the cache
+                                             has been invalidated since,
+                                             the metadata is not added.
+
+        """
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+
+        key = (software_profile_name, kit_spec)
+
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+
+            self._entries[key] = (
+                self._version, time.monotonic() + self.ttl,
+                dict(metadata) if metadata is not None else None)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """
+        Makes all cached metadata stale.
+
+        """
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Gets the cache statistics.
+
+        :return dict: the hit and miss counts, the cache size and version
+
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'size': len(self._entries),
+                'version': self._version,
+            }
+
+
+# process wide cache of kit metadata
+metadata_cache = KitMetadataCache()
+
+
+def _is_kit_change(obj, session: Session) -> bool:
+    """
+    Whether or not a flushed object affects the kit metadata: kits that
+    are installed or uninstalled, and components that are enabled or
+    disabled on software profiles.
+
+    """
+    if isinstance(obj, Kit):
+        return True
+
+    if obj in session.new or obj in session.deleted:
+        return isinstance(obj, (Component, SoftwareProfile))
+
+    if isinstance(obj, Component):
+        return get_history(obj, 'softwareprofiles').has_changes()
+
+    if isinstance(obj, SoftwareProfile):
+        return get_history(obj, 'components').has_changes() or \
+            get_history(obj, 'name').has_changes()
+
+    return False
+
+
+@event.listens_for(Session, 'after_flush')
+def _after_flush(session: Session, flush_context):  # pylint: disable=unused-argument
+    for obj in (session.new | session.dirty | session.deleted):
+        if _is_kit_change(obj, session):
+            session.info['kit_metadata_changed'] = True
+            metadata_cache.invalidate()
+            break
+
+
+@event.listens_for(Session, 'after_commit')
+def _after_commit(session: Session):
+    #
+    # Invalidate again once the changes are committed, in case the cache
+    # was repopulated from another session in between
+    #
+    if session.info.pop('kit_metadata_changed', False):
+        metadata_cache.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _after_rollback(session: Session):
+    if session.info.pop('kit_metadata_changed', False):
+        metadata_cache.invalidate()
@@ -15,6 +15,7 @@
 import importlib
 import logging
 import pkgutil
+import threading
 from typing import Tuple
 
 from tortuga.exceptions.kitNotFound import KitNotFound
@@ -27,6 +28,12 @@ logger = logging.getLogger(KIT_NAMESPACE)
 KIT_INSTALLER_PACKAGES = ['tortuga_kits']
 KIT_INSTALLER_REGISTRY = {}
 
+#
+# Kit installer instances are cached per thread, as callers set
+# per-request state, such as the database session, on them
+#
+_instances = threading.local()
+
 
 def discover_kit_installers():
     """
@@ -91,6 +98,37 @@ def get_kit_installer(kit_spec: Tuple[str, str, str]):
     return kit
 
 
+def get_kit_installer_instance(kit_spec: Tuple[str, str, str],
+                               session=None):
+    """
+    Gets a kit installer instance. Instances are created once per kit and
+    thread, and are then reused, along with their component installers.
+    Reused instances are reset first, so that they don't use stale
+    configuration.
+
+    :param kit_spec:     a kit spec tuple ('name', 'version', 'iteration')
+    :param session:      the database session to set on the instance
+    :return:             a kit installer instance
+    :raises KitNotfound:
+
+    """
+    kit_class = get_kit_installer(kit_spec)
+
+    if not hasattr(_instances, 'cache'):
+        _instances.cache = {}
+
+    installer = _instances.cache.get(kit_spec)
+    if installer is None or not isinstance(installer, kit_class):
+        installer = kit_class()
+        _instances.cache[kit_spec] = installer
+    else:
+        installer.reset()
+
+    installer.session = session
+
+    return installer
+
+
 def get_all_kit_installers():
     """
     Gets a list of all kit installers
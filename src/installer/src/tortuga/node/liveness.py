@@ -0,0 +1,300 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import logging
+import re
+import shlex
+import subprocess
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from sqlalchemy import or_
+from sqlalchemy.orm.session import Session
+
+from tortuga.db.models.node import LAST_UPDATE_FORMAT, Node
+
+
+logger = logging.getLogger(__name__)
+
+
+#
+# The maximum number of node names/ids in a single IN clause
+#
+MAX_IN_CLAUSE_SIZE = 500
+
+
+def format_last_update(timestamp: Optional[datetime.datetime] = None) -> str:
+    """
+    Formats a timestamp for the Node.lastUpdate column.
+
+    :param Optional[datetime] timestamp: the (UTC) timestamp, defaults to
+                                         the current time
+
+    :return str: the formatted timestamp
+
+    """
+    if timestamp is None:
+        timestamp = datetime.datetime.utcnow()
+
+    return timestamp.strftime(LAST_UPDATE_FORMAT)
+
+
+def _chunks(items: list, size: int = MAX_IN_CLAUSE_SIZE) -> Iterator[list]:
+    for idx in range(0, len(items), size):
+        yield items[idx:idx + size]
+
+
+class NodePingReply:
+    def __init__(self, name: str, reply: bool, response_time: float):
+        self.name: str = name
+        self.reply: bool = reply
+        self.response_time: float = response_time
+
+
+class NodePinger:
+    def ping_all_nodes(self) -> List[NodePingReply]:
+        raise NotImplementedError()
+
+    def iter_ping_all_nodes(self) -> Iterator[NodePingReply]:
+        """
+        Pings all nodes, yielding the replies as they arrive. Override this
+        in your implementations if the replies can be read before all
+        nodes have replied.
+
+        :return Iterator[NodePingReply]: the replies
+
+        """
+        yield from self.ping_all_nodes()
+
+
+class McollectiveNodePinger(NodePinger):
+    _command = '/opt/puppetlabs/bin/mco ping'
+
+    @staticmethod
+    def parse_reply(line: str) -> Optional[NodePingReply]:
+        """
+        Parses a line of mco ping output.
+
+        :param str line: the line to parse
+
+        :return Optional[NodePingReply]: the reply, or None if the line
+                                         is not a ping reply
+
+        """
+        #
+        # A typical ping response from the mco ping command looks like
+        # this:
+        #
+        # execd-01-hioqz    time=52.88 ms
+        #
+        parts = re.split(r"\s+", line.strip())
+        if len(parts) != 3:
+            return None
+        if not parts[1].startswith("time="):
+            return None
+
+        return NodePingReply(
+            name=parts[0],
+            reply=True,
+            response_time=float(parts[1].replace("time=", ""))
+        )
+
+    def ping_all_nodes(self) -> List[NodePingReply]:
+        return list(self.iter_ping_all_nodes())
+
+    def iter_ping_all_nodes(self) -> Iterator[NodePingReply]:
+        p = subprocess.Popen(shlex.split(self._command),
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.DEVNULL)
+
+        try:
+            for line in p.stdout:
+                reply = self.parse_reply(line.decode())
+                if reply is not None:
+                    yield reply
+        finally:
+            p.stdout.close()
+            p.wait()
+
+
+class NodeNameResolver:
+    """
+    Resolves the node names in ping replies to node ids. Names are first
+    looked up as they are, in bulk. Names that are not found are then
+    looked up by their short (unqualified) name, using an index of the
+    short names of all nodes that is built once per resolver.
+
+    """
+    def __init__(self, session: Session):
+        """
+        Initializer.
+
+        :param Session session: the database session
+
+        """
+        self._session = session
+        self._short_names: Optional[Dict[str, List[int]]] = None
+
+    def _get_short_name_index(self) -> Dict[str, List[int]]:
+        if self._short_names is None:
+            self._short_names = {}
+            for id_, name in self._session.query(Node.id, Node.name):
+                self._short_names.setdefault(
+                    name.split('.', 1)[0], []).append(id_)
+
+        return self._short_names
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, List[int]]:
+        """
+        Resolves node names to node ids.
+
+        :param Iterable[str] names: the node names, fully qualified or not
+
+        :return Dict[str, List[int]]: the ids of the nodes found for every
+                                      name. Names that were not found are
+                                      left out.
+
+        """
+        names = list(set(names))
+        result: Dict[str, List[int]] = {}
+
+        for chunk in _chunks(names):
+            for id_, name in self._session.query(Node.id, Node.name).filter(
+                    Node.name.in_(chunk)):
+                result[name] = [id_]
+
+        unresolved = [name for name in names if name not in result]
+        if unresolved:
+            short_names = self._get_short_name_index()
+            for name in unresolved:
+                ids = short_names.get(name.split('.', 1)[0])
+                if ids:
+                    result[name] = ids
+
+        return result
+
+
+class NodeLivenessTracker:
+    """
+    Records the ping replies of nodes in the Node.lastUpdate column. The
+    nodes that replied are updated together, in a single UPDATE
+    statement (per MAX_IN_CLAUSE_SIZE nodes).
+
+    """
+    def __init__(self, session: Session):
+        """
+        Initializer.
+
+        :param Session session: the database session
+
+        """
+        self._session = session
+        self._resolver = NodeNameResolver(session)
+        self._unknown_names: Set[str] = set()
+
+    def update(self, replies: Iterable[NodePingReply],
+               timestamp: Optional[datetime.datetime] = None) -> int:
+        """
+        Sets the lastUpdate timestamp of the nodes that replied, and
+        commits the changes.
+
+        :param Iterable[NodePingReply] replies: the ping replies
+        :param Optional[datetime] timestamp:    the (UTC) time the nodes
+                                                replied, defaults to the
+                                                current time
+
+        :return int: the number of nodes updated
+
+        """
+        names = [reply.name for reply in replies if reply.reply]
+        if not names:
+            return 0
+
+        resolved = self._resolver.resolve(names)
+
+        for name in set(names) - set(resolved):
+            if name not in self._unknown_names:
+                self._unknown_names.add(name)
+                logger.warning(
+                    'Node pinger could not find node: {}, skipping'.format(
+                        name))
+
+        node_ids = sorted({id_ for ids in resolved.values() for id_ in ids})
+        last_update = format_last_update(timestamp)
+
+        for chunk in _chunks(node_ids):
+            self._session.query(Node).filter(Node.id.in_(chunk)).update(
+                {Node.lastUpdate: last_update}, synchronize_session=False)
+
+        self._session.commit()
+
+        return len(node_ids)
+
+    def track(self, pinger: NodePinger, batch_size: int = 1000,
+              flush_interval: float = 5.0) -> int:
+        """
+        Pings all nodes, updating the nodes that replied as the replies
+        arrive, in batches.
+
+        :param NodePinger pinger:    the node pinger
+        :param int batch_size:       the maximum number of replies per
+                                     batch
+        :param float flush_interval: the number of seconds after which a
+                                     batch is applied, as soon as the
+                                     next reply arrives
+
+        :return int: the number of nodes updated
+
+        """
+        updated = 0
+        batch: List[NodePingReply] = []
+        batch_started = time.monotonic()
+
+        for reply in pinger.iter_ping_all_nodes():
+            if not batch:
+                batch_started = time.monotonic()
+
+            batch.append(reply)
+
+            if len(batch) >= batch_size or \
+                    time.monotonic() - batch_started >= flush_interval:
+                updated += self.update(batch)
+                batch = []
+
+        if batch:
+            updated += self.update(batch)
+
+        logger.info('Node pinger updated {} node(s)'.format(updated))
+
+        return updated
+
+
+def get_stale_nodes(session: Session,
+                    since: datetime.datetime) -> List[Node]:
+    """
+    Gets the nodes that have not been updated (i.e. have not replied to a
+    ping) since the specified time. Nodes that have never been updated are
+    included.
+
+    :param Session session:  the database session
+    :param datetime since:   the (UTC) time
+
+    :return List[Node]: the stale nodes
+
+    """
+    return session.query(Node).filter(
+        or_(Node.lastUpdate == None,  # noqa pylint: disable=singleton-comparison
+            Node.lastUpdate < format_last_update(since))
+    ).order_by(Node.name).all()
@@ -17,7 +17,6 @@
 import datetime
 import json
 import logging
-import time
 from collections import defaultdict
 from typing import Any, DefaultDict, Dict, List, Optional, Tuple
 
@@ -34,6 +33,7 @@ from tortuga.db.models.softwareProfile import \
     SoftwareProfile as SoftwareProfileModel
 from tortuga.db.nodeDbApi import NodeDbApi
 from tortuga.db.nodesDbHandler import NodesDbHandler
+from tortuga.events.batch import EventBatch
 from tortuga.events.types import NodeStateChanged, NodeTagsChanged
 from tortuga.exceptions.configurationError import ConfigurationError
 from tortuga.exceptions.nodeNotFound import NodeNotFound
@@ -41,6 +41,7 @@ from tortuga.exceptions.operationFailed import OperationFailed
 from tortuga.exceptions.tortugaException import TortugaException
 from tortuga.kit.actions import KitActionsManager
 from tortuga.logging import NODE_NAMESPACE
+from tortuga.node.liveness import format_last_update
 from tortuga.objects.node import Node
 from tortuga.objects.tortugaObject import TortugaObjectList
 from tortuga.objects.tortugaObjectManager import TortugaObjectManager
@@ -61,6 +62,9 @@ OptionDict = Dict[str, bool]
 class NodeManager(TortugaObjectManager): \
         # pylint: disable=too-many-public-methods
 
+    # number of nodes deleted per transaction
+    DELETE_BATCH_SIZE = 500
+
     def __init__(self):
         super(NodeManager, self).__init__()
 
@@ -369,8 +373,7 @@ class NodeManager(TortugaObjectManager): \
             self._logger.info(
                 'Updated timestamp for node [%s]' % (dbNode.name))
 
-        dbNode.lastUpdate = time.strftime(
-            '%Y-%m-%d %H:%M:%S', time.gmtime(time.time()))
+        dbNode.lastUpdate = format_last_update()
 
         result = bool(changed)
 
@@ -438,6 +441,10 @@ class NodeManager(TortugaObjectManager): \
     def __delete_nodes(self, session: Session, kitmgr: KitActionsManager,
                        nodes: List[NodeModel]) -> None:
         """
+        Deletes nodes in batches of DELETE_BATCH_SIZE. Each batch is
+        deleted in a single transaction, and kit actions are called once
+        per batch for each hardware/software profile combination.
+
         :raises DeleteNodeFailed:
         """
 
@@ -457,44 +464,76 @@ class NodeManager(TortugaObjectManager): \
                 session, hwprofile
             ).deleteNode(node_objs)
 
-            # Perform delete node action for each node in hwprofile
+            for idx in range(0, len(node_data_dicts),
+                             self.DELETE_BATCH_SIZE):
+                self.__delete_node_batch(
+                    session, kitmgr,
+                    node_data_dicts[idx:idx + self.DELETE_BATCH_SIZE])
+
+            # clean up add host session cache
+            self._addHostManager.delete_sessions(set([
+                node.addHostSession for node in node_objs
+                if node.addHostSession
+            ]))
+
+        self.__scheduleUpdate()
+
+    def __delete_node_batch(self, session: Session,
+                            kitmgr: KitActionsManager,
+                            node_data_dicts: List[dict]) -> None:
+        """
+        Deletes a batch of nodes from the database, fires the node state
+        change events and calls the post-delete kit actions.
+
+        """
+        #
+        # Reload the batch, which was expired by the previous commit, in a
+        # single query, eagerly loading the relations that deleting
+        # cascades to
+        #
+        session.query(NodeModel).options(
+            *self._nodeDbApi.getLoadOptions(
+                NodeModel,
+                relations=['hardwareprofile', 'softwareprofile',
+                           'instance.instance_metadata'])
+        ).filter(NodeModel.id.in_(
+            [node_data_dict['id'] for node_data_dict in node_data_dicts]
+        )).all()
+
+        node_dicts = []
+
+        with session.no_autoflush:
             for node_data_dict in node_data_dicts:
                 # get JSON object for node record
-                node_dict = NodeSchema(
+                node_dicts.append(NodeSchema(
                     only=('hardwareprofile', 'softwareprofile', 'name',
                           'state'),
                     exclude=('softwareprofile.metadata',)
-                ).dump(node_data_dict['node']).data
+                ).dump(node_data_dict['node']).data)
 
-                # Delete the Node
-                self._logger.debug('Deleting node [%s]', node_dict['name'])
+                session.delete(node_data_dict['node'])
+
+        # Commit the actual deletion of the nodes to the DB. This is
+        # required as the post_delete hooks may use a different DB
+        # session and we have already commited some changes for these
+        # nodes.
+        session.commit()
 
-                #
-                # Fire node state change events
-                #
+        #
+        # Fire node state change events, dispatched together
+        #
+        with EventBatch():
+            for node_dict, node_data_dict in zip(node_dicts,
+                                                 node_data_dicts):
                 NodeStateChanged.fire(
                     node=node_dict,
                     previous_state=node_data_dict['previous_state']
                 )
 
-                session.delete(node_data_dict['node'])
-
-                # Commit the actual deletion of this node to the DB.  This is required
-                # as the post_delete hooks may use a different DB session and we have
-                # already commited some changes for this node.
-                session.commit()
-
-                self.__post_delete(kitmgr, node_dict)
-
-                self._logger.info('Node [%s] deleted', node_dict['name'])
-
-            # clean up add host session cache
-            self._addHostManager.delete_sessions(set([
-                node.addHostSession for node in node_objs
-                if node.addHostSession
-            ]))
+        self.__post_delete(kitmgr, node_dicts)
 
-        self.__scheduleUpdate()
+        for node_dict in node_dicts:
+            self._logger.info('Node [%s] deleted', node_dict['name'])
 
     def __pre_delete_nodes(self, kitmgr: KitActionsManager,
                            nodes: List[NodeModel]) \
@@ -505,23 +544,22 @@ class NodeManager(TortugaObjectManager): \
         """
 
         hwprofile_nodes = defaultdict(list)
+        profile_node_names = defaultdict(list)
 
         #
         # Mark node states as deleted in the database
         #
         for node in nodes:
-            # call pre-delete host kit action
-            kitmgr.pre_delete_host(
-                node.hardwareprofile.name,
-                get_node_swprofile_name(node),
-                nodes=[node.name]
-            )
+            profile_node_names[(node.hardwareprofile.name,
+                                get_node_swprofile_name(node))].append(
+                node.name)
 
             #
             # Capture previous state and node data as a dict for firing
             # the event later on
             #
             hwprofile_nodes[node.hardwareprofile].append({
+                'id': node.id,
                 'node': node,
                 'previous_state': node.state
             })
@@ -529,6 +567,15 @@ class NodeManager(TortugaObjectManager): \
             # mark node deleted
             node.state = state.NODE_STATE_DELETED
 
+        # call pre-delete host kit action
+        for (hwprofile_name, swprofile_name), node_names in \
+                profile_node_names.items():
+            kitmgr.pre_delete_host(
+                hwprofile_name,
+                swprofile_name,
+                nodes=node_names
+            )
+
         return hwprofile_nodes
 
     def __get_resource_adapter(self, session: Session,
@@ -576,22 +623,35 @@ class NodeManager(TortugaObjectManager): \
 
         return result, nodes_deleted
 
-    def __post_delete(self, kitmgr: KitActionsManager, node: dict):
-        """Call post-delete kit action for deleted node and clean up node
-        state files (ie. Puppet certificate, etc.).
+    def __post_delete(self, kitmgr: KitActionsManager,
+                      node_dicts: List[dict]):
+        """Call post-delete kit action for deleted nodes, once per
+        hardware/software profile, and clean up node state files (ie.
+        Puppet certificate, etc.).
 
-        'node' is a JSON object representing the deleted node.
+        'node_dicts' are JSON objects representing the deleted nodes.
         """
 
-        kitmgr.post_delete_host(
-            node['hardwareprofile']['name'],
-            node['softwareprofile']['name']
-            if node['softwareprofile'] else None,
-            nodes=[node['name']]
-        )
+        profile_node_names = defaultdict(list)
+
+        for node in node_dicts:
+            profile_node_names[(
+                node['hardwareprofile']['name'],
+                node['softwareprofile']['name']
+                if node['softwareprofile'] else None
+            )].append(node['name'])
+
+        for (hwprofile_name, swprofile_name), node_names in \
+                profile_node_names.items():
+            kitmgr.post_delete_host(
+                hwprofile_name,
+                swprofile_name,
+                nodes=node_names
+            )
 
-        # remove Puppet cert, etc.
-        self.__cleanup_node_state_files(node)
+        for node in node_dicts:
+            # remove Puppet cert, etc.
+            self.__cleanup_node_state_files(node)
 
     def __cleanup_node_state_files(self, node_dict: dict):
         # Remove the Puppet cert
@@ -700,8 +760,7 @@ class NodeManager(TortugaObjectManager): \
                 'No nodes matching nodespec [%s]' % (nodespec))
 
         if bReinstall:
-            for dbNode in nodes:
-                self._bhm.setNodeForNetworkBoot(session, dbNode)
+            self._bhm.setNodesForNetworkBoot(session, nodes)
 
         for dbHardwareProfile, detailsDict in \
                 self.__processNodeList(nodes).items():
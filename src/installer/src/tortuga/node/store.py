@@ -14,7 +14,6 @@
 import logging
 from typing import Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import desc
 from sqlalchemy.orm import Session, sessionmaker
 
 from tortuga.db.dbManager import DbManager
@@ -23,7 +22,8 @@ from tortuga.db.models.nodeTag import NodeTag
 from tortuga.events.types import TagCreated, TagDeleted, TagUpdated, \
     NodeStateChanged, NodeTagsChanged
 from tortuga.objectstore.base import matches_filters
-from tortuga.typestore.base import TypeStore
+from tortuga.typestore.base import Cursor, TypeStore
+from tortuga.typestore.keyset import keyset_iter
 from .types import Node, NodeStatus
 
 logger = logging.getLogger(__name__)
@@ -37,6 +37,16 @@ class SqlalchemySessionNodeStore(TypeStore):
     """
     type_class = Node
 
+    #
+    # Maps Node attribute names to database columns, where they differ
+    #
+    COLUMNS = {
+        'hardwareprofile_id': 'hardwareProfileId',
+        'softwareprofile_id': 'softwareProfileId',
+        'locked': 'lockedState',
+        'last_update': 'lastUpdate',
+    }
+
     def __init__(self, db_manager: DbManager):
         self._Session = sessionmaker(bind=db_manager.engine)
 
@@ -59,7 +69,8 @@ class SqlalchemySessionNodeStore(TypeStore):
         db_node.state = node.state
         db_node.lockedState = node.locked
 
-        # If last_update field is provided, update the DB
+        # If last_update field is provided, update the DB (the model
+        # normalizes it, and raises ValueError if it is not valid)
         if node.last_update:
             db_node.lastUpdate = node.last_update
 
@@ -122,21 +133,34 @@ class SqlalchemySessionNodeStore(TypeStore):
             order_desc: bool = False,
             order_alpha: bool = False,
             limit: Optional[int] = None,
+            cursor: Optional[Cursor] = None,
             **filters) -> Iterator[Node]:
         logger.debug(
-            'list(order_by=%s, order_desc=%s, limit=%s, filters=%s) -> ...',
-            order_by, order_desc, limit, filters)
+            'list(order_by=%s, order_desc=%s, limit=%s, cursor=%s, '
+            'filters=%s) -> ...',
+            order_by, order_desc, limit, cursor, filters)
         session = self._Session()
         result = session.query(DbNode)
-        if order_by:
-            #
-            # Note: currently, order_alpha is ignored for SqlAlchemy,
-            #       as it is the default behavior for strings
-            #
-            if desc:
-                result = result.order_by(desc(getattr(DbNode, order_by)))
-            else:
-                result = result.order_by(getattr(DbNode, order_by))
+        #
+        # Note: currently, order_alpha is ignored for SqlAlchemy,
+        #       as it is the default behavior for strings
+        #
+        # The primary key is always the last sort column, which gives a
+        # stable order for keyset pagination
+        #
+        columns = [DbNode.id]
+        values = [int(cursor.obj_id)] if cursor else None
+        if order_by and order_by != 'id':
+            columns.insert(0, getattr(DbNode,
+                                      self.COLUMNS.get(order_by, order_by)))
+            if cursor:
+                values.insert(0, cursor.value)
+        #
+        # Rows are read limit at a time, so that a page takes a single
+        # query unless the filters (applied below) reject rows
+        #
+        result = keyset_iter(result, columns, values, order_desc,
+                             batch_size=limit)
         count = 0
         for db_node in result:
             node = self._to_node(db_node)
@@ -148,6 +172,7 @@ class SqlalchemySessionNodeStore(TypeStore):
                     session.close()
                     return
                 yield node
+        session.close()
 
     def get(self, obj_id: str) -> Optional[Node]:
         logger.debug('get(obj_id=%s) -> ...', obj_id)
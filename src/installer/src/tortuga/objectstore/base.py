@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import logging
-from typing import Any, Dict, Iterator, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 
 logger = logging.getLogger(__name__)
@@ -50,6 +50,27 @@ COMPARATORS = {
 }
 
 
+def parse_filter(key: str) -> Tuple[List[str], str]:
+    """
+    Parses a filter key into its attribute path and comparator. See
+    matches_filters() for the filter syntax.
+
+    :param str key: the filter key, i.e. attr__attr__gt
+
+    :return Tuple[List[str], str]: a tuple containing the list of
+                                   (nested) attribute names and the
+                                   comparator
+
+    """
+    parts = key.split('__')
+    if parts[-1] in COMPARATORS.keys():
+        comparator = parts.pop()
+    else:
+        comparator = 'eq'
+
+    return parts, comparator
+
+
 def matches_filters(obj: Union[object, dict],
                     filters: Dict[str, Any]) -> bool:
     """
@@ -77,11 +98,7 @@ def matches_filters(obj: Union[object, dict],
     result = True
 
     for k, right in filters.items():
-        parts = k.split('__')
-        if parts[-1] in COMPARATORS.keys():
-            comparator = parts.pop()
-        else:
-            comparator = 'eq'
+        parts, comparator = parse_filter(k)
 
         left = obj
         for attr in parts:
@@ -133,6 +150,18 @@ class ObjectStore:
         """
         raise NotImplementedError()
 
+    def set_many(self, items: Dict[str, dict]):
+        """
+        Saves a number of objects to the object store. Implementations
+        should override this if they can save the objects more
+        efficiently than one at a time.
+
+        :param Dict[str, dict] items: the objects to store, by key name
+
+        """
+        for key, value in items.items():
+            self.set(key, value)
+
     def get(self, key: str) -> Optional[dict]:
         """
         Gets the object from the object store.
@@ -150,6 +179,7 @@ class ObjectStore:
             order_desc: bool = False,
             order_alpha: bool = False,
             limit: Optional[int] = None,
+            after: Optional[Tuple[str, Any]] = None,
             **filters) -> Iterator[Tuple[str, dict]]:
         """
         Gets a list of objects from the object store.
@@ -159,6 +189,8 @@ class ObjectStore:
         :param bool order_alpha: order alphabetically (instead of numerically)
         :param int limit:        the number of objects to limit in the
                                  iterator
+        :param Tuple[str, Any] after: only return the objects that sort
+                                      after this (key, order_by value)
         :param filters:          one or more filters to apply to the list
 
         :return List[Tuple[str, dict]]: an iterator of tuples, containing
@@ -166,14 +198,18 @@ class ObjectStore:
 
         """
         logger.debug(
-            'list(order_by=%s, order_desc=%s, order_alpha=%s, limit=%s, filters=%s) -> ...',
-            order_by, order_desc, order_alpha, limit, filters
+            'list(order_by=%s, order_desc=%s, order_alpha=%s, limit=%s, after=%s, filters=%s) -> ...',
+            order_by, order_desc, order_alpha, limit, after, filters
         )
 
+        indexed_filters, filters = self.split_filters(filters)
+
         count = 0
         for key, obj in self.list_sorted(order_by=order_by,
                                          order_desc=order_desc,
-                                         order_alpha=order_alpha):
+                                         order_alpha=order_alpha,
+                                         after=after,
+                                         **indexed_filters):
             if matches_filters(obj, filters):
                 count += 1
                 if limit and count == limit:
@@ -182,19 +218,45 @@ class ObjectStore:
 
                 yield (key, obj)
 
+    def split_filters(
+            self,
+            filters: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Splits a set of filters into the filters that the object store can
+        apply itself, i.e. using an index, and the filters that have to be
+        applied by the caller.
+
+        :param Dict[str, Any] filters: the filters to split
+
+        :return Tuple[Dict[str, Any], Dict[str, Any]]: a tuple containing
+                                                       the indexed filters,
+                                                       which may be passed
+                                                       to list_sorted(), and
+                                                       the remaining filters
+
+        """
+        return {}, dict(filters)
+
     def list_sorted(
             self,
             order_by: Optional[str] = None,
             order_desc: bool = False,
-            order_alpha: bool = False) -> Iterator[Tuple[str, dict]]:
+            order_alpha: bool = False,
+            after: Optional[Tuple[str, Any]] = None,
+            **filters) -> Iterator[Tuple[str, dict]]:
         """
         Returns a sorted iterator of objects. This method is designed to be
         called by the list() method, which is responsible for applying
-        the limits and filters.
+        the limits and the filters that are not indexed. Objects with the
+        same order_by value are returned in a stable order.
 
         :param int order_by:     the name of the object attribute to order by
         :param bool order_desc:  sort in descending order
         :param bool order_alpha: order alphabetically (instead of numerically)
+        :param Tuple[str, Any] after: only return the objects that sort
+                                      after this (key, order_by value)
+        :param filters:          indexed filters, as returned by
+                                 split_filters()
 
         :return List[Tuple[str, dict]]: a sorted iterator of tuples,
                                         containing (key, object)
@@ -202,6 +264,19 @@ class ObjectStore:
         """
         raise NotImplementedError()
 
+    def can_list_after(self, order_by: Optional[str] = None) -> bool:
+        """
+        Whether or not a list ordered by an attribute can be resumed using
+        the after parameter of list_sorted(), at a cost that does not
+        depend on how far into the list it is resumed.
+
+        :param str order_by: the name of the object attribute to order by
+
+        :return bool: True if the list can be resumed, False otherwise
+
+        """
+        return True
+
     def delete(self, key: str):
         """
         Deletes an object from the object store.
@@ -211,6 +286,20 @@ class ObjectStore:
         """
         raise NotImplementedError()
 
+    def trim(self, attr: str, max_value: Any) -> int:
+        """
+        Deletes all objects with a (sorted index) attribute value up to
+        and including max_value, i.e. objects older than a retention
+        period.
+
+        :param str attr:      the name of the attribute
+        :param Any max_value: the maximum attribute value to delete
+
+        :return int: the number of objects deleted
+
+        """
+        raise NotImplementedError()
+
     def exists(self, key: str) -> bool:
         """
         Determines whether or not a key exists.
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from typing import Dict, List, Optional, Set
+
 from redis import Redis
 from tortuga.config.configManager import ConfigManager
 
@@ -27,19 +29,59 @@ class ObjectStoreManager:
     _redis_client: Redis = None
     _config_manager: ConfigManager = ConfigManager()
 
+    #
+    # The index declarations (namespace and indexes) that have been
+    # checked against Redis by this process, see
+    # RedisObjectStore.ensure_indexes()
+    #
+    _checked_indexes: Set[tuple] = set()
+
     @classmethod
-    def get(cls, namespace: str, expire: int = 0) -> ObjectStore:
+    def get(cls, namespace: str, expire: int = 0,
+            indexes: Optional[List[str]] = None,
+            sorted_indexes: Optional[List[str]] = None,
+            sorted_index_partitions: Optional[Dict[str, str]] = None) \
+            -> ObjectStore:
         """
         Get an object store for a specified namespace.
 
-        :param str namespace: the namespace for the object store
-        :param int expire:    objects should expire after x seconds
+        :param str namespace:            the namespace for the object store
+        :param int expire:               objects should expire after x
+                                         seconds
+        :param List[str] indexes:        attributes to index for equality
+                                         filters
+        :param List[str] sorted_indexes: attributes to index for range
+                                         filters and ordering
+        :param Dict[str, str] sorted_index_partitions: the attribute to
+                                         partition each sorted index by
 
         :return ObjectStore:  the object store instance
 
+        """
+        store = RedisObjectStore(
+            namespace=namespace, redis_client=cls.get_redis_client(),
+            expire=expire, indexes=indexes, sorted_indexes=sorted_indexes,
+            sorted_index_partitions=sorted_index_partitions)
+        declaration = (
+            namespace, tuple(indexes or []), tuple(sorted_indexes or []),
+            tuple(sorted((sorted_index_partitions or {}).items()))
+        )
+        if declaration not in cls._checked_indexes:
+            store.ensure_indexes()
+            cls._checked_indexes.add(declaration)
+        return store
+
+    @classmethod
+    def get_redis_client(cls) -> Redis:
+        """
+        Get the Redis client shared by all object stores, for data
+        structures that are not objects.
+
+        :return Redis: the Redis client
+
         """
         if not cls._redis_client:
             cls._redis_client = Redis(
                 password=cls._config_manager.getRedisPassword())
-        return RedisObjectStore(namespace=namespace,
-                                redis_client=cls._redis_client, expire=expire)
+            cls._checked_indexes = set()
+        return cls._redis_client
@@ -12,14 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import bisect
+import datetime
 import json
 import logging
-from typing import Iterator, Optional, Tuple
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, \
+    Tuple
 
+from dateutil import parser as date_parser
 from redis.exceptions import ResponseError
 
 from tortuga.logging import OBJECT_STORE_NAMESPACE
-from .base import ObjectStore
+from .base import ObjectStore, parse_filter
 
 logger = logging.getLogger(OBJECT_STORE_NAMESPACE)
 
@@ -29,23 +34,80 @@ class RedisObjectStore(ObjectStore):
     An implementation of the ObjectStore that stores objects in an Redis
     KV store.
 
+    Attributes can be declared as indexed, in which case filters on them
+    are answered by Redis, rather than by loading and testing every object:
+
+    - indexes: a Redis set is maintained per attribute value, supporting
+      equality filters
+    - sorted_indexes: a Redis sorted set is maintained per attribute,
+      scored by the numeric (or date/time) value of the attribute,
+      supporting eq, gt and lt filters as well as ordering
+    - sorted_index_partitions: a sorted index can additionally be
+      partitioned by the value of an indexed attribute, in which case a
+      sorted set is maintained per attribute value as well. Listings that
+      filter on the attribute value and are ordered by the sorted index
+      then read the partition directly, so getting the first N objects
+      costs O(log(n) + N), however many other objects there are
+
+    All keys are kept in a lexicographically sorted set as well, so that
+    un-ordered lists are read in key order, batch_size keys at a time, and
+    can be resumed from any key at the same cost.
+
     """
     #
     # A list of reserved keys, that are required for internal use
     #
-    RESERVED_KEYS = ['INDEX']
+    RESERVED_KEYS = ['INDEX', 'INDEXES', 'KEYS']
+
+    #
+    # A list of reserved key prefixes, that are required for internal use
+    #
+    RESERVED_KEY_PREFIXES = ['INDEX:', 'SORTED:', 'TMP:']
 
-    def __init__(self, namespace: str, redis_client, expire: int = 0):
+    #
+    # The number of objects fetched per pipeline round trip when listing
+    #
+    DEFAULT_BATCH_SIZE = 500
+
+    def __init__(self, namespace: str, redis_client, expire: int = 0,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 indexes: Optional[List[str]] = None,
+                 sorted_indexes: Optional[List[str]] = None,
+                 sorted_index_partitions: Optional[Dict[str, str]] = None):
         """
         Initialization.
 
-        :param str namespace:      the namespace to use for storing objects
-        :param Redis redis_client: the (initialized) redis client to use
-        :param int expire:         objects should expire after x seconds
+        :param str namespace:            the namespace to use for storing
+                                         objects
+        :param Redis redis_client:       the (initialized) redis client to
+                                         use
+        :param int expire:               objects should expire after x
+                                         seconds
+        :param int batch_size:           the number of objects to fetch per
+                                         round trip when listing
+        :param List[str] indexes:        attributes to index for equality
+                                         filters
+        :param List[str] sorted_indexes: attributes to index for range
+                                         filters and ordering
+        :param Dict[str, str] sorted_index_partitions: the attribute to
+                                         partition each sorted index by,
+                                         which must be in indexes
 
         """
         super().__init__(namespace, expire)
         self._redis = redis_client
+        self._batch_size = max(1, batch_size)
+        self._indexes: List[str] = list(indexes or [])
+        self._sorted_indexes: List[str] = list(sorted_indexes or [])
+        self._partitions: Dict[str, str] = dict(
+            sorted_index_partitions or {})
+
+        for attr, partition in self._partitions.items():
+            if attr not in self._sorted_indexes or \
+                    partition not in self._indexes:
+                raise ValueError(
+                    'Invalid sorted index partition: {} by {}'.format(
+                        attr, partition))
 
     def _get_index_key_name(self) -> str:
         """
@@ -56,6 +118,276 @@ class RedisObjectStore(ObjectStore):
         """
         return self.get_key_name('INDEX')
 
+    def _get_key_index_key_name(self) -> str:
+        """
+        Gets the key name for the Redis sorted set of all keys, in which
+        all keys have the same score, so that they are ordered
+        lexicographically.
+
+        :return str: the key name
+
+        """
+        return self.get_key_name('KEYS')
+
+    def _get_value_index_key_name(self, attr: str, value: str) -> str:
+        """
+        Gets the key name for the Redis set indexing objects with a
+        specific attribute value.
+
+        :param str attr:  the name of the indexed attribute
+        :param str value: the attribute value
+
+        :return str: the key name
+
+        """
+        return self.get_key_name('INDEX:{}:{}'.format(attr, value))
+
+    def _get_sorted_index_key_name(self, attr: str) -> str:
+        """
+        Gets the key name for the Redis sorted set indexing an attribute.
+
+        :param str attr: the name of the indexed attribute
+
+        :return str: the key name
+
+        """
+        return self.get_key_name('SORTED:{}'.format(attr))
+
+    def _get_partition_key_name(self, attr: str, value: str) -> str:
+        """
+        Gets the key name for the Redis sorted set indexing an attribute,
+        for the objects in a single partition.
+
+        :param str attr:  the name of the indexed attribute
+        :param str value: the value of the partition attribute
+
+        :return str: the key name
+
+        """
+        return self.get_key_name('SORTED:{}:{}:{}'.format(
+            attr, self._partitions[attr], value))
+
+    def _get_partition_values_key_name(self, attr: str) -> str:
+        """
+        Gets the key name for the Redis set of the partition attribute
+        values of a partitioned sorted index.
+
+        :param str attr: the name of the indexed attribute
+
+        :return str: the key name
+
+        """
+        return self.get_key_name('SORTED:{}:{}'.format(
+            attr, self._partitions[attr]))
+
+    @staticmethod
+    def _index_value(value: Any) -> Optional[str]:
+        """
+        Converts an attribute value to the string used in the value index.
+
+        :param Any value: the attribute value
+
+        :return Optional[str]: the index value, or None if the value can
+                               not be indexed
+
+        """
+        if isinstance(value, bytes):
+            value = value.decode()
+        if value is None or value == 'NULL' or \
+                isinstance(value, (dict, list, tuple)):
+            return None
+
+        return str(value)
+
+    @staticmethod
+    def _index_score(value: Any) -> Optional[float]:
+        """
+        Converts an attribute value to the score used in a sorted index.
+        Numeric values are used as-is, date/time values are converted to
+        a UNIX timestamp.
+
+        :param Any value: the attribute value
+
+        :return Optional[float]: the score, or None if the value can not
+                                 be indexed
+
+        """
+        if isinstance(value, bytes):
+            value = value.decode()
+        if value is None or value == 'NULL' or isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        if not isinstance(value, (str, datetime.datetime)):
+            return None
+
+        if isinstance(value, str):
+            try:
+                return float(value)
+            except ValueError:
+                pass
+
+            try:
+                value = date_parser.parse(value)
+            except (ValueError, OverflowError):
+                return None
+
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+
+        return value.timestamp()
+
+    def ensure_indexes(self):
+        """
+        Makes sure the indexes in Redis match the declared indexes,
+        rebuilding them if the index declaration has changed since they
+        were built.
+
+        """
+        declared = {
+            'key_index': True,
+            'indexes': sorted(self._indexes),
+            'sorted_indexes': sorted(self._sorted_indexes),
+        }
+        if self._partitions:
+            declared['sorted_index_partitions'] = self._partitions
+        declared = json.dumps(declared, sort_keys=True)
+
+        current = self._redis.get(self.get_key_name('INDEXES'))
+        if isinstance(current, bytes):
+            current = current.decode()
+        if current == declared:
+            return
+
+        self.reindex()
+        self._redis.set(self.get_key_name('INDEXES'), declared)
+
+    def reindex(self):
+        """
+        Rebuilds all indexes from the objects in the store.
+
+        """
+        logger.debug('reindex({})'.format(self._namespace))
+
+        #
+        # SCAN rather than KEYS, which blocks the server while it walks
+        # the whole keyspace
+        #
+        for pattern in ('INDEX:*', 'SORTED:*'):
+            stale = []
+            for key in self._redis.scan_iter(
+                    match=self.get_key_name(pattern), count=self._batch_size):
+                stale.append(key)
+                if len(stale) >= self._batch_size:
+                    self._redis.delete(*stale)
+                    stale = []
+            if stale:
+                self._redis.delete(*stale)
+        self._redis.delete(self._get_key_index_key_name())
+
+        keys = self._redis.smembers(self._get_index_key_name())
+        pipe = self._redis.pipeline(transaction=False)
+        for count, (key, obj) in enumerate(self._get_many(keys), 1):
+            self._add_to_indexes(pipe, key, obj, {})
+            if count % self._batch_size == 0:
+                pipe.execute()
+        pipe.execute()
+
+    def _get_indexed_values(self, key: str) -> Dict[str, Any]:
+        """
+        Gets the currently stored values of all indexed attributes of an
+        object.
+
+        :param str key: the key, namespace prefixed
+
+        :return Dict[str, Any]: the indexed attribute values
+
+        """
+        attrs = self._indexes + self._sorted_indexes
+        if not attrs:
+            return {}
+
+        return dict(zip(attrs, self._redis.hmget(key, attrs)))
+
+    def _add_to_indexes(self, pipe, key: str, value: dict,
+                        old_values: Dict[str, Any]):
+        """
+        Queues the commands to index an object on a Redis pipeline.
+
+        :param pipe:                  the Redis pipeline
+        :param str key:               the key, namespace prefixed
+        :param dict value:            the object being stored
+        :param Dict[str, Any] old_values: the previously stored indexed
+                                          values, used to remove stale
+                                          index entries
+
+        """
+        pipe.zadd(self._get_key_index_key_name(), **{key: 0})
+
+        for attr in self._indexes:
+            old_value = self._index_value(old_values.get(attr))
+            new_value = self._index_value(value.get(attr))
+            if old_value is not None and old_value != new_value:
+                pipe.srem(self._get_value_index_key_name(attr, old_value),
+                          key)
+            if new_value is not None:
+                pipe.sadd(self._get_value_index_key_name(attr, new_value),
+                          key)
+
+        for attr in self._sorted_indexes:
+            score = self._index_score(value.get(attr))
+            if score is None:
+                pipe.zrem(self._get_sorted_index_key_name(attr), key)
+            else:
+                pipe.zadd(self._get_sorted_index_key_name(attr),
+                          **{key: score})
+
+            if attr not in self._partitions:
+                continue
+
+            partition = self._partitions[attr]
+            old_value = self._index_value(old_values.get(partition))
+            new_value = self._index_value(value.get(partition))
+            if old_value is not None and \
+                    (old_value != new_value or score is None):
+                pipe.zrem(self._get_partition_key_name(attr, old_value),
+                          key)
+            if new_value is not None and score is not None:
+                pipe.zadd(self._get_partition_key_name(attr, new_value),
+                          **{key: score})
+                pipe.sadd(self._get_partition_values_key_name(attr),
+                          new_value)
+
+    def _remove_from_indexes(self, pipe, key: str,
+                             old_values: Dict[str, Any]):
+        """
+        Queues the commands to remove an object from all indexes on a
+        Redis pipeline.
+
+        :param pipe:                      the Redis pipeline
+        :param str key:                   the key, namespace prefixed
+        :param Dict[str, Any] old_values: the stored indexed values
+
+        """
+        pipe.srem(self._get_index_key_name(), key)
+        pipe.zrem(self._get_key_index_key_name(), key)
+
+        for attr in self._indexes:
+            old_value = self._index_value(old_values.get(attr))
+            if old_value is not None:
+                pipe.srem(self._get_value_index_key_name(attr, old_value),
+                          key)
+
+        for attr in self._sorted_indexes:
+            pipe.zrem(self._get_sorted_index_key_name(attr), key)
+
+            if attr in self._partitions:
+                old_value = self._index_value(
+                    old_values.get(self._partitions[attr]))
+                if old_value is not None:
+                    pipe.zrem(self._get_partition_key_name(attr, old_value),
+                              key)
+
     def set(self, key: str, value: dict):
         """
         See superclass.
@@ -64,18 +396,70 @@ class RedisObjectStore(ObjectStore):
         :param value:
 
         """
-        if key in self.RESERVED_KEYS:
-            raise Exception('Key reserved for internal use: {}'.format(key))
+        self.set_many({key: value})
 
-        if not value:
-            value = {}
+    def set_many(self, items: Dict[str, dict]):
+        """
+        See superclass. The previously indexed values of all objects are
+        read in one round trip, and the objects are written in another.
 
-        logger.debug('set({}, {})'.format(key, value))
+        :param Dict[str, dict] items:
 
-        #
-        # If any of the keys are more complex data structures, store them
-        # as serialized JSON
-        #
+        """
+        for key in items:
+            if key in self.RESERVED_KEYS or \
+                    key.startswith(tuple(self.RESERVED_KEY_PREFIXES)):
+                raise Exception(
+                    'Key reserved for internal use: {}'.format(key))
+
+        if not items:
+            return
+
+        keys = [self.get_key_name(key) for key in items]
+
+        attrs = self._indexes + self._sorted_indexes
+        if attrs:
+            pipe = self._redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.hmget(key, attrs)
+            old_values_list = [dict(zip(attrs, values))
+                               for values in pipe.execute()]
+        else:
+            old_values_list = [{} for _ in keys]
+
+        pipe = self._redis.pipeline()
+
+        for (name, value), key, old_values in zip(items.items(), keys,
+                                                  old_values_list):
+            if not value:
+                value = {}
+
+            logger.debug('set({}, {})'.format(name, value))
+
+            pipe.hmset(key, self._serialize(value))
+            if self._expire:
+                pipe.expire(key, self._expire)
+
+            #
+            # Create a Redis set for the purposes of indexing, sorting, etc.
+            #
+            pipe.sadd(self._get_index_key_name(), key)
+            self._add_to_indexes(pipe, key, value, old_values)
+
+        pipe.execute()
+
+    @staticmethod
+    def _serialize(value: dict) -> dict:
+        """
+        Serializes an object for storing in a Redis hash. If any of the
+        keys are more complex data structures, they are stored as
+        serialized JSON.
+
+        :param dict value: the object
+
+        :return dict: the serialized object
+
+        """
         to_store = {}
         for k, v in value.items():
             if isinstance(v, (dict, list, tuple)):
@@ -85,15 +469,7 @@ class RedisObjectStore(ObjectStore):
             else:
                 to_store[k] = v
 
-        key = self.get_key_name(key)
-        self._redis.hmset(key, to_store)
-        if self._expire:
-            self._redis.expire(key, self._expire)
-
-        #
-        # Create a Redis set for the purposes of indexing, sorting, etc.
-        #
-        self._redis.sadd(self._get_index_key_name(), key)
+        return to_store
 
     def get(self, key: str) -> Optional[dict]:
         """
@@ -125,6 +501,124 @@ class RedisObjectStore(ObjectStore):
         logger.debug('get({}) -> {}'.format(key, result))
         return self._deserialize(result)
 
+    def _get_many(self, keys: Iterable[str],
+                  filters: Optional[Dict[str, Any]] = None) \
+            -> Iterator[Tuple[str, dict]]:
+        """
+        Same as _get(), but for many keys at once. The hashes are fetched
+        in chunks of batch_size keys, using a single pipelined round trip
+        per chunk. Keys that no longer exist (i.e. have expired) are
+        removed from the index and are not returned.
+
+        :param Iterable[str] keys:     the keys, namespace prefixed, in the
+                                       order in which they should be
+                                       returned
+        :param Dict[str, Any] filters: the indexed filters that were used
+                                       to find the keys, if any
+
+        :return Iterator[Tuple[str, dict]]: an iterator of tuples,
+                                            containing (key, object)
+
+        """
+        chunk: List[str] = []
+        for key in keys:
+            if isinstance(key, bytes):
+                key = key.decode()
+            chunk.append(key)
+            if len(chunk) >= self._batch_size:
+                yield from self._get_chunk(chunk, filters or {})
+                chunk = []
+
+        if chunk:
+            yield from self._get_chunk(chunk, filters or {})
+
+    def _get_chunk(self, keys: List[str],
+                   filters: Dict[str, Any]) -> Iterator[Tuple[str, dict]]:
+        """
+        Fetches a single chunk of keys for _get_many().
+
+        :param List[str] keys:         the keys, namespace prefixed
+        :param Dict[str, Any] filters: the indexed filters that were used
+                                       to find the keys
+
+        :return Iterator[Tuple[str, dict]]: an iterator of tuples,
+                                            containing (key, object)
+
+        """
+        pipe = self._redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        results = pipe.execute()
+
+        dangling: List[str] = []
+        for key, result in zip(keys, results):
+            if not result:
+                dangling.append(key)
+                continue
+            obj = self._deserialize(result)
+            #
+            # Value indexes may still reference an object that has expired
+            # and was re-created with different values since, so make sure
+            # the object actually matches
+            #
+            if not self._matches_indexed_filters(obj, filters):
+                continue
+            yield (key, obj)
+
+        #
+        # Lazily clean up index entries for objects that have expired
+        #
+        if dangling:
+            logger.debug('Removing {} expired key(s) from index'.format(
+                len(dangling)))
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.srem(self._get_index_key_name(), *dangling)
+            pipe.zrem(self._get_key_index_key_name(), *dangling)
+            for k, v in filters.items():
+                parts, comparator = parse_filter(k)
+                if parts[0] in self._indexes and comparator == 'eq':
+                    pipe.srem(self._get_value_index_key_name(
+                        parts[0], self._index_value(v)), *dangling)
+            for attr in self._sorted_indexes:
+                pipe.zrem(self._get_sorted_index_key_name(attr), *dangling)
+                partition_value = self._get_partition_value(attr, filters)
+                if partition_value is not None:
+                    pipe.zrem(
+                        self._get_partition_key_name(attr, partition_value),
+                        *dangling)
+            pipe.execute()
+
+    def _matches_indexed_filters(self, obj: dict,
+                                 filters: Dict[str, Any]) -> bool:
+        """
+        Tests whether a deserialized object matches the indexed filters,
+        using the same value conversions as the indexes.
+
+        :param dict obj:               the deserialized object
+        :param Dict[str, Any] filters: the indexed filters
+
+        :return bool: True if the object matches, False otherwise
+
+        """
+        for k, v in filters.items():
+            parts, comparator = parse_filter(k)
+            attr = parts[0]
+            if attr in self._sorted_indexes:
+                left = self._index_score(obj.get(attr))
+                right = self._index_score(v)
+                if left is None:
+                    return False
+                if comparator == 'eq' and not left == right:
+                    return False
+                if comparator == 'gt' and not left > right:
+                    return False
+                if comparator == 'lt' and not left < right:
+                    return False
+            elif self._index_value(obj.get(attr)) != self._index_value(v):
+                return False
+
+        return True
+
     def _deserialize(self, hsh: dict) -> dict:
         """
         Reconstitutes a Redis hash.
@@ -149,46 +643,387 @@ class RedisObjectStore(ObjectStore):
 
         return deserialized
 
+    def _get_partition_value(self, attr: str,
+                             filters: Dict[str, Any]) -> Optional[str]:
+        """
+        Gets the partition of a partitioned sorted index that the objects
+        matching a set of filters are in, if the filters select one.
+
+        :param str attr:               the name of the indexed attribute
+        :param Dict[str, Any] filters: the indexed filters
+
+        :return Optional[str]: the partition attribute value, or None
+
+        """
+        partition = self._partitions.get(attr)
+        if partition is None:
+            return None
+
+        for k, v in filters.items():
+            parts, comparator = parse_filter(k)
+            if parts == [partition] and comparator == 'eq':
+                return self._index_value(v)
+
+        return None
+
+    def split_filters(
+            self,
+            filters: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        See superclass.
+
+        :param Dict[str, Any] filters:
+
+        :return Tuple[Dict[str, Any], Dict[str, Any]]:
+
+        """
+        indexed_filters = {}
+        remaining_filters = {}
+
+        for k, v in filters.items():
+            parts, comparator = parse_filter(k)
+            if len(parts) == 1 and (
+                    (parts[0] in self._sorted_indexes and
+                     self._index_score(v) is not None) or
+                    (parts[0] in self._indexes and comparator == 'eq' and
+                     self._index_value(v) is not None)):
+                indexed_filters[k] = v
+            else:
+                remaining_filters[k] = v
+
+        return indexed_filters, remaining_filters
+
     def list_sorted(
             self,
             order_by: Optional[str] = None,
             order_desc: bool = False,
-            order_alpha: bool = False) -> Iterator[Tuple[str, dict]]:
+            order_alpha: bool = False,
+            after: Optional[Tuple[str, Any]] = None,
+            **filters) -> Iterator[Tuple[str, dict]]:
         """
-        See superclass.
+        See superclass. If order_by is a sorted index, objects are always
+        ordered by their index score, and order_alpha is ignored. Lists
+        ordered by other attributes can not be resumed, see
+        can_list_after().
 
         :param str order_by:
         :param bool order_desc:
         :param bool order_alpha:
+        :param Tuple[str, Any] after:
+        :param filters:
 
         :return Iterator[dict]:
 
         """
+        if after is not None and not self.can_list_after(order_by):
+            raise ValueError(
+                'Lists ordered by {} can not be resumed, as it is not a'
+                ' sorted index'.format(order_by))
+
+        driver = order_by if order_by in self._sorted_indexes else None
+        bounds = self._get_bounds(filters)
+
         #
-        # Un-ordered list
+        # If the driving sorted index is partitioned, and the filters
+        # select a partition, the partition is read instead, and the
+        # partition filter does not have to be applied separately
         #
-        if not order_by:
-            for key in self._redis.smembers(self._get_index_key_name()):
-                key = key.decode()
-                obj = self._get(key)
-                if obj is None:
-                    continue
-                yield (self._remove_namespace(key), obj)
+        partition_value = self._get_partition_value(driver, filters) \
+            if driver else None
+        candidate_filters = filters
+        if partition_value is not None:
+            candidate_filters = {
+                k: v for k, v in filters.items()
+                if parse_filter(k) != ([self._partitions[driver]], 'eq')
+            }
 
-            return
+        candidates = self._find_candidates(candidate_filters, bounds,
+                                           exclude=driver)
+
+        if after is not None:
+            after = (self.get_key_name(after[0]).encode(), after[1])
+
+        #
+        # Ordered by a sorted index
+        #
+        if driver:
+            lower, upper = bounds.get(driver, [None, None])
+            keys = self._iter_sorted_index(driver, lower, upper, order_desc,
+                                           after, candidates,
+                                           partition_value)
+
+        #
+        # Un-ordered list
+        #
+        elif not order_by:
+            #
+            # Order by key, so the order is stable and can be resumed from
+            #
+            if candidates is None:
+                keys = self._iter_keys(after[0] if after else None)
+            else:
+                keys = sorted(candidates)
+                if after is not None:
+                    keys = keys[bisect.bisect_right(keys, after[0]):]
 
         #
         # Ordered list
         #
+        elif candidates is None:
+            keys = self._sort(self._get_index_key_name(), order_by,
+                              order_desc, order_alpha)
+
+        elif candidates:
+            #
+            # Let Redis sort the candidates, using a short-lived set
+            #
+            tmp_key = self.get_key_name('TMP:{}'.format(uuid.uuid4()))
+            pipe = self._redis.pipeline()
+            pipe.sadd(tmp_key, *candidates)
+            pipe.expire(tmp_key, 60)
+            pipe.execute()
+            try:
+                keys = self._sort(tmp_key, order_by, order_desc,
+                                  order_alpha)
+            finally:
+                self._redis.delete(tmp_key)
+
+        else:
+            keys = []
+
+        for key, obj in self._get_many(keys, filters):
+            yield (self._remove_namespace(key), obj)
+
+    def can_list_after(self, order_by: Optional[str] = None) -> bool:
+        """
+        See superclass. Only un-ordered lists and lists ordered by a
+        sorted index can be resumed without sorting all objects again.
+
+        :param str order_by:
+
+        :return bool:
+
+        """
+        return not order_by or order_by in self._sorted_indexes
+
+    def _iter_keys(self, after: Optional[bytes] = None) -> Iterator[bytes]:
+        """
+        Iterates over all keys in key order, in pages of batch_size keys,
+        using the sorted set of all keys. Each page starts after the last
+        key of the previous one.
+
+        :param bytes after: start after this key, namespace prefixed
+
+        :return Iterator[bytes]: the keys, namespace prefixed
+
+        """
+        name = self._get_key_index_key_name()
+
+        while True:
+            page = self._redis.zrangebylex(
+                name, b'(' + after if after is not None else '-', '+',
+                start=0, num=self._batch_size)
+
+            yield from page
+
+            if len(page) < self._batch_size:
+                return
+
+            after = page[-1]
+
+    def _get_bounds(self, filters: Dict[str, Any]) -> Dict[str, list]:
+        """
+        Converts the indexed filters on sorted indexes to the tightest
+        lower and upper bound per attribute.
+
+        :param Dict[str, Any] filters: the indexed filters
+
+        :return Dict[str, list]: a [lower, upper] list of (score,
+                                 exclusive) bounds, or None, per attribute
+
+        """
+        bounds: Dict[str, list] = {}
+
+        for k, v in filters.items():
+            parts, comparator = parse_filter(k)
+            attr = parts[0]
+            if attr not in self._sorted_indexes:
+                continue
+
+            score = self._index_score(v)
+            lower, upper = bounds.setdefault(attr, [None, None])
+            if comparator in ('eq', 'gt'):
+                bound = (score, comparator == 'gt')
+                if lower is None or bound > lower:
+                    bounds[attr][0] = bound
+            if comparator in ('eq', 'lt'):
+                bound = (score, comparator == 'lt')
+                if upper is None or \
+                        (bound[0], not bound[1]) < (upper[0], not upper[1]):
+                    bounds[attr][1] = bound
+
+        return bounds
+
+    def _find_candidates(self, filters: Dict[str, Any],
+                         bounds: Dict[str, list],
+                         exclude: Optional[str] = None) \
+            -> Optional[Set[bytes]]:
+        """
+        Finds the keys of the objects matching a set of indexed filters,
+        using set intersections and sorted set range queries.
+
+        :param Dict[str, Any] filters: the indexed filters
+        :param Dict[str, list] bounds: the bounds on sorted indexes, as
+                                       returned by _get_bounds()
+        :param str exclude:            a sorted index for which the bounds
+                                       are applied by the caller
+
+        :return Optional[Set[bytes]]: the matching keys, namespace
+                                      prefixed, or None if there are no
+                                      filters to apply
+
+        """
+        value_index_keys = []
+        for k, v in filters.items():
+            parts, _ = parse_filter(k)
+            if parts[0] not in self._sorted_indexes:
+                value_index_keys.append(self._get_value_index_key_name(
+                    parts[0], self._index_value(v)))
+
+        candidates: Optional[Set[bytes]] = None
+        if value_index_keys:
+            candidates = set(self._redis.sinter(*value_index_keys))
+
+        for attr, (lower, upper) in bounds.items():
+            if attr == exclude:
+                continue
+            members = set(self._redis.zrangebyscore(
+                self._get_sorted_index_key_name(attr),
+                self._format_bound(lower, '-inf'),
+                self._format_bound(upper, '+inf')))
+            candidates = members if candidates is None \
+                else candidates & members
+
+        return candidates
+
+    def _iter_sorted_index(self, attr: str, lower: Optional[tuple],
+                           upper: Optional[tuple], order_desc: bool,
+                           after: Optional[Tuple[bytes, Any]] = None,
+                           candidates: Optional[Set[bytes]] = None,
+                           partition_value: Optional[str] = None) \
+            -> Iterator[bytes]:
+        """
+        Iterates over the keys in a sorted index, in pages of batch_size
+        keys. Each page starts where the previous one ended, using the
+        score and key of the last key seen, so the cost of a page does not
+        depend on how far into the index it is.
+
+        :param str attr:              the name of the indexed attribute
+        :param tuple lower:           the lower (score, exclusive) bound
+        :param tuple upper:           the upper (score, exclusive) bound
+        :param bool order_desc:       iterate in descending order
+        :param Tuple[bytes, Any] after: start after this (key, value)
+        :param Set[bytes] candidates: only return these keys, if set
+        :param str partition_value:   iterate over this partition of a
+                                      partitioned sorted index only
+
+        :return Iterator[bytes]: the keys, namespace prefixed
+
+        """
+        name = self._get_partition_key_name(attr, partition_value) \
+            if partition_value is not None \
+            else self._get_sorted_index_key_name(attr)
+
+        position = None
+        if after is not None:
+            score = self._index_score(after[1])
+            if score is not None:
+                position = (score, after[0])
+
+        offset = 0
+        while True:
+            if position is not None:
+                #
+                # Narrow the range to start at the current position
+                #
+                if order_desc:
+                    if upper is None or position[0] < upper[0]:
+                        upper = (position[0], False)
+                elif lower is None or position[0] > lower[0]:
+                    lower = (position[0], False)
+
+            min_ = self._format_bound(lower, '-inf')
+            max_ = self._format_bound(upper, '+inf')
+            if order_desc:
+                page = self._redis.zrevrangebyscore(
+                    name, max_, min_, start=offset, num=self._batch_size,
+                    withscores=True)
+            else:
+                page = self._redis.zrangebyscore(
+                    name, min_, max_, start=offset, num=self._batch_size,
+                    withscores=True)
+
+            progress = False
+            for key, score in page:
+                #
+                # Keys with the same score are ordered by key
+                #
+                if position is not None and score == position[0] and \
+                        (key >= position[1] if order_desc
+                         else key <= position[1]):
+                    continue
+                progress = True
+                position = (score, key)
+                if candidates is None or key in candidates:
+                    yield key
+
+            if len(page) < self._batch_size:
+                return
+
+            #
+            # If a whole page shares the score of the current position,
+            # move past it using an offset
+            #
+            offset = 0 if progress else offset + len(page)
+
+    @staticmethod
+    def _format_bound(bound: Optional[tuple], default: str) -> str:
+        """
+        Formats a (score, exclusive) bound for a sorted set range query.
+
+        :param tuple bound:  the (score, exclusive) bound, or None
+        :param str default:  the value to use if there is no bound
+
+        :return str: the formatted bound
+
+        """
+        if bound is None:
+            return default
+        score, exclusive = bound
+
+        return '{}{!r}'.format('(' if exclusive else '', score)
+
+    def _sort(self, name: str, order_by: str, order_desc: bool,
+              order_alpha: bool) -> List[bytes]:
+        """
+        Sorts the keys in a Redis set by an object attribute. Keys with
+        the same attribute value are ordered by key.
+
+        :param str name:              the key name of the set to sort
+        :param str order_by:          the name of the object attribute to
+                                      order by
+        :param bool order_desc:       sort in descending order
+        :param bool order_alpha:      order alphabetically (instead of
+                                      numerically)
+
+        :return List[bytes]: the sorted keys
+
+        """
         try:
             sort_by = '*->{}'.format(order_by)
-            for key in self._redis.sort(self._get_index_key_name(),
-                                        by=sort_by, desc=order_desc,
-                                        alpha=order_alpha):
-                key = key.decode()
-                yield (self._remove_namespace(key), self._get(key))
-
-            return
+            pairs = self._redis.sort(name, by=sort_by, get=['#', sort_by],
+                                     desc=order_desc, alpha=order_alpha,
+                                     groups=True)
 
         except ResponseError as e:
             #
@@ -203,6 +1038,26 @@ class RedisObjectStore(ObjectStore):
             else:
                 raise
 
+        def sort_key(key: bytes, value: Any) -> tuple:
+            if isinstance(value, str):
+                value = value.encode()
+            if not order_alpha:
+                try:
+                    return (0, float(value or 0)), key
+                except ValueError:
+                    pass
+            return (1, value or b''), key
+
+        #
+        # Redis does not order keys with the same value when sorting
+        # alphabetically, so re-sort (which is cheap on sorted input) to
+        # get a stable order
+        #
+        pairs = sorted(pairs, key=lambda pair: sort_key(*pair),
+                       reverse=order_desc)
+
+        return [key for key, _ in pairs]
+
     def _remove_namespace(self, key: str) -> str:
         """
         Removes the namespace prefix from a key.
@@ -224,14 +1079,81 @@ class RedisObjectStore(ObjectStore):
         """
         logger.debug('delete({})'.format(key))
         key = self.get_key_name(key)
+        old_values = self._get_indexed_values(key)
+
+        pipe = self._redis.pipeline()
         #
-        # Remove from the Redis set
+        # Remove from the Redis set, and any other indexes
         #
-        self._redis.srem(self._get_index_key_name(), key)
+        self._remove_from_indexes(pipe, key, old_values)
         #
         # Delete the object
         #
-        self._redis.delete(key)
+        pipe.delete(key)
+        pipe.execute()
+
+    def trim(self, attr: str, max_value: Any) -> int:
+        """
+        See superclass. The objects are found using the sorted index for
+        the attribute, and are removed from the object index, all sorted
+        indexes (and their partitions) and the partitioning value
+        indexes. Other value indexes are cleaned up lazily.
+
+        :param str attr:
+        :param Any max_value:
+
+        :return int:
+
+        """
+        if attr not in self._sorted_indexes:
+            raise Exception('Not a sorted index: {}'.format(attr))
+
+        score = self._index_score(max_value)
+        if score is None:
+            raise Exception('Invalid {} value: {}'.format(attr, max_value))
+
+        keys = [
+            key.decode() if isinstance(key, bytes) else key
+            for key in self._redis.zrangebyscore(
+                self._get_sorted_index_key_name(attr), '-inf', repr(score))
+        ]
+        if not keys:
+            return 0
+
+        logger.debug('trim({}, {}) -> {} object(s)'.format(
+            attr, max_value, len(keys)))
+
+        #
+        # The partitions of partitioned sorted indexes, and the value
+        # indexes of their partitioning attribute values
+        #
+        sorted_keys = [self._get_sorted_index_key_name(sorted_attr)
+                       for sorted_attr in self._sorted_indexes]
+        value_index_keys = []
+        for sorted_attr, partition in self._partitions.items():
+            for value in self._redis.smembers(
+                    self._get_partition_values_key_name(sorted_attr)):
+                if isinstance(value, bytes):
+                    value = value.decode()
+                sorted_keys.append(
+                    self._get_partition_key_name(sorted_attr, value))
+                value_index_keys.append(
+                    self._get_value_index_key_name(partition, value))
+
+        for idx in range(0, len(keys), self._batch_size):
+            chunk = keys[idx:idx + self._batch_size]
+
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.srem(self._get_index_key_name(), *chunk)
+            pipe.zrem(self._get_key_index_key_name(), *chunk)
+            for key in sorted_keys:
+                pipe.zrem(key, *chunk)
+            for key in value_index_keys:
+                pipe.srem(key, *chunk)
+            pipe.delete(*chunk)
+            pipe.execute()
+
+        return len(keys)
 
     def exists(self, key: str) -> bool:
         """
@@ -15,7 +15,7 @@
 # pylint: disable=no-member
 
 import logging
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from sqlalchemy.orm.session import Session
 
@@ -44,6 +44,25 @@ class OsSupportBase:
 
         return ''
 
+    def getKickstartFilesContents(
+            self, session: Session,
+            nodes: List[Tuple[Node, HardwareProfile, SoftwareProfile]]) \
+            -> List[str]:
+        """
+        Returns the Kickstart file contents for a number of nodes, in the
+        order of the nodes
+
+        :param Session session: the database session
+        :param nodes:           (node, hardware profile, software profile)
+                                tuples
+        """
+
+        return [
+            self.getKickstartFileContents(
+                session, node, hardwareprofile, softwareprofile)
+            for node, hardwareprofile, softwareprofile in nodes
+        ]
+
     def getPXEReinstallSnippet(
             self, ksurl: str, node: Node,
             hardwareprofile: Optional[HardwareProfile] = None,
@@ -15,11 +15,13 @@
 import crypt
 import os.path
 import string
+import threading
 import time
 from random import choice
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from jinja2 import Template
+from jinja2 import (Environment, FileSystemBytecodeCache, FileSystemLoader,
+                    Template)
 from sqlalchemy.orm.session import Session
 
 from tortuga.config.configManager import getfqdn
@@ -57,6 +59,41 @@ def sort_by_devicename_comparator(nic1: Nic, nic2: Nic) -> int:
     return 0
 
 
+#
+# Jinja environments for loading kickstart templates, keyed by template
+# directory
+#
+_template_environments: Dict[str, Environment] = {}
+_template_environments_lock = threading.Lock()
+
+
+def get_kickstart_template(path: str) -> Template:
+    """
+    Gets a compiled kickstart template.
+
+    Templates are compiled once and kept in memory. They are recompiled
+    only when the modification time of the template file changes. The
+    compiled bytecode is also cached on disk, so processes that did not
+    compile a template themselves don't have to compile it again either.
+
+    :param str path: the path of the template file
+
+    :return Template: the compiled template
+
+    """
+    dirname, basename = os.path.split(os.path.abspath(path))
+
+    with _template_environments_lock:
+        env = _template_environments.get(dirname)
+        if env is None:
+            env = Environment(loader=FileSystemLoader(dirname),
+                              bytecode_cache=FileSystemBytecodeCache(),
+                              auto_reload=True)
+            _template_environments[dirname] = env
+
+    return env.get_template(basename)
+
+
 def get_provisioning_nic(nics: List[Nic]):
     """
     Returns first nic with boot flag enabled or None
@@ -405,21 +442,17 @@ dd if=/dev/zero of=$d%s bs=512 count=1
 
         return buf
 
-    def __get_template_subst_dict(
-            self, session: Session, node: Node,
-            hardwareprofile: HardwareProfile,
+    def __get_profile_subst_dict(
+            self, session: Session, hardwareprofile: HardwareProfile,
             softwareprofile: SoftwareProfile) -> Dict[str, Any]:
         """
-        :param node: Object
+        Gets the template substitutions that are the same for all nodes
+        using a hardware and software profile.
+
         :param hardwareprofile: Object
         :param softwareprofile: Object
         :return: Dictionary
         """
-        hardwareprofile = hardwareprofile \
-            if hardwareprofile else node.hardwareprofile
-        softwareprofile = softwareprofile \
-            if softwareprofile else node.softwareprofile
-
         installer_public_fqdn: str = getfqdn()
         installer_hostname: str = installer_public_fqdn.split('.')[0]
 
@@ -438,12 +471,7 @@ dd if=/dev/zero of=$d%s bs=512 count=1
                 hardwareprofile.nics[0], enable_interface_aliases=None),
             '.%s' % private_domain if private_domain else '')
 
-        values: List[str] = node.name.split('.', 1)
-        domain: str = values[1].lower() if len(values) == 2 else ''
-
         return {
-            'fqdn': node.name,
-            'domain': domain,
             'hostname': installer_hostname,
             'installer_private_fqdn': installer_private_fqdn,
             'installer_private_domain': private_domain,
@@ -468,10 +496,6 @@ dd if=/dev/zero of=$d%s bs=512 count=1
             ),
             'lang': 'en_US.UTF-8',
             'keyboard': 'us',
-            'networkcfg': self.__kickstart_get_network_section(
-                node, hardwareprofile
-            ),
-            'rootpw': self._generatePassword(),
             'timezone': self.__kickstart_get_timezone(session),
             'includes': '%include /tmp/partinfo',
             'repos': '\n'.join(
@@ -491,19 +515,82 @@ dd if=/dev/zero of=$d%s bs=512 count=1
             'cfmstring': self._cm.getCfmPassword()
         }
 
+    def __get_node_subst_dict(
+            self, node: Node,
+            hardwareprofile: HardwareProfile) -> Dict[str, Any]:
+        """
+        Gets the template substitutions that are specific to a node.
+
+        :param node: Object
+        :param hardwareprofile: Object
+        :return: Dictionary
+        """
+        values: List[str] = node.name.split('.', 1)
+        domain: str = values[1].lower() if len(values) == 2 else ''
+
+        return {
+            'fqdn': node.name,
+            'domain': domain,
+            'networkcfg': self.__kickstart_get_network_section(
+                node, hardwareprofile
+            ),
+            'rootpw': self._generatePassword(),
+        }
+
     def getKickstartFileContents(self, session: Session, node: Node,
                                  hardwareprofile: HardwareProfile,
                                  softwareprofile: SoftwareProfile) -> str:
-        # Perform basic sanity checking before proceeding
-        self.__validate_node(node)
+        return self.getKickstartFilesContents(
+            session, [(node, hardwareprofile, softwareprofile)])[0]
+
+    def getKickstartFilesContents(
+            self, session: Session,
+            nodes: List[Tuple[Node, HardwareProfile, SoftwareProfile]]) \
+            -> List[str]:
+        """
+        Returns the Kickstart file contents for a number of nodes. The
+        template is loaded, and the sections that only depend on the
+        profiles (repos, partitions, timezone, etc.) are computed, once
+        per hardware and software profile combination.
+
+        :param Session session: the database session
+        :param nodes:           (node, hardware profile, software profile)
+                                tuples; the node profiles are used if
+                                the profiles are None
+        """
+        profiles: Dict[Tuple[int, int], Tuple[Template, Dict[str, Any]]] = {}
+        results: List[str] = []
+
+        for node, hardwareprofile, softwareprofile in nodes:
+            # Perform basic sanity checking before proceeding
+            self.__validate_node(node)
+
+            hardwareprofile = hardwareprofile \
+                if hardwareprofile else node.hardwareprofile
+            softwareprofile = softwareprofile \
+                if softwareprofile else node.softwareprofile
+
+            key = (id(hardwareprofile), id(softwareprofile))
+
+            profile = profiles.get(key)
+            if profile is None:
+                profile = (
+                    get_kickstart_template(
+                        self.__get_kickstart_template(softwareprofile)),
+                    self.__get_profile_subst_dict(
+                        session, hardwareprofile, softwareprofile),
+                )
+                profiles[key] = profile
+
+            template, template_subst_dict = profile
 
-        template_subst_dict = self.__get_template_subst_dict(
-            session, node, hardwareprofile, softwareprofile)
+            template_subst_dict = dict(template_subst_dict)
+            template_subst_dict.update(
+                self.__get_node_subst_dict(node, hardwareprofile))
 
-        with open(self.__get_kickstart_template(softwareprofile)) as fp:
-            tmpl = fp.read()
+            results.append(template.render(template_subst_dict))
 
-        return Template(tmpl).render(template_subst_dict)
+        return results
 
     @staticmethod
     def _generatePassword() -> str:
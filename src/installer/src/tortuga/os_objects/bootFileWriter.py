@@ -0,0 +1,216 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from tortuga.logging import OS_NAMESPACE
+
+
+logger = logging.getLogger(OS_NAMESPACE)
+
+
+class BootFile(NamedTuple):
+    """
+    A boot file (PXE configuration, kickstart file, etc.) to be written.
+
+    """
+    path: str
+    contents: str
+    uid: Optional[int] = None
+    gid: Optional[int] = None
+    mode: int = 0o644
+
+
+class BootFileWriter:
+    """
+    Writes boot files using a pool of worker threads.
+
+    Files are written atomically (to a temporary file that is then renamed
+    into place), so a node booting while its files are rewritten never
+    sees a partially written file. Files that already have the desired
+    contents, mode and ownership are not written again. The digests of the files written are
+    remembered, so unchanged files usually don't even have to be read.
+
+    """
+    DEFAULT_MAX_WORKERS = 8
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Initialization.
+
+        :param int max_workers: the maximum number of files written
+                                concurrently
+
+        """
+        self.max_workers = max(1, max_workers)
+
+        self._lock = threading.Lock()
+        # path -> (st_mtime_ns, st_size, digest)
+        self._digests: Dict[str, Tuple[int, int, bytes]] = {}
+
+        self._written = 0
+        self._skipped = 0
+
+    def write(self, files: List[BootFile]) -> Dict[str, Exception]:
+        """
+        Writes boot files.
+
+        :param List[BootFile] files: the files to write
+
+        :return Dict[str, Exception]: the errors for the files that could
+                                      not be written, keyed by path
+
+        """
+        errors: Dict[str, Exception] = {}
+
+        if not files:
+            return errors
+
+        if len(files) == 1 or self.max_workers == 1:
+            results = [self._write_file_safe(boot_file)
+                       for boot_file in files]
+        else:
+            with ThreadPoolExecutor(
+                    max_workers=min(self.max_workers, len(files))) as pool:
+                results = list(pool.map(self._write_file_safe, files))
+
+        for boot_file, exc in zip(files, results):
+            if exc is not None:
+                errors[boot_file.path] = exc
+
+        return errors
+
+    def forget(self, path: str):
+        """
+        Forgets the digest of a file, i.e. after it was removed.
+
+        :param str path: the path of the file
+
+        """
+        with self._lock:
+            self._digests.pop(path, None)
+
+    def get_stats(self) -> dict:
+        """
+        Gets the writer statistics.
+
+        :return dict: the number of files written and skipped
+
+        """
+        with self._lock:
+            return {
+                'written': self._written,
+                'skipped': self._skipped,
+            }
+
+    def _write_file_safe(self, boot_file: BootFile) -> Optional[Exception]:
+        try:
+            self._write_file(boot_file)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error(
+                'Error writing boot file [{}]: {}'.format(boot_file.path, exc))
+
+            return exc
+
+        return None
+
+    def _write_file(self, boot_file: BootFile):
+        data = boot_file.contents.encode()
+        digest = hashlib.sha256(data).digest()
+
+        if self._is_unchanged(boot_file, digest):
+            with self._lock:
+                self._skipped += 1
+
+            return
+
+        dirname, basename = os.path.split(boot_file.path)
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=dirname or None, prefix='.{}.'.format(basename))
+
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(data)
+
+                os.fchmod(fp.fileno(), boot_file.mode)
+
+                if os.geteuid() == 0 and \
+                        (boot_file.uid is not None or
+                         boot_file.gid is not None):
+                    os.fchown(
+                        fp.fileno(),
+                        -1 if boot_file.uid is None else boot_file.uid,
+                        -1 if boot_file.gid is None else boot_file.gid)
+
+            os.replace(tmp_path, boot_file.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+            raise
+
+        st = os.stat(boot_file.path)
+
+        with self._lock:
+            self._digests[boot_file.path] = \
+                (st.st_mtime_ns, st.st_size, digest)
+            self._written += 1
+
+    def _is_unchanged(self, boot_file: BootFile, digest: bytes) -> bool:
+        path = boot_file.path
+
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False
+
+        if st.st_mode & 0o7777 != boot_file.mode:
+            return False
+
+        #
+        # The ownership can only be set (and therefore only be checked)
+        # when running as root
+        #
+        if os.geteuid() == 0 and (
+                (boot_file.uid is not None and st.st_uid != boot_file.uid) or
+                (boot_file.gid is not None and st.st_gid != boot_file.gid)):
+            return False
+
+        with self._lock:
+            cached = self._digests.get(path)
+
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2] == digest
+
+        #
+        # The file was not written by us, or changed since, compare the
+        # actual contents
+        #
+        try:
+            with open(path, 'rb') as fp:
+                current_digest = hashlib.sha256(fp.read()).digest()
+        except OSError:
+            return False
+
+        with self._lock:
+            self._digests[path] = (st.st_mtime_ns, st.st_size, current_digest)
+
+        return current_digest == digest
@@ -17,6 +17,7 @@
 import os
 import pwd
 import shutil
+from typing import List, Tuple
 
 from sqlalchemy.orm.session import Session
 
@@ -106,6 +107,18 @@ class OsBootHostManagerCommon(OsObjectManager):
         # (ie. any platform not running ISC DHCPD)
         pass
 
+    def addDhcpLeases(self, node_nics: List[Tuple[Node, Nic]]) -> None:
+        # Add DHCP leases for a number of nodes. Platforms that can add
+        # leases in bulk should override this.
+        for node, nic in node_nics:
+            self.addDhcpLease(node, nic)
+
+    def removeDhcpLeases(self, nodes: List[Node]) -> None:
+        # Remove the DHCP leases of a number of nodes. Platforms that can
+        # remove leases in bulk should override this.
+        for node in nodes:
+            self.removeDhcpLease(node)
+
     def setNodeForNetworkBoot(
             self, session: Session, dbNode: Node) -> None: \
         # pylint: disable=unused-argument
@@ -114,3 +127,10 @@ class OsBootHostManagerCommon(OsObjectManager):
         dbNode.bootFrom = 0
 
         self.deletePuppetNodeCert(dbNode.name)
+
+    def setNodesForNetworkBoot(
+            self, session: Session, dbNodes: List[Node]) -> None:
+        # Set a number of nodes to boot from network. Platforms that can
+        # write the boot configuration in bulk should override this.
+        for dbNode in dbNodes:
+            self.setNodeForNetworkBoot(session, dbNode)
@@ -15,12 +15,11 @@
 # pylint: disable=no-member
 
 import os
-import subprocess
-from textwrap import dedent
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm.session import Session
 
+from tortuga.config.configManager import ConfigManager
 from tortuga.db.models.hardwareProfile import HardwareProfile
 from tortuga.db.models.nic import Nic
 from tortuga.db.models.node import Node
@@ -28,7 +27,10 @@ from tortuga.db.models.softwareProfile import SoftwareProfile
 from tortuga.exceptions.nicNotFound import NicNotFound
 from tortuga.exceptions.osNotSupported import OsNotSupported
 from tortuga.objects.osFamilyInfo import OsFamilyInfo
+from tortuga.os_objects.bootFileWriter import BootFile, BootFileWriter
 from tortuga.os_objects.osBootHostManagerCommon import OsBootHostManagerCommon
+from tortuga.os_objects.rhel.dhcpLeaseManager import (DhcpLease,
+                                                      OmshellLeaseManager)
 from tortuga.resourceAdapter.utility import get_provisioning_nic
 from tortuga.utility.bootParameters import getBootParameters
 
@@ -38,6 +40,16 @@ class BootHostManager(OsBootHostManagerCommon):
     Methods for manipulating PXE files
     """
 
+    # shared by all instances, so that unchanged boot files are detected
+    # without reading them, and OS support modules are loaded only once
+    _bootFileWriter = BootFileWriter()
+    __ossupport_cache: Dict[Tuple[str, str, str], Any] = {}
+
+    def __init__(self, configManager: ConfigManager) -> None:
+        super().__init__(configManager)
+
+        self._leaseManager = OmshellLeaseManager()
+
     def __getPxelinuxBootFilePath(self, mac: str):
         pxeconfigDir = os.path.join(
             self.getTftproot(), 'tortuga/pxelinux.cfg')
@@ -80,6 +92,8 @@ class BootHostManager(OsBootHostManagerCommon):
                 if os.path.exists(filename):
                     os.remove(filename)
 
+                self._bootFileWriter.forget(filename)
+
                 self._logger.debug(
                     "Removed [%s] for node [%s]" % (filename, dbNode.name))
             except Exception as msg:  # noqa pylint: disable=broad-except
@@ -106,22 +120,91 @@ class BootHostManager(OsBootHostManagerCommon):
     def writePXEFile(self, session: Session, node: Node,
                      localboot: Optional[bool] = None,
                      hardwareprofile: Optional[HardwareProfile] = None,
-                     softwareprofile: Optional[SoftwareProfile] = None): \
-            # pylint: disable=unused-argument
+                     softwareprofile: Optional[SoftwareProfile] = None):
         # 'hardwareProfile', 'softwareProfile', and 'localboot' are
         # overrides.  If not specified, node.hardwareprofile,
         # node.softwareprofile, and node.bootFrom values are used
         # respectively.
 
-        hwprofile = hardwareprofile if hardwareprofile else \
-            node.hardwareprofile
+        self.writePXEFiles(session, [node], localboot=localboot,
+                           hardwareprofile=hardwareprofile,
+                           softwareprofile=softwareprofile)
+
+    def writePXEFiles(self, session: Session, nodes: List[Node],
+                      localboot: Optional[bool] = None,
+                      hardwareprofile: Optional[HardwareProfile] = None,
+                      softwareprofile: Optional[SoftwareProfile] = None):
+        """
+        Writes the PXE (and kickstart) files for a number of nodes.
+
+        The file contents are generated in this thread, as that needs the
+        database session, and then written by a pool of worker threads.
+        Kickstart files are generated in one go, so the sections they
+        share are only computed once per profile. Files that are
+        unchanged are not rewritten.
+
+        :param Session session:                 the database session
+        :param List[Node] nodes:                the nodes
+        :param Optional[bool] localboot:        overrides node.bootFrom
+        :param HardwareProfile hardwareprofile: overrides
+                                                node.hardwareprofile
+        :param SoftwareProfile softwareprofile: overrides
+                                                node.softwareprofile
+
+        """
+        boot_files: List[BootFile] = []
+        boot_nodes = []
+
+        for node in nodes:
+            hwprofile = hardwareprofile if hardwareprofile else \
+                node.hardwareprofile
+
+            swprofile = softwareprofile if softwareprofile else \
+                node.softwareprofile
+
+            node_boot_files = self.__get_boot_files(
+                session, node, hwprofile, swprofile,
+                bool(localboot) if localboot is not None
+                else bool(node.bootFrom))
+
+            if node_boot_files is None:
+                continue
+
+            node_paths = [boot_file.path for boot_file in node_boot_files]
+            if hwprofile.installType == 'package':
+                node_paths.append(self.__get_kickstart_file_path(node))
+
+            boot_files.extend(node_boot_files)
+            boot_nodes.append((node, hwprofile, swprofile, node_paths))
+
+        boot_files.extend(self.__get_kickstart_files(
+            session,
+            [(node, hwprofile, swprofile)
+             for node, hwprofile, swprofile, _ in boot_nodes
+             if hwprofile.installType == 'package']
+        ))
+
+        # The errors are logged per path by the writer
+        errors = self._bootFileWriter.write(boot_files)
 
-        swprofile = softwareprofile if softwareprofile else \
-            node.softwareprofile
+        # Write 'cloud-init' configuration
+        for node, hwprofile, swprofile, node_paths in boot_nodes:
+            if errors.keys() & set(node_paths):
+                self._logger.error(
+                    'Not writing other boot files for node [%s], as its'
+                    ' boot files could not be written' % (node.name))
+
+                continue
+
+            self.write_other_boot_files(node, hwprofile, swprofile)
 
-        localboot = bool(localboot) \
-            if localboot is not None else bool(node.bootFrom)
+        if errors:
+            raise next(iter(errors.values()))
 
+    def __get_boot_files(self, session: Session, node: Node,
+                         hwprofile: HardwareProfile,
+                         swprofile: SoftwareProfile,
+                         localboot: bool) -> Optional[List[BootFile]]:
         self._logger.debug(
             'writePXEFile(): node=[%s], hwprofile=[%s],'
             ' swprofile=[%s], localboot=[%s]' % (
@@ -136,7 +219,7 @@ class BootHostManager(OsBootHostManagerCommon):
             nic = get_provisioning_nic(node)
         except NicNotFound:
             # Node does not have a nic marked as bootable.
-            return
+            return None
 
         result = "# PXE boot configuration for %s\n" % (node.name)
 
@@ -174,22 +257,12 @@ label Reinstall
 
                 # Call the external support module
                 try:
-                    osSupport = __import__(
-                        'tortuga.os.%s.osSupport' % (osFamilyInfo.name),
-                        globals(), locals(), ['osSupport'], 0)
-
-                    if not hasattr(osSupport, 'OSSupport'):
-                        self._logger.error(
-                            'Invalid OS support module for [%s]' % (
-                                osFamilyInfo.name))
-
-                        return
-
-                    result += osSupport.OSSupport(
-                        osFamilyInfo).getPXEReinstallSnippet(
-                            ksurl, node, hardwareprofile=hwprofile,
-                            softwareprofile=swprofile) + '\n'
-                except ImportError:
+                    osSupport = self.__get_ossupport(swprofile)
+
+                    result += osSupport.getPXEReinstallSnippet(
+                        ksurl, node, hardwareprofile=hwprofile,
+                        softwareprofile=swprofile) + '\n'
+                except OsNotSupported:
                     self._logger.warning(
                         'OS support module not found for [%s]' % (
                             osFamilyInfo.name))
@@ -202,35 +275,41 @@ label Reinstall
                                           node.name,
                                           bootParams['kernelParams'])
 
-        # Write file contents
-        filename = self.__getPxelinuxBootFilePath(nic.mac)
-
-        current_euid = os.geteuid()
-        current_egid = os.getegid()
-
-        try:
-            # The PXE file needs to be owned by the 'apache' user, so the
-            # WS API can update it.
-            os.setegid(self.passdata.pw_gid)
-            os.seteuid(self.passdata.pw_uid)
-
-            fp = os.open(
-                filename, os.O_CREAT | os.O_TRUNC | os.O_WRONLY, 0o644)
-
-            os.write(fp, result.encode())
+        # The PXE file needs to be owned by the 'apache' user, so the
+        # WS API can update it.
+        # The kickstart file, for package-based installations, is added
+        # by the caller
+        return [
+            BootFile(self.__getPxelinuxBootFilePath(nic.mac), result,
+                     uid=self.passdata.pw_uid, gid=self.passdata.pw_gid)
+        ]
+
+    def __get_kickstart_files(
+            self, session: Session,
+            nodes: List[Tuple[Node, HardwareProfile, SoftwareProfile]]) \
+            -> List[BootFile]:
+        """
+        Raises:
+            OsNotSupported
+        """
+        # Group the nodes by OS support object, keeping their order
+        groups: Dict[int, Tuple[Any, list]] = {}
+        for node, hardwareprofile, softwareprofile in nodes:
+            osSupport = self.__get_ossupport(softwareprofile)
+            groups.setdefault(id(osSupport), (osSupport, []))[1].append(
+                (node, hardwareprofile, softwareprofile))
 
-            os.close(fp)
-        finally:
-            os.seteuid(current_euid)
-            os.setegid(current_egid)
+        boot_files: List[BootFile] = []
 
-        if hwprofile.installType == 'package':
-            # Now write out the kickstart file
-            self._writeKickstartFile(session, node, hwprofile, swprofile)
+        for osSupport, group in groups.values():
+            contents = osSupport.getKickstartFilesContents(session, group)
 
-        # Write 'cloud-init' configuration
+            boot_files.extend(
+                BootFile(self.__get_kickstart_file_path(node), node_contents)
+                for (node, _, _), node_contents in zip(group, contents)
+            )
 
-        self.write_other_boot_files(node, hwprofile, swprofile)
+        return boot_files
 
     def _writeKickstartFile(self, session: Session, node: Node,
                             hardwareprofile: HardwareProfile,
@@ -241,99 +320,87 @@ label Reinstall
         Raises:
             OsNotSupported
         """
-        osFamilyName = softwareprofile.os.family.name
-
-        try:
-            osSupportModule = __import__(
-                'tortuga.os.%s.osSupport' % (osFamilyName),
-                fromlist=['OSSupport'])
-        except ImportError:
-            raise OsNotSupported(
-                'Operating system family [%s] not supported' % (
-                    osFamilyName))
-
-        OSSupport = osSupportModule.OSSupport
-
-        tmpOsFamilyInfo = OsFamilyInfo(
-            softwareprofile.os.family.name,
-            softwareprofile.os.family.version,
-            softwareprofile.os.family.arch)
-
-        contents = OSSupport(tmpOsFamilyInfo).getKickstartFileContents(
-            session, node, hardwareprofile, softwareprofile)
-
-        with open(self.__get_kickstart_file_path(node), 'w') as fp:
-            fp.write(contents)
+        errors = self._bootFileWriter.write(
+            self.__get_kickstart_files(
+                session, [(node, hardwareprofile, softwareprofile)]))
+        if errors:
+            raise next(iter(errors.values()))
 
     def _getDhcpNodeName(self, node: Node, nic: Nic): \
             # pylint: disable=unused-argument,no-self-use
         return node.name
 
     def addDhcpLease(self, node: Node, nic: Nic) -> None:
-        self._logger.debug(
-            'Adding DHCP lease for node [%s] MAC [%s]' % (node.name, nic.mac))
+        self.addDhcpLeases([(node, nic)])
 
-        dhcpName = self._getDhcpNodeName(node, nic)
+    def addDhcpLeases(self, node_nics: List[Tuple[Node, Nic]]) -> None:
+        """
+        Adds DHCP leases for a number of nodes, using as few omshell
+        sessions as possible.
+
+        :param List[Tuple[Node, Nic]] node_nics: the nodes, and the NIC to
+                                                 add a lease for
 
-        cmds = dedent("""\
-            connect
-            new host
-            set name = "{name}"
-            set hardware-address = {mac}
-            set hardware-type = 1
-            set ip-address = {ip}
-            create
-            """)
+        """
+        leases = []
+        nodes = {}
 
-        cmds = cmds.format(name=dhcpName, mac=nic.mac, ip=nic.ip)
+        for node, nic in node_nics:
+            self._logger.debug(
+                'Adding DHCP lease for node [%s] MAC [%s]' % (
+                    node.name, nic.mac))
 
-        p = subprocess.Popen(['/usr/bin/omshell'],
-                             stdin=subprocess.PIPE,
-                             stdout=subprocess.PIPE, encoding='utf-8')
+            lease = DhcpLease(name=self._getDhcpNodeName(node, nic),
+                              mac=nic.mac, ip=nic.ip)
+            leases.append(lease)
+            nodes[lease.name] = node
 
-        stdout, _ = p.communicate(cmds)
+        errors = self._leaseManager.add_leases(leases)
 
-        if p.poll() != 0:
+        for name, error in errors.items():
             self._logger.error(
-                'Error adding DHCP lease for node [%s] (retval=%d): %s' % (
-                    node.name, p.returncode, stdout))
+                'Error adding DHCP lease for node [%s]: %s' % (
+                    nodes[name].name, error))
 
     def removeDhcpLease(self, node: Node) -> None:
-        # Find first provisioning NIC
-        try:
-            nic = get_provisioning_nic(node)
-        except NicNotFound:
-            return
+        self.removeDhcpLeases([node])
 
-        self._logger.debug(
-            'Removing DHCP lease for node [%s] MAC [%s]' % (
-                node.name, nic.mac))
+    def removeDhcpLeases(self, nodes: List[Node]) -> None:
+        """
+        Removes the DHCP leases of a number of nodes, using as few omshell
+        sessions as possible.
 
-        dhcpName = self._getDhcpNodeName(node, nic)
+        :param List[Node] nodes: the nodes
 
-        cmds = dedent("""\
-            connect
-            new host
-            set name = "{name}"
-            set hardware-address = {mac}
-            set hardware-type = 1
-            set ip-address = {ip}
-            open
-            remove
-        """)
+        """
+        leases = []
+        lease_nodes = {}
 
-        cmds = cmds.format(name=dhcpName, mac=nic.mac, ip=nic.ip)
+        for node in nodes:
+            # Find first provisioning NIC
+            try:
+                nic = get_provisioning_nic(node)
+            except NicNotFound:
+                continue
 
-        p = subprocess.Popen(['/usr/bin/omshell'],
-                             stdin=subprocess.PIPE,
-                             stdout=subprocess.PIPE, encoding='utf-8')
+            self._logger.debug(
+                'Removing DHCP lease for node [%s] MAC [%s]' % (
+                    node.name, nic.mac))
 
-        stdout, _ = p.communicate(cmds)
+            lease = DhcpLease(name=self._getDhcpNodeName(node, nic),
+                              mac=nic.mac, ip=nic.ip)
+            leases.append(lease)
+            lease_nodes[lease.name] = node
 
-        if p.poll() != 0:
+        if not leases:
+            return
+
+        errors = self._leaseManager.remove_leases(leases)
+
+        for name, error in errors.items():
             self._logger.error(
-                'Error removing DHCP lease for node [%s] (retval=%d): %s' % (
-                    node.name, p.returncode, stdout))
+                'Error removing DHCP lease for node [%s]: %s' % (
+                    lease_nodes[name].name, error))
 
     def getTftproot(self): \
             # pylint: disable=no-self-use
@@ -354,21 +421,35 @@ label Reinstall
             return __import__(
                 'tortuga.os.%s.osSupport' % (osFamilyName),
                 fromlist=['OSSupport']).OSSupport
-        except ImportError:
+        except (ImportError, AttributeError):
             raise OsNotSupported(
                 'Operating system family [%s] not supported' % (
                     osFamilyName))
 
     def __get_ossupport(self, softwareprofile):
+        """
+        Gets the OS support object for the operating system family of a
+        software profile. These are shared by all boot host managers.
+
+        Raises:
+            OsNotSupported
+        """
+        key = (softwareprofile.os.family.name,
+               softwareprofile.os.family.version,
+               softwareprofile.os.family.arch)
+
+        osSupport = BootHostManager.__ossupport_cache.get(key)
+        if osSupport is not None:
+            return osSupport
+
         OSSupport = self.__get_ossupport_module(
             softwareprofile.os.family.name)
 
-        tmpOsFamilyInfo = OsFamilyInfo(
-            softwareprofile.os.family.name,
-            softwareprofile.os.family.version,
-            softwareprofile.os.family.arch)
+        osSupport = OSSupport(OsFamilyInfo(*key))
 
-        return OSSupport(tmpOsFamilyInfo)
+        BootHostManager.__ossupport_cache[key] = osSupport
+
+        return osSupport
 
     def get_cloud_config(self, node, hardwareprofile=None,
                          softwareprofile=None):
@@ -411,7 +492,11 @@ label Reinstall
             node, hardwareprofile, softwareprofile)
 
     def setNodeForNetworkBoot(self, session: Session, dbNode: Node):
-        super().setNodeForNetworkBoot(session, dbNode)
+        self.setNodesForNetworkBoot(session, [dbNode])
+
+    def setNodesForNetworkBoot(self, session: Session, dbNodes: List[Node]):
+        for dbNode in dbNodes:
+            super().setNodeForNetworkBoot(session, dbNode)
 
-        # Write the updated file
-        self.writePXEFile(session, dbNode)
+        # Write the updated files
+        self.writePXEFiles(session, dbNodes)
@@ -0,0 +1,181 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import subprocess
+from collections import namedtuple
+from textwrap import dedent
+from typing import Dict, List, Optional, Tuple
+
+from tortuga.logging import OS_NAMESPACE
+
+
+logger = logging.getLogger(OS_NAMESPACE)
+
+
+DhcpLease = namedtuple('DhcpLease', ['name', 'mac', 'ip'])
+
+
+class OmshellLeaseManager:
+    """
+    Adds and removes ISC DHCP server host leases using omshell. Leases are
+    sent in batches, using one omshell session per batch instead of one
+    per lease.
+
+    omshell keeps going when a command in a session fails, but its output
+    cannot reliably be matched to the lease that failed. So, if a batch
+    reports any errors, its leases are sent again, one session per lease,
+    to find out which ones failed. Adding a lease that already exists, or
+    removing a lease that does not exist, is not considered an error,
+    which makes sending leases more than once harmless.
+
+    """
+    DEFAULT_OMSHELL = '/usr/bin/omshell'
+    DEFAULT_BATCH_SIZE = 250
+
+    ADD_COMMANDS = dedent("""\
+        new host
+        set name = "{name}"
+        set hardware-address = {mac}
+        set hardware-type = 1
+        set ip-address = {ip}
+        create
+        """)
+
+    REMOVE_COMMANDS = dedent("""\
+        new host
+        set name = "{name}"
+        set hardware-address = {mac}
+        set hardware-type = 1
+        set ip-address = {ip}
+        open
+        remove
+        """)
+
+    ERROR_PREFIXES = ("can't", 'you must')
+
+    def __init__(self, omshell: str = DEFAULT_OMSHELL,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Initialization.
+
+        :param str omshell:    the path to the omshell executable
+        :param int batch_size: the maximum number of leases sent in one
+                               omshell session
+
+        """
+        self.omshell = omshell
+        self.batch_size = max(1, batch_size)
+
+        #: the number of omshell sessions started, for statistics
+        self.sessions = 0
+
+    def add_leases(self, leases: List[DhcpLease]) -> Dict[str, str]:
+        """
+        Adds host leases.
+
+        :param List[DhcpLease] leases: the leases to add
+
+        :return Dict[str, str]: the error messages of the leases that could
+                                not be added, keyed by lease name
+
+        """
+        return self._run(leases, self.ADD_COMMANDS, 'already exists')
+
+    def remove_leases(self, leases: List[DhcpLease]) -> Dict[str, str]:
+        """
+        Removes host leases.
+
+        :param List[DhcpLease] leases: the leases to remove
+
+        :return Dict[str, str]: the error messages of the leases that could
+                                not be removed, keyed by lease name
+
+        """
+        return self._run(leases, self.REMOVE_COMMANDS, 'not found')
+
+    def _run(self, leases: List[DhcpLease], commands: str,
+             ignored_error: str) -> Dict[str, str]:
+        errors: Dict[str, str] = {}
+
+        for idx in range(0, len(leases), self.batch_size):
+            batch = leases[idx:idx + self.batch_size]
+
+            message, retry = self._run_session(batch, commands, ignored_error)
+            if message is None:
+                continue
+
+            if len(batch) == 1 or not retry:
+                for lease in batch:
+                    errors[lease.name] = message
+                continue
+
+            logger.debug(
+                'omshell reported errors for a batch of {} lease(s),'
+                ' retrying leases individually'.format(len(batch)))
+
+            for lease in batch:
+                message, _ = self._run_session(
+                    [lease], commands, ignored_error)
+                if message is not None:
+                    errors[lease.name] = message
+
+        return errors
+
+    def _run_session(self, leases: List[DhcpLease], commands: str,
+                     ignored_error: str) -> Tuple[Optional[str], bool]:
+        """
+        Runs the commands for a number of leases in one omshell session.
+
+        :return Tuple[Optional[str], bool]: the error message, or None if
+                                            all commands succeeded, and
+                                            whether it makes sense to retry
+                                            the leases individually
+
+        """
+        script = 'connect\n' + ''.join(
+            commands.format(name=lease.name, mac=lease.mac, ip=lease.ip)
+            for lease in leases
+        )
+
+        self.sessions += 1
+
+        try:
+            p = subprocess.Popen([self.omshell],
+                                 stdin=subprocess.PIPE,
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.STDOUT,
+                                 encoding='utf-8')
+
+            stdout, _ = p.communicate(script)
+        except OSError as exc:
+            return 'Unable to run omshell: {}'.format(exc), False
+
+        errors = [
+            line.strip() for line in stdout.splitlines()
+            if line.strip().lower().startswith(self.ERROR_PREFIXES) and
+            ignored_error not in line
+        ]
+
+        if p.returncode != 0:
+            return 'retval={}: {}'.format(
+                p.returncode, '; '.join(errors) or stdout.strip()), False
+
+        if errors:
+            # there is no point in retrying if omshell could not connect to
+            # the DHCP server
+            return '; '.join(errors), \
+                not any('connect' in error for error in errors)
+
+        return None, False
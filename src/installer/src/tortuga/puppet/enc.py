@@ -0,0 +1,545 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import logging
+import os.path
+import time
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm.attributes import get_history
+
+from tortuga.config.configManager import ConfigManager
+from tortuga.db.dataRequestsDbHandler import DataRequestsDbHandler
+from tortuga.db.globalParametersDbHandler import GlobalParametersDbHandler
+from tortuga.db.helper import get_installer_hostname_suffix
+from tortuga.db.models.component import Component
+from tortuga.db.models.dataRequest import DataRequest
+from tortuga.db.models.globalParameter import GlobalParameter
+from tortuga.db.models.hardwareProfile import HardwareProfile
+from tortuga.db.models.hardwareProfileProvisioningNic import \
+    HardwareProfileProvisioningNic
+from tortuga.db.models.hardwareProfileTag import HardwareProfileTag
+from tortuga.db.models.kit import Kit
+from tortuga.db.models.kitSource import KitSource
+from tortuga.db.models.network import Network
+from tortuga.db.models.node import Node
+from tortuga.db.models.nodeTag import NodeTag
+from tortuga.db.models.softwareProfile import SoftwareProfile
+from tortuga.db.models.softwareProfileTag import SoftwareProfileTag
+from tortuga.exceptions.parameterNotFound import ParameterNotFound
+from tortuga.kit.registry import get_kit_installer_instance
+from tortuga.logging import PUPPET_NAMESPACE
+
+from .encCache import PuppetEncCache, invalidate_puppet_enc_cache
+
+
+logger = logging.getLogger(PUPPET_NAMESPACE)
+
+
+class PuppetEncGenerator:
+    """
+    Generates Puppet ENC (external node classifier) documents.
+
+    Apart from the names of the profiles, a document only depends on the
+    software profile, the hardware profile and the add host request of a
+    node, and on whether the node is the installer. Documents are
+    therefore rendered once per such combination, which makes generating
+    documents for many nodes with one generator cheap: the kit and
+    component installers are only run once per software profile.
+
+    A generator reads the global parameters when it is created, so it
+    should not be kept around for longer than a single batch of nodes.
+
+    """
+    def __init__(self, session: OrmSession):
+        """
+        Initializer.
+
+        :param Session session: the database session
+
+        """
+        self.session = session
+
+        self._cm = ConfigManager()
+
+        self._public_installer_fqdn = self._cm.getInstaller().lower()
+        self._primary_installer_hostname = \
+            self._public_installer_fqdn.split('.', 1)[0]
+
+        try:
+            self._dns_zone = GlobalParametersDbHandler().getParameter(
+                session, 'DNSZone').value.lower()
+        except ParameterNotFound:
+            self._dns_zone = None
+
+        try:
+            depot_path = GlobalParametersDbHandler().getParameter(
+                session, 'depot').value.lower()
+
+            self._cm.setDepotDir(depot_path)
+        except ParameterNotFound:
+            pass
+
+        self._data_requests: Dict[Optional[str], Optional[dict]] = {}
+        self._documents: Dict[tuple, dict] = {}
+
+    @staticmethod
+    def render(data: dict) -> str:
+        """
+        Renders an ENC document.
+
+        :param dict data: the ENC data
+
+        :return str: the YAML document
+
+        """
+        return yaml.safe_dump(
+            data, default_flow_style=False, explicit_start=True)
+
+    def get_node_data(self, node: Node) -> dict:
+        """
+        Gets the ENC data for a node.
+
+        :param Node node: the node
+
+        :return dict: the ENC data
+
+        """
+        is_installer = self._primary_installer_hostname == \
+            node.name.lower().split('.', 1)[0]
+
+        key = (
+            node.softwareprofile.id if node.softwareprofile else None,
+            node.hardwareprofile.id,
+            node.addHostSession,
+            is_installer,
+        )
+
+        data = self._documents.get(key)
+        if data is None:
+            data = self._get_data(node, is_installer)
+            self._documents[key] = data
+
+        return copy.deepcopy(data)
+
+    def _get_request_data(self, add_host_session: Optional[str]) \
+            -> Optional[dict]:
+        if add_host_session in self._data_requests:
+            return self._data_requests[add_host_session]
+
+        data = None
+        try:
+            db_data_request = DataRequestsDbHandler().get_by_addHostSession(
+                self.session, add_host_session)
+            if db_data_request:
+                data = db_data_request.request
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+        self._data_requests[add_host_session] = data
+
+        return data
+
+    def _get_installer_hostname(self, node: Node, is_installer: bool) -> str:
+        primary_installer_hostname = self._primary_installer_hostname
+        dns_zone = self._dns_zone
+
+        if node.hardwareprofile.nics:
+            private_installer_fqdn = '%s%s%s' % (
+                primary_installer_hostname,
+                get_installer_hostname_suffix(
+                    node.hardwareprofile.nics[0],
+                    enable_interface_aliases=None),
+                '.%s' % (dns_zone) if dns_zone else '')
+        else:
+            private_installer_fqdn = '%s%s' % (
+                primary_installer_hostname,
+                '.%s' % (dns_zone) if dns_zone else '')
+
+        if not is_installer and node.hardwareprofile.location == 'local':
+            # If the hardware profile does not have an associated
+            # provisioning NIC, use the public installer FQDN by default.
+            # This can happen if the user has added their own "public"
+            # nodes to a local hardware profile.
+
+            if not node.hardwareprofile.nics:
+                return self._public_installer_fqdn
+
+            return private_installer_fqdn
+
+        # If the specified node is the installer itself or a node
+        # accessing the installer through it's public interface, use the
+        # public host name.
+        return self._public_installer_fqdn
+
+    def _get_puppet_classes(self, node: Node, is_installer: bool) \
+            -> Tuple[dict, set]:
+        puppet_classes = {}
+
+        enabledKits = set()
+
+        if not node.softwareprofile:
+            return puppet_classes, enabledKits
+
+        data = self._get_request_data(node.addHostSession)
+
+        for dbComponent in node.softwareprofile.components:
+
+            if not dbComponent.kit.isOs:
+                #
+                # Load the kit and component installers
+                #
+                kit_spec = (
+                    dbComponent.kit.name,
+                    dbComponent.kit.version,
+                    dbComponent.kit.iteration
+                )
+                kit_installer = get_kit_installer_instance(
+                    kit_spec, session=self.session)
+                _component = kit_installer.get_component_installer(
+                    dbComponent.name)
+
+                #
+                # Get the puppet args for the component
+                #
+                try:
+                    puppet_class_args = _component.run_action(
+                        'get_puppet_args',
+                        node.softwareprofile,
+                        node.hardwareprofile,
+                        data=data
+                    )
+                    if puppet_class_args is not None:
+                        puppet_classes[_component.puppet_class] = \
+                            puppet_class_args
+                except Exception as e:  # noqa pylint: disable=broad-except
+                    # display exception message in puppet output
+                    msg = '{}: {}'.format(_component.puppet_class, e)
+                    if not puppet_classes.get(
+                            'tortuga_kit_base::common::message'):
+                        puppet_classes[
+                            'tortuga_kit_base::common::message'] = {
+                                'msg': [msg]}
+                    else:
+                        puppet_classes[
+                            'tortuga_kit_base::common::message'][
+                                'msg'].append(msg)
+                    # suppress exception if unable to get Puppet args
+                    puppet_classes[_component.puppet_class] = {}
+
+            else:
+                #
+                # OS kit component is omitted on installer. The installer
+                # is assumed to have a pre-existing OS repository
+                # configuration.
+                #
+                if is_installer:
+                    continue
+
+            enabledKits.add(dbComponent.kit)
+
+        return puppet_classes, enabledKits
+
+    def _get_data(self, node: Node, is_installer: bool) -> dict:
+        installerHostName = self._get_installer_hostname(node, is_installer)
+
+        puppet_classes, enabledKits = self._get_puppet_classes(
+            node, is_installer)
+
+        dataDict = {}
+
+        if puppet_classes:
+            dataDict['classes'] = puppet_classes
+
+        parametersDict = {}
+        dataDict['parameters'] = parametersDict
+
+        # software profile
+        if node.softwareprofile:
+            parametersDict['swprofilename'] = node.softwareprofile.name
+
+        # hardware profile
+        parametersDict['hwprofilename'] = node.hardwareprofile.name
+
+        # installer hostname
+        parametersDict['primary_installer_hostname'] = installerHostName
+
+        # Local repos directory
+        repodir = os.path.join(self._cm.getDepotDir(), 'kits')
+
+        # Build YUM repository entries only if we have kits associated with
+        # the software profile.
+        if enabledKits:
+            repourl = self._cm.getIntWebRootUrl(installerHostName) + \
+                '/repos' if not is_installer else 'file://{0}'.format(repodir)
+
+            repo_type = None
+
+            if node.softwareprofile.os.family.name == 'rhel':
+                repo_type = 'yum'
+            # elif node.softwareprofile.os.family == 'ubuntu':
+            #     repo_type = 'apt'
+
+            if repo_type:
+                # Only add 'repos' entries for supported operating system
+                # families.
+
+                repos_dict = {}
+
+                for kit in enabledKits:
+                    if kit.isOs:
+                        verstr = str(kit.version)
+                        arch = kit.components[0].os[0].arch
+                    else:
+                        verstr = '%s-%s' % (kit.version, kit.iteration)
+                        arch = 'noarch'
+
+                    for dbKitSource in node.softwareprofile.kitsources:
+                        if dbKitSource in kit.sources:
+                            baseurl = dbKitSource.url
+                            break
+                    else:
+                        subpath = '%s/%s/%s' % (kit.name, verstr, arch)
+
+                        if not kit.isOs and not os.path.exists(
+                                os.path.join(repodir,
+                                             subpath,
+                                             'repodata/repomd.xml')):
+                            continue
+
+                        baseurl = '%s/%s' % (repourl, subpath)
+
+                        # [TODO] temporary workaround for handling RHEL
+                        # media path.
+                        #
+                        # This code is duplicated from tortuga.boot.distro
+                        if kit.isOs and \
+                           node.softwareprofile.os.name == 'rhel' and \
+                           node.softwareprofile.os.family.version != '7':
+                            subpath += '/Server'
+
+                    if repo_type == 'yum':
+                        if node.hardwareprofile.location == 'remote':
+                            cost = 1200
+                        else:
+                            cost = 1000
+
+                        repos_dict['uc-kit-%s' % (kit.name)] = {
+                            'type': repo_type,
+                            'baseurl': baseurl,
+                            'cost': cost,
+                        }
+
+                if repos_dict:
+                    parametersDict['repos'] = repos_dict
+
+        # Enable '3rdparty' repo
+        if node.softwareprofile:
+            third_party_repo_subpath = '3rdparty/%s/%s/%s' % (
+                node.softwareprofile.os.family.name,
+                node.softwareprofile.os.family.version,
+                node.softwareprofile.os.arch)
+
+            local_repos_path = os.path.join(repodir, third_party_repo_subpath)
+
+            # Check for existence of repository metadata to validate
+            # existence
+            if enabledKits and os.path.exists(
+                    os.path.join(local_repos_path, 'repodata', 'repomd.xml')):
+                third_party_repo_dict = {
+                    'tortuga-third-party': {
+                        'type': 'yum',
+                        'baseurl': os.path.join(
+                            repourl, third_party_repo_subpath),
+                    },
+                }
+
+                if 'repos' not in parametersDict:
+                    parametersDict['repos'] = third_party_repo_dict
+                else:
+                    parametersDict['repos'] = dict(
+                        list(parametersDict['repos'].items()) +
+                        list(third_party_repo_dict.items()))
+
+        # environment
+        dataDict['environment'] = 'production'
+
+        return dataDict
+
+
+def precompute_puppet_enc(session: OrmSession,
+                          node_names: Optional[List[str]] = None,
+                          cache: Optional[PuppetEncCache] = None) -> int:
+    """
+    Renders the ENC documents for nodes and stores them in the cache. The
+    kits must already be loaded.
+
+    :param Session session:       the database session
+    :param List[str] node_names:  the names of the nodes to render the
+                                  documents for, defaults to all nodes
+    :param PuppetEncCache cache:  the cache to store the documents in
+
+    :return int: the number of documents cached
+
+    """
+    if cache is None:
+        cache = PuppetEncCache()
+
+    #
+    # Documents rendered while the cache (or a node) is invalidated must
+    # not be served, so get the generation and the time before reading
+    # anything
+    #
+    rendered = time.time()
+    generation = cache.get_generation()
+
+    query = session.query(Node).filter(Node.state != 'Deleted')
+    if node_names is not None:
+        if not node_names:
+            return 0
+        query = query.filter(Node.name.in_(node_names))
+
+    generator = PuppetEncGenerator(session)
+    documents: Dict[str, str] = {}
+
+    for node in query:
+        try:
+            documents[node.name] = generator.render(
+                generator.get_node_data(node))
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error(
+                'Unable to generate the Puppet ENC document for node'
+                ' [{}]: {}'.format(node.name, exc))
+
+    cache.set_many(documents, generation=generation, rendered=rendered)
+
+    logger.debug(
+        'Precomputed {} Puppet ENC document(s)'.format(len(documents)))
+
+    return len(documents)
+
+
+#
+# The database models whose changes affect the ENC documents of all nodes
+#
+_PROFILE_MODELS = (
+    Component,
+    DataRequest,
+    GlobalParameter,
+    HardwareProfile,
+    HardwareProfileProvisioningNic,
+    HardwareProfileTag,
+    Kit,
+    KitSource,
+    Network,
+    SoftwareProfile,
+    SoftwareProfileTag,
+)
+
+#
+# The node attributes the ENC document of a node depends on
+#
+_NODE_ATTRIBUTES = ('name', 'softwareProfileId', 'hardwareProfileId',
+                    'addHostSession', 'tags')
+
+
+#
+# Profile attributes that change with the nodes in the profile, without
+# affecting the documents of the other nodes
+#
+_IGNORED_PROFILE_ATTRIBUTES = ('nodes',)
+
+
+def _is_profile_changed(obj, session: OrmSession) -> bool:
+    if obj in session.new or obj in session.deleted:
+        return True
+
+    return any(attr.history.has_changes()
+               for attr in inspect(obj).attrs
+               if attr.key not in _IGNORED_PROFILE_ATTRIBUTES)
+
+
+def _get_changed_node_names(node: Node, deleted: bool) -> List[str]:
+    if deleted:
+        return [node.name]
+
+    names = []
+    for attr in _NODE_ATTRIBUTES:
+        history = get_history(node, attr)
+        if history.has_changes():
+            names.append(node.name)
+            if attr == 'name':
+                names.extend(history.deleted)
+
+    return names
+
+
+@event.listens_for(OrmSession, 'after_flush')
+def _after_flush(session: OrmSession,
+                 flush_context):  # pylint: disable=unused-argument
+    changes = session.info.setdefault('puppet_enc_changes', set())
+
+    if None in changes:
+        return
+
+    tagged_node_ids = set()
+
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, _PROFILE_MODELS):
+            if not _is_profile_changed(obj, session):
+                continue
+
+            changes.add(None)
+            return
+
+        if isinstance(obj, Node):
+            if obj in session.new:
+                # new nodes don't have a document cached
+                continue
+
+            changes.update(
+                _get_changed_node_names(obj, obj in session.deleted))
+        elif isinstance(obj, NodeTag) and obj.node_id is not None:
+            tagged_node_ids.add(obj.node_id)
+
+    if tagged_node_ids:
+        with session.no_autoflush:
+            changes.update(
+                name for name, in session.query(Node.name).filter(
+                    Node.id.in_(tagged_node_ids)))
+
+    if not changes:
+        session.info.pop('puppet_enc_changes')
+
+
+@event.listens_for(OrmSession, 'after_commit')
+def _after_commit(session: OrmSession):
+    changes = session.info.pop('puppet_enc_changes', None)
+    if not changes:
+        return
+
+    if None in changes:
+        invalidate_puppet_enc_cache()
+    else:
+        for node_name in changes:
+            invalidate_puppet_enc_cache(node_name)
+
+
+@event.listens_for(OrmSession, 'after_rollback')
+def _after_rollback(session: OrmSession):
+    session.info.pop('puppet_enc_changes', None)
@@ -0,0 +1,229 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import time
+import uuid
+from typing import Dict, Optional
+
+from tortuga.logging import PUPPET_NAMESPACE
+from tortuga.objectstore.base import ObjectStore
+from tortuga.objectstore.manager import ObjectStoreManager
+
+
+logger = logging.getLogger(PUPPET_NAMESPACE)
+
+
+class PuppetEncCache:
+    """
+    A cache of rendered Puppet ENC (external node classifier) documents,
+    keyed by node name.
+
+    The documents are kept in the object store, so they are shared by the
+    web service, the Celery workers and the get-tortuga-node command, all
+    of which run as separate processes. This module deliberately has no
+    dependencies on the database or the kits, so that serving a cached
+    document is cheap.
+
+    Every document records the generation of the cache it was rendered
+    in. Invalidating the whole cache replaces the generation, which makes
+    all existing documents stale in a single write. Documents also expire
+    after a while, as a safety net; the generation itself is kept in a
+    separate store and never expires.
+
+    Invalidating the document of a single node records the time it was
+    invalidated, separately from the document, and documents record the
+    time their rendering started. A document that was rendered from data
+    read before the node was invalidated is therefore never served, even
+    if it is stored afterwards. This assumes that all processes share a
+    clock, i.e. run on the installer.
+
+    """
+    NAMESPACE = 'puppet-enc'
+    DEFAULT_EXPIRE = 7200
+
+    #
+    # Node names are host names, which cannot contain underscores, so this
+    # can never clash with a node name
+    #
+    GENERATION_KEY = '_generation'
+    INVALIDATED_KEY_PREFIX = '_invalidated:'
+
+    def __init__(self, store: Optional[ObjectStore] = None,
+                 generation_store: Optional[ObjectStore] = None,
+                 invalidation_store: Optional[ObjectStore] = None,
+                 expire: int = DEFAULT_EXPIRE):
+        """
+        Initializer.
+
+        :param ObjectStore store:            the object store to keep the
+                                             documents in, defaults to the
+                                             'puppet-enc' store
+        :param ObjectStore generation_store: the object store to keep the
+                                             generation in, defaults to
+                                             store if it is specified
+        :param ObjectStore invalidation_store: the object store to keep
+                                             the node invalidation times
+                                             in, which must expire objects
+                                             no sooner than store. Defaults
+                                             to store if it is specified.
+        :param int expire:                   the number of seconds after
+                                             which documents expire
+
+        """
+        if store is None:
+            store = ObjectStoreManager.get(self.NAMESPACE, expire=expire)
+            if generation_store is None:
+                generation_store = ObjectStoreManager.get(
+                    '{}-generation'.format(self.NAMESPACE))
+            if invalidation_store is None:
+                invalidation_store = ObjectStoreManager.get(
+                    '{}-invalidated'.format(self.NAMESPACE), expire=expire)
+
+        self._store = store
+        self._generation_store = generation_store or store
+        self._invalidation_store = invalidation_store or store
+
+    def get(self, node_name: str) -> Optional[str]:
+        """
+        Gets the cached ENC document for a node.
+
+        :param str node_name: the name of the node
+
+        :return Optional[str]: the YAML document, or None if there is no
+                               valid document cached for the node
+
+        """
+        entry = self._store.get(node_name.lower())
+        if not entry or entry.get('yaml') is None:
+            return None
+
+        if entry.get('generation') != self.get_generation():
+            return None
+
+        invalidated = self._invalidation_store.get(
+            self.INVALIDATED_KEY_PREFIX + node_name.lower())
+        if invalidated and \
+                float(invalidated['time']) >= float(entry.get('rendered', 0)):
+            return None
+
+        return entry.get('yaml')
+
+    def set_many(self, documents: Dict[str, str],
+                 generation: Optional[str] = None,
+                 rendered: Optional[float] = None):
+        """
+        Caches ENC documents.
+
+        :param Dict[str, str] documents: the YAML documents, keyed by node
+                                         name
+        :param str generation:           the generation of the cache the
+                                         documents were rendered in, as
+                                         returned by get_generation()
+                                         before rendering started. Pass
+                                         it, so that documents rendered
+                                         while the cache was invalidated
+                                         are never served
+        :param float rendered:           the time (time.time()) rendering
+                                         started, before any data was
+                                         read. Pass it, so that documents
+                                         rendered while a node was
+                                         invalidated are never served
+
+        """
+        if not documents:
+            return
+
+        if generation is None:
+            generation = self.get_generation()
+
+        if rendered is None:
+            rendered = time.time()
+
+        self._store.set_many({
+            node_name.lower(): {'yaml': document, 'generation': generation,
+                                'rendered': rendered}
+            for node_name, document in documents.items()
+        })
+
+    def set(self, node_name: str, document: str,
+            generation: Optional[str] = None,
+            rendered: Optional[float] = None):
+        """
+        Caches the ENC document for a node.
+
+        :param str node_name:  the name of the node
+        :param str document:   the YAML document
+        :param str generation: see set_many()
+        :param float rendered: see set_many()
+
+        """
+        self.set_many({node_name: document}, generation=generation,
+                      rendered=rendered)
+
+    def get_generation(self) -> str:
+        """
+        Gets the current generation of the cache, starting a new one if
+        there is none.
+
+        :return str: the generation
+
+        """
+        entry = self._generation_store.get(self.GENERATION_KEY)
+        if entry and entry.get('value'):
+            return entry['value']
+
+        return self._new_generation()
+
+    def invalidate(self, node_name: Optional[str] = None):
+        """
+        Invalidates cached ENC documents.
+
+        :param str node_name: the name of the node to invalidate the
+                              document for, or None to invalidate all
+                              documents
+
+        """
+        if node_name is None:
+            logger.debug('Invalidating all cached Puppet ENC documents')
+            self._new_generation()
+        else:
+            self._invalidation_store.set(
+                self.INVALIDATED_KEY_PREFIX + node_name.lower(),
+                {'time': time.time()})
+            self._store.delete(node_name.lower())
+
+    def _new_generation(self) -> str:
+        generation = uuid.uuid4().hex
+        self._generation_store.set(
+            self.GENERATION_KEY, {'value': generation})
+
+        return generation
+
+
+def invalidate_puppet_enc_cache(node_name: Optional[str] = None):
+    """
+    Invalidates cached ENC documents, logging (rather than raising) any
+    errors, as failing to invalidate the cache must not fail the change
+    that triggered it.
+
+    :param str node_name: the name of the node to invalidate the document
+                          for, or None to invalidate all documents
+
+    """
+    try:
+        PuppetEncCache().invalidate(node_name)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.error(
+            'Unable to invalidate the Puppet ENC cache: {}'.format(exc))
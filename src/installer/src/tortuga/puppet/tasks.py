@@ -0,0 +1,57 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from typing import List, Optional
+
+from celery.schedules import crontab
+
+from tortuga.logging import PUPPET_NAMESPACE
+from tortuga.tasks.celery import app
+
+from .enc import precompute_puppet_enc
+
+
+logger = logging.getLogger(PUPPET_NAMESPACE)
+
+
+@app.on_after_finalize.connect
+def setup_periodic_tasks(sender, **kwargs):
+    #
+    # Precompute the Puppet ENC documents every 30 minutes, which is well
+    # within the expiry time of the cached documents
+    #
+    logger.info(
+        'Setting-up periodic task to run every 30 minutes:'
+        ' precompute_puppet_enc_documents')
+    sender.add_periodic_task(
+        crontab(minute='*/30'),
+        precompute_puppet_enc_documents.s(),
+    )
+
+
+@app.task()
+def precompute_puppet_enc_documents(node_names: Optional[List[str]] = None):
+    """
+    Renders the Puppet ENC documents and stores them in the cache, so
+    get-tortuga-node can serve them without touching the database.
+
+    :param List[str] node_names: the names of the nodes to render the
+                                 documents for, defaults to all nodes
+
+    """
+    with app.dbm.session() as session:
+        count = precompute_puppet_enc(session, node_names=node_names)
+
+    logger.info('Precomputed {} Puppet ENC document(s)'.format(count))
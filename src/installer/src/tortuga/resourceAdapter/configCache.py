@@ -0,0 +1,259 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import csv
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm.session import Session
+
+from tortuga.db.models.resourceAdapterConfig import ResourceAdapterConfig
+from tortuga.db.models.resourceAdapterSetting import ResourceAdapterSetting
+from tortuga.logging import RESOURCE_ADAPTER_NAMESPACE
+
+
+logger = logging.getLogger(RESOURCE_ADAPTER_NAMESPACE)
+
+
+class ResourceAdapterConfigCache:
+    """
+    A bounded, in-memory cache of resolved resource adapter configurations,
+    keyed by resource adapter and configuration profile name.
+
+    Every entry records the version of the cache it was resolved in. The
+    version is bumped whenever a resource adapter configuration profile
+    (or one of its settings) is changed in the database from this process,
+    which makes all existing entries stale. Changes made by other
+    processes are picked up once the entries expire, ttl seconds after
+    they were added.
+
+    """
+    DEFAULT_TTL = 60
+    DEFAULT_MAX_SIZE = 256
+
+    def __init__(self, ttl: float = DEFAULT_TTL,
+                 max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Initializer.
+
+        :param float ttl:    the number of seconds a resolved configuration
+                             is cached for, 0 disables the cache
+        :param int max_size: the maximum number of cached configurations
+
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._entries: \
+            'OrderedDict[Tuple[str, str], Tuple[int, float, Dict[str, Any]]]' \
+            = OrderedDict()
+
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, adapter_name: str,
+            profile: str) -> Optional[Dict[str, Any]]:
+        """
+        Gets a resolved configuration.
+
+        :param str adapter_name: the name of the resource adapter
+        :param str profile:      the name of the configuration profile
+
+        :return Optional[Dict[str, Any]]: a copy of the configuration, or
+                                          None if it is not cached
+
+        """
+        key = (adapter_name, profile)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                version, expires, config = entry
+
+                if version == self._version and \
+                        expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return copy.deepcopy(config)
+
+                del self._entries[key]
+
+            self._misses += 1
+
+            return None
+
+    def add(self, adapter_name: str, profile: str, config: Dict[str, Any],
+            version: Optional[int] = None):
+        """
+        Adds a resolved configuration to the cache.
+
+        :param str adapter_name:        the name of the resource adapter
+        :param str profile:             the name of the configuration
+                                        profile
+        :param Dict[str, Any] config:   the resolved configuration
+        :param Optional[int] version:   the cache version the configuration
+                                        was resolved in. If the cache has
+                                        been invalidated since, the
+                                        configuration is not added.
+
+        """
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+
+        key = (adapter_name, profile)
+
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+
+            self._entries[key] = (
+                self._version, time.monotonic() + self.ttl,
+                copy.deepcopy(config))
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """
+        Makes all cached configurations stale.
+
+        """
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Gets the cache statistics.
+
+        :return dict: the hit and miss counts, the cache size and version
+
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'size': len(self._entries),
+                'version': self._version,
+            }
+
+
+class InstanceSizeMappingCache:
+    """
+    Caches the parsed contents of resource adapter instance size mapping
+    files (CSV files mapping instance types/sizes to a number of vcpus).
+    A file is only parsed again when its modification time changes.
+
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mappings: Dict[str, Tuple[float, Dict[str, str]]] = {}
+
+    def get(self, filename: str) -> Optional[Dict[str, str]]:
+        """
+        Gets the instance size mapping from a file.
+
+        :param str filename: the path to the CSV file
+
+        :return Optional[Dict[str, str]]: the mapping of the first field to
+                                          the second field of every row,
+                                          or None if the file does not
+                                          exist
+
+        :raises OSError:
+
+        """
+        try:
+            mtime = os.stat(filename).st_mtime
+        except FileNotFoundError:
+            with self._lock:
+                self._mappings.pop(filename, None)
+
+            return None
+
+        with self._lock:
+            entry = self._mappings.get(filename)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+
+        mapping: Dict[str, str] = {}
+
+        with open(filename) as fp:
+            for row in csv.reader(fp):
+                if len(row) < 2:
+                    continue
+
+                # the first matching row wins
+                mapping.setdefault(row[0], row[1])
+
+        with self._lock:
+            self._mappings[filename] = (mtime, mapping)
+
+        return mapping
+
+    def clear(self):
+        """
+        Removes all cached mappings.
+
+        """
+        with self._lock:
+            self._mappings.clear()
+
+
+# process wide caches shared by all resource adapter instances
+config_cache = ResourceAdapterConfigCache()
+instance_size_mapping_cache = InstanceSizeMappingCache()
+
+
+def _is_resource_adapter_config(obj) -> bool:
+    return isinstance(obj, (ResourceAdapterConfig, ResourceAdapterSetting))
+
+
+@event.listens_for(Session, 'after_flush')
+def _after_flush(session: Session, flush_context):  # pylint: disable=unused-argument
+    for obj in (session.new | session.dirty | session.deleted):
+        if _is_resource_adapter_config(obj):
+            session.info['resource_adapter_config_changed'] = True
+            config_cache.invalidate()
+            break
+
+
+@event.listens_for(Session, 'after_commit')
+def _after_commit(session: Session):
+    #
+    # Invalidate again once the changes are committed, in case the cache
+    # was repopulated from another session in between
+    #
+    if session.info.pop('resource_adapter_config_changed', False):
+        config_cache.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _after_rollback(session: Session):
+    if session.info.pop('resource_adapter_config_changed', False):
+        config_cache.invalidate()
@@ -128,16 +128,17 @@ class Default(ResourceAdapter):
     def deleteNode(self, nodes: List[Node]) -> None:
         """Remove boot configuration for deleted nodes
         """
-        for node in nodes:
-            self.__delete_boot_configuration(node)
+        self.__delete_boot_configuration(nodes)
 
         self.hookAction('delete', [node.name for node in nodes])
 
-    def __delete_boot_configuration(self, node: Node) -> None:
+    def __delete_boot_configuration(self, nodes: List[Node]) -> None:
         """Remove PXE boot files and DHCP configuration
         """
-        self._bhm.rmPXEFile(node)
-        self._bhm.removeDhcpLease(node)
+        for node in nodes:
+            self._bhm.rmPXEFile(node)
+
+        self._bhm.removeDhcpLeases(nodes)
 
     def rebootNode(self, nodes: List[Node],
                    bSoftReset: Optional[bool] = False):
@@ -312,10 +313,6 @@ class Default(ResourceAdapter):
 
             dbSession.add(node)
 
-            # Create DHCP/PXE configuration
-            self.writeLocalBootConfiguration(
-                node, dbHardwareProfile, dbSoftwareProfile)
-
             # Get the provisioning nic
             nics = get_provisioning_nics(node)
 
@@ -327,6 +324,10 @@ class Default(ResourceAdapter):
 
             newNodes.append(node)
 
+        # Create DHCP/PXE configuration
+        self.writeLocalBootConfigurations(
+            newNodes, dbHardwareProfile, dbSoftwareProfile)
+
         return newNodes
 
     def stop(self, hardwareProfileName, deviceName): \
@@ -0,0 +1,99 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+import logging
+import pkgutil
+import threading
+
+from tortuga.logging import RESOURCE_ADAPTER_NAMESPACE
+
+
+logger = logging.getLogger(RESOURCE_ADAPTER_NAMESPACE)
+
+
+RESOURCE_ADAPTER_PACKAGE = 'tortuga.resourceAdapter'
+RESOURCE_ADAPTER_REGISTRY = {}
+
+_discovery_lock = threading.RLock()
+_discovered = False
+
+
+def discover_resource_adapters(refresh: bool = False):
+    """
+    Imports all modules in RESOURCE_ADAPTER_PACKAGE, so that the resource
+    adapters they define are registered. This only happens once per
+    process, unless a refresh is requested, i.e. after installing a kit.
+
+    :param bool refresh: search for resource adapters again, even if they
+                         have been searched for already
+
+    """
+    global _discovered
+
+    with _discovery_lock:
+        if _discovered and not refresh:
+            return
+
+        logger.debug('Searching for resource adapters in package: {}'.format(
+            RESOURCE_ADAPTER_PACKAGE))
+
+        importlib.invalidate_caches()
+        pkg = importlib.import_module(RESOURCE_ADAPTER_PACKAGE)
+
+        for _, name, _ in pkgutil.walk_packages(
+                pkg.__path__, prefix='{}.'.format(RESOURCE_ADAPTER_PACKAGE)):
+            try:
+                importlib.import_module(name)
+            except Exception:
+                logger.exception(
+                    'Error loading resource adapter module: {}'.format(name))
+
+        _discovered = True
+
+
+def register_resource_adapter(adapter_class):
+    """
+    Registers a resource adapter.
+
+    :param adapter_class: a subclass of ResourceAdapter
+
+    """
+    name = adapter_class.__adaptername__.lower()
+    if RESOURCE_ADAPTER_REGISTRY.get(name) is adapter_class:
+        return
+    RESOURCE_ADAPTER_REGISTRY[name] = adapter_class
+    logger.debug('Resource adapter registered: {}'.format(name))
+
+
+def get_resource_adapter(adapter_name: str):
+    """
+    Gets a resource adapter class from the registry.
+
+    :param adapter_name: the name of the resource adapter
+
+    :return: the resource adapter class, or None if not found
+
+    """
+    return RESOURCE_ADAPTER_REGISTRY.get(adapter_name.lower())
+
+
+def get_all_resource_adapters():
+    """
+    Gets a list of all resource adapters
+
+    :return: a list of resource adapter classes
+
+    """
+    return [ra for ra in RESOURCE_ADAPTER_REGISTRY.values()]
@@ -14,7 +14,6 @@
 
 # pylint: disable=logging-not-lazy,no-self-use,no-member,maybe-no-member
 
-import csv
 import logging
 import os.path
 import re
@@ -49,6 +48,8 @@ from tortuga.resourceAdapterConfiguration.validator import (ConfigurationValidat
                                                             ValidationError)
 from tortuga.schema import ResourceAdapterConfigSchema
 
+from .configCache import config_cache, instance_size_mapping_cache
+from .registry import register_resource_adapter
 from .userDataMixin import UserDataMixin
 
 
@@ -57,7 +58,28 @@ cm = ConfigManager()
 DEFAULT_CONFIGURATION_PROFILE_NAME = 'Default'
 
 
-class ResourceAdapter(UserDataMixin): \
+class ResourceAdapterMeta(type):
+    """
+    Metaclass for resource adapters.
+
+    The purpose of this metaclass is to register resource adapters so that
+    they can easily be looked-up by name.
+
+    """
+    def __init__(cls, name, bases, attrs):
+        super().__init__(name, bases, attrs)
+
+        #
+        # Don't attempt to register the base resource adapter, or any
+        # other class without an adapter name
+        #
+        if not cls.__adaptername__:
+            return
+
+        register_resource_adapter(cls)
+
+
+class ResourceAdapter(UserDataMixin, metaclass=ResourceAdapterMeta): \
         # pylint: disable=too-many-public-methods
     """
     This is the base class for all resource adapters to derive from.
@@ -103,6 +125,21 @@ class ResourceAdapter(UserDataMixin): \
 
         self.session = None
 
+    def reset(self):
+        """
+        Discards any state kept by this instance for a single request,
+        such as the database session, the tags requested and parameters
+        read from the database. Resource adapter instances are reused (see
+        tortuga.resourceAdapter.resourceAdapterFactory.get_api), and this
+        is called every time an instance is reused. Override this in your
+        implementations if they keep any other such state, making sure to
+        call the superclass method.
+
+        """
+        self.__private_dns_zone = None
+        self.__tags_requested = {}
+        self.session = None
+
     @property
     def addHostSession(self):
         return self._addHostSession
@@ -153,6 +190,36 @@ class ResourceAdapter(UserDataMixin): \
         """
         raise NotImplemented()
 
+    def set_node_tags(self, nodes: List[Node], tags: Dict[str, str]):
+        """
+        Sets tags on a number of nodes in the resource adapter/provider
+        instances. By default, set_node_tag() is called for every node and
+        tag; override this if the provider can tag many instances in a
+        single API call.
+
+        :param List[Node] nodes:   the Tortuga nodes
+        :param Dict[str, str] tags: the tags to set, and their values
+
+        """
+        for node in nodes:
+            for tag_name, tag_value in tags.items():
+                self.set_node_tag(node, tag_name, tag_value)
+
+    def unset_node_tags(self, nodes: List[Node], tag_names: List[str]):
+        """
+        Removes tags from a number of nodes in the resource
+        adapter/provider instances. By default, unset_node_tag() is called
+        for every node and tag; override this if the provider can untag
+        many instances in a single API call.
+
+        :param List[Node] nodes:     the Tortuga nodes
+        :param List[str] tag_names:  the names of the tags to remove
+
+        """
+        for node in nodes:
+            for tag_name in tag_names:
+                self.unset_node_tag(node, tag_name)
+
     def fire_state_change_event(self, db_node: Node, previous_state: str):
         """
         Fires a node state changed event. This is a "fake" operation allowing
@@ -536,6 +603,20 @@ class ResourceAdapter(UserDataMixin): \
             NicNotFound
         """
 
+        self.writeLocalBootConfigurations(
+            [node], hardwareprofile, softwareprofile)
+
+    def writeLocalBootConfigurations(self, nodes: List[Node],
+                                     hardwareprofile: HardwareProfile,
+                                     softwareprofile: SoftwareProfile):
+        """
+        Writes the PXE files of a number of nodes in the same hardware and
+        software profile, and adds their DHCP leases in bulk.
+
+        Raises:
+            NicNotFound
+        """
+
         if not hardwareprofile.nics:
             # Hardware profile has no provisioning NICs defined. This
             # shouldn't happen...
@@ -549,31 +630,40 @@ class ResourceAdapter(UserDataMixin): \
         # Determine the provisioning nic for the hardware profile
         hwProfileProvisioningNic = hardwareprofile.nics[0]
 
-        nic = None
+        # Set up DHCP/PXE for newly addded nodes
+        bhm = self.osObject.getOsBootHostManager(self._cm)
 
-        if hwProfileProvisioningNic.network:
-            # Find the nic attached to the newly added node that is on
-            # the same network as the provisioning nic.
-            nic = self.__findNicForProvisioningNetwork(
-                node.nics, hwProfileProvisioningNic.network)
+        node_nics = []
 
-        if not nic or not nic.mac:
-            self._logger.warning(
-                'MAC address not defined for nic (ip=[%s]) on node [%s]' % (
-                    nic.ip, node.name))
+        for node in nodes:
+            nic = None
 
-            return
+            if hwProfileProvisioningNic.network:
+                # Find the nic attached to the newly added node that is on
+                # the same network as the provisioning nic.
+                nic = self.__findNicForProvisioningNetwork(
+                    node.nics, hwProfileProvisioningNic.network)
 
-        # Set up DHCP/PXE for newly addded node
-        bhm = self.osObject.getOsBootHostManager(self._cm)
+            if not nic or not nic.mac:
+                self._logger.warning(
+                    'MAC address not defined for nic (ip=[%s]) on node'
+                    ' [%s]' % (nic.ip if nic else None, node.name))
+
+                continue
 
-        # Write out the PXE file
-        bhm.writePXEFile(
-            self.session, node, hardwareprofile=hardwareprofile,
+            node_nics.append((node, nic))
+
+        if not node_nics:
+            return
+
+        # Write out the PXE files
+        bhm.writePXEFiles(
+            self.session, [node for node, _ in node_nics],
+            hardwareprofile=hardwareprofile,
             softwareprofile=softwareprofile, localboot=False)
 
-        # Add a DHCP lease
-        bhm.addDhcpLease(node, nic)
+        # Add the DHCP leases
+        bhm.addDhcpLeases(node_nics)
 
     def removeLocalBootConfiguration(self, node: Node) -> None:
         bhm = self.osObject.getOsBootHostManager(self._cm)
@@ -649,17 +739,12 @@ class ResourceAdapter(UserDataMixin): \
             self._cm.getKitConfigBase(),
             '{0}-instance-sizes.csv'.format(self.__adaptername__))
 
-        if not os.path.exists(fn):
-            return 1
-
         try:
-            with open(fn) as fp:
-                reader = csv.reader(fp)
-                for row in reader:
-                    if row[0] == value:
-                        return int(row[1])
+            mapping = instance_size_mapping_cache.get(fn)
+            if mapping is None or value not in mapping:
+                return 1
 
-            return 1
+            return int(mapping[value])
         except Exception as exc:  # pylint: disable=broad-except
             self._logger.error(
                 'Error processing instance type mapping'
@@ -672,7 +757,19 @@ class ResourceAdapter(UserDataMixin): \
         """
         Deserialize resource adapter configuration to key/value pairs
 
+        The resolved configuration is cached per configuration profile,
+        until the configuration profiles are changed.
+
         """
+        profile = DEFAULT_CONFIGURATION_PROFILE_NAME
+        if node.instance and node.instance.resource_adapter_configuration:
+            profile = node.instance.resource_adapter_configuration.name
+
+        processed_config = config_cache.get(self.__adaptername__, profile)
+        if processed_config is not None:
+            return processed_config
+
+        version = config_cache.version
 
         #
         # Default settings dict is blank
@@ -719,6 +816,9 @@ class ResourceAdapter(UserDataMixin): \
         #
         self.process_config(processed_config)
 
+        config_cache.add(self.__adaptername__, profile, processed_config,
+                         version=version)
+
         return processed_config
 
     def load_resource_adapter_config(self, session: Session,
@@ -12,43 +12,96 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import pkgutil
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
 
 from tortuga.exceptions.resourceNotFound import ResourceNotFound
-import tortuga.resourceAdapter
+
+from .registry import (discover_resource_adapters, get_all_resource_adapters,
+                       get_resource_adapter)
+
+
+#
+# The number of resource adapter instances cached per thread
+#
+MAX_CACHED_INSTANCES = 32
+
+#
+# Resource adapter instances are cached per thread, as callers set
+# per-request state, such as the database session, on them
+#
+_instances = threading.local()
+
+#
+# Incremented whenever the cached instances must be discarded
+#
+_generation = 0
+
+#
+# The minimum number of seconds between searches for a resource adapter
+# that was not found
+#
+MISSING_ADAPTER_RESCAN_INTERVAL = 60
+
+#
+# The names of the resource adapters that were not found, and when they
+# were last searched for
+#
+_missing_adapters = {}
+_missing_adapters_lock = threading.Lock()
 
 
 def find_resourceadapters():
     """
-    Finds all resource adapter classes.
+    Finds all resource adapter classes. The resource adapter modules are
+    only searched for the first time this is called, after that the
+    registry is used.
 
     :return List[ResourceAdapter]: a list of all resource adapter classes
 
     """
-    subclasses = []
+    discover_resource_adapters()
 
-    def look_for_subclass(module_name):
-        module = __import__(module_name)
+    return get_all_resource_adapters()
 
-        d = module.__dict__
-        for m in module_name.split('.')[1:]:
-            d = d[m].__dict__
 
-        for key, entry in d.items():
-            if key == tortuga.resourceAdapter.resourceAdapter.ResourceAdapter.__name__:
-                continue
+def refresh_resourceadapters():
+    """
+    Searches for resource adapter modules again, i.e. after a kit has been
+    installed, and discards all cached resource adapter instances.
 
-            try:
-                if issubclass(entry, tortuga.resourceAdapter.resourceAdapter.ResourceAdapter):
-                    subclasses.append(entry)
-            except TypeError:
-                continue
+    """
+    global _generation
+
+    discover_resource_adapters(refresh=True)
+
+    with _missing_adapters_lock:
+        _missing_adapters.clear()
+
+    _generation += 1
+
+
+def _should_search_missing(adapter_name: str) -> bool:
+    """
+    Whether or not to search for a resource adapter that was not found
+    again. Searches are made at most once per
+    MISSING_ADAPTER_RESCAN_INTERVAL seconds for every name.
+
+    """
+    name = adapter_name.lower()
+    now = time.monotonic()
 
-    for _, modulename, _ in pkgutil.walk_packages(
-            tortuga.resourceAdapter.__path__):
-        look_for_subclass('tortuga.resourceAdapter.{0}'.format(modulename))
+    with _missing_adapters_lock:
+        searched = _missing_adapters.get(name)
+        if searched is not None and \
+                now - searched < MISSING_ADAPTER_RESCAN_INTERVAL:
+            return False
 
-    return subclasses
+        _missing_adapters[name] = now
+
+        return True
 
 
 def get_resourceadapter_class(adapter_name: str):
@@ -60,22 +113,58 @@ def get_resourceadapter_class(adapter_name: str):
     :raises ResourceNotFound:
 
     """
-    for adapter in find_resourceadapters():
-        if adapter.__adaptername__.lower() == adapter_name.lower():
-            return adapter
+    discover_resource_adapters()
+
+    adapter = get_resource_adapter(adapter_name)
+    if adapter is None and _should_search_missing(adapter_name):
+        #
+        # The resource adapter may have been installed (by another
+        # process) since the resource adapter modules were searched.
+        # Modules that were imported already are not imported again, so
+        # the cached instances of other resource adapters are kept.
+        #
+        discover_resource_adapters(refresh=True)
+        adapter = get_resource_adapter(adapter_name)
 
-    raise ResourceNotFound(
-        'Unable to find resource adapter [{0}]'.format(adapter_name))
+    if adapter is None:
+        raise ResourceNotFound(
+            'Unable to find resource adapter [{0}]'.format(adapter_name))
 
+    return adapter
 
-def get_api(adapter_name: str):
+
+def get_api(adapter_name: str, addHostSession: Optional[str] = None):
     """
     Gets an instantiated resource adapter class for the given resource
-    adapter name.
+    adapter name. Instances are created once per (resource adapter name,
+    add host session) and thread, and are then reused.
 
     :param adapter_name:      the name of the resource adapter
+    :param addHostSession:    the add host session the resource adapter
+                              is used in, if any
     :return: ResourceAdapter: a resource adapter instance
     :raises ResourceNotFound:
 
     """
-    return get_resourceadapter_class(adapter_name)()
+    if getattr(_instances, 'generation', None) != _generation:
+        _instances.cache = OrderedDict()
+        _instances.generation = _generation
+
+    cache = _instances.cache
+    key = (adapter_name.lower(), addHostSession)
+
+    adapter = cache.get(key)
+    if adapter is not None:
+        cache.move_to_end(key)
+        adapter.reset()
+        return adapter
+
+    adapter_class = get_resourceadapter_class(adapter_name)
+    adapter = adapter_class(addHostSession=addHostSession) \
+        if addHostSession else adapter_class()
+
+    cache[key] = adapter
+    while len(cache) > MAX_CACHED_INSTANCES:
+        cache.popitem(last=False)
+
+    return adapter
@@ -0,0 +1,267 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import uuid
+from collections import OrderedDict, namedtuple
+from typing import Dict, Iterable, List, Optional
+
+from redis import Redis
+from redis.exceptions import ResponseError
+from sqlalchemy.orm.session import Session
+
+from tortuga.db.models.node import Node
+from tortuga.logging import RESOURCE_ADAPTER_NAMESPACE
+from tortuga.objectstore.manager import ObjectStoreManager
+from .resourceAdapter import ResourceAdapter
+from .resourceAdapterFactory import get_api
+
+
+logger = logging.getLogger(RESOURCE_ADAPTER_NAMESPACE)
+
+
+#
+# A change to a node tag, to be pushed to the resource adapter. The value
+# is ignored if the tag was deleted.
+#
+NodeTagChange = namedtuple('NodeTagChange',
+                           ['node_id', 'name', 'value', 'deleted'])
+
+
+class NodeTagSyncQueue:
+    """
+    Buffers node tag changes in Redis until they are pushed to the resource
+    adapters, so that changes made over a short window can be pushed
+    together. Only the last change to every node tag is kept.
+
+    """
+    DEFAULT_WINDOW = 5
+
+    PENDING_KEY = 'tag-sync:pending'
+    PROCESSING_KEY = 'tag-sync:processing'
+    SCHEDULED_KEY = 'tag-sync:scheduled'
+
+    #
+    # How long (in seconds) a scheduled sync is waited for before another
+    # one is scheduled, in case the sync task was lost
+    #
+    SCHEDULED_EXPIRE = 60
+
+    def __init__(self, redis_client: Optional[Redis] = None,
+                 window: int = DEFAULT_WINDOW):
+        """
+        Initializer.
+
+        :param Optional[Redis] redis_client: the Redis client, defaults to
+                                             the shared object store client
+        :param int window:                   the number of seconds changes
+                                             are buffered for
+
+        """
+        self._redis = redis_client or ObjectStoreManager.get_redis_client()
+        self.window = window
+
+    def add(self, changes: Iterable[NodeTagChange]):
+        """
+        Adds node tag changes to the queue.
+
+        :param Iterable[NodeTagChange] changes: the changes to add
+
+        """
+        pipeline = self._redis.pipeline()
+        for change in changes:
+            pipeline.hset(
+                self.PENDING_KEY,
+                '{}:{}'.format(change.node_id, change.name),
+                json.dumps(change._asdict())
+            )
+        pipeline.execute()
+
+    def schedule(self) -> bool:
+        """
+        Marks a sync of the queued changes as scheduled.
+
+        :return bool: True if the caller has to schedule the sync, False if
+                      one is scheduled already
+
+        """
+        return bool(self._redis.set(self.SCHEDULED_KEY, '1',
+                                    ex=self.SCHEDULED_EXPIRE, nx=True))
+
+    def drain(self) -> List[NodeTagChange]:
+        """
+        Removes all queued changes from the queue. Changes added from this
+        point on are synced by the next scheduled sync.
+
+        :return List[NodeTagChange]: the queued changes
+
+        """
+        self._redis.delete(self.SCHEDULED_KEY)
+
+        processing_key = '{}:{}'.format(self.PROCESSING_KEY, uuid.uuid4())
+        try:
+            self._redis.rename(self.PENDING_KEY, processing_key)
+        except ResponseError:
+            # nothing is queued
+            return []
+
+        pipeline = self._redis.pipeline()
+        pipeline.hgetall(processing_key)
+        pipeline.delete(processing_key)
+        queued = pipeline.execute()[0] or {}
+
+        return [NodeTagChange(**json.loads(value))
+                for value in queued.values()]
+
+
+class NodeTagSynchronizer:
+    """
+    Pushes node tag changes to the resource adapters. Nodes in the same
+    resource adapter that have the same changes are tagged together, using
+    the bulk set_node_tags()/unset_node_tags() resource adapter methods.
+
+    The number of calls made to the resource adapters (and thereby to the
+    cloud provider APIs) is recorded in the statistics, which are kept in
+    Redis so they are shared by all processes.
+
+    """
+    STATS_KEY = 'tag-sync:stats'
+    STATS_FIELDS = ['changes', 'nodes', 'api_calls', 'failures']
+
+    def __init__(self, session: Session,
+                 redis_client: Optional[Redis] = None):
+        """
+        Initializer.
+
+        :param Session session:              the database session
+        :param Optional[Redis] redis_client: the Redis client, defaults to
+                                             the shared object store client
+
+        """
+        self._session = session
+        self._redis = redis_client or ObjectStoreManager.get_redis_client()
+
+    @classmethod
+    def get_stats(cls, redis_client: Optional[Redis] = None) -> dict:
+        """
+        Gets the synchronizer statistics, for all processes.
+
+        :param Optional[Redis] redis_client: the Redis client, defaults to
+                                             the shared object store client
+
+        :return dict: the number of changes and nodes synced, the number of
+                      resource adapter calls made, and the number of those
+                      that failed
+
+        """
+        redis_client = redis_client or ObjectStoreManager.get_redis_client()
+
+        values = redis_client.hmget(cls.STATS_KEY, cls.STATS_FIELDS)
+
+        return {field: int(value or 0)
+                for field, value in zip(cls.STATS_FIELDS, values)}
+
+    def _add_stats(self, **counts: int):
+        pipeline = self._redis.pipeline()
+        for field, count in counts.items():
+            if count:
+                pipeline.hincrby(self.STATS_KEY, field, count)
+        pipeline.execute()
+
+    def sync(self, changes: List[NodeTagChange]) -> int:
+        """
+        Pushes node tag changes to the resource adapters.
+
+        :param List[NodeTagChange] changes: the changes to push
+
+        :return int: the number of resource adapter calls made
+
+        """
+        #
+        # The changes to every node, as {tag name: [deleted, value]}
+        #
+        node_changes: Dict[int, Dict[str, list]] = OrderedDict()
+        for change in changes:
+            node_changes.setdefault(int(change.node_id), {})[change.name] = \
+                [bool(change.deleted), change.value]
+
+        if not node_changes:
+            return 0
+
+        nodes = self._session.query(Node).filter(
+            Node.id.in_(list(node_changes.keys()))).all()
+
+        #
+        # Group the nodes by resource adapter, then by changes
+        #
+        groups: Dict[str, Dict[str, List[Node]]] = OrderedDict()
+        for node in nodes:
+            resourceadapter = node.hardwareprofile.resourceadapter
+            if resourceadapter is None:
+                logger.warning(
+                    'Node [%s] has no resource adapter, tags not synced',
+                    node.name)
+                continue
+
+            key = json.dumps(node_changes[node.id], sort_keys=True)
+            groups.setdefault(resourceadapter.name, OrderedDict()).setdefault(
+                key, []).append(node)
+
+        api_calls = 0
+        failures = 0
+
+        for adapter_name, adapter_groups in groups.items():
+            adapter = get_api(adapter_name)
+            adapter.session = self._session
+
+            for key, group_nodes in adapter_groups.items():
+                tags = json.loads(key)
+
+                for method, base_method, arg in (
+                        ('unset_node_tags', ResourceAdapter.unset_node_tags,
+                         [name for name, (deleted, _) in tags.items()
+                          if deleted]),
+                        ('set_node_tags', ResourceAdapter.set_node_tags,
+                         {name: value for name, (deleted, value)
+                          in tags.items() if not deleted})):
+                    if not arg:
+                        continue
+
+                    if getattr(type(adapter), method) is base_method:
+                        # one call per node and tag
+                        calls = len(group_nodes) * len(arg)
+                    else:
+                        calls = 1
+
+                    api_calls += calls
+
+                    try:
+                        getattr(adapter, method)(group_nodes, arg)
+                    except Exception as ex:  # pylint: disable=broad-except
+                        logger.error(
+                            'Error syncing tags with resource adapter'
+                            ' [%s] for nodes [%s]: %s', adapter_name,
+                            ' '.join(node.name for node in group_nodes), ex)
+
+                        failures += calls
+
+        logger.info(
+            'Synced %d tag change(s) for %d node(s) with %d resource'
+            ' adapter call(s)', len(changes), len(nodes), api_calls)
+
+        self._add_stats(changes=len(changes), nodes=len(nodes),
+                        api_calls=api_calls, failures=failures)
+
+        return api_calls
@@ -18,6 +18,7 @@ from tortuga.addhost.addHostRequest import process_addhost_request
 from tortuga.addhost.deleteHostRequest import process_delete_host_request
 from tortuga.logging import RESOURCE_ADAPTER_NAMESPACE
 from tortuga.tasks.celery import app
+from .tagSync import NodeTagSyncQueue, NodeTagSynchronizer
 
 
 logger = logging.getLogger(RESOURCE_ADAPTER_NAMESPACE)
@@ -36,3 +37,13 @@ def delete_nodes(self, nodespec: str, force: bool = False) -> None:
         # use Celery task id as 'addHostSession'
         process_delete_host_request(
             session, self.request.id, nodespec, force=force)
+
+
+@app.task()
+def sync_node_tags() -> None:
+    changes = NodeTagSyncQueue().drain()
+    if not changes:
+        return
+
+    with app.dbm.session() as session:
+        NodeTagSynchronizer(session).sync(changes)
@@ -36,8 +36,9 @@ class ResourceRequestStoreManager:
             # We want to keep resource requests around indefinitely, so
             # no expiry here!
             #
-            object_store = ObjectStoreManager.get('resourcerequests',
-                                                  expire=0)
+            object_store = ObjectStoreManager.get(
+                'resourcerequests', expire=0,
+                indexes=['resource_type'], sorted_indexes=['timestamp'])
             cls._event_store = ObjectStoreResourceRequestStore(object_store)
         return cls._event_store
 
@@ -20,6 +20,7 @@ from tortuga.events.types import (ResourceRequestCreated,
                                   ResourceRequestUpdated,
                                   ResourceRequestDeleted)
 from tortuga.logging import EVENTS_NAMESPACE
+from tortuga.typestore.base import Cursor
 from tortuga.typestore.objectstore import ObjectStoreTypeStore
 from .types import BaseResourceRequest
 from .types import get_resource_request_class
@@ -71,6 +72,7 @@ class ResourceRequestStore:
             order_desc: bool = False,
             order_alpha: bool = False,
             limit: Optional[int] = None,
+            cursor: Optional[Cursor] = None,
             **filters) -> Iterator[BaseResourceRequest]:
         """
         Gets a iterator of resource_requests from the resource_request store.
@@ -80,6 +82,8 @@ class ResourceRequestStore:
         :param bool order_alpha: order alphabetically (instead of numerically)
         :param int limit:        the number of objects to limit in the
                                  iterator
+        :param Cursor cursor:    start after the object this cursor points
+                                 at
         :param filters:          one or more filters to apply to the list
 
         :return: an iterator of resource_requests
@@ -22,13 +22,15 @@ from tortuga.config.configManager import ConfigManager
 from tortuga.db.componentDbApi import ComponentDbApi
 from tortuga.db.globalParameterDbApi import GlobalParameterDbApi
 from tortuga.db.kitDbApi import KitDbApi
+from tortuga.db.kitsDbHandler import KitsDbHandler
 from tortuga.db.nodeDbApi import NodeDbApi
 from tortuga.db.softwareProfileDbApi import SoftwareProfileDbApi
 from tortuga.events.types import SoftwareProfileTagsChanged
 from tortuga.exceptions.componentNotFound import ComponentNotFound
 from tortuga.exceptions.kitNotFound import KitNotFound
 from tortuga.helper import osHelper
-from tortuga.kit.registry import get_kit_installer
+from tortuga.kit.metadataCache import metadata_cache
+from tortuga.kit.registry import get_kit_installer_instance
 from tortuga.logging import SOFTWARE_PROFILE_NAMESPACE
 from tortuga.objects.kit import Kit
 from tortuga.objects.softwareProfile import SoftwareProfile
@@ -50,6 +52,7 @@ class SoftwareProfileManager(TortugaObjectManager): \
         self._component_db_api = ComponentDbApi()
         self._global_param_db_api = GlobalParameterDbApi()
         self._kit_db_api = KitDbApi()
+        self._kits_db_handler = KitsDbHandler()
         self._config_manager = ConfigManager()
         self._logger = logging.getLogger(SOFTWARE_PROFILE_NAMESPACE)
 
@@ -599,8 +602,7 @@ class SoftwareProfileManager(TortugaObjectManager): \
         """
         kit_spec = (kit.getName(), kit.getVersion(), kit.getIteration())
 
-        installer = get_kit_installer(kit_spec)()
-        installer.session = session
+        installer = get_kit_installer_instance(kit_spec, session=session)
         comp_installer = installer.get_component_installer(comp_name)
 
         if comp_installer is None:
@@ -727,8 +729,7 @@ class SoftwareProfileManager(TortugaObjectManager): \
         """
         kit_spec = (kit.getName(), kit.getVersion(), kit.getIteration())
 
-        installer = get_kit_installer(kit_spec)()
-        installer.session = session
+        installer = get_kit_installer_instance(kit_spec, session=session)
 
         comp_installer = installer.get_component_installer(comp_name)
 
@@ -869,7 +870,8 @@ class SoftwareProfileManager(TortugaObjectManager): \
     def get_software_profile_metadata(
             self, session: Session, name: str) -> Dict[str, str]:
         """
-        Call action_get_metadata() method for all kits
+        Call action_get_metadata() method for all kits. The metadata
+        returned by every kit is cached (see tortuga.kit.metadataCache).
         """
 
         self._logger.debug(
@@ -877,19 +879,24 @@ class SoftwareProfileManager(TortugaObjectManager): \
 
         metadata: Dict[str, str] = {}
 
-        for kit in self._kit_db_api.getKitList(session):
-            if kit.getIsOs():
+        for kit in self._kits_db_handler.getKitList(session):
+            if kit.isOs:
                 # ignore OS kits
                 continue
 
-            kit_installer = get_kit_installer(
-                (kit.getName(), kit.getVersion(), kit.getIteration())
-            )()
-            kit_installer.session = session
+            kit_spec = (kit.name, kit.version, kit.iteration)
 
-            # we are only interested in software profile metadata
-            item = kit_installer.action_get_metadata(
-                software_profile_name=name)
+            version = metadata_cache.version
+            cached, item = metadata_cache.get(name, kit_spec)
+            if not cached:
+                kit_installer = get_kit_installer_instance(
+                    kit_spec, session=session)
+
+                # we are only interested in software profile metadata
+                item = kit_installer.action_get_metadata(
+                    software_profile_name=name)
+
+                metadata_cache.add(name, kit_spec, item, version=version)
 
             if item:
                 metadata.update(item)
@@ -14,7 +14,6 @@
 import logging
 from typing import Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import desc
 from sqlalchemy.orm import Session, sessionmaker
 
 from tortuga.db.dbManager import DbManager
@@ -24,7 +23,8 @@ from tortuga.db.models.softwareProfileTag import SoftwareProfileTag
 from tortuga.events.types import SoftwareProfileTagsChanged, TagCreated, \
     TagUpdated, TagDeleted
 from tortuga.objectstore.base import matches_filters
-from tortuga.typestore.base import TypeStore
+from tortuga.typestore.base import Cursor, TypeStore
+from tortuga.typestore.keyset import keyset_iter
 from .types import SoftwareProfile
 
 logger = logging.getLogger(__name__)
@@ -38,6 +38,17 @@ class SqlalchemySessionSoftwareProfileStore(TypeStore):
     """
     type_class = SoftwareProfile
 
+    #
+    # Maps SoftwareProfile attribute names to database columns, where they differ
+    #
+    COLUMNS = {
+        'min_nodes': 'minNodes',
+        'max_nodes': 'maxNodes',
+        'locked': 'lockedState',
+        'data_root': 'dataRoot',
+        'data_rsync': 'dataRsync',
+    }
+
     def __init__(self, db_manager: DbManager):
         self._Session = sessionmaker(bind=db_manager.engine)
 
@@ -118,25 +129,34 @@ class SqlalchemySessionSoftwareProfileStore(TypeStore):
             order_desc: bool = False,
             order_alpha: bool = False,
             limit: Optional[int] = None,
+            cursor: Optional[Cursor] = None,
             **filters) -> Iterator[SoftwareProfile]:
         logger.debug(
-            'list(order_by=%s, order_desc=%s, limit=%s, filters=%s) -> ...',
-            order_by, order_desc, limit, filters)
+            'list(order_by=%s, order_desc=%s, limit=%s, cursor=%s, '
+            'filters=%s) -> ...',
+            order_by, order_desc, limit, cursor, filters)
         session = self._Session()
         result = session.query(DbSoftwareProfile)
-        if order_by:
-            #
-            # Note: currently, order_alpha is ignored for SqlAlchemy,
-            #       as it is the default behavior for strings
-            #
-            if desc:
-                result = result.order_by(
-                    desc(getattr(DbSoftwareProfile, order_by))
-                )
-            else:
-                result = result.order_by(
-                    getattr(DbSoftwareProfile, order_by)
-                )
+        #
+        # Note: currently, order_alpha is ignored for SqlAlchemy,
+        #       as it is the default behavior for strings
+        #
+        # The primary key is always the last sort column, which gives a
+        # stable order for keyset pagination
+        #
+        columns = [DbSoftwareProfile.id]
+        values = [int(cursor.obj_id)] if cursor else None
+        if order_by and order_by != 'id':
+            columns.insert(0, getattr(DbSoftwareProfile,
+                                      self.COLUMNS.get(order_by, order_by)))
+            if cursor:
+                values.insert(0, cursor.value)
+        #
+        # Rows are read limit at a time, so that a page takes a single
+        # query unless the filters (applied below) reject rows
+        #
+        result = keyset_iter(result, columns, values, order_desc,
+                             batch_size=limit)
         count = 0
         for db_swp in result:
             swp = self._to_swp(db_swp)
@@ -148,6 +168,7 @@ class SqlalchemySessionSoftwareProfileStore(TypeStore):
                     session.close()
                     return
                 yield swp
+        session.close()
 
     def get(self, obj_id: str) -> Optional[SoftwareProfile]:
         logger.debug('get(obj_id=%s) -> ...', obj_id)
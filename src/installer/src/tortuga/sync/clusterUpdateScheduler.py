@@ -0,0 +1,263 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+from tortuga.logging import SYNC_NAMESPACE
+
+
+logger = logging.getLogger(SYNC_NAMESPACE)
+
+
+def merge_update_opts(merged: dict, opts: dict) -> dict:
+    """
+    Merges the options of a cluster update into those of an earlier one.
+    Dicts, such as the node and software profile tag deltas, are merged
+    recursively, lists are concatenated, and other values are replaced.
+
+    :param dict merged: the options to merge into, modified in place
+    :param dict opts:   the options to merge
+
+    :return dict: the merged options
+
+    """
+    for key, value in opts.items():
+        current = merged.get(key)
+
+        if isinstance(current, dict) and isinstance(value, dict):
+            merge_update_opts(current, value)
+
+        elif isinstance(current, list) and isinstance(value, list):
+            current.extend(copy.deepcopy(value))
+
+        else:
+            merged[key] = copy.deepcopy(value)
+
+    return merged
+
+
+def get_update_batch(opts: dict) -> str:
+    """
+    Gets the name of the batch a cluster update belongs to. Updates in
+    different batches run different update scripts, so they are never
+    merged.
+
+    :param dict opts: the update options
+
+    :return str: the batch name
+
+    """
+    if 'node' in opts or 'software_profile' in opts:
+        return 'tags'
+
+    if 'slurm_update' in opts:
+        return 'slurm:{}'.format(opts['slurm_update'].get('slurm_cluster'))
+
+    return 'cluster'
+
+
+class PendingUpdate:
+    """
+    A scheduled cluster update, with the merged options of all the
+    updates that were coalesced into it.
+
+    """
+    def __init__(self, due: float, deadline: float):
+        self.opts: dict = {}
+        self.reasons: Set[str] = set()
+        self.requests: int = 0
+        self.due = due
+        self.deadline = deadline
+
+
+class ClusterUpdateScheduler:
+    """
+    Debounces cluster updates. Updates scheduled while another update of
+    the same batch is pending are merged into it, and postpone it by
+    their delay, up to max_delay seconds after it was first scheduled.
+    At most max_running updates run at the same time.
+
+    """
+    def __init__(self, run_update: Callable[[dict], None],
+                 max_running: int = 1, max_delay: float = 60):
+        """
+        Initializer.
+
+        :param run_update:      the function that runs an update, given
+                                its (merged) options
+        :param int max_running: the maximum number of updates that run at
+                                the same time
+        :param float max_delay: the maximum number of seconds an update is
+                                postponed by updates merged into it
+
+        """
+        self._run_update = run_update
+        self._max_running = max_running
+        self._max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._pending: Dict[str, PendingUpdate] = {}
+        self._running: Set[str] = set()
+        self._thread: Optional[threading.Thread] = None
+
+        #
+        # Metrics
+        #
+        self._requests = 0
+        self._runs = 0
+        self._coalesced_requests = 0
+        self._run_durations: List[float] = []
+        self._total_run_duration = 0.0
+
+    def schedule(self, update_reason: Optional[str] = None,
+                 delay: float = 5, opts: Optional[dict] = None):
+        """
+        Schedules a cluster update.
+
+        :param str update_reason: the reason for the update, for logging
+        :param float delay:       the number of seconds to wait for more
+                                  updates before running
+        :param dict opts:         the update options
+
+        """
+        opts = opts or {}
+        batch = get_update_batch(opts)
+        now = time.monotonic()
+
+        with self._cond:
+            pending = self._pending.get(batch)
+
+            if pending is None:
+                pending = PendingUpdate(
+                    due=now + delay,
+                    deadline=now + max(delay, self._max_delay))
+                self._pending[batch] = pending
+
+                logger.debug(
+                    'Scheduling cluster update in %s seconds,'
+                    ' reason: %s, opts: %s' % (delay, update_reason, opts))
+            else:
+                pending.due = min(max(pending.due, now + delay),
+                                  pending.deadline)
+
+                logger.debug(
+                    'Merging cluster update into pending update,'
+                    ' reason: %s, opts: %s' % (update_reason, opts))
+
+            merge_update_opts(pending.opts, opts)
+            if update_reason:
+                pending.reasons.add(update_reason)
+            pending.requests += 1
+            self._requests += 1
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch,
+                                                daemon=True)
+                self._thread.start()
+
+            self._cond.notify_all()
+
+    def _next_due(self) -> Optional[str]:
+        """
+        Gets the batch of the pending update that is due first, and is
+        allowed to run.
+
+        """
+        if len(self._running) >= self._max_running:
+            return None
+
+        batches = [batch for batch in self._pending
+                   if batch not in self._running]
+        if not batches:
+            return None
+
+        return min(batches, key=lambda batch: self._pending[batch].due)
+
+    def _dispatch(self):
+        """
+        The thread worker that starts pending updates when they are due.
+
+        """
+        while True:
+            with self._cond:
+                while True:
+                    batch = self._next_due()
+                    timeout = None
+                    if batch is not None:
+                        timeout = self._pending[batch].due - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    self._cond.wait(timeout)
+
+                pending = self._pending.pop(batch)
+                self._running.add(batch)
+
+            threading.Thread(target=self._run, args=(batch, pending),
+                             daemon=True).start()
+
+    def _run(self, batch: str, pending: PendingUpdate):
+        """
+        Runs a pending update.
+
+        """
+        logger.debug(
+            'Running cluster update for %s request(s), reasons: %s' % (
+                pending.requests, ', '.join(sorted(pending.reasons))))
+
+        start = time.monotonic()
+        try:
+            self._run_update(pending.opts)
+
+        except Exception:
+            logger.exception('Cluster update failed')
+
+        finally:
+            duration = time.monotonic() - start
+
+            with self._cond:
+                self._running.discard(batch)
+                self._runs += 1
+                self._coalesced_requests += pending.requests
+                self._total_run_duration += duration
+                self._run_durations = (self._run_durations + [duration])[-100:]
+                self._cond.notify_all()
+
+    def get_metrics(self) -> dict:
+        """
+        Gets the scheduler metrics.
+
+        :return dict: the metrics
+
+        """
+        with self._cond:
+            return {
+                'queue_depth': len(self._pending),
+                'pending_requests': sum(
+                    pending.requests for pending in self._pending.values()),
+                'running': len(self._running),
+                'requests': self._requests,
+                'runs': self._runs,
+                'coalescing_ratio': self._coalesced_requests / self._runs
+                if self._runs else None,
+                'last_run_duration': self._run_durations[-1]
+                if self._run_durations else None,
+                'average_run_duration': self._total_run_duration / self._runs
+                if self._runs else None,
+                'max_run_duration': max(self._run_durations)
+                if self._run_durations else None,
+            }
@@ -69,3 +69,22 @@ class SyncApi(TortugaApi):
 
             # Wrap exception
             raise TortugaException(exception=ex)
+
+    def getUpdateMetrics(self):
+        """Return cluster update scheduler metrics
+
+            Returns:
+                dict - queue depth, coalescing ratio and run durations
+            Throws:
+                TortugaException
+        """
+        try:
+            return SyncManager().getUpdateMetrics()
+        except Exception as ex:
+            self._logger.exception('Error getting update metrics')
+
+            if isinstance(ex, TortugaException):
+                raise
+
+            # Wrap exception
+            raise TortugaException(exception=ex)
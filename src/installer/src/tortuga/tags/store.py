@@ -14,7 +14,6 @@
 import logging
 from typing import Iterator, Optional
 
-from sqlalchemy import desc
 from sqlalchemy.orm import Session, sessionmaker
 
 from tortuga.db.dbManager import DbManager
@@ -33,7 +32,8 @@ from tortuga.softwareprofile.types import SoftwareProfile
 from tortuga.hardwareprofile.manager import HardwareProfileStoreManager
 from tortuga.hardwareprofile.types import HardwareProfile
 from tortuga.objectstore.base import matches_filters
-from tortuga.typestore.base import TypeStore
+from tortuga.typestore.base import Cursor, TypeStore
+from tortuga.typestore.keyset import keyset_iter
 from .types import Tag
 
 
@@ -136,42 +136,70 @@ class SqlalchemySessionTagStore(TypeStore):
             order_desc: bool = False,
             order_alpha: bool = False,
             limit: Optional[int] = None,
+            cursor: Optional[Cursor] = None,
             **filters) -> Iterator[Tag]:
         logger.debug(
-            'list(order_by=%s, order_desc=%s, limit=%s, filters=%s) -> ...',
-            order_by, order_desc, limit, filters)
-        
-        session = self._Session()
-        result_nodes = session.query(NodeTag)
-        result_swps = session.query(SoftwareProfileTag)
-        result_hwps = session.query(HardwareProfileTag)
+            'list(order_by=%s, order_desc=%s, limit=%s, cursor=%s, '
+            'filters=%s) -> ...',
+            order_by, order_desc, limit, cursor, filters)
 
-        if order_by in ['id', 'object_type']:
+        #
+        # Tags are always listed node tags first, then software profile
+        # tags, then hardware profile tags. By default, each is ordered
+        # by object id and tag key (name), as their ids are. Tags can also
+        # be ordered by key, then object id, or by value.
+        #
+        if order_by in ('id', 'object_type'):
             order_by = None
-        if order_by == ['object_id']:
-            order_by = 'id'
-        if order_by:
+        if order_by not in (None, 'key', 'value'):
+            raise ValueError('Unsupported order_by: {}'.format(order_by))
+
+        cursor_type = None
+        if cursor:
+            cursor_type, cursor_object_id, cursor_name = \
+                Tag.parse_id(cursor.obj_id)
+
+        tables = [
+            ('node', NodeTag, NodeTag.node_id),
+            ('softwareprofile', SoftwareProfileTag,
+             SoftwareProfileTag.softwareprofile_id),
+            ('hardwareprofile', HardwareProfileTag,
+             HardwareProfileTag.hardwareprofile_id),
+        ]
+        if cursor_type:
+            #
+            # Skip the tables that were completely listed in previous pages
+            #
+            while tables and tables[0][0] != cursor_type:
+                tables.pop(0)
+
+        session = self._Session()
+        count = 0
+        for object_type, model, object_id_column in tables:
             #
             # Note: currently, order_alpha is ignored for SqlAlchemy,
             #       as it is the default behavior for strings
             #
-            if desc:
-                result_nodes = result_nodes.order_by(
-                    desc(getattr(NodeTag, order_by)))
-                result_swps = result_nodes.order_by(
-                    desc(getattr(SoftwareProfileTag, order_by)))
-                result_hwps = result_nodes.order_by(
-                    desc(getattr(HardwareProfileTag, order_by)))
-            else:
-                result_nodes = result_nodes.order_by(
-                    getattr(NodeTag, order_by))
-                result_swps = result_nodes.order_by(
-                    getattr(SoftwareProfileTag, order_by))
-                result_hwps = result_nodes.order_by(
-                    getattr(HardwareProfileTag, order_by))
+            columns = [object_id_column, model.name]
+            values = None
+            if object_type == cursor_type:
+                values = [int(cursor_object_id), cursor_name]
+            if order_by == 'key':
+                #
+                # The key is part of the tag id, so the cursor value is
+                # not needed
+                #
+                columns.reverse()
+                if values:
+                    values.reverse()
+            elif order_by == 'value':
+                columns.insert(0, model.value)
+                if values:
+                    values.insert(0, cursor.value)
+            result = keyset_iter(session.query(model), columns, values,
+                                 order_desc,
+                                 batch_size=limit - count if limit else None)
 
-        count = 0
-        for result in [result_nodes, result_swps, result_hwps]:
             for db_tag in result:
                 tag = self._to_tag(db_tag)
                 if matches_filters(tag, filters):
@@ -182,7 +210,8 @@ class SqlalchemySessionTagStore(TypeStore):
                         session.close()
                         return
                     yield tag
-    
+        session.close()
+
     def get(self, tag_id: str) -> Optional[Tag]:
         logger.debug('get(obj_id=%s) -> ...', tag_id)
 
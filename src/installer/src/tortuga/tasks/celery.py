@@ -59,6 +59,7 @@ if 'TORTUGA_TEST' in os.environ:
         include=[
             'tortuga.events.tasks',
             'tortuga.node.tasks',
+            'tortuga.puppet.tasks',
             'tortuga.resourceAdapter.tasks',
         ]
     )
@@ -130,6 +131,7 @@ else:
         include=[
             'tortuga.events.tasks',
             'tortuga.node.tasks',
+            'tortuga.puppet.tasks',
             'tortuga.resourceAdapter.tasks',
         ] + kit_task_modules + component_task_modules
     )
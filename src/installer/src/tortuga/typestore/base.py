@@ -1,8 +1,84 @@
-from typing import Type, Iterator, Optional
+import base64
+import binascii
+import json
+from typing import Any, Type, Iterator, Optional
 
 from tortuga.types.base import BaseType
 
 
+class Cursor:
+    """
+    A position in an ordered list of objects, used for keyset pagination.
+    The cursor refers to the last object of a page, by its id and by the
+    value of the attribute the list is ordered by. The next page starts
+    with the first object that sorts after that position.
+
+    """
+    def __init__(self, obj_id: str, value: Any = None):
+        """
+        Initialization.
+
+        :param str obj_id: the id of the last object returned
+        :param Any value:  the value of the order_by attribute of the last
+                           object returned
+
+        """
+        self.obj_id: str = obj_id
+        self.value: Any = value
+
+    @classmethod
+    def from_object(cls, obj: BaseType,
+                    order_by: Optional[str] = None) -> 'Cursor':
+        """
+        Creates a cursor pointing at an object.
+
+        :param BaseType obj: the object
+        :param str order_by: the name of the attribute the list is ordered
+                             by, if any
+
+        :return Cursor: the cursor
+
+        """
+        value = None
+        if order_by:
+            #
+            # Use the marshalled value, as that is what is stored
+            #
+            marshalled = obj.get_schema_class()().dump(obj).data
+            value = marshalled.get(order_by, None)
+
+        return cls(obj.id, value)
+
+    def encode(self) -> str:
+        """
+        Encodes the cursor as an opaque, URL-safe string.
+
+        :return str: the encoded cursor
+
+        """
+        data = json.dumps({'id': self.obj_id, 'value': self.value})
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    @classmethod
+    def decode(cls, token: str) -> 'Cursor':
+        """
+        Decodes a cursor previously encoded using encode().
+
+        :param str token: the encoded cursor
+
+        :raises ValueError: if the cursor is not valid
+
+        :return Cursor: the cursor
+
+        """
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode()))
+            return cls(data['id'], data.get('value', None))
+
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise ValueError('Invalid cursor: {}'.format(token))
+
+
 class TypeStore:
     """
     Base class for storing objects.
@@ -56,15 +132,20 @@ class TypeStore:
             order_desc: bool = False,
             order_alpha: bool = False,
             limit: Optional[int] = None,
+            cursor: Optional[Cursor] = None,
             **filters) -> Iterator[BaseType]:
         """
-        Gets a iterator of objects from the type store.
+        Gets a iterator of objects from the type store. Objects with the
+        same order_by value are always returned in a stable order, so that
+        a list can be paged through using cursors.
 
         :param str order_by:     the name of the object attribute to order by
         :param bool order_desc:  sort in descending order
         :param bool order_alpha: order alphabetically (instead of numerically)
         :param int limit:        the number of objects to limit in the
                                  iterator
+        :param Cursor cursor:    start after the object this cursor points
+                                 at
         :param filters:          one or more filters to apply to the list
 
         :return Iterator[BaseType]: an iterator of objects
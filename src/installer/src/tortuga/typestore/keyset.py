@@ -0,0 +1,108 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Iterator, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+
+def keyset_query(query: Query, columns: List[Any],
+                 values: Optional[List[Any]] = None,
+                 order_desc: bool = False) -> Query:
+    """
+    Orders a query by a list of columns and, optionally, restricts it to
+    the rows that sort after a given position (keyset pagination). The
+    last column must be unique and not nullable, i.e. the primary key, so
+    that the order is stable.
+
+    NULL values are sorted first in ascending order, and last in
+    descending order, which is consistent with both SQLite and MySQL.
+
+    :param Query query:        the query
+    :param List[Any] columns:  the columns to order by
+    :param List[Any] values:   the column values of the last row of the
+                               previous page, if any
+    :param bool order_desc:    sort in descending order
+
+    :return Query: the ordered (and restricted) query
+
+    """
+    if values is not None:
+        query = query.filter(_after(columns, values, order_desc))
+
+    if order_desc:
+        return query.order_by(*[column.desc() for column in columns])
+
+    return query.order_by(*columns)
+
+
+def keyset_iter(query: Query, columns: List[Any],
+                values: Optional[List[Any]] = None,
+                order_desc: bool = False,
+                batch_size: Optional[int] = None) -> Iterator[Any]:
+    """
+    Iterates over the rows of a query in keyset order (see keyset_query()),
+    fetching at most batch_size rows per SQL query. The next batch is only
+    fetched once the previous one has been consumed, so the cost of reading
+    a page does not depend on the number of rows that sort after it.
+
+    :param Query query:        the query
+    :param List[Any] columns:  the (mapped attribute) columns to order by
+    :param List[Any] values:   the column values of the last row of the
+                               previous page, if any
+    :param bool order_desc:    sort in descending order
+    :param int batch_size:     the number of rows per SQL query, None to
+                               fetch all rows at once
+
+    :return Iterator[Any]: the rows
+
+    """
+    while True:
+        batch = keyset_query(query, columns, values, order_desc)
+        if batch_size:
+            batch = batch.limit(batch_size)
+        rows = batch.all()
+
+        yield from rows
+
+        if not batch_size or len(rows) < batch_size:
+            return
+
+        values = [getattr(rows[-1], column.key) for column in columns]
+
+
+def _after(columns: List[Any], values: List[Any], order_desc: bool):
+    """
+    Builds the filter expression matching rows that sort after a
+    position, for keyset_query().
+
+    """
+    column, value = columns[0], values[0]
+
+    if len(columns) == 1:
+        return column < value if order_desc else column > value
+
+    rest = _after(columns[1:], values[1:], order_desc)
+
+    if value is None:
+        if order_desc:
+            return and_(column.is_(None), rest)
+        return or_(and_(column.is_(None), rest), column.isnot(None))
+
+    if order_desc:
+        return or_(column < value, column.is_(None),
+                   and_(column == value, rest))
+
+    return or_(column > value, and_(column == value, rest))
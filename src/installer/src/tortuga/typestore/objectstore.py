@@ -3,7 +3,7 @@ from typing import Iterator, Optional
 
 from tortuga.objectstore.base import matches_filters, ObjectStore
 from tortuga.types.base import BaseType
-from .base import TypeStore
+from .base import Cursor, TypeStore
 
 
 logger = logging.getLogger(__name__)
@@ -69,6 +69,7 @@ class ObjectStoreTypeStore(TypeStore):
             order_desc: bool = False,
             order_alpha: bool = False,
             limit: Optional[int] = None,
+            cursor: Optional[Cursor] = None,
             **filters) -> Iterator[BaseType]:
         """
         See superclass.
@@ -77,15 +78,33 @@ class ObjectStoreTypeStore(TypeStore):
 
         """
         logger.debug(
-            'list(order_by={}, order_desc={}, limit, filters={}) -> ...'.format(
-                order_by, order_desc, limit, filters
+            'list(order_by={}, order_desc={}, limit={}, cursor={}, '
+            'filters={}) -> ...'.format(
+                order_by, order_desc, limit, cursor, filters
             )
         )
 
+        #
+        # Reject paging through lists that can't be resumed from a cursor,
+        # rather than sorting all objects again for every page
+        #
+        if (limit or cursor) and not self._store.can_list_after(order_by):
+            raise ValueError(
+                'Can not page through a list ordered by {}'.format(order_by))
+
+        #
+        # Indexed filters are applied by the object store, so that
+        # non-matching objects are never unmarshalled
+        #
+        indexed_filters, filters = self._store.split_filters(filters)
+        after = (cursor.obj_id, cursor.value) if cursor else None
+
         count = 0
         for _, obj_dict in self._store.list_sorted(order_by=order_by,
                                                    order_desc=order_desc,
-                                                   order_alpha=order_alpha):
+                                                   order_alpha=order_alpha,
+                                                   after=after,
+                                                   **indexed_filters):
             obj = self.unmarshall(obj_dict)
             if matches_filters(obj, filters):
                 count += 1
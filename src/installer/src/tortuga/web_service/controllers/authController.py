@@ -14,9 +14,11 @@
 
 import cherrypy
 
+from tortuga.auth.credentialCache import credential_cache
 from tortuga.utility import tortugaStatus
 from tortuga.web_service.auth import methods
 from tortuga.web_service.auth.authenticator import CherryPyAuthenticator
+from tortuga.web_service.auth.decorators import authentication_required
 from tortuga.web_service.auth.exceptions import TortugaHTTPAuthError
 from .tortugaController import TortugaController
 
@@ -32,7 +34,13 @@ class AuthController(TortugaController):
             'path': '/v1/auth/login',
             'action': 'login',
             'method': ['GET', 'PUT', 'POST', 'DELETE']
-        }
+        },
+        {
+            'name': 'authCredentialCache',
+            'path': '/v1/auth/cache',
+            'action': 'getCredentialCacheStats',
+            'method': ['GET']
+        },
     ]
 
     @cherrypy.tools.json_out()
@@ -60,3 +68,12 @@ class AuthController(TortugaController):
                 'Authentication failed'
             )
             cherrypy.response.status = 401
+
+    @authentication_required()
+    @cherrypy.tools.json_out()
+    def getCredentialCacheStats(self):
+        """
+        Returns the hit/miss counters of the verified credential cache.
+
+        """
+        return self.formatResponse(credential_cache.get_stats())
@@ -20,6 +20,7 @@ import cherrypy
 
 from tortuga.exceptions.kitNotFound import KitNotFound
 from tortuga.kit.manager import KitManager
+from tortuga.kit.metadataCache import metadata_cache
 from tortuga.objects.tortugaObject import TortugaObjectList
 from tortuga.web_service.auth.decorators import authentication_required
 
@@ -38,6 +39,12 @@ class KitController(TortugaController):
             'action': 'kitsAction',
             'method': ['GET', 'DELETE']
         },
+        {
+            'name': 'kitMetadataCache',
+            'path': '/v1/kits/cache',
+            'action': 'getMetadataCacheStats',
+            'method': ['GET']
+        },
         {
             'name': 'userKitId',
             'path': '/v1/kits/:kit_id',
@@ -52,6 +59,15 @@ class KitController(TortugaController):
         },
     ]
 
+    @authentication_required()
+    @cherrypy.tools.json_out()
+    def getMetadataCacheStats(self):
+        """
+        Returns the hit/miss counters of the kit metadata cache.
+
+        """
+        return self.formatResponse(metadata_cache.get_stats())
+
     @cherrypy.tools.json_out()
     @cherrypy.tools.json_in()
     @authentication_required()
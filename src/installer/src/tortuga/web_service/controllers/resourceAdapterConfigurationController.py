@@ -31,6 +31,7 @@ from tortuga.objects.validators import FieldValidationError, RegexValidator
 from tortuga.resourceAdapter.resourceAdapter import ResourceAdapter
 from tortuga.resourceAdapter.resourceAdapterFactory import \
     get_resourceadapter_class
+from tortuga.resourceAdapter.tagSync import NodeTagSynchronizer
 from tortuga.resourceAdapterConfiguration.api import \
     ResourceAdapterConfigurationApi
 from tortuga.resourceAdapterConfiguration.validator \
@@ -53,6 +54,12 @@ class ResourceAdapterConfigurationController(TortugaController):
             'action': 'get_resource_adapters',
             'method': ['GET'],
         },
+        {
+            'name': 'get_tag_sync_stats',
+            'path': '/v1/resourceadapters/tagsync',
+            'action': 'get_tag_sync_stats',
+            'method': ['GET'],
+        },
         {
             'name': 'create_resource_adapter_configuration',
             'path': '/v1/resourceadapters/:(resadapter_name)/profile/:(name)',
@@ -91,6 +98,16 @@ class ResourceAdapterConfigurationController(TortugaController):
         },
     ]
 
+    @authentication_required()
+    @cherrypy.tools.json_out()
+    def get_tag_sync_stats(self):
+        """
+        Returns the node tag sync counters, including the number of
+        resource adapter (cloud provider API) calls made.
+
+        """
+        return self.formatResponse(NodeTagSynchronizer.get_stats())
+
     @cherrypy.tools.json_out()
     def get_resource_adapters(self):
         try:
@@ -89,6 +89,7 @@ class UpdateController(TortugaController):
 
             response = {
                 'running': status,
+                'metrics': self._syncApi.getUpdateMetrics(),
             }
         except Exception as ex:
             self._logger.exception('getUpdateStatus() failed')
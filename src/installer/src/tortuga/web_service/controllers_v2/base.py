@@ -12,15 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import logging
 import traceback
-from typing import Any, List
+import types
+from typing import Any, Iterator, List
+from urllib.parse import urlencode
 
 import cherrypy
 
 from tortuga.logging import WEBSERVICE_NAMESPACE
 from tortuga.types.base import BaseType
-from tortuga.typestore.base import TypeStore
+from tortuga.typestore.base import Cursor, TypeStore
 from tortuga.web_service.auth.decorators import authentication_required
 
 
@@ -29,6 +32,20 @@ HTTP_STATUS_BAD_REQUEST = 400
 HTTP_STATUS_NOT_FOUND = 404
 
 
+def json_or_stream_handler(*args, **kwargs):
+    """
+    A handler for the json_out tool, that JSON encodes the return value of
+    the page handler, unless it is a generator, in which case it is assumed
+    to be a streamed response that is already encoded.
+
+    """
+    value = cherrypy.serving.request._json_inner_handler(*args, **kwargs)
+    if isinstance(value, types.GeneratorType):
+        return value
+
+    return json.dumps(value).encode('utf-8')
+
+
 class HttpError(Exception):
     status_code = HTTP_STATUS_BAD_REQUEST
 
@@ -46,6 +63,21 @@ class Controller(object):
     methods: List[str] = ['GET']
     type_store: TypeStore = None
 
+    #
+    # The number of objects per page, if a cursor is provided without
+    # a page_size
+    #
+    default_page_size: int = 100
+
+    #
+    # The formats in which list responses can be streamed, and their
+    # content types
+    #
+    stream_formats = {
+        'json': 'application/json',
+        'ndjson': 'application/x-ndjson',
+    }
+
     def __init__(self):
         self._logger = logging.getLogger(WEBSERVICE_NAMESPACE)
 
@@ -130,9 +162,9 @@ class Controller(object):
             elif v.strip().lower() == 'false':
                 params[k] = False
             #
-            # The limit keyword should always be an integer
+            # The limit and page_size keywords should always be integers
             #
-            elif k == 'limit':
+            elif k in ('limit', 'page_size'):
                 params[k] = int(v)
             else:
                 params[k] = v
@@ -165,11 +197,19 @@ class Controller(object):
         return self.type_store.type_class(**unmarshalled.data)
 
     @authentication_required()
-    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_out(handler=json_or_stream_handler)
     def list(self, **query) -> List[dict]:
         """
         Gets a list of objects from the configured object store.
 
+        The list can be paged through by providing a page_size. If there
+        are more objects, the Link header of the response points at the
+        next page, using an opaque cursor parameter.
+
+        Alternatively, the list can be streamed by setting the stream
+        parameter to one of the stream_formats, in which case each object
+        is written as soon as it comes out of the type store.
+
         :param query: query parameters
 
         :return List[dict]: a list of objects, in dict form
@@ -177,16 +217,122 @@ class Controller(object):
         """
         try:
             params = self.build_params(query)
+
+            #
+            # If a page_size and/or cursor is provided, return a single
+            # page, with a link to the next page in the Link header
+            #
+            page_size = params.pop('page_size', None)
+            cursor = params.pop('cursor', None)
+            stream = params.pop('stream', None)
+            if stream:
+                if page_size is not None or cursor:
+                    raise HttpError('stream can not be combined with '
+                                    'page_size or cursor')
+                return self.stream_response(self.type_store.list(**params),
+                                            stream)
+
+            if cursor:
+                params['cursor'] = Cursor.decode(cursor)
+            if page_size is not None or cursor:
+                page_size = page_size or self.default_page_size
+                params['limit'] = page_size
+
             response = []
+            obj = None
             for obj in self.type_store.list(**params):
                 response.append(self.marshall(obj))
 
+            if page_size and len(response) == page_size:
+                self.set_next_link(
+                    query,
+                    Cursor.from_object(obj, params.get('order_by', None))
+                )
+
         except Exception as ex:
             self._logger.error(traceback.format_exc())
             response = self.error_response(str(ex))
 
         return self.format_response(response)
 
+    def stream_response(self, objs: Iterator[BaseType],
+                        stream_format: str) -> Iterator[bytes]:
+        """
+        Streams a list of objects, marshalling and writing each object as
+        it comes off the iterator.
+
+        If an error occurs once streaming has started, the HTTP status can
+        no longer be changed, so the error response is written as the
+        last item instead.
+
+        :param Iterator[BaseType] objs: the objects to stream
+        :param str stream_format:       one of the stream_formats
+
+        :return Iterator[bytes]: the encoded response body
+
+        """
+        if stream_format not in self.stream_formats:
+            raise HttpError(
+                'Unsupported stream format: {}'.format(stream_format))
+
+        #
+        # Get the first object before streaming starts, so that errors
+        # in the query itself still result in a regular error response
+        #
+        objs = iter(objs)
+        first = next(objs, None)
+
+        cherrypy.response.stream = True
+        cherrypy.response.headers['Content-Type'] = \
+            self.stream_formats[stream_format]
+
+        if stream_format == 'ndjson':
+            start, separator, end = b'', b'\n', b'\n'
+        else:
+            start, separator, end = b'[', b',', b']'
+
+        def encode(data: Any) -> bytes:
+            return json.dumps(data).encode('utf-8')
+
+        def generate() -> Iterator[bytes]:
+            yield start
+            written = first is not None
+            try:
+                if first is not None:
+                    yield encode(self.marshall(first))
+                    for obj in objs:
+                        yield separator + encode(self.marshall(obj))
+
+            except Exception as ex:
+                self._logger.error(traceback.format_exc())
+                error = {'error': {'message': str(ex)}}
+                yield (separator if first is not None else b'') + \
+                    encode(error)
+                written = True
+
+            #
+            # An empty ndjson stream is an empty body, so its trailing
+            # newline is only written after at least one item
+            #
+            if written or stream_format != 'ndjson':
+                yield end
+
+        return generate()
+
+    def set_next_link(self, query: dict, cursor: Cursor):
+        """
+        Sets the Link header of the response to point at the next page.
+
+        :param dict query:    the HTTP query parameters of the current page
+        :param Cursor cursor: the cursor pointing at the last object of
+                              the current page
+
+        """
+        query = dict(query)
+        query['cursor'] = cursor.encode()
+        url = cherrypy.url(qs=urlencode(query))
+        cherrypy.response.headers['Link'] = '<{}>; rel="next"'.format(url)
+
     @authentication_required()
     @cherrypy.tools.json_out()
     def get(self, obj_id: str) -> dict:
@@ -11,13 +11,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import time
 import traceback
 from typing import TYPE_CHECKING
 
 import cherrypy
 from marshmallow import ValidationError
 
+from tortuga.node.liveness import format_last_update
 from tortuga.node.manager import NodeStoreManager, NodeStatusStoreManager
 from tortuga.web_service.auth.decorators import authentication_required
 from .base import Controller, HttpError, HttpNotFoundError
@@ -78,10 +78,7 @@ class NodeStatusController(Controller):
             # Update the current object with the state from the request;
             # if state is not provided, keep the current state
             obj_current.state = obj.state or obj_current.state
-            obj_current.last_update = time.strftime(
-                '%Y-%m-%d %H:%M:%S',
-                time.gmtime(time.time())
-            )
+            obj_current.last_update = format_last_update()
             obj = self.type_store.save(obj_current)
             response = self.marshall(obj)
         except HttpError as ex:
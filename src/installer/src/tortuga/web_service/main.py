@@ -28,6 +28,8 @@ from cherrypy.process import plugins
 from tortuga.kit.loader import load_kits
 from tortuga.logging import KIT_NAMESPACE, ROOT_NAMESPACE, \
     WEBSERVICE_NAMESPACE
+# registers the hooks invalidating the Puppet ENC cache on database changes
+from tortuga.puppet import enc  # noqa pylint: disable=unused-import
 from . import controllers, controllers_v2, rootRouteMapper
 from .app import app
 from .auth import methods as auth_methods
@@ -182,4 +182,9 @@ async def websocket_handler(websocket, path):
     for task in pending:
         task.cancel()
 
+    #
+    # Make sure events are no longer delivered to the closed session
+    #
+    state_manager.state.unsubscribe()
+
     logger.debug('Websocket connection exited')
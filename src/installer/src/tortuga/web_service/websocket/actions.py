@@ -16,7 +16,6 @@ from typing import Dict, Type
 
 from marshmallow import fields, Schema
 
-from tortuga.events.manager import PubSubManager
 from tortuga.exceptions.authenticationFailed import AuthenticationFailed
 from tortuga.auth.methods import MultiAuthentionMethod
 from ..auth.methods import WsUsernamePasswordAuthenticationMethod, \
@@ -208,11 +207,10 @@ class SubscribeAction(BaseAction):
             raise AuthenticationRequired()
 
         #
-        # Don't re-subscribe if they are already subscribed
+        # Events are delivered straight to the message queue of the
+        # state. Subscribing again is a no-op.
         #
-        if not self._state.pubsub:
-            self._state.pubsub = PubSubManager.get()
-            self._state.pubsub.subscribe()
+        self._state.subscribe()
 
         #
         # Enqueue a subscription success message
@@ -242,12 +240,9 @@ class UnsubscribeAction(BaseAction):
             raise AuthenticationRequired()
 
         #
-        # Don't bother unsubcribing them if they currently don't have a
-        # subscription
+        # Unsubscribing is a no-op if there is no subscription
         #
-        if self._state.pubsub:
-            self._state.pubsub.unsubscribe()
-            self._state.pubsub = None
+        self._state.unsubscribe()
 
         #
         # Enqueue a unsubscribe success message
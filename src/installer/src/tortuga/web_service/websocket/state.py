@@ -12,11 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 from datetime import datetime, timedelta
-from typing import List, Union, Optional
+from typing import Union, Optional
 
+from tortuga.events.manager import PubSubManager
 from tortuga.events.types import BaseEvent
-from tortuga.events.pubsub import EventPubSub
 from .messages import BaseMessage
 
 
@@ -42,8 +43,8 @@ class State:
         #
         # Message queue state
         #
-        self._message_queue: List[Union[BaseMessage, BaseEvent]] = []
-        self.pubsub: EventPubSub = None
+        self._message_queue: asyncio.Queue = asyncio.Queue()
+        self.subscribed: bool = False
 
         #
         # Websocket state
@@ -79,6 +80,20 @@ class State:
             return True
         return False
 
+    def get_authentication_time_remaining(self) -> Optional[float]:
+        """
+        Gets the time remaining until the authentication period expires.
+
+        :returns Optional[float]: the number of seconds remaining, or None
+                                  if there is no authentication timeout
+
+        """
+        if not self._authentication_timeout:
+            return None
+
+        remaining = self._authentication_timeout - datetime.now()
+        return max(remaining.total_seconds(), 0)
+
     def enqueue_message(self, msg: Union[BaseMessage, BaseEvent]):
         """
         Enqueues a message to be sent to the websocket client.
@@ -86,28 +101,63 @@ class State:
         :param Union[BaseMessage, BaseEvent] msg: the message to send
 
         """
-        self._message_queue.insert(0, msg)
+        self._message_queue.put_nowait(msg)
 
-    def next_message(self) -> Optional[Union[BaseMessage, BaseEvent]]:
+    async def next_message(self, timeout: Optional[float] = None
+                           ) -> Optional[Union[BaseMessage, BaseEvent]]:
         """
-        Gets the next message to send from the queue.
+        Gets the next message to send from the queue, waiting for one to
+        arrive if the queue is empty.
+
+        :param Optional[float] timeout: the maximum number of seconds to
+                                        wait, or None to wait indefinitely
 
         :return Optional[Union[BaseMessage, BaseEvent]]: the next message if
                                                          any, None otherwise
         """
-        #
-        # Queued messages take priority over pubsub messages
-        #
-        if self._message_queue:
-            return self._message_queue.pop()
+        while True:
+            try:
+                msg = self._message_queue.get_nowait()
+
+            except asyncio.QueueEmpty:
+                if timeout is not None and timeout <= 0:
+                    return None
+                try:
+                    msg = await asyncio.wait_for(self._message_queue.get(),
+                                                 timeout)
+                except asyncio.TimeoutError:
+                    return None
+
+            #
+            # Events are only sent to authenticated users
+            #
+            if isinstance(msg, BaseEvent) and not self.authenticated:
+                continue
+
+            return msg
+
+    def subscribe(self):
+        """
+        Subscribes to events, which are then delivered directly to the
+        message queue.
 
-        #
-        # If there are no queued messages, check for pubsub messages
-        #
-        if self.authenticated and self.pubsub:
-            return self.pubsub.get_message()
+        """
+        if self.subscribed:
+            return
+
+        PubSubManager.get_dispatcher().subscribe(self._message_queue)
+        self.subscribed = True
+
+    def unsubscribe(self):
+        """
+        Unsubscribes from events.
+
+        """
+        if not self.subscribed:
+            return
 
-        return None
+        PubSubManager.get_dispatcher().unsubscribe(self._message_queue)
+        self.subscribed = False
 
     def clear_message_queue(self):
         """
@@ -118,11 +168,10 @@ class State:
         #
         # Unsubscribe from the event pubsub
         #
-        if self.pubsub:
-            self.pubsub.unsubscribe()
-        self.pubsub = None
+        self.unsubscribe()
 
         #
         # Clear out the message queue
         #
-        self._message_queue = []
+        while not self._message_queue.empty():
+            self._message_queue.get_nowait()
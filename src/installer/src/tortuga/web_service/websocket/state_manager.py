@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import asyncio
 import json
 import logging
 from typing import Type, Union
@@ -151,7 +150,7 @@ class StateManager:
         msg: Union[BaseMessage, BaseEvent] = None
 
         #
-        # This loops spins until there is a message to return
+        # This loops until there is a message to return
         #
         while not msg:
             #
@@ -169,14 +168,13 @@ class StateManager:
                 self.state.enqueue_message(
                     ErrorMessage(reason='Authentication timeout')
                 )
-
-            msg = self.state.next_message()
+                self.state.clear_authentication_timeout()
 
             #
-            # If there is no message to send, we wait for a short period of
-            # time before trying again.
+            # Wait until there is a message to send, but no longer than
+            # the authentication timeout, so that it can be enforced
             #
-            if not msg:
-                await asyncio.sleep(1)
+            msg = await self.state.next_message(
+                timeout=self.state.get_authentication_time_remaining())
 
         return msg
@@ -52,6 +52,15 @@ def disable_DbManager(monkeypatch, dbm):
 def mock_redis(monkeypatch):
     monkeypatch.setattr(objectstore_manager, 'Redis', MockRedis)
 
+    #
+    # A real client may have been created before Redis was mocked, i.e. by
+    # the (session scoped) dbm fixture
+    #
+    if not isinstance(objectstore_manager.ObjectStoreManager._redis_client,
+                      MockRedis):
+        monkeypatch.setattr(objectstore_manager.ObjectStoreManager,
+                            '_redis_client', None)
+
 
 @pytest.fixture()
 def redis():
@@ -13,9 +13,12 @@
 # limitations under the License.
 
 import fnmatch
-from typing import Dict, List, Union
+import time
+from typing import Dict, Iterator, List, Union
 import re
 
+from redis.exceptions import ResponseError
+
 
 class MockRedis:
     def __init__(self, *args, **kwargs):
@@ -23,13 +26,14 @@ class MockRedis:
         self._channels: List[bytes] = []
         self._pubsubs: List[PubSub] = []
 
-    def delete(self, key: str):
-        bkey = key.encode()
+    def delete(self, *keys: str):
+        for key in keys:
+            bkey = key.encode() if isinstance(key, str) else key
 
-        try:
-            self._data_store.pop(bkey)
-        except KeyError:
-            pass
+            try:
+                self._data_store.pop(bkey)
+            except KeyError:
+                pass
 
     def exists(self, key: str) -> bool:
         bkey = key.encode()
@@ -39,11 +43,55 @@ class MockRedis:
     def expire(self, key: str, timeout: int):
         pass
 
+    def get(self, key: str):
+        bkey = key.encode()
+
+        return self._data_store.get(bkey, None)
+
+    def set(self, key: str, value: str, ex: int = None, nx: bool = False):
+        bkey = key.encode()
+
+        if nx and bkey in self._data_store:
+            return None
+
+        self._data_store[bkey] = value.encode()
+
+        return True
+
+    def rename(self, src: str, dst: str):
+        try:
+            self._data_store[dst.encode()] = \
+                self._data_store.pop(src.encode())
+        except KeyError:
+            raise ResponseError('no such key')
+
+    def hset(self, key: str, field: str, value: str):
+        bkey = key.encode()
+
+        hsh = self._data_store.setdefault(bkey, {})
+        hsh[field.encode()] = value.encode()
+
+    def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        bkey = key.encode()
+        bfield = field.encode()
+
+        hsh = self._data_store.setdefault(bkey, {})
+        hsh[bfield] = str(int(hsh.get(bfield, 0)) + amount).encode()
+
+        return int(hsh[bfield])
+
     def hmset(self, key: str, value: dict):
         bkey = key.encode()
 
         self._data_store[bkey] = value
 
+    def hmget(self, key: str, fields: List[str]) -> list:
+        bkey = key.encode()
+
+        hsh = self._data_store.get(bkey, None) or {}
+        return [hsh.get(field, hsh.get(field.encode(), None))
+                for field in fields]
+
     def hgetall(self, key: str) -> dict:
         bkey = key.encode()
 
@@ -59,6 +107,12 @@ class MockRedis:
 
         return keys
 
+    def scan_iter(self, match: str = '*',
+                  count: int = None) -> Iterator[bytes]:
+        for bk in list(self._data_store.keys()):
+            if fnmatch.fnmatch(bk.decode(), match):
+                yield bk
+
     def publish(self, channel: str, value: str):
         bchannel = channel.encode()
         bvalue = value.encode()
@@ -71,54 +125,197 @@ class MockRedis:
         for pubsub in self._pubsubs:
             pubsub._new_message(bchannel, bvalue)
 
+    def pipeline(self, transaction: bool = True) -> 'Pipeline':
+        return Pipeline(self)
+
     def pubsub(self) -> 'PubSub':
         p = PubSub(self)
         self._pubsubs.append(p)
 
         return p
 
-    def sadd(self, key: str, value: str):
+    def sadd(self, key: str, *values: Union[str, bytes]):
         bkey = key.encode()
 
         set_ = self._data_store.get(bkey, [])
-        set_.append(value.encode())
+        for value in values:
+            bvalue = value.encode() if isinstance(value, str) else value
+            if bvalue not in set_:
+                set_.append(bvalue)
         self._data_store[bkey] = set_
 
-    def srem(self, key: str, value: str):
+    def sinter(self, *keys: str) -> set:
+        result = None
+        for key in keys:
+            members = set(self.smembers(key))
+            result = members if result is None else result & members
+
+        return result or set()
+
+    def srem(self, key: str, *values: str):
         bkey = key.encode()
 
         set_ = self._data_store.get(bkey, [])
-        try:
-            set_.remove(value.encode())
-        except ValueError:
-            pass
+        for value in values:
+            try:
+                set_.remove(value.encode())
+            except ValueError:
+                pass
         self._data_store[bkey] = set_
 
     def smembers(self, key: str) -> List[bytes]:
         bkey = key.encode()
 
-        return self._data_store.get(bkey, [])
+        return list(self._data_store.get(bkey, []))
+
+    def zadd(self, key: str, **members: float):
+        bkey = key.encode()
+
+        zset = self._data_store.get(bkey, {})
+        for member, score in members.items():
+            zset[member.encode()] = float(score)
+        self._data_store[bkey] = zset
+
+    def zrem(self, key: str, *members: str):
+        bkey = key.encode()
+
+        zset = self._data_store.get(bkey, {})
+        for member in members:
+            zset.pop(member.encode(), None)
+
+    def zrangebyscore(self, key: str, min: str, max: str,
+                      start: int = None, num: int = None,
+                      withscores: bool = False) -> list:
+        bkey = key.encode()
+
+        def in_range(score):
+            for bound, cmp in ((min, lambda a, b: a >= b),
+                               (max, lambda a, b: a <= b)):
+                bound = str(bound)
+                if bound.startswith('('):
+                    bound = float(bound[1:])
+                    if score == bound:
+                        return False
+                else:
+                    bound = float(bound)
+                if not cmp(score, bound):
+                    return False
+            return True
+
+        zset = self._data_store.get(bkey, {})
+        result = [(member, score) for member, score in
+                  sorted(zset.items(), key=lambda item: (item[1], item[0]))
+                  if in_range(score)]
+
+        if start is not None:
+            result = result[start:start + num]
+
+        if withscores:
+            return result
+
+        return [member for member, _ in result]
+
+    def zrangebylex(self, key: str, min: Union[str, bytes],
+                    max: Union[str, bytes], start: int = None,
+                    num: int = None) -> List[bytes]:
+        bkey = key.encode()
+
+        def in_range(member):
+            for bound, lower in ((min, True), (max, False)):
+                if isinstance(bound, str):
+                    bound = bound.encode()
+                if bound in (b'-', b'+'):
+                    if (bound == b'+') == lower:
+                        return False
+                    continue
+                value = bound[1:]
+                if bound.startswith(b'(') and member == value:
+                    return False
+                if (member < value) if lower else (member > value):
+                    return False
+            return True
+
+        zset = self._data_store.get(bkey, {})
+        result = [member for member in sorted(zset) if in_range(member)]
+
+        if start is not None:
+            result = result[start:start + num]
+
+        return result
+
+    def zrevrangebyscore(self, key: str, max: str, min: str,
+                         start: int = None, num: int = None,
+                         withscores: bool = False) -> list:
+        result = list(reversed(self.zrangebyscore(key, min, max,
+                                                  withscores=True)))
 
-    def sort(self, key: str, by: str = None, desc: bool = False,
-             alpha: bool = False) -> List[bytes]:
+        if start is not None:
+            result = result[start:start + num]
+
+        if withscores:
+            return result
+
+        return [member for member, _ in result]
+
+    def sort(self, key: str, by: str = None, get: List[str] = None,
+             desc: bool = False, alpha: bool = False,
+             groups: bool = False) -> list:
         result = self.smembers(key)
 
+        def get_field(obj_key: bytes, pattern: str):
+            if pattern == '#':
+                return obj_key
+            m = re.match(r'\*->(.+)', pattern)
+            if not m:
+                raise Exception('Mock does not support: {}'.format(pattern))
+            value = self._data_store[obj_key].get(m.group(1), None)
+            return value if value is None else str(value).encode()
+
         sort_key = None
         if by:
             m = re.match(r'\*->(.+)', by)
-            groups = m.groups()
-            if not len(groups) == 1:
+            groups_ = m.groups()
+            if not len(groups_) == 1:
                 raise Exception('Mock does not support by: {}'.format(by))
-            sort_key = lambda obj_key: self._data_store[obj_key][groups[0]]
+            sort_key = lambda obj_key: self._data_store[obj_key][groups_[0]]
 
         result.sort(key=sort_key)
 
         if desc:
             result.reverse()
 
+        if get:
+            rows = [tuple(get_field(k, pattern) for pattern in get)
+                    for k in result]
+            if groups:
+                return rows
+            return [field for row in rows for field in row]
+
         return result
 
 
+class Pipeline:
+    def __init__(self, redis_client: MockRedis):
+        self._redis: MockRedis = redis_client
+        self._commands: List[tuple] = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> list:
+        results = [method(*args, **kwargs)
+                   for method, args, kwargs in self._commands]
+        self._commands = []
+
+        return results
+
+
 class PubSub:
     def __init__(self, redis_client: MockRedis):
         self._redis: MockRedis = redis_client
@@ -133,6 +330,14 @@ class PubSub:
         except IndexError:
             return None
 
+    def listen(self) -> Iterator[dict]:
+        while True:
+            msg = self.get_message()
+            if msg is None:
+                time.sleep(0.01)
+                continue
+            yield msg
+
     def psubscribe(self, pattern: str):
         bpattern = pattern.encode()
 
@@ -177,6 +382,8 @@ class PubSub:
             return
 
         msg = {
+            'type': 'message',
+            'channel': channel,
             'data': message
         }
         self._messages.insert(0, msg)
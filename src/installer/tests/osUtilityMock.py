@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from typing import List
+
 from sqlalchemy.orm.session import Session
 
 from tortuga.config.configManager import ConfigManager
@@ -27,14 +29,26 @@ class MockBootHostManager:
             # pylint: disable=unused-argument
         dbNode.state = state.NODE_STATE_EXPIRED
 
+    def setNodesForNetworkBoot(self, session: Session, dbNodes: List[Node]):
+        for dbNode in dbNodes:
+            self.setNodeForNetworkBoot(session, dbNode)
+
     def writePXEFile(self, *args, **kwargs): \
             # pylint: disable=unused-argument
         return
 
+    def writePXEFiles(self, *args, **kwargs): \
+            # pylint: disable=unused-argument
+        return
+
     def addDhcpLease(self, *args, **kwargs): \
             # pylint: disable=unused-argument
         pass
 
+    def addDhcpLeases(self, *args, **kwargs): \
+            # pylint: disable=unused-argument
+        pass
+
 
 class MockOsObjectFactory:
     def getOsBootHostManager(self, configManager: ConfigManager): \
@@ -17,7 +17,8 @@
 import pytest
 
 from tortuga.addhost.addHostServerLocal import (AddHostServerLocal,
-                                                get_host_name)
+                                                get_host_name, reservedIps)
+from tortuga.addhost.ipAllocator import release_ip
 from tortuga.db.hardwareProfilesDbHandler import HardwareProfilesDbHandler
 from tortuga.db.models.node import Node
 from tortuga.db.networksDbHandler import NetworksDbHandler
@@ -51,6 +52,26 @@ def test_generate_node_name(dbm):
         assert name1 == name3
 
 
+def test_generate_node_names(dbm):
+    with dbm.session() as session:
+        names = api.generate_node_names(session, 'compute-#NN', 3,
+                                        dns_zone='domain')
+
+        # names generated by previous tests are still in the session
+        assert len(set(names)) == 3
+        assert all(name.endswith('.domain') for name in names)
+        assert not {get_host_name(name) for name in names} & \
+            {'compute-{:02d}'.format(n) for n in range(1, 11)}
+
+        api.clear_session_nodes([Node(name=name) for name in names])
+
+        name = api.generate_node_name(session, 'compute-#NN')
+
+        assert name == get_host_name(names[0])
+
+        api.clear_session_node(Node(name=name))
+
+
 def test_generate_provisioning_ip_address(dbm):
     with dbm.session() as session:
         networks = NetworksDbHandler().getNetworkList(session)
@@ -59,6 +80,29 @@ def test_generate_provisioning_ip_address(dbm):
 
         assert result
 
+
+def test_generate_provisioning_ip_addresses(dbm):
+    with dbm.session() as session:
+        network = NetworksDbHandler().getNetworkList(session)[0]
+
+        nic_ips = [nic.ip for nic in network.nics]
+
+        ips = api.generate_provisioning_ip_addresses(network, 100)
+
+        try:
+            assert len(set(ips)) == 100
+            assert not set(ips) & set(nic_ips)
+            assert not set(ips) & set(
+                api.generate_provisioning_ip_addresses(network, 1))
+
+            with pytest.raises(InvalidArgument):
+                api.generate_provisioning_ip_addresses(network, 254)
+
+        finally:
+            for ip in ips:
+                reservedIps.discard(ip)
+                release_ip(network.id, ip)
+
 def test_failed_initializeNode(dbm):
     with dbm.session() as session:
         hardware_profile = HardwareProfilesDbHandler().getHardwareProfile(
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import pytest
+from sqlalchemy import event
 
 from tortuga.db.nodeDbApi import NodeDbApi
 from tortuga.objects.node import Node
@@ -74,3 +75,32 @@ def test_getNodeList(dbm):
     assert isinstance(result, TortugaObjectList)
 
     assert isinstance(result[0], Node)
+
+
+def test_getNodeList_eager_loading(dbm):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    options = {
+        'hardwareprofile': True,
+        'softwareprofile': True,
+        'tags': True,
+        'instance': True,
+    }
+
+    event.listen(dbm.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        with dbm.session() as session:
+            result = NodeDbApi().getNodeList(session, optionDict=options)
+    finally:
+        event.remove(dbm.engine, 'before_cursor_execute',
+                     before_cursor_execute)
+
+    #
+    # The number of statements does not depend on the number of nodes
+    #
+    assert len(result) > 10
+    assert len(statements) <= 5
+    assert all(node.getHardwareProfile() for node in result)
@@ -12,8 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 import pytest
-from mock import MagicMock
+from mock import MagicMock, patch
+from passlib.hash import pbkdf2_sha256
 
 from tortuga.exceptions.authenticationFailed import AuthenticationFailed
 
@@ -190,3 +193,82 @@ def test_username_password_authentication_method(dbm):
     #
     with pytest.raises(AuthenticationFailed):
         method.authenticate(username='admin', password='invalid')
+
+
+def test_credential_cache():
+    from tortuga.auth.credentialCache import CredentialCache
+
+    cache = CredentialCache(ttl=60, max_size=2)
+
+    assert not cache.contains('db', 'admin', 'password')
+
+    cache.add('db', 'admin', 'password')
+    assert cache.contains('db', 'admin', 'password')
+    assert not cache.contains('db', 'admin', 'invalid')
+    assert not cache.contains('vault', 'admin', 'password')
+
+    #
+    # The least recently used credential is evicted when the cache is full
+    #
+    cache.add('db', 'user1', 'password')
+    cache.add('db', 'user2', 'password')
+    assert not cache.contains('db', 'admin', 'password')
+
+    cache.invalidate('user1')
+    assert not cache.contains('db', 'user1', 'password')
+    assert cache.contains('db', 'user2', 'password')
+
+    assert cache.get_stats() == {'hits': 2, 'misses': 5, 'size': 1}
+
+
+def test_credential_cache_expiry():
+    from tortuga.auth.credentialCache import CredentialCache
+
+    cache = CredentialCache(ttl=60)
+    cache.add('db', 'admin', 'password')
+
+    with patch('tortuga.auth.credentialCache.time.monotonic',
+               return_value=time.monotonic() + 61):
+        assert not cache.contains('db', 'admin', 'password')
+
+    assert cache.get_stats()['size'] == 0
+
+
+def test_username_password_authentication_cached(dbm):
+    from tortuga.admin.manager import AdminManager
+    from tortuga.auth.credentialCache import credential_cache
+    from tortuga.auth.methods import UsernamePasswordAuthenticationMethod
+
+    credential_cache.invalidate()
+
+    method = UsernamePasswordAuthenticationMethod()
+
+    with patch('tortuga.auth.methods.pbkdf2_sha256.verify',
+               wraps=pbkdf2_sha256.verify) as verify:
+        for _ in range(3):
+            assert method.authenticate(username='admin',
+                                       password='password') == 'admin'
+
+        assert verify.call_count == 1
+
+        #
+        # Changing the password invalidates the cached credentials
+        #
+        with dbm.session() as session:
+            admin_manager = AdminManager()
+            admin = admin_manager.getAdmin(session, 'admin')
+            admin.setPassword('newpassword')
+            admin_manager.updateAdmin(session, admin, isCrypted=False)
+
+        with pytest.raises(AuthenticationFailed):
+            method.authenticate(username='admin', password='password')
+
+        assert method.authenticate(username='admin',
+                                   password='newpassword') == 'admin'
+
+        assert verify.call_count == 3
+
+        with dbm.session() as session:
+            admin = admin_manager.getAdmin(session, 'admin')
+            admin.setPassword('password')
+            admin_manager.updateAdmin(session, admin, isCrypted=False)
@@ -0,0 +1,174 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from tortuga.config.configManager import ConfigManager
+from tortuga.db.models.node import Node
+from tortuga.os_objects.bootFileWriter import BootFile, BootFileWriter
+from tortuga.os_objects.rhel.bootHostManager import BootHostManager
+
+
+def test_write(tmpdir):
+    writer = BootFileWriter(max_workers=4)
+
+    files = [BootFile(str(tmpdir.join('file{}'.format(n))),
+                      'contents {}\n'.format(n))
+             for n in range(10)]
+
+    assert writer.write(files) == {}
+
+    for n in range(10):
+        with open(str(tmpdir.join('file{}'.format(n)))) as fp:
+            assert fp.read() == 'contents {}\n'.format(n)
+
+    # no temporary files are left behind
+    assert len(tmpdir.listdir()) == 10
+
+    assert writer.get_stats() == {'written': 10, 'skipped': 0}
+
+    #
+    # Unchanged files are skipped
+    #
+    files[0] = BootFile(files[0].path, 'updated contents\n')
+
+    assert writer.write(files) == {}
+    assert writer.get_stats() == {'written': 11, 'skipped': 9}
+
+    with open(files[0].path) as fp:
+        assert fp.read() == 'updated contents\n'
+
+
+def test_write_modified_externally(tmpdir):
+    writer = BootFileWriter()
+
+    path = str(tmpdir.join('file'))
+    assert writer.write([BootFile(path, 'contents\n')]) == {}
+
+    with open(path, 'w') as fp:
+        fp.write('changed\n')
+
+    assert writer.write([BootFile(path, 'contents\n')]) == {}
+    assert writer.get_stats() == {'written': 2, 'skipped': 0}
+
+    with open(path) as fp:
+        assert fp.read() == 'contents\n'
+
+    #
+    # Files that were not written by this writer are compared by contents
+    #
+    assert BootFileWriter().write([BootFile(path, 'contents\n')]) == {}
+    assert os.stat(path).st_mode & 0o777 == 0o644
+
+    #
+    # Files with the wrong mode are rewritten
+    #
+    os.chmod(path, 0o600)
+    assert writer.write([BootFile(path, 'contents\n')]) == {}
+    assert writer.get_stats() == {'written': 3, 'skipped': 0}
+    assert os.stat(path).st_mode & 0o777 == 0o644
+
+
+def test_write_errors(tmpdir):
+    writer = BootFileWriter()
+
+    good = str(tmpdir.join('file'))
+    bad = str(tmpdir.join('nonexistent', 'file'))
+
+    errors = writer.write([BootFile(good, 'contents\n'),
+                           BootFile(bad, 'contents\n')])
+
+    assert list(errors) == [bad]
+    assert os.path.exists(good)
+
+
+def test_write_pxe_files(dbm, tmpdir):
+    pxe_dir = tmpdir.mkdir('tortuga').mkdir('pxelinux.cfg')
+    ks_dir = tmpdir.mkdir('kickstarts')
+
+    with dbm.session() as session:
+        nodes = session.query(Node).filter(
+            Node.name.like('compute-%')).all()
+
+        cm = ConfigManager()
+        bhm = BootHostManager(cm)
+
+        with patch.object(BootHostManager, 'getTftproot',
+                          return_value=str(tmpdir)), \
+                patch.object(cm, 'getKickstartsDir',
+                             return_value=str(ks_dir)), \
+                patch('tortuga.os.rhel.osSupport.OSSupport.'
+                      'getKickstartFilesContents',
+                      side_effect=lambda session, ks_nodes:
+                      ['# kickstart\n'] * len(ks_nodes)) as ks_contents, \
+                patch.object(BootHostManager, 'write_other_boot_files') \
+                as write_other_boot_files:
+            bhm.writePXEFiles(session, nodes, localboot=True)
+
+        # all kickstart files are generated in one go
+        assert ks_contents.call_count == 1
+        assert write_other_boot_files.call_count == len(nodes)
+
+        assert len(pxe_dir.listdir()) == len(nodes)
+        assert len(ks_dir.listdir()) == len(nodes)
+
+        with open(str(pxe_dir.join('01-FF-00-00-00-00-00-65'))) as fp:
+            assert fp.read() == (
+                '# PXE boot configuration for compute-01.private\n'
+                '\n'
+                'default localdisk\n'
+                'prompt 0\n'
+                'label localdisk\n'
+                '    kernel chain.c32\n'
+                '    append hd0\n'
+            )
+
+
+def test_write_pxe_files_errors(dbm, tmpdir):
+    pxe_dir = tmpdir.mkdir('tortuga').mkdir('pxelinux.cfg')
+    ks_dir = tmpdir.mkdir('kickstarts')
+
+    # the PXE file of compute-01 can not be written
+    pxe_dir.mkdir('01-FF-00-00-00-00-00-65')
+
+    with dbm.session() as session:
+        nodes = session.query(Node).filter(
+            Node.name.like('compute-%')).all()
+
+        cm = ConfigManager()
+        bhm = BootHostManager(cm)
+
+        with patch.object(BootHostManager, 'getTftproot',
+                          return_value=str(tmpdir)), \
+                patch.object(cm, 'getKickstartsDir',
+                             return_value=str(ks_dir)), \
+                patch('tortuga.os.rhel.osSupport.OSSupport.'
+                      'getKickstartFilesContents',
+                      side_effect=lambda session, ks_nodes:
+                      ['# kickstart\n'] * len(ks_nodes)), \
+                patch.object(BootHostManager, 'write_other_boot_files') \
+                as write_other_boot_files:
+            with pytest.raises(OSError):
+                bhm.writePXEFiles(session, nodes, localboot=True)
+
+        #
+        # The other boot files are still written for the other nodes
+        #
+        assert sorted(call[0][0].name for call in
+                      write_other_boot_files.call_args_list) == sorted(
+            node.name for node in nodes if node.name != 'compute-01.private')
+        assert len(ks_dir.listdir()) == len(nodes)
@@ -0,0 +1,112 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+
+from tortuga.sync.clusterUpdateScheduler import ClusterUpdateScheduler, \
+    merge_update_opts
+
+
+class FakeUpdateRunner:
+    def __init__(self, duration: float = 0):
+        self.duration = duration
+        self.runs = []
+        self.done = threading.Event()
+
+    def __call__(self, opts: dict):
+        self.runs.append(opts)
+        self.done.set()
+        time.sleep(self.duration)
+
+
+def wait_for_runs(scheduler: ClusterUpdateScheduler, runs: int):
+    for _ in range(500):
+        metrics = scheduler.get_metrics()
+        if metrics['runs'] >= runs and not metrics['running']:
+            return metrics
+        time.sleep(0.01)
+
+    raise AssertionError('Cluster updates did not run')
+
+
+def test_merge_update_opts():
+    merged = {}
+    merge_update_opts(merged, {'node': {'compute-01': {'a': '1'}},
+                               'list': [1]})
+    merge_update_opts(merged, {'node': {'compute-01': {'b': '2'},
+                                        'compute-02': {'a': '3'}},
+                               'list': [2]})
+
+    assert merged == {
+        'node': {'compute-01': {'a': '1', 'b': '2'},
+                 'compute-02': {'a': '3'}},
+        'list': [1, 2],
+    }
+
+
+def test_coalesce_tag_updates():
+    runner = FakeUpdateRunner()
+    scheduler = ClusterUpdateScheduler(runner, max_delay=5)
+
+    for n in range(500):
+        scheduler.schedule(
+            update_reason='tags updated', delay=0.2,
+            opts={'node': {'compute-{:03d}'.format(n): {'tag': str(n)}}})
+
+    metrics = wait_for_runs(scheduler, 1)
+
+    assert len(runner.runs) == 1
+    assert len(runner.runs[0]['node']) == 500
+    assert runner.runs[0]['node']['compute-499'] == {'tag': '499'}
+    assert metrics['requests'] == 500
+    assert metrics['coalescing_ratio'] == 500
+    assert metrics['queue_depth'] == 0
+
+
+def test_batches_not_merged():
+    runner = FakeUpdateRunner()
+    scheduler = ClusterUpdateScheduler(runner, max_running=2)
+
+    scheduler.schedule(delay=0)
+    scheduler.schedule(delay=0, opts={'node': {'compute-01': {}}})
+    scheduler.schedule(delay=0,
+                       opts={'slurm_update': {'slurm_cluster': 'a'}})
+
+    wait_for_runs(scheduler, 3)
+
+    assert sorted(runner.runs, key=len) == sorted([
+        {}, {'node': {'compute-01': {}}},
+        {'slurm_update': {'slurm_cluster': 'a'}}], key=len)
+
+
+def test_update_while_running():
+    runner = FakeUpdateRunner(duration=0.2)
+    scheduler = ClusterUpdateScheduler(runner)
+
+    scheduler.schedule(delay=0, opts={'node': {'compute-01': {}}})
+    assert runner.done.wait(5)
+
+    #
+    # Updates scheduled while an update is running are held back until
+    # it is done, and then run together
+    #
+    scheduler.schedule(delay=0, opts={'node': {'compute-02': {}}})
+    scheduler.schedule(delay=0, opts={'node': {'compute-03': {}}})
+
+    metrics = wait_for_runs(scheduler, 2)
+
+    assert runner.runs[1] == {'node': {'compute-02': {}, 'compute-03': {}}}
+    assert metrics['coalescing_ratio'] == 1.5
+    assert metrics['max_run_duration'] >= 0.2
@@ -0,0 +1,178 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import stat
+import sys
+from textwrap import dedent
+from types import SimpleNamespace
+
+import pytest
+
+from tortuga.os_objects.rhel.dhcpLeaseManager import (DhcpLease,
+                                                      OmshellLeaseManager)
+
+
+FAKE_OMSHELL = dedent("""\
+    #!{python}
+    #
+    # Stand-in for omshell, keeping the host leases in a JSON file. Hosts
+    # named "bad-*" can't be created.
+    #
+    import json
+    import sys
+
+    state_file = {state_file!r}
+
+    with open(state_file) as fp:
+        state = json.load(fp)
+
+    state['sessions'] += 1
+    obj = None
+
+    for line in sys.stdin:
+        cmd = line.strip()
+
+        if cmd == 'connect':
+            if state['fail_connect']:
+                print("can't connect: connection refused")
+                break
+        elif cmd == 'new host':
+            obj = {{}}
+            print('obj: host')
+        elif cmd.startswith('set '):
+            key, value = cmd[4:].split(' = ')
+            obj[key] = value.strip('"')
+        elif cmd == 'create':
+            if obj['name'] in state['hosts']:
+                print("can't open object: already exists")
+            elif obj['name'].startswith('bad-'):
+                print("can't open object: invalid argument")
+            else:
+                state['hosts'][obj['name']] = obj
+        elif cmd == 'open':
+            if obj['name'] not in state['hosts']:
+                print("can't open object: not found")
+                obj = None
+        elif cmd == 'remove':
+            if obj is None:
+                print("can't destroy object: not found")
+            else:
+                del state['hosts'][obj['name']]
+                print('obj: <null>')
+
+    with open(state_file, 'w') as fp:
+        json.dump(state, fp)
+    """)
+
+
+@pytest.fixture
+def omshell(tmpdir):
+    state_file = str(tmpdir.join('state.json'))
+    with open(state_file, 'w') as fp:
+        json.dump({'sessions': 0, 'fail_connect': False, 'hosts': {}}, fp)
+
+    omshell = str(tmpdir.join('omshell'))
+    with open(omshell, 'w') as fp:
+        fp.write(FAKE_OMSHELL.format(python=sys.executable,
+                                     state_file=state_file))
+    os.chmod(omshell, os.stat(omshell).st_mode | stat.S_IEXEC)
+
+    def get_state():
+        with open(state_file) as fp:
+            return json.load(fp)
+
+    def set_state(**kwargs):
+        state = get_state()
+        state.update(kwargs)
+        with open(state_file, 'w') as fp:
+            json.dump(state, fp)
+
+    return SimpleNamespace(path=omshell, get_state=get_state,
+                           set_state=set_state)
+
+
+def _get_leases(names):
+    return [
+        DhcpLease(name=name, mac='00:00:00:00:00:{:02x}'.format(n),
+                  ip='10.0.0.{}'.format(n + 1))
+        for n, name in enumerate(names)
+    ]
+
+
+def test_add_remove_leases(omshell):
+    mgr = OmshellLeaseManager(omshell=omshell.path, batch_size=4)
+
+    leases = _get_leases(['node{}'.format(n) for n in range(10)])
+
+    assert mgr.add_leases(leases) == {}
+
+    state = omshell.get_state()
+    assert state['sessions'] == 3
+    assert sorted(state['hosts']) == sorted(lease.name for lease in leases)
+    assert state['hosts']['node1'] == {
+        'name': 'node1',
+        'hardware-address': '00:00:00:00:00:01',
+        'hardware-type': '1',
+        'ip-address': '10.0.0.2',
+    }
+
+    #
+    # Adding existing leases, or removing missing leases, is not an error
+    #
+    assert mgr.add_leases(leases[:2]) == {}
+    assert mgr.remove_leases(leases[:5]) == {}
+    assert mgr.remove_leases(leases) == {}
+
+    state = omshell.get_state()
+    assert state['sessions'] == 3 + 1 + 2 + 3
+    assert state['hosts'] == {}
+
+
+def test_add_leases_errors(omshell):
+    mgr = OmshellLeaseManager(omshell=omshell.path, batch_size=4)
+
+    leases = _get_leases(['node0', 'bad-node1', 'node2', 'node3', 'node4'])
+
+    errors = mgr.add_leases(leases)
+    assert errors == {'bad-node1': "can't open object: invalid argument"}
+
+    #
+    # The failed batch is retried lease by lease
+    #
+    state = omshell.get_state()
+    assert state['sessions'] == 2 + 4
+    assert sorted(state['hosts']) == ['node0', 'node2', 'node3', 'node4']
+
+
+def test_add_leases_connect_failed(omshell):
+    omshell.set_state(fail_connect=True)
+
+    mgr = OmshellLeaseManager(omshell=omshell.path, batch_size=4)
+
+    errors = mgr.add_leases(_get_leases(['node0', 'node1']))
+    assert errors == {
+        'node0': "can't connect: connection refused",
+        'node1': "can't connect: connection refused",
+    }
+    assert omshell.get_state()['sessions'] == 1
+
+
+def test_omshell_not_found(tmpdir):
+    mgr = OmshellLeaseManager(omshell=str(tmpdir.join('nonexistent')))
+
+    errors = mgr.remove_leases(_get_leases(['node0']))
+    assert list(errors) == ['node0']
+    assert errors['node0'].startswith('Unable to run omshell')
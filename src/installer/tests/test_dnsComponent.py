@@ -0,0 +1,162 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from tortuga.db.models.hardwareProfile import HardwareProfile
+from tortuga.db.models.network import Network
+from tortuga.db.models.nic import Nic
+from tortuga.db.models.node import Node
+
+
+@pytest.fixture
+def dns(monkeypatch):
+    monkeypatch.syspath_prepend(os.path.join(
+        os.path.dirname(__file__), '..', '..', 'kits', 'kit-base'))
+
+    return importlib.import_module('tortuga_kits.base.components.dns.component')
+
+
+@pytest.fixture
+def hostsdir(dns, monkeypatch, tmpdir):
+    monkeypatch.setattr(dns.DnsmasqDnsProvider, 'hostsdir', str(tmpdir))
+
+    return str(tmpdir)
+
+
+def _add_node(session, name, hwprofile, *nics):
+    node = Node(name=name, state='Installed')
+    node.hardwareprofile = hwprofile
+    node.nics = list(nics)
+    session.add(node)
+
+    return node
+
+
+def test_get_records(dbm, dns, monkeypatch):
+    monkeypatch.setattr(dns.ComponentInstaller, '_private_dns_zone',
+                        lambda self: 'private')
+
+    with dbm.session() as session:
+        provisioning = Network(address='10.3.0.0', netmask='255.255.255.0',
+                               name='dns-provisioning', type='provision')
+        public = Network(address='192.168.3.0', netmask='255.255.255.0',
+                         name='dns-public', type='public')
+
+        installer_nic = Nic(ip='10.3.0.1', network=provisioning, boot=True)
+        installer_hwprofile = HardwareProfile(name='dns-installer',
+                                              location='local')
+        installer_hwprofile.nics = [installer_nic]
+        installer_node = _add_node(session, 'dns-installer.example.com',
+                                   installer_hwprofile, installer_nic)
+
+        local_hwprofile = HardwareProfile(name='dns-local', location='local')
+        remote_hwprofile = HardwareProfile(name='dns-remote',
+                                           location='remote')
+        null_hwprofile = HardwareProfile(name='dns-null')
+
+        _add_node(session, 'local-01', local_hwprofile,
+                  Nic(ip='10.3.0.11', network=provisioning, boot=True))
+        _add_node(session, 'local-02', local_hwprofile,
+                  Nic(ip='192.168.3.12', network=public, boot=False))
+        _add_node(session, 'remote-01', remote_hwprofile,
+                  Nic(ip='10.3.0.21', network=provisioning, boot=True),
+                  Nic(ip='192.168.3.21', network=public, boot=False))
+        _add_node(session, 'remote-02', remote_hwprofile,
+                  Nic(ip='10.3.0.22', network=provisioning, boot=False))
+        _add_node(session, 'remote-03', remote_hwprofile,
+                  Nic(ip='192.168.3.23', network=public, boot=False))
+        _add_node(session, 'null-01', null_hwprofile,
+                  Nic(ip='10.3.0.31', network=provisioning, boot=True))
+        _add_node(session, 'null-02', null_hwprofile,
+                  Nic(ip='192.168.3.32', network=public, boot=False))
+
+        deleted = _add_node(session, 'remote-04', remote_hwprofile,
+                            Nic(ip='10.3.0.24', network=provisioning,
+                                boot=True))
+        deleted.state = 'Deleted'
+
+        session.flush()
+
+        # the location column defaults to 'local' on insert
+        session.query(HardwareProfile).filter(
+            HardwareProfile.id == null_hwprofile.id).update(
+                {HardwareProfile.location: None}, synchronize_session=False)
+
+        try:
+            records = dns.ComponentInstaller(MagicMock())._get_records(
+                session, installer_node)
+        finally:
+            session.rollback()
+
+    assert {name: ip for name, ip in records.items()
+            if name.split('-', 1)[0] in ('dns', 'local', 'remote', 'null')
+            } == {
+        'dns-installer.private': '10.3.0.1',
+        # local and NULL location nodes only get provisioning records
+        'local-01': '10.3.0.11',
+        'null-01': '10.3.0.31',
+        # remote nodes resolve to their (first) non-boot address
+        'remote-01': '192.168.3.21',
+        'remote-02': '10.3.0.22',
+        'remote-03': '192.168.3.23',
+    }
+
+
+def test_sync_records(dns, hostsdir):
+    provider = dns.DnsmasqDnsProvider('private')
+    reload_flag = os.path.join(hostsdir, provider.reload_flag)
+
+    records = {'node-01': '10.3.0.11', 'node-02': '10.3.0.12'}
+
+    # new records are picked up by dnsmasq without a reload
+    assert provider.sync_records(records) == 2
+    assert sorted(os.listdir(hostsdir)) == ['node-01', 'node-02']
+    with open(os.path.join(hostsdir, 'node-01')) as fp:
+        assert fp.read() == '10.3.0.11 node-01\n'
+
+    # unchanged records are not written
+    mtime = os.stat(os.path.join(hostsdir, 'node-01')).st_mtime_ns
+    assert provider.sync_records(records) == 0
+    assert os.stat(os.path.join(hostsdir, 'node-01')).st_mtime_ns == mtime
+    assert not os.path.exists(reload_flag)
+
+    # changed records are rewritten and flag a reload
+    records['node-02'] = '10.3.0.22'
+    assert provider.sync_records(records) == 1
+    with open(os.path.join(hostsdir, 'node-02')) as fp:
+        assert fp.read() == '10.3.0.22 node-02\n'
+    assert os.path.exists(reload_flag)
+
+    os.remove(reload_flag)
+
+    # records not in the complete set are only removed when pruning
+    del records['node-02']
+    assert provider.sync_records(records) == 0
+    assert os.path.exists(os.path.join(hostsdir, 'node-02'))
+    assert not os.path.exists(reload_flag)
+
+    assert provider.sync_records(records, prune=True) == 0
+    assert not os.path.exists(os.path.join(hostsdir, 'node-02'))
+    assert os.path.exists(reload_flag)
+
+    os.remove(reload_flag)
+
+    provider.remove_records(['node-01', 'node-03'])
+    assert not os.path.exists(os.path.join(hostsdir, 'node-01'))
+    assert os.path.exists(reload_flag)
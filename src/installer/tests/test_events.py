@@ -12,6 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+from unittest.mock import patch
+
 from marshmallow import fields
 import pytest
 import time
@@ -42,7 +45,10 @@ class ExampleEvent(BaseEvent):
 
 @pytest.fixture()
 def event_store(redis):
-    object_store = RedisObjectStore(namespace='events', redis_client=redis)
+    object_store = RedisObjectStore(
+        namespace='events', redis_client=redis, indexes=['name'],
+        sorted_indexes=['timestamp'],
+        sorted_index_partitions={'timestamp': 'name'})
     store = ObjectStoreEventStore(object_store=object_store)
     #
     # Manually set the store on te store manager so that all calls to get()
@@ -55,6 +61,7 @@ def event_store(redis):
     # is there for any internal calls to the manager
     #
     PubSubManager._redis_client = redis
+    PubSubManager._dispatcher = None
 
     return store
 
@@ -122,6 +129,43 @@ def test_event_pubsub(event_store):
         assert evt == evt_sub
 
 
+def test_event_dispatcher(event_store):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    queue = asyncio.Queue()
+    filtered_queue = asyncio.Queue()
+
+    dispatcher = PubSubManager.get_dispatcher()
+    dispatcher.subscribe(queue, loop=loop)
+    dispatcher.subscribe(filtered_queue, event_name='some-other-event',
+                         loop=loop)
+
+    events = [
+        ExampleEvent.fire(integer=3, string='testing'),
+        ExampleEvent.fire(integer=4, string='testing2'),
+    ]
+
+    #
+    # Assert that the events are delivered to the queue in order, without
+    # having to poll for them
+    #
+    async def receive():
+        return [await asyncio.wait_for(queue.get(), 5) for _ in events]
+
+    try:
+        assert loop.run_until_complete(receive()) == events
+        assert filtered_queue.empty()
+
+        dispatcher.unsubscribe(queue)
+        ExampleEvent.fire(integer=5, string='abc123')
+        loop.run_until_complete(asyncio.sleep(0.1))
+        assert queue.empty()
+
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
 def test_event_listener(event_store, celery_worker):
     #
     # The purpose of this unit test is to ensure that when events fire,
@@ -176,3 +220,95 @@ def test_event_listener(event_store, celery_worker):
     assert 'example-listener' in was_run
     assert 'example-all-listener' in was_run
     assert 'example-none-listener' not in was_run
+
+
+def test_event_batch(event_store):
+    from tortuga.events.batch import EventBatch
+    from tortuga.events.listeners.base import BaseListener
+
+    class ExampleBatchListener(BaseListener):
+        name = 'example-batch-listener'
+        event_types = [ExampleEvent]
+
+    pubsub = PubSubManager.get()
+    pubsub.subscribe()
+
+    with patch('tortuga.events.tasks.run_event_listener.apply_async') \
+            as run_event_listener, \
+            patch('tortuga.events.tasks.run_event_listener_batch.'
+                  'apply_async') as run_event_listener_batch:
+        with EventBatch():
+            events = [
+                ExampleEvent.fire(integer=n, string='batch')
+                for n in range(3)
+            ]
+
+            #
+            # Nested batches are dispatched with the outermost batch
+            #
+            with EventBatch():
+                events.append(ExampleEvent.fire(integer=3, string='batch'))
+
+            #
+            # Nothing is stored, published or dispatched until the batch
+            # is done
+            #
+            assert event_store.get(events[0].id) is None
+            assert pubsub.get_message() is None
+            run_event_listener_batch.assert_not_called()
+
+        for evt in events:
+            assert event_store.get(evt.id) == evt
+            assert pubsub.get_message() == evt
+
+        run_event_listener.assert_not_called()
+
+        #
+        # The listener is scheduled once for all events in the batch
+        #
+        calls = [call for call in run_event_listener_batch.call_args_list
+                 if call[1]['args'][0] == 'example-batch-listener']
+        assert len(calls) == 1
+        assert [event_dict['integer']
+                for event_dict in calls[0][1]['args'][1]] == [0, 1, 2, 3]
+
+
+def test_event_batch_max_size(event_store):
+    from tortuga.events.batch import EventBatch
+
+    with patch('tortuga.events.batch.dispatch_events') as dispatch_events:
+        with EventBatch(max_size=2):
+            for n in range(5):
+                ExampleEvent.fire(integer=n, string='batch')
+
+    assert [len(call[0][0]) for call in dispatch_events.call_args_list] == \
+        [2, 2, 1]
+
+
+def test_listener_run_batch():
+    from tortuga.events.listeners.base import BaseListener
+
+    was_run = []
+
+    class ExampleRunBatchListener(BaseListener):
+        name = 'example-run-batch-listener'
+        event_types = [ExampleEvent]
+
+        def run(self, event):
+            was_run.append(event.integer)
+
+    listener = ExampleRunBatchListener(None)
+    listener.run_batch([ExampleEvent(integer=n, string='batch')
+                        for n in range(3)])
+
+    assert was_run == [0, 1, 2]
+
+
+def test_event_store_compact(event_store):
+    events = [ExampleEvent.fire(integer=n, string='compact')
+              for n in range(3)]
+
+    assert event_store.compact(events[1].timestamp) == 2
+    assert [evt.id for evt in event_store.list()] == [events[2].id]
+    assert [evt.id for evt in event_store.list(
+        name='example-event', order_by='timestamp')] == [events[2].id]
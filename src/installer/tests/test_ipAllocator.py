@@ -0,0 +1,83 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ipaddress
+
+import pytest
+
+from tortuga.addhost.ipAllocator import IpAllocator
+from tortuga.exceptions.invalidArgument import InvalidArgument
+
+
+def allocate(allocator: IpAllocator, *args, **kwargs):
+    return [ip.exploded for ip in allocator.allocate(*args, **kwargs)]
+
+
+def test_allocate():
+    allocator = IpAllocator(ipaddress.IPv4Network('10.0.0.0/24'))
+    allocator.assign('10.0.0.1')
+    allocator.reserve('10.0.0.3')
+    allocator.assign('192.168.0.1')
+
+    assert allocate(allocator) == ['10.0.0.2']
+    assert allocate(allocator, 2) == ['10.0.0.4', '10.0.0.5']
+
+
+def test_allocate_start_increment():
+    allocator = IpAllocator(ipaddress.IPv4Network('10.0.0.0/24'))
+    allocator.assign('10.0.0.20')
+
+    assert allocate(allocator, 3, start='10.0.0.10', increment=10) == \
+        ['10.0.0.10', '10.0.0.30', '10.0.0.40']
+
+    with pytest.raises(InvalidArgument):
+        allocator.allocate(start='10.0.1.1')
+
+
+def test_release():
+    allocator = IpAllocator(ipaddress.IPv4Network('10.0.0.0/24'))
+    allocator.assign('10.0.0.1')
+
+    assert allocate(allocator, 3) == ['10.0.0.2', '10.0.0.3', '10.0.0.4']
+
+    allocator.release('10.0.0.3')
+    allocator.release('10.0.0.1')
+
+    assert allocator.is_taken('10.0.0.1')
+    assert not allocator.is_taken('10.0.0.3')
+    assert allocate(allocator, 2) == ['10.0.0.3', '10.0.0.5']
+
+
+def test_allocate_full_bytes():
+    allocator = IpAllocator(ipaddress.IPv4Network('10.0.0.0/16'))
+    for offset in range(1, 1000):
+        allocator.assign(ipaddress.IPv4Address('10.0.0.0') + offset)
+
+    assert allocate(allocator) == ['10.0.3.232']
+
+
+def test_allocate_exhausted():
+    allocator = IpAllocator(ipaddress.IPv4Network('10.0.0.0/29'))
+    allocator.assign('10.0.0.3')
+
+    #
+    # The broadcast address is never allocated, and a failed allocation
+    # does not reserve anything
+    #
+    with pytest.raises(InvalidArgument):
+        allocator.allocate(6)
+
+    assert not allocator.is_taken('10.0.0.1')
+    assert allocate(allocator, 5) == \
+        ['10.0.0.1', '10.0.0.2', '10.0.0.4', '10.0.0.5', '10.0.0.6']
@@ -0,0 +1,153 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+import os
+import pkgutil
+from unittest.mock import patch
+
+import pytest
+
+from tortuga.db.models.component import Component
+from tortuga.db.models.kit import Kit
+from tortuga.db.models.softwareProfile import SoftwareProfile
+from tortuga.kit.metadataCache import KitMetadataCache, metadata_cache
+from tortuga.kit.registry import get_kit_installer_instance
+from tortuga.softwareprofile.softwareProfileManager import \
+    SoftwareProfileManager
+
+
+KIT_SPEC = ('base', '7.1.0', '0')
+
+
+class FakeKitInstaller:
+    def __init__(self):
+        self.calls = 0
+
+    def action_get_metadata(self, software_profile_name=None):
+        self.calls += 1
+        return {'profile': software_profile_name}
+
+
+@pytest.fixture
+def kit_installer():
+    metadata_cache.invalidate()
+
+    installer = FakeKitInstaller()
+
+    with patch('tortuga.softwareprofile.softwareProfileManager'
+               '.get_kit_installer_instance', return_value=installer):
+        yield installer
+
+
+def test_cache():
+    cache = KitMetadataCache()
+
+    assert cache.get('compute', KIT_SPEC) == (False, None)
+
+    version = cache.version
+    cache.add('compute', KIT_SPEC, {'a': '1'}, version=version)
+    cache.add('compute2', KIT_SPEC, None, version=version)
+
+    assert cache.get('compute', KIT_SPEC) == (True, {'a': '1'})
+    assert cache.get('compute2', KIT_SPEC) == (True, None)
+    assert cache.get('compute', ('base', '7.2.0', '0')) == (False, None)
+
+    cache.invalidate()
+    assert cache.get('compute', KIT_SPEC) == (False, None)
+
+    #
+    # Metadata retrieved before the cache was invalidated is not added
+    #
+    cache.add('compute', KIT_SPEC, {'a': '1'}, version=version)
+    assert cache.get('compute', KIT_SPEC) == (False, None)
+
+    assert cache.get_stats() == {
+        'hits': 2,
+        'misses': 4,
+        'size': 0,
+        'version': version + 1,
+    }
+
+
+def test_get_software_profile_metadata(dbm, kit_installer):
+    manager = SoftwareProfileManager()
+
+    with dbm.session() as session:
+        kits = session.query(Kit).filter(Kit.isOs == False).count()  # noqa
+
+        assert manager.get_software_profile_metadata(session, 'compute') == \
+            {'profile': 'compute'}
+        assert kit_installer.calls == kits
+
+        stats = metadata_cache.get_stats()
+
+        assert manager.get_software_profile_metadata(session, 'compute') == \
+            {'profile': 'compute'}
+        assert kit_installer.calls == kits
+        assert metadata_cache.get_stats()['hits'] == stats['hits'] + kits
+
+        #
+        # Enabling a component invalidates the cache
+        #
+        swprofile = session.query(SoftwareProfile).filter(
+            SoftwareProfile.name == 'compute').one()
+        swprofile.components.append(session.query(Component).filter(
+            Component.name == 'pdsh').one())
+        session.flush()
+
+        manager.get_software_profile_metadata(session, 'compute')
+        assert kit_installer.calls == kits * 2
+
+        session.rollback()
+
+
+def test_get_kit_installer_instance(monkeypatch):
+    monkeypatch.syspath_prepend(
+        os.path.join(os.path.dirname(__file__), 'fixtures', 'kit-test'))
+    importlib.import_module('tortuga_kits.test_1_0_0.kit')
+
+    kit_spec = ('test', '1.0.0', '0')
+
+    with patch('pkgutil.walk_packages',
+               side_effect=pkgutil.walk_packages) as walk_packages:
+        installer = get_kit_installer_instance(kit_spec, session='session1')
+        component_installer = installer.get_component_installer(
+            'mycomponent')
+        assert component_installer.session == 'session1'
+
+        installer.get_config()
+        component_installer.get_config()
+
+        #
+        # The same instance is returned, with the new session
+        #
+        assert get_kit_installer_instance(
+            kit_spec, session='session2') is installer
+        assert installer.get_component_installer('mycomponent').session == \
+            'session2'
+
+        #
+        # Reused instances don't keep any cached configuration
+        #
+        assert installer._config_parser is None
+        assert component_installer._config_parser is None
+
+        #
+        # The components package is only walked once per kit
+        #
+        other_installer = installer.__class__()
+        assert other_installer.get_component_installer('mycomponent') \
+            is not None
+        assert walk_packages.call_count == 1
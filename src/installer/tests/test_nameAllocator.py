@@ -0,0 +1,73 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from tortuga.addhost.nameAllocator import NameAllocator
+from tortuga.exceptions.invalidArgument import InvalidArgument
+
+
+def test_allocate():
+    allocator = NameAllocator('compute-#NN')
+    allocator.assign('compute-01.domain')
+    allocator.assign('compute-03')
+    allocator.assign('other-02')
+    allocator.reserve('compute-04')
+
+    assert allocator.name_filter == 'compute-__'
+    assert allocator.allocate(3) == ['compute-02', 'compute-05',
+                                     'compute-06']
+
+
+def test_release():
+    allocator = NameAllocator('rack01-#NNN-x')
+    allocator.assign('rack01-001-x')
+
+    assert allocator.allocate(2) == ['rack01-002-x', 'rack01-003-x']
+
+    allocator.release('rack01-002-x')
+    allocator.release('rack01-001-x')
+
+    assert allocator.allocate(2) == ['rack01-002-x', 'rack01-004-x']
+
+
+def test_allocate_randomize():
+    allocator = NameAllocator('compute-#NN', randomize=True)
+    allocator.assign('compute-01-abcde')
+
+    name, = allocator.allocate()
+
+    assert allocator.name_filter == 'compute-__-_____'
+    assert name.startswith('compute-02-') and len(name) == 16
+    assert allocator.parse(name) == 2
+
+
+def test_allocate_exhausted():
+    allocator = NameAllocator('compute-#N')
+    allocator.assign('compute-5')
+
+    with pytest.raises(InvalidArgument):
+        allocator.allocate(9)
+
+    assert allocator.allocate(8) == [
+        'compute-{}'.format(n) for n in (1, 2, 3, 4, 6, 7, 8, 9)]
+
+
+def test_allocate_without_specifier():
+    allocator = NameAllocator('compute')
+
+    assert allocator.allocate() == ['compute']
+
+    with pytest.raises(InvalidArgument):
+        allocator.allocate()
@@ -0,0 +1,123 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+import pytest
+
+from tortuga.db.models.node import Node
+from tortuga.node.liveness import McollectiveNodePinger, \
+    NodeLivenessTracker, NodeNameResolver, NodePinger, NodePingReply, \
+    get_stale_nodes
+
+
+class FakeNodePinger(NodePinger):
+    def __init__(self, names):
+        self.names = names
+
+    def ping_all_nodes(self):
+        return [NodePingReply(name, True, 1.0) for name in self.names]
+
+
+@pytest.fixture
+def session(dbm):
+    with dbm.session() as session:
+        last_updates = dict(session.query(Node.id, Node.lastUpdate))
+
+        yield session
+
+        # restore the (shared) database
+        session.rollback()
+        for node in session.query(Node):
+            node.lastUpdate = last_updates[node.id]
+        session.commit()
+
+
+def test_parse_reply():
+    reply = McollectiveNodePinger.parse_reply(
+        'compute-01                           time=52.88 ms\n')
+    assert reply.name == 'compute-01'
+    assert reply.response_time == 52.88
+
+    assert McollectiveNodePinger.parse_reply(
+        '---- ping statistics ----') is None
+
+
+def test_resolve(session):
+    resolver = NodeNameResolver(session)
+
+    node = session.query(Node).filter(
+        Node.name == 'compute-01.private').one()
+
+    assert resolver.resolve(
+        ['compute-01.private', 'compute-01', 'compute-01.other',
+         'compute-0', 'unknown']) == {
+        'compute-01.private': [node.id],
+        'compute-01': [node.id],
+        'compute-01.other': [node.id],
+    }
+
+
+def test_track(session):
+    names = ['compute-{:02d}'.format(n) for n in range(1, 6)] + ['unknown']
+
+    tracker = NodeLivenessTracker(session)
+    assert tracker.track(FakeNodePinger(names), batch_size=2) == 5
+
+    now = datetime.datetime.utcnow()
+    stale = {node.name for node in get_stale_nodes(
+        session, now - datetime.timedelta(minutes=5))}
+
+    assert 'compute-01.private' not in stale
+    assert 'compute-05.private' not in stale
+    assert 'compute-06.private' in stale
+
+    #
+    # Nodes that reply later are no longer stale
+    #
+    tracker.update([NodePingReply('compute-06.private', True, 1.0)],
+                   timestamp=now + datetime.timedelta(minutes=1))
+
+    stale = {node.name for node in get_stale_nodes(
+        session, now + datetime.timedelta(seconds=30))}
+
+    assert 'compute-06.private' not in stale
+    assert 'compute-01.private' in stale
+
+
+def test_last_update_normalized(session):
+    node = session.query(Node).filter(
+        Node.name == 'compute-01.private').one()
+
+    node.lastUpdate = '2018-01-02T03:04:05.123Z'
+    assert node.lastUpdate == '2018-01-02 03:04:05'
+
+    node.lastUpdate = datetime.datetime(
+        2018, 1, 2, 5, 4, 5,
+        tzinfo=datetime.timezone(datetime.timedelta(hours=2)))
+    assert node.lastUpdate == '2018-01-02 03:04:05'
+
+    #
+    # Timestamps that would not compare correctly in the database are
+    # rejected
+    #
+    for value in ['2018-1-2 3:04:05', '02/01/2018 03:04:05', 'yesterday']:
+        with pytest.raises(ValueError):
+            node.lastUpdate = value
+
+    assert node.lastUpdate == '2018-01-02 03:04:05'
+
+    session.flush()
+    assert node in get_stale_nodes(session, datetime.datetime(2018, 1, 3))
+    assert node not in get_stale_nodes(session, datetime.datetime(2018, 1, 2))
@@ -12,7 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from unittest.mock import patch
+
+from tortuga.db.models.hardwareProfile import HardwareProfile
 from tortuga.db.models.node import Node
+from tortuga.db.models.softwareProfile import SoftwareProfile
 
 
 def test_addnode(dbm):
@@ -22,3 +26,50 @@ def test_addnode(dbm):
         session.add(node)
 
         session.commit()
+
+
+@patch('tortuga.node.nodeManager.NodeStateChanged')
+@patch('tortuga.node.nodeManager.resourceAdapterFactory')
+@patch('tortuga.node.nodeManager.KitActionsManager')
+@patch('tortuga.node.nodeManager.SyncApi')
+@patch('tortuga.node.nodeManager.osUtility.getOsObjectFactory')
+def test_delete_nodes_batched(get_os_object_factory_mock, sync_api_mock,
+                              kit_actions_manager_mock,
+                              resource_adapter_factory_mock,
+                              node_state_changed_mock, dbm): \
+        # pylint: disable=unused-argument
+    from tortuga.node.nodeManager import NodeManager
+
+    with dbm.session() as session:
+        hwprofile = session.query(HardwareProfile).filter(
+            HardwareProfile.name == 'aws').one()
+        swprofile = session.query(SoftwareProfile).filter(
+            SoftwareProfile.name == 'compute').one()
+
+        for idx in range(10):
+            session.add(Node(name='bulkdel-{:02d}'.format(idx),
+                             state='Installed', hardwareprofile=hwprofile,
+                             softwareprofile=swprofile))
+        session.commit()
+
+        node_manager = NodeManager()
+        node_manager.DELETE_BATCH_SIZE = 4
+        node_manager.deleteNode(session, 'bulkdel-*')
+
+        assert not session.query(Node).filter(
+            Node.name.like('bulkdel-%')).count()
+
+    kitmgr = kit_actions_manager_mock.return_value
+
+    #
+    # Kit actions are called once for all nodes before deletion, and
+    # once per batch after deletion
+    #
+    assert kitmgr.pre_delete_host.call_count == 1
+    assert len(kitmgr.pre_delete_host.call_args[1]['nodes']) == 10
+    assert [len(call[1]['nodes'])
+            for call in kitmgr.post_delete_host.call_args_list] == [4, 4, 2]
+
+    assert node_state_changed_mock.fire.call_count == 10
+    resource_adapter_factory_mock.get_api.return_value.deleteNode \
+        .assert_called_once()
@@ -13,8 +13,12 @@
 # limitations under the License.
 
 import types
+from unittest.mock import patch
+
+import pytest
 
 from tortuga.objectstore.base import matches_filters
+from tortuga.objectstore.manager import ObjectStoreManager
 from tortuga.objectstore.redis import RedisObjectStore
 
 
@@ -277,3 +281,333 @@ def test_list_filter(redis):
     for k, v in store.list(order_by='number', age__gt=40):
         numbers.append(v['number'])
     assert numbers == [1, 4]
+
+
+def test_list_batched(redis, monkeypatch):
+    store = RedisObjectStore(namespace='test', redis_client=redis,
+                             batch_size=2)
+
+    to_store = {
+        'my_key{}'.format(idx): {'number': idx} for idx in range(1, 6)
+    }
+    for k, v in to_store.items():
+        store.set(k, v)
+
+    pipelines = []
+    original_pipeline = redis.pipeline
+
+    def pipeline(*args, **kwargs):
+        pipelines.append(1)
+        return original_pipeline(*args, **kwargs)
+
+    monkeypatch.setattr(redis, 'pipeline', pipeline)
+
+    #
+    # Make sure objects are fetched in chunks of batch_size, and that the
+    # sort order is preserved across chunks
+    #
+    numbers = []
+    for k, v in store.list(order_by='number'):
+        numbers.append(int(v['number']))
+    assert numbers == [1, 2, 3, 4, 5]
+    assert len(pipelines) == 3
+
+    #
+    # Make sure the list is streamed, i.e. only the first chunk is fetched
+    # when only the first object is consumed
+    #
+    pipelines.clear()
+    next(store.list())
+    assert len(pipelines) == 1
+
+
+def test_list_removes_expired_keys(redis):
+    store = RedisObjectStore(namespace='test', redis_client=redis,
+                             batch_size=2)
+
+    for idx in range(1, 6):
+        store.set('my_key{}'.format(idx), {'number': idx})
+
+    #
+    # Simulate expiry of some objects, leaving their index entries behind
+    #
+    redis.delete('test:my_key2')
+    redis.delete('test:my_key4')
+
+    keys = sorted(k for k, _ in store.list())
+    assert keys == ['my_key1', 'my_key3', 'my_key5']
+
+    #
+    # Make sure the dangling index entries were cleaned up
+    #
+    index = sorted(k.decode() for k in redis.smembers('test:INDEX'))
+    assert index == ['test:my_key1', 'test:my_key3', 'test:my_key5']
+
+
+def test_list_indexed_filters(redis, monkeypatch):
+    store = RedisObjectStore(namespace='test', redis_client=redis,
+                             indexes=['name'], sorted_indexes=['age'])
+
+    to_store = {
+        'my_key5': {'number': 5, 'name': 'alice', 'age': 22},
+        'my_key2': {'number': 2, 'name': 'bob', 'age': 33},
+        'my_key1': {'number': 1, 'name': 'zeph', 'age': 44},
+        'my_key4': {'number': 4, 'name': 'fred', 'age': 55},
+        'my_key3': {'number': 3, 'name': 'bob', 'age': 34}
+    }
+    for k, v in to_store.items():
+        store.set(k, v)
+
+    indexed, remaining = store.split_filters(
+        {'name': 'bob', 'age__gt': 30, 'number__lt': 3})
+    assert indexed == {'name': 'bob', 'age__gt': 30}
+    assert remaining == {'number__lt': 3}
+
+    #
+    # Make sure non-matching objects are never fetched from Redis
+    #
+    fetched = []
+    original_hgetall = redis.hgetall
+
+    def hgetall(key):
+        fetched.append(key)
+        return original_hgetall(key)
+
+    monkeypatch.setattr(redis, 'hgetall', hgetall)
+
+    numbers = [int(v['number']) for _, v in store.list(name='bob')]
+    assert sorted(numbers) == [2, 3]
+    assert sorted(fetched) == ['test:my_key2', 'test:my_key3']
+
+    #
+    # Ranges and ordering using the sorted index
+    #
+    fetched.clear()
+    ages = [int(v['age']) for _, v in
+            store.list(order_by='age', age__gt=22, age__lt=55)]
+    assert ages == [33, 34, 44]
+    assert len(fetched) == 3
+
+    ages = [int(v['age']) for _, v in
+            store.list(order_by='age', order_desc=True, age__gt=22)]
+    assert ages == [55, 44, 34, 33]
+
+    #
+    # Combined indexed and non-indexed filters
+    #
+    numbers = [int(v['number']) for _, v in
+               store.list(order_by='number', name='bob', age__lt=34)]
+    assert numbers == [2]
+
+    numbers = [int(v['number']) for _, v in
+               store.list(order_by='number', age__lt=50, number__gt=1)]
+    assert numbers == [2, 3, 5]
+
+    #
+    # Limits on an ordered index
+    #
+    ages = [int(v['age']) for _, v in store.list(order_by='age', limit=2)]
+    assert ages == [22, 33]
+
+
+def test_indexes_maintained(redis):
+    store = RedisObjectStore(namespace='test', redis_client=redis,
+                             indexes=['name'], sorted_indexes=['age'])
+
+    store.set('my_key1', {'name': 'bob', 'age': 33})
+    store.set('my_key2', {'name': 'bob', 'age': 44})
+
+    #
+    # Updates move the object to the new index entries
+    #
+    store.set('my_key1', {'name': 'alice', 'age': 55})
+    assert [k for k, _ in store.list(name='bob')] == ['my_key2']
+    assert [k for k, _ in store.list(name='alice')] == ['my_key1']
+    assert [k for k, _ in store.list(age__gt=50)] == ['my_key1']
+
+    #
+    # Deletes remove the object from all indexes
+    #
+    store.delete('my_key2')
+    assert list(store.list(name='bob')) == []
+    assert list(store.list(age__lt=50)) == []
+    assert redis.smembers('test:INDEX:name:bob') == []
+
+
+def test_ensure_indexes(redis):
+    store = RedisObjectStore(namespace='test', redis_client=redis)
+    store.set('my_key1', {'name': 'bob', 'timestamp': '2018-11-01T10:00:00+00:00'})
+    store.set('my_key2', {'name': 'joe', 'timestamp': '2018-11-01T09:00:00+00:00'})
+
+    #
+    # Declaring indexes on existing data builds them
+    #
+    store = RedisObjectStore(namespace='test', redis_client=redis,
+                             indexes=['name'],
+                             sorted_indexes=['timestamp'])
+    store.ensure_indexes()
+
+    assert [k for k, _ in store.list(name='joe')] == ['my_key2']
+    assert [k for k, _ in store.list(order_by='timestamp')] == \
+        ['my_key2', 'my_key1']
+    assert [k for k, _ in store.list(
+        timestamp__gt='2018-11-01T09:30:00+00:00')] == ['my_key1']
+
+    #
+    # Indexes that are no longer declared are removed, in batches,
+    # without using the (blocking) KEYS command
+    #
+    store = RedisObjectStore(namespace='test', redis_client=redis,
+                             batch_size=1, sorted_indexes=['timestamp'])
+    with patch.object(redis, 'keys', side_effect=AssertionError), \
+            patch.object(redis, 'delete', wraps=redis.delete) as delete:
+        store.ensure_indexes()
+
+    assert redis.keys('test:INDEX:*') == []
+    assert all(len(call[0]) == 1 for call in delete.call_args_list)
+    assert [k for k, _ in store.list(order_by='timestamp')] == \
+        ['my_key2', 'my_key1']
+
+
+def test_list_after(redis):
+    store = RedisObjectStore(namespace='test', redis_client=redis,
+                             batch_size=2, sorted_indexes=['age'])
+
+    to_store = {
+        'my_key5': {'number': 5, 'name': 'alice', 'age': 22},
+        'my_key2': {'number': 2, 'name': 'bob', 'age': 33},
+        'my_key1': {'number': 1, 'name': 'zeph', 'age': 33},
+        'my_key4': {'number': 4, 'name': 'fred', 'age': 33},
+        'my_key3': {'number': 3, 'name': 'bob', 'age': 44}
+    }
+    for k, v in to_store.items():
+        store.set(k, v)
+
+    def paginate(**kwargs):
+        keys = []
+        after = None
+        while True:
+            page = list(store.list(limit=2, after=after, **kwargs))
+            keys += [k for k, _ in page]
+            if len(page) < 2:
+                return keys
+            after = (page[-1][0], page[-1][1].get(kwargs.get('order_by')))
+
+    #
+    # Ties are ordered by key, and pages resume after the last key
+    #
+    for kwargs in [{},
+                   {'order_by': 'age'},
+                   {'order_by': 'age', 'order_desc': True}]:
+        expected = [k for k, _ in store.list(**kwargs)]
+        assert paginate(**kwargs) == expected, kwargs
+
+    assert [k for k, _ in store.list(order_by='age')] == \
+        ['my_key5', 'my_key1', 'my_key2', 'my_key4', 'my_key3']
+    assert [k for k, _ in store.list(order_by='name', order_alpha=True)] == \
+        ['my_key5', 'my_key2', 'my_key3', 'my_key4', 'my_key1']
+
+    #
+    # Un-ordered lists are read from the sorted set of keys, a batch at
+    # a time, rather than from the whole (unordered) index set
+    #
+    with patch.object(redis, 'smembers', side_effect=AssertionError):
+        assert paginate() == sorted(to_store.keys())
+
+    #
+    # Lists ordered by attributes that are not sorted indexes can't be
+    # resumed without sorting all objects again
+    #
+    assert not store.can_list_after('name')
+    with pytest.raises(ValueError):
+        list(store.list(order_by='name', order_alpha=True,
+                        after=('my_key2', 'bob')))
+
+    #
+    # The sorted set of keys is built for existing objects
+    #
+    redis.delete('test:KEYS', 'test:INDEXES')
+    store.ensure_indexes()
+    assert paginate() == sorted(to_store.keys())
+
+
+def test_partitioned_sorted_index(redis, monkeypatch):
+    store = RedisObjectStore(namespace='test', redis_client=redis,
+                             indexes=['name'], sorted_indexes=['age'],
+                             sorted_index_partitions={'age': 'name'})
+
+    for n in range(100):
+        store.set('other{:03d}'.format(n), {'name': 'other', 'age': n})
+    store.set('bob1', {'name': 'bob', 'age': 10})
+    store.set('bob2', {'name': 'bob', 'age': 30})
+    store.set('bob3', {'name': 'bob', 'age': 20})
+
+    #
+    # Neither the other objects, nor the name index, are read when
+    # listing the objects of a partition
+    #
+    monkeypatch.setattr(redis, 'sinter', None)
+
+    assert [k for k, _ in store.list(order_by='age', order_desc=True,
+                                     name='bob', limit=2)] == \
+        ['bob2', 'bob3']
+    assert [k for k, _ in store.list(order_by='age', name='bob',
+                                     age__gt=10)] == ['bob3', 'bob2']
+
+    #
+    # Updates move the object to the new partition
+    #
+    store.set('bob1', {'name': 'alice', 'age': 10})
+    assert [k for k, _ in store.list(order_by='age', name='bob')] == \
+        ['bob3', 'bob2']
+    assert [k for k, _ in store.list(order_by='age', name='alice')] == \
+        ['bob1']
+
+    store.delete('bob3')
+    assert [k for k, _ in store.list(order_by='age', name='bob')] == \
+        ['bob2']
+
+
+def test_trim(redis):
+    store = RedisObjectStore(namespace='test', redis_client=redis,
+                             indexes=['name'], sorted_indexes=['age'],
+                             sorted_index_partitions={'age': 'name'})
+
+    for n in range(10):
+        store.set('my_key{}'.format(n),
+                  {'name': 'even' if n % 2 == 0 else 'odd', 'age': n})
+
+    assert store.trim('age', 4) == 5
+
+    assert sorted(k for k, _ in store.list()) == \
+        ['my_key5', 'my_key6', 'my_key7', 'my_key8', 'my_key9']
+    assert [k for k, _ in store.list(order_by='age', name='odd')] == \
+        ['my_key5', 'my_key7', 'my_key9']
+    assert sorted(redis.smembers('test:INDEX:name:even')) == \
+        [b'test:my_key6', b'test:my_key8']
+    assert not redis.exists('test:my_key0')
+
+    assert store.trim('age', 4) == 0
+
+
+def test_manager_ensure_indexes(monkeypatch):
+    monkeypatch.setattr(ObjectStoreManager, '_redis_client', None)
+
+    with patch.object(RedisObjectStore, 'ensure_indexes') as ensure_indexes:
+        #
+        # The indexes of a namespace are only checked once per process...
+        #
+        for _ in range(3):
+            ObjectStoreManager.get('test', indexes=['name'])
+        assert ensure_indexes.call_count == 1
+
+        #
+        # ...unless they are declared differently
+        #
+        ObjectStoreManager.get('test', indexes=['name', 'age'])
+        ObjectStoreManager.get('test2', indexes=['name'])
+        assert ensure_indexes.call_count == 3
+
+        ObjectStoreManager.get('test3')
+        ObjectStoreManager.get('test3')
+        assert ensure_indexes.call_count == 4
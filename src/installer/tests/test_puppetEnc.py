@@ -0,0 +1,200 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from tortuga.db.models.node import Node
+from tortuga.db.models.softwareProfile import SoftwareProfile
+from tortuga.objectstore.manager import ObjectStoreManager
+from tortuga.puppet.enc import PuppetEncGenerator, precompute_puppet_enc
+from tortuga.puppet.encCache import PuppetEncCache
+from tortuga.scripts import get_tortuga_node
+
+
+class FakeComponentInstaller:
+    puppet_class = 'tortuga_kit_base::core'
+
+    def __init__(self):
+        self.calls = 0
+
+    def run_action(self, action, swprofile, hwprofile, data=None):
+        self.calls += 1
+        return {'swprofile': swprofile.name}
+
+
+class FakeKitInstaller:
+    component_installer = FakeComponentInstaller()
+
+    def get_component_installer(self, name):
+        return self.component_installer
+
+
+@pytest.fixture
+def kit_installer():
+    FakeKitInstaller.component_installer = FakeComponentInstaller()
+
+    with patch('tortuga.puppet.enc.get_kit_installer_instance',
+               return_value=FakeKitInstaller()):
+        yield FakeKitInstaller.component_installer
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    # start every test with an empty (mock) Redis
+    monkeypatch.setattr(ObjectStoreManager, '_redis_client', None)
+
+    return PuppetEncCache()
+
+
+def _get_compute_nodes(session):
+    return session.query(Node).filter(Node.name.like('compute-%')).all()
+
+
+def test_cache(cache):
+    assert cache.get('node01') is None
+
+    generation = cache.get_generation()
+    cache.set_many({'node01': '--- 1\n', 'NODE02': '--- 2\n'})
+
+    assert cache.get('NODE01') == '--- 1\n'
+    assert cache.get('node02') == '--- 2\n'
+
+    cache.invalidate('node01')
+    assert cache.get('node01') is None
+    assert cache.get('node02') == '--- 2\n'
+
+    cache.invalidate()
+    assert cache.get('node02') is None
+
+    #
+    # Documents rendered before the cache was invalidated are not served
+    #
+    cache.set('node01', '--- 1\n', generation=generation)
+    assert cache.get('node01') is None
+
+    #
+    # Documents rendered before a node was invalidated are not served
+    # either, even if they are stored afterwards
+    #
+    generation = cache.get_generation()
+    rendered = time.time()
+    cache.invalidate('node01')
+    cache.set_many({'node01': '--- 1\n', 'node02': '--- 2\n'},
+                   generation=generation, rendered=rendered)
+    assert cache.get('node01') is None
+    assert cache.get('node02') == '--- 2\n'
+
+    cache.set('node01', '--- 1\n', generation=generation)
+    assert cache.get('node01') == '--- 1\n'
+
+
+def test_precompute(dbm, cache, kit_installer):
+    with dbm.session() as session:
+        nodes = _get_compute_nodes(session)
+
+        assert precompute_puppet_enc(session, cache=cache) >= len(nodes)
+
+        #
+        # The component installers are only run once per profile
+        #
+        assert kit_installer.calls < len(nodes)
+
+        for node in nodes:
+            document = cache.get(node.name)
+            assert document == PuppetEncGenerator.render(
+                PuppetEncGenerator(session).get_node_data(node))
+
+            data = yaml.safe_load(document)
+            assert data['classes']['tortuga_kit_base::core'] == {
+                'swprofile': node.softwareprofile.name}
+            assert data['parameters']['hwprofilename'] == \
+                node.hardwareprofile.name
+            assert data['environment'] == 'production'
+
+
+def test_invalidated_by_database_changes(dbm, cache, kit_installer):
+    with dbm.session() as session:
+        precompute_puppet_enc(session, cache=cache)
+
+        node, other_node = _get_compute_nodes(session)[:2]
+
+        #
+        # Node state changes don't affect the documents
+        #
+        node.state = 'Installed'
+        session.commit()
+        assert cache.get(node.name) is not None
+
+        #
+        # Moving a node to another software profile invalidates its
+        # document only
+        #
+        original_swprofile = node.softwareprofile
+        swprofile = session.query(SoftwareProfile).filter(
+            SoftwareProfile.id != original_swprofile.id).first()
+        original_description = swprofile.description
+
+        node.softwareprofile = swprofile
+        session.commit()
+        assert cache.get(node.name) is None
+        assert cache.get(other_node.name) is not None
+
+        #
+        # Changes that are rolled back don't invalidate anything
+        #
+        swprofile.description = 'changed'
+        session.flush()
+        session.rollback()
+        assert cache.get(other_node.name) is not None
+
+        #
+        # Profile changes invalidate all documents
+        #
+        swprofile.description = 'changed'
+        session.commit()
+        assert cache.get(other_node.name) is None
+
+        # restore the (shared) database
+        node.softwareprofile = original_swprofile
+        swprofile.description = original_description
+        session.commit()
+
+
+def test_get_tortuga_node(dbm, cache, kit_installer, capsys):
+    with dbm.session() as session:
+        node = _get_compute_nodes(session)[0]
+        node_name = node.name
+
+        get_tortuga_node.get_puppet_node_yaml(session, node_name, cache=cache)
+
+        document = capsys.readouterr().out
+        assert yaml.safe_load(document)['parameters']['hwprofilename'] == \
+            node.hardwareprofile.name
+
+    #
+    # The second time around, the cached document is served without
+    # loading the kits or touching the database
+    #
+    with patch('sys.argv', ['get-tortuga-node', node_name]), \
+            patch('tortuga.kit.loader.load_kits') as load_kits, \
+            patch('tortuga.db.dbManager.DbManager') as db_manager:
+        get_tortuga_node.main()
+
+    assert capsys.readouterr().out == document
+    load_kits.assert_not_called()
+    db_manager.assert_not_called()
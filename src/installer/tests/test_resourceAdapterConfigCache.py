@@ -0,0 +1,211 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from tortuga.db.resourceAdapterConfigDbHandler import \
+    ResourceAdapterConfigDbHandler
+from tortuga.resourceAdapter.configCache import (InstanceSizeMappingCache,
+                                                 ResourceAdapterConfigCache,
+                                                 config_cache)
+from tortuga.resourceAdapter.registry import RESOURCE_ADAPTER_REGISTRY
+from tortuga.resourceAdapter.resourceAdapter import ResourceAdapter
+from tortuga.resourceAdapterConfiguration import settings
+from tortuga.resourceAdapterConfiguration.manager import \
+    ResourceAdapterConfigurationManager
+
+
+_registered_adapter = RESOURCE_ADAPTER_REGISTRY.get('aws')
+
+
+class ConfigCacheTestAdapter(ResourceAdapter):
+    __adaptername__ = 'aws'
+
+    settings = {
+        'ami': settings.StringSetting(),
+        'another_key': settings.StringSetting(),
+        'instance_type': settings.StringSetting(default='t2.micro'),
+    }
+
+    process_config_calls = 0
+
+    def process_config(self, config):
+        ConfigCacheTestAdapter.process_config_calls += 1
+        config['tags'] = {'name': 'value'}
+
+
+#
+# Defining the test adapter registers it, don't leave it in the (global)
+# resource adapter registry for other tests
+#
+if _registered_adapter is None:
+    RESOURCE_ADAPTER_REGISTRY.pop('aws', None)
+else:
+    RESOURCE_ADAPTER_REGISTRY['aws'] = _registered_adapter
+
+
+@pytest.fixture
+def adapter(dbm):
+    config_cache.invalidate()
+    ConfigCacheTestAdapter.process_config_calls = 0
+
+    with dbm.session() as session:
+        adapter = ConfigCacheTestAdapter()
+        adapter.session = session
+
+        yield adapter
+
+    config_cache.invalidate()
+
+
+def _get_node(session, profile: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        instance=SimpleNamespace(
+            resource_adapter_configuration=ResourceAdapterConfigDbHandler(
+            ).get(session, 'aws', profile)
+        )
+    )
+
+
+def test_resource_adapter_config_cache():
+    cache = ResourceAdapterConfigCache(ttl=0.5)
+
+    assert cache.get('aws', 'default') is None
+
+    cache.add('aws', 'default', {'ami': 'ami-1234'})
+
+    config = cache.get('aws', 'default')
+    assert config == {'ami': 'ami-1234'}
+
+    #
+    # Callers get their own copy of the config
+    #
+    config['ami'] = 'ami-5678'
+    assert cache.get('aws', 'default') == {'ami': 'ami-1234'}
+
+    #
+    # Configs resolved before the cache was invalidated are not added
+    #
+    version = cache.version
+    cache.invalidate()
+    assert cache.get('aws', 'default') is None
+
+    cache.add('aws', 'default', {'ami': 'ami-1234'}, version=version)
+    assert cache.get('aws', 'default') is None
+
+    #
+    # Entries expire
+    #
+    cache.add('aws', 'default', {'ami': 'ami-1234'})
+    time.sleep(0.6)
+    assert cache.get('aws', 'default') is None
+
+    assert cache.get_stats() == {
+        'hits': 2,
+        'misses': 4,
+        'size': 0,
+        'version': 1,
+    }
+
+
+def test_get_node_resource_adapter_config_cached(adapter):
+    node = _get_node(adapter.session, 'nondefault')
+
+    config = adapter.get_node_resource_adapter_config(node)
+    assert config['another_key'] == 'another_value'
+    assert config['instance_type'] == 't2.micro'
+
+    #
+    # Resolve the same profile again, without touching the database
+    #
+    with patch.object(ResourceAdapterConfigDbHandler, 'get') as get:
+        assert adapter.get_node_resource_adapter_config(node) == config
+        assert adapter.get_node_resource_adapter_config(
+            SimpleNamespace(instance=None)) is not None
+
+    assert get.call_count == 1
+    assert ConfigCacheTestAdapter.process_config_calls == 2
+
+    #
+    # Changes made by callers don't affect the cached config
+    #
+    config['tags']['name'] = 'changed'
+    cached_config = adapter.get_node_resource_adapter_config(node)
+    assert cached_config['tags'] == {'name': 'value'}
+
+    cached_config['tags']['name'] = 'changed'
+    assert adapter.get_node_resource_adapter_config(node)['tags'] == \
+        {'name': 'value'}
+
+
+def test_get_node_resource_adapter_config_invalidated(adapter):
+    node = _get_node(adapter.session, 'nondefault')
+
+    assert adapter.get_node_resource_adapter_config(node)['another_key'] == \
+        'another_value'
+
+    ResourceAdapterConfigurationManager().update(
+        adapter.session, 'aws', 'nondefault',
+        [{'key': 'another_key', 'value': 'updated_value'}], force=True)
+
+    assert adapter.get_node_resource_adapter_config(node)['another_key'] == \
+        'updated_value'
+
+    ResourceAdapterConfigurationManager().update(
+        adapter.session, 'aws', 'nondefault',
+        [{'key': 'another_key', 'value': 'another_value'}], force=True)
+
+    assert ConfigCacheTestAdapter.process_config_calls == 2
+
+
+def test_instance_size_mapping_cache(tmpdir):
+    filename = str(tmpdir.join('aws-instance-sizes.csv'))
+    cache = InstanceSizeMappingCache()
+
+    assert cache.get(filename) is None
+
+    with open(filename, 'w') as fp:
+        fp.write('t2.micro,1\nt2.large,2\n\nt2.large,4\n')
+
+    assert cache.get(filename) == {'t2.micro': '1', 't2.large': '2'}
+
+    with patch('tortuga.resourceAdapter.configCache.open') as open_:
+        assert cache.get(filename)['t2.micro'] == '1'
+    open_.assert_not_called()
+
+    #
+    # The file is parsed again once it is modified
+    #
+    with open(filename, 'w') as fp:
+        fp.write('t2.micro,8\n')
+    mtime = os.stat(filename).st_mtime + 1
+    os.utime(filename, (mtime, mtime))
+
+    assert cache.get(filename) == {'t2.micro': '8'}
+
+
+def test_get_instance_size_mapping(tmpdir, adapter):
+    with open(str(tmpdir.join('aws-instance-sizes.csv')), 'w') as fp:
+        fp.write('t2.micro,1\nt2.large,2\nbroken,x\n')
+
+    with patch.object(adapter._cm, 'getKitConfigBase',
+                      return_value=str(tmpdir)):
+        assert adapter.get_instance_size_mapping('t2.large') == 2
+        assert adapter.get_instance_size_mapping('nonexistent') == 1
+        assert adapter.get_instance_size_mapping('broken') == 1
@@ -0,0 +1,140 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from tortuga.exceptions.resourceNotFound import ResourceNotFound
+from tortuga.resourceAdapter import resourceAdapterFactory
+from tortuga.resourceAdapter.resourceAdapter import ResourceAdapter
+
+
+class FactoryTestAdapter(ResourceAdapter):
+    __adaptername__ = 'FactoryTest'
+
+
+def test_find_resourceadapters():
+    resourceAdapterFactory.find_resourceadapters()
+
+    #
+    # The resource adapter modules are only searched once
+    #
+    with patch('tortuga.resourceAdapter.registry.pkgutil.walk_packages') \
+            as walk_packages:
+        adapter_names = [adapter.__adaptername__ for adapter in
+                         resourceAdapterFactory.find_resourceadapters()]
+        assert resourceAdapterFactory.get_resourceadapter_class(
+            'DEFAULT').__adaptername__ == 'default'
+
+    walk_packages.assert_not_called()
+
+    assert 'default' in adapter_names
+    assert 'FactoryTest' in adapter_names
+
+
+def test_get_resourceadapter_class_not_found():
+    with pytest.raises(ResourceNotFound):
+        resourceAdapterFactory.get_resourceadapter_class('nonexistent')
+
+
+def test_get_api():
+    adapter = resourceAdapterFactory.get_api('factorytest')
+
+    assert isinstance(adapter, FactoryTestAdapter)
+    assert resourceAdapterFactory.get_api('FactoryTest') is adapter
+
+    #
+    # Instances are cached per add host session...
+    #
+    session_adapter = resourceAdapterFactory.get_api(
+        'factorytest', addHostSession='1234')
+    assert session_adapter is not adapter
+    assert session_adapter.addHostSession == '1234'
+    assert resourceAdapterFactory.get_api(
+        'factorytest', addHostSession='1234') is session_adapter
+
+    #
+    # ...and per thread
+    #
+    adapters = []
+    thread = threading.Thread(target=lambda: adapters.append(
+        resourceAdapterFactory.get_api('factorytest')))
+    thread.start()
+    thread.join()
+    assert adapters[0] is not adapter
+
+    #
+    # State kept for a single request is discarded when reusing instances
+    #
+    with patch('tortuga.resourceAdapter.resourceAdapter.ParameterApi') \
+            as parameter_api:
+        parameter_api.return_value.getParameter.return_value.getValue. \
+            return_value = 'example.com'
+        adapter.session = session = object()
+        adapter.start({'tags': {'name': 'value'}}, session, None)
+        assert adapter.private_dns_zone == 'example.com'
+        assert 'name' in adapter.get_initial_tags({}, 'hwp', 'swp')
+
+        parameter_api.return_value.getParameter.return_value.getValue. \
+            return_value = 'example.org'
+        assert resourceAdapterFactory.get_api('factorytest') is adapter
+        assert adapter.session is None
+        assert 'name' not in adapter.get_initial_tags({}, 'hwp', 'swp')
+        assert adapter.private_dns_zone == 'example.org'
+
+    #
+    # Refreshing the resource adapters discards cached instances
+    #
+    resourceAdapterFactory.refresh_resourceadapters()
+    assert resourceAdapterFactory.get_api('factorytest') is not adapter
+
+
+def test_get_resourceadapter_class_missing_rescan():
+    resourceAdapterFactory.refresh_resourceadapters()
+
+    adapter = resourceAdapterFactory.get_api('factorytest')
+
+    with patch('tortuga.resourceAdapter.registry.pkgutil.walk_packages',
+               return_value=[]) as walk_packages, \
+            patch('tortuga.resourceAdapter.resourceAdapterFactory.time.'
+                  'monotonic', return_value=1000.0) as monotonic:
+        #
+        # Missing resource adapters are searched for once per interval...
+        #
+        for _ in range(3):
+            with pytest.raises(ResourceNotFound):
+                resourceAdapterFactory.get_resourceadapter_class(
+                    'nonexistent')
+        assert walk_packages.call_count == 1
+
+        monotonic.return_value += \
+            resourceAdapterFactory.MISSING_ADAPTER_RESCAN_INTERVAL
+        with pytest.raises(ResourceNotFound):
+            resourceAdapterFactory.get_resourceadapter_class('nonexistent')
+        assert walk_packages.call_count == 2
+
+        #
+        # ...without discarding the cached instances
+        #
+        assert resourceAdapterFactory.get_api('factorytest') is adapter
+
+        #
+        # An explicit refresh searches again on the next miss
+        #
+        resourceAdapterFactory.refresh_resourceadapters()
+        with pytest.raises(ResourceNotFound):
+            resourceAdapterFactory.get_resourceadapter_class('nonexistent')
+        assert walk_packages.call_count == 4
@@ -16,8 +16,13 @@
 WIP: needs complete unit tests implemented
 """
 
+import os
+from unittest.mock import patch
+
 import pytest
+from jinja2 import Environment, FileSystemBytecodeCache
 
+from tortuga.db.models.nic import Nic
 from tortuga.db.models.node import Node
 from tortuga.db.nodesDbHandler import NodesDbHandler
 from tortuga.exceptions.nodeNotFound import NodeNotFound
@@ -50,3 +55,63 @@ class TestRhelOSSupport:
 
         with pytest.raises(NodeNotFound):
             osSupport._OSSupport__validate_node(node)
+
+
+def test_getKickstartFilesContents(dbm, tmpdir):
+    template = tmpdir.join('kickstart.tmpl')
+    template.write('# {{ fqdn }}\ntimezone {{ timezone }}\n{{ networkcfg }}\n')
+
+    bytecode_dir = tmpdir.mkdir('bytecode')
+
+    osSupport = OSSupport(OsFamilyInfo('rhel', '7', 'x86_64'))
+
+    with dbm.session() as session:
+        nodes = session.query(Node).filter(
+            Node.name.like('compute-%')).all()
+
+        # use the installer NIC as the provisioning NIC (not committed)
+        installer_nic = session.query(Nic).filter(Nic.ip == '10.2.0.1').one()
+        for hardwareprofile in {node.hardwareprofile for node in nodes}:
+            hardwareprofile.nics = [installer_nic]
+
+        with patch.object(osSupport._cm, 'getKitConfigBase',
+                          return_value=str(tmpdir)), \
+                patch('tortuga.os.rhel.osSupport.FileSystemBytecodeCache',
+                      lambda: FileSystemBytecodeCache(str(bytecode_dir))), \
+                patch.object(Environment, 'compile',
+                             autospec=True,
+                             side_effect=Environment.compile) as compile_, \
+                patch.object(OSSupport, '_OSSupport__kickstart_get_repos',
+                             return_value=[]) as get_repos:
+            contents = osSupport.getKickstartFilesContents(
+                session, [(node, None, None) for node in nodes])
+
+            #
+            # The template is compiled, and the profile sections computed,
+            # once for all nodes in the same profiles
+            #
+            assert compile_.call_count == 1
+            assert len(bytecode_dir.listdir()) == 1
+            assert get_repos.call_count == len(
+                {(node.hardwareprofile.id, node.softwareprofile.id)
+                 for node in nodes})
+
+            assert len(contents) == len(nodes)
+            for node, node_contents in zip(nodes, contents):
+                assert node_contents.startswith(
+                    '# {}\ntimezone '.format(node.name))
+                assert 'network --device' in node_contents
+
+            #
+            # The template is compiled again once it is modified
+            #
+            template.write('# changed {{ fqdn }}\n')
+            mtime = template.mtime() + 1
+            os.utime(str(template), (mtime, mtime))
+
+            assert osSupport.getKickstartFileContents(
+                session, nodes[0], None, None) == \
+                '# changed {}'.format(nodes[0].name)
+            assert compile_.call_count == 2
+
+        session.rollback()
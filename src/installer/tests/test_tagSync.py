@@ -0,0 +1,162 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest.mock import patch
+
+import pytest
+
+from tortuga.db.models.node import Node
+from tortuga.events.types import TagCreated, TagDeleted
+from tortuga.objectstore.manager import ObjectStoreManager
+from tortuga.resourceAdapter.resourceAdapter import ResourceAdapter
+from tortuga.resourceAdapter.tagSync import NodeTagChange, \
+    NodeTagSyncQueue, NodeTagSynchronizer
+
+
+class PerNodeAdapter(ResourceAdapter):
+    __adaptername__ = 'test-per-node'
+
+    def __init__(self):
+        self.calls = []
+
+    def set_node_tag(self, node, tag_name, tag_value):
+        self.calls.append(('set', node.name, tag_name, tag_value))
+
+    def unset_node_tag(self, node, tag_name):
+        self.calls.append(('unset', node.name, tag_name))
+
+
+class BulkAdapter(PerNodeAdapter):
+    __adaptername__ = 'test-bulk'
+
+    def set_node_tags(self, nodes, tags):
+        self.calls.append(('set', sorted(node.name for node in nodes), tags))
+
+    def unset_node_tags(self, nodes, tag_names):
+        self.calls.append(
+            ('unset', sorted(node.name for node in nodes), tag_names))
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    # start every test with an empty (mock) Redis
+    monkeypatch.setattr(ObjectStoreManager, '_redis_client', None)
+
+    return NodeTagSyncQueue()
+
+
+def _get_compute_nodes(session):
+    return session.query(Node).filter(
+        Node.name.like('compute-%')).order_by(Node.id).all()
+
+
+def test_queue(queue):
+    assert queue.drain() == []
+
+    assert queue.schedule()
+    assert not queue.schedule()
+
+    queue.add([NodeTagChange(1, 'a', '1', False),
+               NodeTagChange(2, 'a', '1', False)])
+    queue.add([NodeTagChange(1, 'a', '2', False),
+               NodeTagChange(1, 'b', None, True)])
+
+    #
+    # Only the last change to every node tag is kept
+    #
+    assert sorted(queue.drain()) == [
+        NodeTagChange(1, 'a', '2', False),
+        NodeTagChange(1, 'b', None, True),
+        NodeTagChange(2, 'a', '1', False),
+    ]
+    assert queue.drain() == []
+
+    #
+    # Once drained, the next change schedules another sync
+    #
+    assert queue.schedule()
+
+
+def test_listener(queue):
+    # importing the listeners sets up the (patched) web service database
+    from tortuga.events.listeners.tags import TagChangeListener
+
+    listener = TagChangeListener(None)
+
+    with patch('tortuga.resourceAdapter.tasks.sync_node_tags') as task:
+        listener.run_batch([
+            TagCreated(tag_id='node:1:managed:a', value='1'),
+            TagCreated(tag_id='node:2:a', value='1'),
+            TagCreated(tag_id='node:2:b'),
+            TagCreated(tag_id='softwareprofile:1:a', value='1'),
+        ])
+        listener.run(TagDeleted(tag_id='node:1:b'))
+
+    #
+    # The sync is only scheduled once
+    #
+    task.apply_async.assert_called_once_with(countdown=queue.window)
+
+    #
+    # Tags without a value are not mistaken for deleted tags
+    #
+    assert sorted(queue.drain()) == [
+        NodeTagChange(1, 'a', '1', False),
+        NodeTagChange(1, 'b', None, True),
+        NodeTagChange(2, 'a', '1', False),
+        NodeTagChange(2, 'b', None, False),
+    ]
+
+
+@pytest.mark.parametrize('adapter_class', [PerNodeAdapter, BulkAdapter])
+def test_synchronizer(dbm, queue, adapter_class):
+    adapter = adapter_class()
+
+    with dbm.session() as session:
+        nodes = _get_compute_nodes(session)[:4]
+        names = [node.name for node in nodes]
+
+        changes = \
+            [NodeTagChange(node.id, 'a', '1', False) for node in nodes] + \
+            [NodeTagChange(node.id, 'b', None, True) for node in nodes[:2]]
+
+        with patch('tortuga.resourceAdapter.tagSync.get_api',
+                   return_value=adapter):
+            api_calls = NodeTagSynchronizer(session).sync(changes)
+
+    if adapter_class is BulkAdapter:
+        #
+        # Nodes with the same changes are tagged together
+        #
+        assert api_calls == 3
+        assert adapter.calls == [
+            ('unset', names[:2], ['b']),
+            ('set', names[:2], {'a': '1'}),
+            ('set', names[2:], {'a': '1'}),
+        ]
+    else:
+        assert api_calls == 6
+        assert sorted(adapter.calls) == sorted(
+            [('set', name, 'a', '1') for name in names] +
+            [('unset', name, 'b') for name in names[:2]])
+
+    #
+    # The statistics are kept in Redis, for all processes
+    #
+    assert NodeTagSynchronizer.get_stats() == {
+        'changes': len(changes),
+        'nodes': len(nodes),
+        'api_calls': api_calls,
+        'failures': 0,
+    }
@@ -0,0 +1,171 @@
+# Copyright 2008-2018 Univa Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from sqlalchemy import event
+
+from tortuga.node.store import SqlalchemySessionNodeStore
+from tortuga.objectstore.redis import RedisObjectStore
+from tortuga.tags.store import SqlalchemySessionTagStore
+from tortuga.tags.types import Tag
+from tortuga.typestore.base import Cursor
+from tortuga.typestore.objectstore import ObjectStoreTypeStore
+
+
+def paginate(store, page_size, **kwargs):
+    """
+    Pages through a type store, returning the list of pages.
+
+    """
+    pages = []
+    cursor = None
+    while True:
+        page = list(store.list(limit=page_size, cursor=cursor, **kwargs))
+        if page:
+            pages.append(page)
+        if len(page) < page_size:
+            return pages
+        cursor = Cursor.decode(
+            Cursor.from_object(page[-1], kwargs.get('order_by')).encode())
+
+
+def test_cursor_encode_decode():
+    cursor = Cursor.decode(Cursor('12', 'compute-01').encode())
+    assert cursor.obj_id == '12'
+    assert cursor.value == 'compute-01'
+
+    with pytest.raises(ValueError):
+        Cursor.decode('not-a-cursor')
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'order_by': 'name'},
+    {'order_by': 'name', 'order_desc': True},
+    {'order_by': 'state'},
+    {'order_by': 'state', 'order_desc': True},
+    {'order_by': 'last_update'},
+    {'order_by': 'name', 'name__gt': 'compute-04'},
+    {'name__lt': 'compute-07'},
+])
+def test_node_store_pagination(dbm, kwargs):
+    store = SqlalchemySessionNodeStore(dbm)
+
+    expected = [node.id for node in store.list(**kwargs)]
+    assert len(expected) > 3
+
+    pages = paginate(store, 3, **kwargs)
+    assert all(len(page) <= 3 for page in pages)
+    assert [node.id for page in pages for node in page] == expected
+
+
+def test_node_store_page_query(dbm):
+    store = SqlalchemySessionNodeStore(dbm)
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):  # pylint: disable=unused-argument
+        statements.append(statement)
+
+    event.listen(dbm.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        page = list(store.list(order_by='name', limit=3))
+        node_statements = [statement for statement in statements
+                           if 'FROM nodes' in statement]
+        pages = paginate(store, 3, order_by='name', name__gt='compute-04')
+    finally:
+        event.remove(dbm.engine, 'before_cursor_execute',
+                     before_cursor_execute)
+
+    #
+    # A page is read with a single query, limited in SQL...
+    #
+    assert len(page) == 3
+    assert len(node_statements) == 1
+    assert 'LIMIT' in node_statements[0]
+
+    #
+    # ...and filtered pages are filled from further limited queries
+    #
+    assert [len(page) for page in pages[:2]] == [3, 3]
+    assert all(node.name > 'compute-04' for page in pages for node in page)
+
+
+def test_node_store_order(dbm):
+    store = SqlalchemySessionNodeStore(dbm)
+
+    names = [node.name for node in store.list(order_by='name')]
+    assert names == sorted(names)
+
+    names = [node.name for node in
+             store.list(order_by='name', order_desc=True)]
+    assert names == sorted(names, reverse=True)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'order_by': 'key'},
+    {'order_by': 'key', 'order_desc': True},
+    {'order_by': 'value'},
+    {'order_by': 'value', 'order_desc': True},
+])
+def test_tag_store_pagination(dbm, kwargs):
+    store = SqlalchemySessionTagStore(dbm)
+
+    expected = [tag.id for tag in store.list(**kwargs)]
+    assert len(set(expected)) == len(expected)
+    assert len(expected) > 4
+
+    pages = paginate(store, 4, **kwargs)
+    assert [tag.id for page in pages for tag in page] == expected
+
+
+def test_tag_store_order(dbm):
+    store = SqlalchemySessionTagStore(dbm)
+
+    ids = [Tag.parse_id(tag.id) for tag in store.list(order_by='key')
+           if tag.id.startswith('node:')]
+    assert ids == sorted(ids, key=lambda id_: (id_[2], int(id_[1])))
+
+    ids = [Tag.parse_id(tag.id) for tag in
+           store.list(order_by='key', order_desc=True)
+           if tag.id.startswith('node:')]
+    assert ids == sorted(ids, key=lambda id_: (id_[2], int(id_[1])),
+                         reverse=True)
+
+    with pytest.raises(ValueError):
+        list(store.list(order_by='nonexistent'))
+
+
+class TagObjectStoreTypeStore(ObjectStoreTypeStore):
+    type_class = Tag
+
+
+def test_object_store_pagination(redis):
+    store = TagObjectStoreTypeStore(
+        RedisObjectStore(namespace='tags', redis_client=redis, batch_size=2))
+    for idx in range(7):
+        store.save(Tag(id='node:{}:tag'.format(idx), value=str(idx % 3)))
+
+    expected = [tag.id for tag in store.list()]
+    assert expected == sorted(expected)
+
+    pages = paginate(store, 3)
+    assert [tag.id for page in pages for tag in page] == expected
+
+    #
+    # Objects can only be paged through in key or sorted index order
+    #
+    with pytest.raises(ValueError):
+        list(store.list(order_by='value', limit=3))
@@ -12,12 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections import OrderedDict
 from logging import getLogger
 import os
 import re
+from typing import Dict, Iterable, Tuple
 
 from tortuga.db.nodesDbHandler import NodesDbHandler
 from tortuga.db.models.hardwareProfile import HardwareProfile
+from tortuga.db.models.nic import Nic
+from tortuga.db.models.node import Node
 from tortuga.db.globalParameterDbApi import GlobalParameterDbApi
 from tortuga.kit.installer import ComponentInstallerBase
 from tortuga.exceptions.parameterNotFound import ParameterNotFound
@@ -61,6 +65,33 @@ class DnsProvider(object):
         """
         raise NotImplementedError
 
+    def sync_records(self, records: Dict[str, str],
+                     prune: bool = False) -> int:
+        """
+        Write a set of records. Inheriting classes may overwrite this
+        to only write the records that changed, and to remove the records
+        that are not in the set if prune is True.
+
+        :param records: Dict of ip addresses by name
+        :param prune: True if records is the complete set of records
+        :returns: the number of records written
+
+        """
+        for name, ip in records.items():
+            self.add_record(name, ip)
+
+        return len(records)
+
+    def remove_records(self, names: Iterable[str]):
+        """
+        Remove a batch of records.
+
+        :param names: Iterable of record names
+
+        """
+        for name in names:
+            self.remove_record(name)
+
 
 class DnsmasqDnsProvider(DnsProvider):
     """
@@ -95,6 +126,7 @@ class DnsmasqDnsProvider(DnsProvider):
         reload_file_path = os.path.join(cls.hostsdir, cls.reload_flag)
         if not force and not os.path.exists(reload_file_path):
             logger.debug('Reload flag not found, skipping dnsmasq reload')
+            return
 
         cmd = 'systemctl kill -s HUP dnsmasq.service'
         tortugaSubprocess.executeCommand(cmd)
@@ -103,15 +135,111 @@ class DnsmasqDnsProvider(DnsProvider):
         if os.path.exists(reload_file_path):
             os.remove(reload_file_path)
 
+    @staticmethod
+    def _format_record(name, ip):
+        return '{} {}\n'.format(ip, name)
+
+    def _read_records(self) -> Dict[str, str]:
+        """
+        Reads the hosts files currently on disk.
+
+        :returns: Dict of hosts file contents by name
+
+        """
+        records = {}
+
+        for entry in os.scandir(self.hostsdir):
+            #
+            # dnsmasq ignores dot files, which are used for the reload
+            # flag and temporary files
+            #
+            if entry.name.startswith('.') or not entry.is_file():
+                continue
+
+            with open(entry.path) as fp:
+                records[entry.name] = fp.read()
+
+        return records
+
+    def _write_record(self, name, ip):
+        """
+        Writes a hosts file atomically, so dnsmasq (which watches the
+        directory using inotify) never reads a partially written file.
+
+        """
+        tmp_file_path = os.path.join(self.hostsdir, '.{}.tmp'.format(name))
+        with open(tmp_file_path, 'w') as fp:
+            fp.write(self._format_record(name, ip))
+
+        os.replace(tmp_file_path, os.path.join(self.hostsdir, name))
+
     def add_record(self, name, ip):
-        hosts_file_path = os.path.join(self.hostsdir, name)
-        with open(hosts_file_path, 'w') as fp:
-            fp.write('{} {}\n'.format(ip, name))
+        self.sync_records({name: ip})
+
+    def sync_records(self, records: Dict[str, str],
+                     prune: bool = False) -> int:
+        """
+        Writes only the records that are missing or changed on disk, and
+        removes the ones that are not in records if prune is True. New
+        hosts files are picked up by dnsmasq automatically, changed and
+        removed ones need a reload to drop the old address, which is
+        flagged once for the whole batch.
+
+        :param records: Dict of ip addresses by name
+        :param prune: True if records is the complete set of records
+        :returns: the number of records written
+
+        """
+        if len(records) == 1 and not prune:
+            name = next(iter(records))
+            hosts_file_path = os.path.join(self.hostsdir, name)
+            existing = {}
+            if os.path.exists(hosts_file_path):
+                with open(hosts_file_path) as fp:
+                    existing[name] = fp.read()
+        else:
+            existing = self._read_records()
+
+        written = 0
+        changed = False
+
+        for name, ip in records.items():
+            content = existing.get(name)
+            if content == self._format_record(name, ip):
+                continue
+
+            self._write_record(name, ip)
+            written += 1
+
+            if content is not None:
+                changed = True
+
+        if prune:
+            for name in existing.keys() - records.keys():
+                os.remove(os.path.join(self.hostsdir, name))
+                changed = True
+
+        if changed:
+            self._flag_for_reload()
+
+        logger.debug('Wrote {} of {} dnsmasq host record(s)'.format(
+            written, len(records)))
+
+        return written
 
     def remove_record(self, name):
-        hosts_file_path = os.path.join(self.hostsdir, name)
-        if os.path.exists(hosts_file_path):
-            os.remove(hosts_file_path)
+        self.remove_records([name])
+
+    def remove_records(self, names: Iterable[str]):
+        removed = False
+
+        for name in names:
+            hosts_file_path = os.path.join(self.hostsdir, name)
+            if os.path.exists(hosts_file_path):
+                os.remove(hosts_file_path)
+                removed = True
+
+        if removed:
             self._flag_for_reload()
 
 
@@ -136,6 +264,12 @@ class ComponentInstaller(ComponentInstallerBase):
         super().__init__(kit)
         self._provider = None
 
+    def reset(self):
+        super().reset()
+
+        # the DNS zone may have changed since the provider was created
+        self._provider = None
+
     def action_get_puppet_args(self, db_software_profile,
                                db_hardware_profile,
                                *args, **kwargs):
@@ -166,92 +300,78 @@ class ComponentInstaller(ComponentInstallerBase):
         except ParameterNotFound:
             return default
 
-    def _provisioning_nics(self, provisioning_nic):
+    def _get_records(self, session, installer_node) -> Dict[str, str]:
         """
-        Write provisioning NIC entries.
+        Compute the desired DNS records for the installer and all nodes,
+        using a single query.
 
-        :param provisioning_nic: Object
-        :returns: None
+        :param session: Object session
+        :param installer_node: Object installer node
+        :returns: Dict of ip addresses by name
         """
-
         private_dns_zone = self._private_dns_zone()
 
-        # write record for installer host name and private zone
-        self.provider.add_record(
-            '{}.{}'.format(
-                provisioning_nic.node.name.split('.', 1)[0], private_dns_zone),
-            provisioning_nic.ip
-        )
-
-        for nic in provisioning_nic.network.nics:
-            if nic == provisioning_nic:
-                continue  # already handled
-
-            if nic.node.hardwareprofile.location == 'remote' and \
-                    not nic.boot:
-                continue
+        provisioning_nics = {
+            nic.id: nic for nic in installer_node.hardwareprofile.nics
+        }
+        provisioning_networks = {
+            nic.networkId for nic in provisioning_nics.values()
+        }
 
-            if nic.node.state == 'Deleted':
-                continue
+        records = OrderedDict()
 
-            self.provider.add_record(
-                nic.node.name,
+        # write record for installer host name and private zone
+        for nic in provisioning_nics.values():
+            records['{}.{}'.format(
+                installer_node.name.split('.', 1)[0], private_dns_zone)] = \
                 nic.ip
-            )
-
-    def _node_nics(self, session):
-        """
-        Write compute node NIC entries.
-
-        :param session: Object session
-        :returns: None
-        """
-
-        hardware_profiles = session.query(HardwareProfile).filter(
-            HardwareProfile.location != 'local'
-        ).all()
 
-        for profile in hardware_profiles:
-            for node in profile.nodes:
-                if not node.nics:
-                    continue
-
-                nics = {
-                    'internal': [],
-                    'external': []
-                }
-
-                for nic in node.nics:
-                    if nic.boot:
-                        nics['internal'].append(nic)
-                    else:
-                        nics['external'].append(nic)
-
-                if nics['internal'] and nics['external']:
-                    if profile.location == 'remote':
-                        ip = nics['external'][0].ip
-                    else:
-                        ip = nics['internal'][0].ip
-
-                elif nics['external'] and not nics['internal']:
-                    ip = nics['external'][0].ip
-
-                elif nics['internal'] and not nics['external']:
-                    ip = nics['internal'][0].ip
-
-                else:
-                    continue
-
-                if ip is None:
-                    continue
+        rows = session.query(
+            Nic.id, Nic.networkId, Nic.ip, Nic.boot, Node.id, Node.name,
+            HardwareProfile.location
+        ).join(
+            Node, Nic.nodeId == Node.id
+        ).join(
+            HardwareProfile, Node.hardwareProfileId == HardwareProfile.id
+        ).filter(
+            Node.state != 'Deleted'
+        ).order_by(Nic.id)
+
+        node_nics: Dict[int, Tuple[str, str, list, list]] = OrderedDict()
+
+        for nic_id, network_id, ip, boot, node_id, node_name, location \
+                in rows:
+            #
+            # Provisioning NIC entries
+            #
+            if network_id in provisioning_networks and \
+                    nic_id not in provisioning_nics and \
+                    not (location == 'remote' and not boot) and \
+                    ip is not None:
+                records[node_name] = ip
+
+            #
+            # Compute node NIC entries. Hardware profiles without a
+            # location are skipped, as they were by the SQL
+            # "location != 'local'" filter.
+            #
+            if location is not None and location != 'local':
+                _, _, internal, external = node_nics.setdefault(
+                    node_id, (node_name, location, [], []))
+                (internal if boot else external).append(ip)
+
+        for node_name, location, internal, external in node_nics.values():
+            if internal and external:
+                ip = external[0] if location == 'remote' else internal[0]
+            else:
+                ip = (internal or external)[0]
+
+            if ip is None:
+                continue
 
-                if node.state == 'Deleted':
-                    continue
+            records[node_name] = ip
 
-                self.provider.add_record(
-                    node.name,
-                    ip
-                )
+        return records
 
     def _configure(self, software_profile_name, fd, *args, **kwargs):
         """
@@ -287,10 +407,9 @@ class ComponentInstaller(ComponentInstallerBase):
             self.kit_installer.config_manager.getInstaller()
         )
 
-        for provisioning_nic in installer_node.hardwareprofile.nics:
-            self._provisioning_nics(provisioning_nic)
-
-        self._node_nics(self.kit_installer.session)
+        self.provider.sync_records(
+            self._get_records(self.kit_installer.session, installer_node),
+            prune=True)
 
     def action_pre_add_host(self, hardware_profile, software_profile,
                             hostname, ip, *args, **kwargs):
@@ -317,5 +436,4 @@ class ComponentInstaller(ComponentInstallerBase):
 
         :returns: None
         """
-        for node in nodes:
-            self.provider.remove_record(node)
+        self.provider.remove_records(nodes)